@@ -0,0 +1,515 @@
+USE [flight];
+GO
+
+-- ===================================================================
+-- BENCHMARK: EXPORT DATE RANGE FILTER AFTER DATA_ / PUSHED INTO FLIGHT_DATA
+-- ===================================================================
+-- Runs the live export query of /export-flight-data (FLIGHT_EXPORT_SOURCE=live) on a
+-- synthetic multi-year flight_raw, once with the date range applied after DATA_ has enriched
+-- every row (previous query) and once with the range applied first on the indexed
+-- flight_raw.flight_date inside FLIGHT_DATA (services/flight_export.py).
+-- Every range (1 day, 30 days, 365 days, ending @LastDay) is measured with 1 year and with
+-- @Years years of data loaded: the pushed variant follows the size of the range, the
+-- previous one the size of the table. Both variants must report the same number of rows.
+--
+-- The synthetic rows are inserted in a transaction that is rolled back at the end;
+-- run on a copy of the database.
+
+SET NOCOUNT ON;
+
+DECLARE @Years INT = 5;
+DECLARE @RowsPerDay INT = 200;
+DECLARE @Runs INT = 3;
+DECLARE @LastDay DATE = '2099-12-31';
+DECLARE @BatchId CHAR(32) = REPLACE(CAST(NEWID() AS CHAR(36)), '-', '');
+
+DECLARE @Phase INT = 1;
+DECLARE @Run INT;
+DECLARE @RangeDays INT;
+DECLARE @LoadFrom DATE;
+DECLARE @LoadTo DATE;
+DECLARE @StartDay DATE;
+DECLARE @EndDay DATE;
+DECLARE @StartDate DATETIME;
+DECLARE @EndDate DATETIME;
+DECLARE @Start DATETIME2;
+DECLARE @Rows INT;
+
+DECLARE @Routes TABLE
+(
+    id INT NOT NULL PRIMARY KEY,
+    route NVARCHAR(100) NOT NULL,
+    sheet_name NVARCHAR(255) NOT NULL
+);
+INSERT INTO @Routes (id, route, sheet_name)
+VALUES
+    (1, 'SGN-HAN', 'SGN'),
+    (2, 'HAN-SGN', 'HAN'),
+    (3, 'DAD-SGN', 'DAD'),
+    (4, 'HAN-DAD', 'HAN'),
+    (5, 'SGN-BKK', 'SGN'),
+    (6, 'HAN-ICN', 'HAN'),
+    (7, 'CXR-HAN', 'CXR'),
+    (8, 'PQC-SGN', 'PQC');
+
+DECLARE @Ranges TABLE (RangeDays INT NOT NULL PRIMARY KEY);
+INSERT INTO @Ranges (RangeDays)
+VALUES (1), (30), (365);
+
+DECLARE @Results TABLE
+(
+    Variant NVARCHAR(20),
+    LoadedYears INT,
+    RangeDays INT,
+    Run INT,
+    Ms INT,
+    [Rows] INT
+);
+
+BEGIN TRANSACTION;
+
+WHILE @Phase <= 2
+BEGIN
+    -- Phase 1 loads the last year, phase 2 the @Years - 1 years before it
+    SET @LoadTo = CASE WHEN @Phase = 1 THEN @LastDay ELSE DATEADD(YEAR, -1, @LastDay) END;
+    SET @LoadFrom = CASE WHEN @Phase = 1
+        THEN DATEADD(DAY, 1, DATEADD(YEAR, -1, @LastDay))
+        ELSE DATEADD(DAY, 1, DATEADD(YEAR, -@Years, @LastDay)) END;
+
+    ;WITH
+        N AS (
+            SELECT TOP (@RowsPerDay) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n
+            FROM sys.all_objects
+        ),
+        D AS (
+            SELECT TOP (DATEDIFF(DAY, @LoadFrom, @LoadTo) + 1)
+                DATEADD(DAY, ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1, @LoadFrom) AS d
+            FROM sys.all_objects a
+                CROSS JOIN sys.all_objects b
+        )
+    INSERT INTO flight_raw
+        (flightdate, flight_date, flight_date_status, flightno, route, actype,
+        adl, chd, cgo, mail, totalpax, source, sheet_name, import_batch_id)
+    SELECT
+        CONVERT(NVARCHAR(10), D.d, 103),
+        D.d,
+        0,
+        'VN' + CAST(100 + N.n AS NVARCHAR(10)),
+        R.route,
+        'A321',
+        150, 5, 100, 10, 155,
+        'benchmark_export_date_range',
+        R.sheet_name,
+        @BatchId
+    FROM D
+        CROSS JOIN N
+        INNER JOIN @Routes R ON R.id = N.n % 8 + 1;
+
+    PRINT 'Loaded years: ' + CAST(CASE WHEN @Phase = 1 THEN 1 ELSE @Years END AS VARCHAR)
+        + ', flight_raw rows: ' + CAST((SELECT COUNT(*) FROM flight_raw) AS VARCHAR);
+
+    SET @RangeDays = (SELECT MIN(RangeDays) FROM @Ranges);
+
+    WHILE @RangeDays IS NOT NULL
+    BEGIN
+        SET @EndDay = @LastDay;
+        SET @StartDay = DATEADD(DAY, 1 - @RangeDays, @LastDay);
+        SET @StartDate = CAST(@StartDay AS DATETIME);
+        SET @EndDate = DATEADD(SECOND, 86399, CAST(@EndDay AS DATETIME));
+
+        SET @Run = 1;
+        WHILE @Run <= @Runs
+        BEGIN
+            -- Previous query: range applied after DATA_
+            SET @Start = SYSDATETIME();
+
+            WITH SECTOR_DOM AS (
+                SELECT
+                    CASE
+                        WHEN LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1)
+                            < RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR))
+                            THEN SECTOR
+                        ELSE RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR))
+                            + '-'
+                            + LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1)
+                    END AS ROUTE,
+                    SECTOR,
+                    [Area_Lv1],
+                    [DOM/INT]
+                FROM SECTOR_ROUTE_DOM_REF
+            ),
+            ROUTE_ AS (
+                SELECT
+                    ROUTE,
+                    [Area_Lv1] AS AREA
+                FROM SECTOR_DOM
+                WHERE UPPER(LTRIM(RTRIM([DOM/INT]))) = 'DOM'
+                GROUP BY ROUTE, [Area_Lv1]
+            ),
+            FLIGHT_DATA AS (
+                SELECT
+                    f.id,
+                    CAST(f.flight_date AS DATETIME) AS flightdate,
+
+                    flightno,
+                    route,
+                    f.actype,
+                    COALESCE(f.seat, s.seat) AS seat,
+                    adl, chd, cgo, mail,
+                    source, acregno, sheet_name,
+
+                    CASE
+                        WHEN totalpax > 0 THEN totalpax
+                        ELSE ISNULL(adl, 0) + ISNULL(chd, 0)
+                    END AS totalpax,
+
+                    CASE
+                        WHEN totalpax = 0
+                            AND (ISNULL(cgo, 0) + ISNULL(mail, 0) > 0) THEN 0
+                        WHEN totalpax > 0 THEN 1
+                    END AS FLIGHT_TYPE
+
+                FROM flight_raw f
+                LEFT JOIN AIRPORT_REF dep
+                    ON LEFT(TRIM(f.route), 3) = dep.IATACode
+                LEFT JOIN AIRPORT_REF arr
+                    ON RIGHT(TRIM(f.route), 3) = arr.IATACode
+                LEFT JOIN actype_seat s
+                    ON LOWER(TRIM(f.actype)) = LOWER(TRIM(s.actype))
+
+                WHERE
+                    CASE
+                        WHEN CHARINDEX('SGN', route) > 1
+                            AND sheet_name != 'SGN' THEN 0
+                        WHEN sheet_name = 'SGN' THEN 1
+                        WHEN CASE
+                                WHEN dep.Country = 'Vietnam'
+                                    AND arr.Country = 'Vietnam' THEN 'DOM'
+                                WHEN dep.Country IS NOT NULL
+                                    AND arr.Country IS NOT NULL
+                                    AND (dep.Country != 'Vietnam'
+                                        OR arr.Country != 'Vietnam') THEN 'INT'
+                                ELSE NULL
+                            END = 'INT' THEN 2
+                        WHEN sheet_name = LEFT(route, 3) THEN 3
+                        ELSE -1
+                    END > 0
+            ),
+            DATA_ AS (
+                SELECT
+                    CASE
+                        WHEN LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1)
+                            < RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE))
+                            THEN F.ROUTE
+                        ELSE RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE))
+                            + '-'
+                            + LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1)
+                    END AS ROUTE_SORT,
+
+                    F.*,
+                    LEFT(TRIM(F.FLIGHTNO), 2) AS AIRLINE_CODE,
+                    A.AIRLINES_NAME,
+                    A.AIRLINE_NATION,
+
+                    LEFT(F.ROUTE, 3) AS DEPARTURE,
+                    RIGHT(F.ROUTE, 3) AS ARRIVES,
+
+                    CASE
+                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM'
+                            AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'VIETNAM'
+                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM'
+                            AND UPPER(AI1.COUNTRY) <> 'VIETNAM' THEN AI1.COUNTRY
+                        ELSE AI.COUNTRY
+                    END AS COUNTRY,
+
+                    CASE
+                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM'
+                            AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'DOM'
+                        ELSE 'INT'
+                    END AS INT_DOM,
+
+                    CASE
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[2_LETTER_CODE]
+                        ELSE C.[2_LETTER_CODE]
+                    END AS COUNTRY_CODE,
+
+                    CASE
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[REGION_(VNM)]
+                        ELSE C.[REGION_(VNM)]
+                    END AS AREA,
+
+                    AI.CITY AS CITY_ARRIVES,
+                    AI.COUNTRY AS COUNTRY_ARRIVES,
+                    AI1.CITY AS CITY_DEPARTURE,
+                    AI1.COUNTRY AS COUNTRY_DEPARTURE,
+                    C2.[2_LETTER_CODE] AS AIRLINE_NATION_CODE
+                FROM FLIGHT_DATA F
+                LEFT JOIN AIRLINE_REF A
+                    ON LEFT(F.FLIGHTNO, 2) = A.CARRIER
+                LEFT JOIN AIRPORT_REF AI
+                    ON AI.IATACODE = RIGHT(F.ROUTE, 3)
+                LEFT JOIN AIRPORT_REF AI1
+                    ON AI1.IATACODE = LEFT(F.ROUTE, 3)
+                LEFT JOIN COUNTRY_REF C
+                    ON AI.COUNTRY = C.COUNTRY
+                LEFT JOIN COUNTRY_REF C1
+                    ON AI1.COUNTRY = C1.COUNTRY
+                LEFT JOIN COUNTRY_REF C2
+                    ON C2.COUNTRY = A.AIRLINE_NATION
+            )
+            SELECT @Rows = COUNT(*)
+            FROM (
+                SELECT
+                    D.flightdate,
+                    D.FLIGHTNO,
+                    D.ROUTE,
+                    D.ACTYPE,
+                    D.TOTALPAX,
+                    D.CGO,
+                    D.MAIL,
+                    D.ACREGNO,
+                    D.SOURCE,
+                    D.SHEET_NAME,
+                    D.SEAT,
+                    D.INT_DOM,
+                    D.AIRLINE_CODE,
+                    D.AIRLINES_NAME,
+                    D.AIRLINE_NATION,
+                    D.AIRLINE_NATION_CODE,
+                    DEPARTURE,
+                    CITY_DEPARTURE,
+                    COUNTRY_DEPARTURE,
+                    ARRIVES,
+                    CITY_ARRIVES,
+                    COUNTRY_ARRIVES,
+                    COUNTRY_CODE,
+                    D.AREA AS AREA_CODE
+
+                FROM DATA_ AS D
+                LEFT JOIN ROUTE_ AS S
+                    ON D.ROUTE_SORT = S.ROUTE
+                WHERE D.flightdate >= @StartDate
+                    AND D.flightdate <= @EndDate
+            ) AS X
+            OPTION (RECOMPILE);
+
+            INSERT INTO @Results
+            VALUES ('filter_last', CASE WHEN @Phase = 1 THEN 1 ELSE @Years END, @RangeDays, @Run,
+                DATEDIFF(MILLISECOND, @Start, SYSDATETIME()), @Rows);
+
+            -- Range applied first on flight_raw.flight_date
+            SET @Start = SYSDATETIME();
+
+            WITH SECTOR_DOM AS (
+                SELECT
+                    CASE
+                        WHEN LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1)
+                            < RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR))
+                            THEN SECTOR
+                        ELSE RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR))
+                            + '-'
+                            + LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1)
+                    END AS ROUTE,
+                    SECTOR,
+                    [Area_Lv1],
+                    [DOM/INT]
+                FROM SECTOR_ROUTE_DOM_REF
+            ),
+            ROUTE_ AS (
+                SELECT
+                    ROUTE,
+                    [Area_Lv1] AS AREA
+                FROM SECTOR_DOM
+                WHERE UPPER(LTRIM(RTRIM([DOM/INT]))) = 'DOM'
+                GROUP BY ROUTE, [Area_Lv1]
+            ),
+            FLIGHT_DATA AS (
+                SELECT
+                    f.id,
+                    CAST(f.flight_date AS DATETIME) AS flightdate,
+
+                    flightno,
+                    route,
+                    f.actype,
+                    COALESCE(f.seat, s.seat) AS seat,
+                    adl, chd, cgo, mail,
+                    source, acregno, sheet_name,
+
+                    CASE
+                        WHEN totalpax > 0 THEN totalpax
+                        ELSE ISNULL(adl, 0) + ISNULL(chd, 0)
+                    END AS totalpax,
+
+                    CASE
+                        WHEN totalpax = 0
+                            AND (ISNULL(cgo, 0) + ISNULL(mail, 0) > 0) THEN 0
+                        WHEN totalpax > 0 THEN 1
+                    END AS FLIGHT_TYPE
+
+                FROM flight_raw f
+                LEFT JOIN AIRPORT_REF dep
+                    ON LEFT(TRIM(f.route), 3) = dep.IATACode
+                LEFT JOIN AIRPORT_REF arr
+                    ON RIGHT(TRIM(f.route), 3) = arr.IATACode
+                LEFT JOIN actype_seat s
+                    ON LOWER(TRIM(f.actype)) = LOWER(TRIM(s.actype))
+
+                -- Lọc khoảng thời gian trước tiên: seek trên index flight_date, chỉ các dòng
+                -- trong khoảng đi qua các join / CTE phía sau
+                WHERE f.flight_date >= @StartDay
+                    AND f.flight_date <= @EndDay
+                    AND CAST(f.flight_date AS DATETIME) >= @StartDate
+                    AND CAST(f.flight_date AS DATETIME) <= @EndDate
+                    AND CASE
+                        WHEN CHARINDEX('SGN', route) > 1
+                            AND sheet_name != 'SGN' THEN 0
+                        WHEN sheet_name = 'SGN' THEN 1
+                        WHEN CASE
+                                WHEN dep.Country = 'Vietnam'
+                                    AND arr.Country = 'Vietnam' THEN 'DOM'
+                                WHEN dep.Country IS NOT NULL
+                                    AND arr.Country IS NOT NULL
+                                    AND (dep.Country != 'Vietnam'
+                                        OR arr.Country != 'Vietnam') THEN 'INT'
+                                ELSE NULL
+                            END = 'INT' THEN 2
+                        WHEN sheet_name = LEFT(route, 3) THEN 3
+                        ELSE -1
+                    END > 0
+            ),
+            DATA_ AS (
+                SELECT
+                    CASE
+                        WHEN LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1)
+                            < RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE))
+                            THEN F.ROUTE
+                        ELSE RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE))
+                            + '-'
+                            + LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1)
+                    END AS ROUTE_SORT,
+
+                    F.*,
+                    LEFT(TRIM(F.FLIGHTNO), 2) AS AIRLINE_CODE,
+                    A.AIRLINES_NAME,
+                    A.AIRLINE_NATION,
+
+                    LEFT(F.ROUTE, 3) AS DEPARTURE,
+                    RIGHT(F.ROUTE, 3) AS ARRIVES,
+
+                    CASE
+                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM'
+                            AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'VIETNAM'
+                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM'
+                            AND UPPER(AI1.COUNTRY) <> 'VIETNAM' THEN AI1.COUNTRY
+                        ELSE AI.COUNTRY
+                    END AS COUNTRY,
+
+                    CASE
+                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM'
+                            AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'DOM'
+                        ELSE 'INT'
+                    END AS INT_DOM,
+
+                    CASE
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[2_LETTER_CODE]
+                        ELSE C.[2_LETTER_CODE]
+                    END AS COUNTRY_CODE,
+
+                    CASE
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
+                        WHEN UPPER(C.COUNTRY) = 'VIETNAM'
+                            AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[REGION_(VNM)]
+                        ELSE C.[REGION_(VNM)]
+                    END AS AREA,
+
+                    AI.CITY AS CITY_ARRIVES,
+                    AI.COUNTRY AS COUNTRY_ARRIVES,
+                    AI1.CITY AS CITY_DEPARTURE,
+                    AI1.COUNTRY AS COUNTRY_DEPARTURE,
+                    C2.[2_LETTER_CODE] AS AIRLINE_NATION_CODE
+                FROM FLIGHT_DATA F
+                LEFT JOIN AIRLINE_REF A
+                    ON LEFT(F.FLIGHTNO, 2) = A.CARRIER
+                LEFT JOIN AIRPORT_REF AI
+                    ON AI.IATACODE = RIGHT(F.ROUTE, 3)
+                LEFT JOIN AIRPORT_REF AI1
+                    ON AI1.IATACODE = LEFT(F.ROUTE, 3)
+                LEFT JOIN COUNTRY_REF C
+                    ON AI.COUNTRY = C.COUNTRY
+                LEFT JOIN COUNTRY_REF C1
+                    ON AI1.COUNTRY = C1.COUNTRY
+                LEFT JOIN COUNTRY_REF C2
+                    ON C2.COUNTRY = A.AIRLINE_NATION
+            )
+            SELECT @Rows = COUNT(*)
+            FROM (
+                SELECT
+                    D.flightdate,
+                    D.FLIGHTNO,
+                    D.ROUTE,
+                    D.ACTYPE,
+                    D.TOTALPAX,
+                    D.CGO,
+                    D.MAIL,
+                    D.ACREGNO,
+                    D.SOURCE,
+                    D.SHEET_NAME,
+                    D.SEAT,
+                    D.INT_DOM,
+                    D.AIRLINE_CODE,
+                    D.AIRLINES_NAME,
+                    D.AIRLINE_NATION,
+                    D.AIRLINE_NATION_CODE,
+                    DEPARTURE,
+                    CITY_DEPARTURE,
+                    COUNTRY_DEPARTURE,
+                    ARRIVES,
+                    CITY_ARRIVES,
+                    COUNTRY_ARRIVES,
+                    COUNTRY_CODE,
+                    D.AREA AS AREA_CODE
+
+                FROM DATA_ AS D
+                LEFT JOIN ROUTE_ AS S
+                    ON D.ROUTE_SORT = S.ROUTE
+            ) AS X
+            OPTION (RECOMPILE);
+
+            INSERT INTO @Results
+            VALUES ('range_first', CASE WHEN @Phase = 1 THEN 1 ELSE @Years END, @RangeDays, @Run,
+                DATEDIFF(MILLISECOND, @Start, SYSDATETIME()), @Rows);
+
+            SET @Run += 1;
+        END
+
+        SET @RangeDays = (SELECT MIN(RangeDays) FROM @Ranges WHERE RangeDays > @RangeDays);
+    END
+
+    SET @Phase += 1;
+END
+
+ROLLBACK TRANSACTION;
+
+SELECT
+    Variant,
+    LoadedYears,
+    RangeDays,
+    COUNT(*) AS Runs,
+    MIN(Ms) AS MinMs,
+    AVG(Ms) AS AvgMs,
+    MAX(Ms) AS MaxMs,
+    MAX([Rows]) AS [Rows]
+FROM @Results
+GROUP BY Variant, LoadedYears, RangeDays
+ORDER BY RangeDays, Variant, LoadedYears;
+GO
@@ -0,0 +1,99 @@
+USE [flight];
+GO
+
+-- ===================================================================
+-- BENCHMARK: VALIDATION LOOKUPS BEFORE / AFTER NORMALIZED KEYS
+-- ===================================================================
+-- Runs the route and actype checks of usp_CleanAndValidateFlightData over error_table
+-- (read-only), once with the original expressions (LOWER(TRIM(actype)), sector built
+-- from LEFT/RIGHT(route, 3)) and once with actype_norm / sector_key.
+-- Both variants must report the same number of invalid rows.
+--
+-- For a full cleaning run, compare the duration printed by
+--     SET STATISTICS TIME ON; EXEC usp_CleanAndValidateFlightData @FullSweep = 1;
+-- on a copy of the database before and after applying the normalized key migration.
+
+SET NOCOUNT ON;
+
+DECLARE @Runs INT = 5;
+DECLARE @Run INT = 1;
+DECLARE @Start DATETIME2;
+DECLARE @InvalidRoutes INT;
+DECLARE @InvalidActypes INT;
+DECLARE @Results TABLE
+(
+    Variant NVARCHAR(20),
+    Run INT,
+    Ms INT,
+    InvalidRoutes INT,
+    InvalidActypes INT
+);
+
+WHILE @Run <= @Runs
+BEGIN
+    -- Original expressions
+    SET @Start = SYSDATETIME();
+
+    SELECT
+        @InvalidRoutes = SUM(CASE WHEN NOT EXISTS (
+            SELECT 1
+            FROM Airline_Route_Details ARD
+            WHERE ARD.SECTOR = (
+                CASE
+                    WHEN LEN(TRIM(et.route)) = 7 AND CHARINDEX('-', et.route) > 0 THEN
+                        CASE
+                            WHEN LEFT(et.route, 3) < RIGHT(et.route, 3)
+                                THEN CONCAT(LEFT(et.route, 3), RIGHT(et.route, 3))
+                            ELSE CONCAT(RIGHT(et.route, 3), LEFT(et.route, 3))
+                        END
+                    ELSE NULL
+                END
+            )
+        ) THEN 1 ELSE 0 END),
+        @InvalidActypes = SUM(CASE
+            WHEN (ISNULL(et.cgo, 0) + ISNULL(et.mail, 0) > 0 AND ISNULL(et.totalpax, 0) = 0) THEN 0
+            WHEN NOT EXISTS (
+                SELECT 1
+                FROM actype_seat ATS
+                WHERE LOWER(TRIM(ATS.actype)) = LOWER(TRIM(et.actype))
+            ) THEN 1 ELSE 0 END)
+    FROM error_table et;
+
+    INSERT INTO @Results
+    VALUES ('expression', @Run, DATEDIFF(MILLISECOND, @Start, SYSDATETIME()), @InvalidRoutes, @InvalidActypes);
+
+    -- Normalized key columns
+    SET @Start = SYSDATETIME();
+
+    SELECT
+        @InvalidRoutes = SUM(CASE WHEN NOT EXISTS (
+            SELECT 1
+            FROM Airline_Route_Details ARD
+            WHERE ARD.sector_key = et.sector_key
+        ) THEN 1 ELSE 0 END),
+        @InvalidActypes = SUM(CASE
+            WHEN (ISNULL(et.cgo, 0) + ISNULL(et.mail, 0) > 0 AND ISNULL(et.totalpax, 0) = 0) THEN 0
+            WHEN NOT EXISTS (
+                SELECT 1
+                FROM actype_seat ATS
+                WHERE ATS.actype_norm = et.actype_norm
+            ) THEN 1 ELSE 0 END)
+    FROM error_table et;
+
+    INSERT INTO @Results
+    VALUES ('normalized_key', @Run, DATEDIFF(MILLISECOND, @Start, SYSDATETIME()), @InvalidRoutes, @InvalidActypes);
+
+    SET @Run += 1;
+END
+
+SELECT
+    Variant,
+    COUNT(*) AS Runs,
+    MIN(Ms) AS MinMs,
+    AVG(Ms) AS AvgMs,
+    MAX(Ms) AS MaxMs,
+    MAX(InvalidRoutes) AS InvalidRoutes,
+    MAX(InvalidActypes) AS InvalidActypes
+FROM @Results
+GROUP BY Variant;
+GO
@@ -10,11 +10,97 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = ""
     OPENAI_API_KEY: str
 
+    # Excel import: đọc từng sheet / từng chunk dòng thay vì load toàn bộ workbook
+    EXCEL_STREAMING_READ: bool = True
+    EXCEL_CHUNK_SIZE: int = 5000
+    # Số process parse Excel song song khi import nhiều file (1 = tuần tự)
+    EXCEL_PARSE_WORKERS: int = 1
+    # Cache kết quả parse theo SHA-256 của file (thư mục rỗng = thư mục tạm, 0 MB = tắt)
+    PARSE_CACHE_DIR: str = ""
+    PARSE_CACHE_MAX_MB: int = 512
+
+    # Ghi flight_raw: số dòng mỗi lô executemany, bật fast_executemany cho mssql+pyodbc
+    FLIGHT_RAW_INSERT_CHUNK_SIZE: int = 10000
+    DB_FAST_EXECUTEMANY: bool = True
+
+    # Handler def chạy trong threadpool: số thread và kích thước connection pool tương ứng
+    API_THREADPOOL_SIZE: int = 40
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+
+    # Upload: ghi file xuống đĩa theo chunk, giới hạn dung lượng mỗi file / mỗi request (0 = không giới hạn)
+    UPLOAD_CHUNK_SIZE_KB: int = 1024
+    UPLOAD_MAX_FILE_MB: int = 200
+    UPLOAD_MAX_REQUEST_MB: int = 1024
+
+    # Job import chạy nền: số worker (1 = các job chạy lần lượt, stored procedure làm sạch
+    # xử lý toàn bộ dữ liệu chưa clean) và thư mục lưu file chờ xử lý (rỗng = thư mục tạm)
+    IMPORT_JOB_WORKERS: int = 1
+    IMPORT_JOB_DIR: str = ""
+    # Process chạy job cập nhật heartbeat mỗi IMPORT_JOB_HEARTBEAT_SECONDS giây; job running có
+    # heartbeat cũ hơn IMPORT_JOB_STALE_SECONDS giây (process đã dừng) được đưa lại vào hàng đợi
+    IMPORT_JOB_HEARTBEAT_SECONDS: int = 30
+    IMPORT_JOB_STALE_SECONDS: int = 300
+
+    # Validate dữ liệu bằng stored procedure ("sql") hay trong process khi import ("python")
+    VALIDATION_ENGINE: str = "sql"
+
+    # Mã sân bay dùng làm sheet_name cho file MB, mục đứng trước được ưu tiên
+    MB_STATION_CODES: str = "THD,HPH,HAN,VDO,VDH,VII,DIN"
+
+    # Logging: level chung, level theo module (vd "backend.services=DEBUG,sqlalchemy=WARNING")
+    # và định dạng output ("json" hoặc "text")
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_FORMAT: str = "json"
+
+    # Cache summary của /stats, /processing-summary (giây, 0 = tắt), xoá khi import /
+    # làm sạch hoàn tất
+    PROCESSING_SUMMARY_CACHE_SECONDS: int = 30
+
+    # Export stream (ndjson / csv): số dòng mỗi lần fetch từ cursor
+    EXPORT_FETCH_SIZE: int = 5000
+    # Export phân trang (/export-flight-data/page): số dòng mặc định và tối đa mỗi trang
+    EXPORT_PAGE_SIZE: int = 5000
+    EXPORT_MAX_PAGE_SIZE: int = 50000
+    # Export đọc bảng flight_export_fact đã enrich sẵn ("fact", làm mới khi làm sạch dữ liệu /
+    # sửa bảng reference) hay tính lại toàn bộ query enrich mỗi lần ("live")
+    FLIGHT_EXPORT_SOURCE: str = "fact"
+
     # Validate and split the ALLOWED_ORIGINS before storing
     @field_validator("ALLOWED_ORIGINS")
     def parse_allowed_origins(cls, v: str) -> List[str]:
         return v.split(",") if v else []
 
+    # Split MB_STATION_CODES, keeping the configured order
+    @field_validator("MB_STATION_CODES")
+    def parse_mb_station_codes(cls, v: str) -> List[str]:
+        return [code.strip() for code in v.split(",") if code.strip()] if v else []
+
+    # Only "sql" and "python" validation engines are supported
+    @field_validator("VALIDATION_ENGINE")
+    def parse_validation_engine(cls, v: str) -> str:
+        v = v.strip().lower()
+        if v not in ("sql", "python"):
+            raise ValueError("VALIDATION_ENGINE must be 'sql' or 'python'")
+        return v
+
+    # Only "json" and "text" log formats are supported
+    @field_validator("LOG_FORMAT")
+    def parse_log_format(cls, v: str) -> str:
+        v = v.strip().lower()
+        if v not in ("json", "text"):
+            raise ValueError("LOG_FORMAT must be 'json' or 'text'")
+        return v
+
+    # Only "fact" and "live" export sources are supported
+    @field_validator("FLIGHT_EXPORT_SOURCE")
+    def parse_flight_export_source(cls, v: str) -> str:
+        v = v.strip().lower()
+        if v not in ("fact", "live"):
+            raise ValueError("FLIGHT_EXPORT_SOURCE must be 'fact' or 'live'")
+        return v
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,178 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from backend.core.config import settings
+
+
+# Correlation id của request / job đang chạy, được gắn vào mọi log record
+_correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+# Các thuộc tính có sẵn của LogRecord, phần còn lại (truyền qua extra=) được ghi ra JSON
+_RECORD_ATTRIBUTES = set(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "correlation_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_correlation_id() -> str:
+    """Tạo correlation id mới (UUID dạng hex)"""
+    return uuid.uuid4().hex
+
+
+def get_correlation_id() -> Optional[str]:
+    """Lấy correlation id của context hiện tại"""
+    return _correlation_id.get()
+
+
+def set_correlation_id(correlation_id: Optional[str]):
+    """
+    Gán correlation id cho context hiện tại (request / job)
+
+    Args:
+        correlation_id (str, optional): Correlation id
+
+    Returns:
+        Token: Dùng với reset_correlation_id() để khôi phục giá trị cũ
+    """
+    return _correlation_id.set(correlation_id)
+
+
+def reset_correlation_id(token) -> None:
+    """Khôi phục correlation id trước khi gọi set_correlation_id()"""
+    _correlation_id.reset(token)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Gắn correlation id của context hiện tại vào log record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log record thành một dòng JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _parse_module_levels(value: str) -> Dict[str, str]:
+    """
+    Đọc cấu hình level theo module, dạng "module=LEVEL,module=LEVEL"
+
+    Args:
+        value (str): Cấu hình LOG_LEVELS
+
+    Returns:
+        Dict[str, str]: Tên logger -> level
+    """
+
+    levels = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _apply_levels() -> None:
+    """Gán LOG_LEVEL cho root logger và LOG_LEVELS cho từng module"""
+    logging.getLogger().setLevel(settings.LOG_LEVEL.upper())
+
+    for name, level in _parse_module_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+
+def _build_formatter() -> logging.Formatter:
+    """Formatter theo LOG_FORMAT (json hoặc text)"""
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(correlation_id)s] %(message)s"
+    )
+
+
+def setup_logging() -> None:
+    """
+    Cấu hình logging cho ứng dụng: root logger ghi qua QueueHandler (không chặn luồng
+    xử lý), một QueueListener ghi ra stdout theo LOG_FORMAT. Level chung là LOG_LEVEL,
+    LOG_LEVELS ghi đè level từng module. Gọi nhiều lần chỉ cấu hình một lần.
+
+    Returns:
+        None
+    """
+
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Filter chạy ở thread gọi log nên lấy đúng correlation id của request / job
+    queue_handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    _apply_levels()
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def setup_worker_logging(correlation_id: Optional[str] = None) -> None:
+    """
+    Cấu hình logging trong process con (parse Excel song song): thread QueueListener
+    không tồn tại trong process con nên ghi thẳng ra stdout
+
+    Args:
+        correlation_id (str, optional): Correlation id của request / job tạo process
+
+    Returns:
+        None
+    """
+
+    global _listener
+    _listener = None
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+    stream_handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [stream_handler]
+    _apply_levels()
+
+    _correlation_id.set(correlation_id)
@@ -5,7 +5,19 @@ from sqlalchemy.ext.declarative import declarative_base
 from backend.core.config import settings
 
 
-engine = create_engine(settings.DATABASE_URL)  # Tạo engine kết nối CSDL
+# pyodbc fast_executemany: gửi cả lô tham số một lần thay vì từng dòng INSERT
+engine_options = {}
+if settings.DATABASE_URL.startswith("mssql+pyodbc") and settings.DB_FAST_EXECUTEMANY:
+    engine_options["fast_executemany"] = True
+
+# Mỗi request giữ một connection trong thread của threadpool, pool phải đủ lớn cho số thread
+if not settings.DATABASE_URL.startswith("sqlite"):
+    engine_options["pool_size"] = settings.DB_POOL_SIZE
+    engine_options["max_overflow"] = settings.DB_MAX_OVERFLOW
+
+engine = create_engine(
+    settings.DATABASE_URL, **engine_options
+)  # Tạo engine kết nối CSDL
 
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine
@@ -225,6 +225,17 @@ IF COL_LENGTH('import_log', 'created_at') IS NULL
 IF COL_LENGTH('import_log', 'updated_at') IS NULL
     ALTER TABLE import_log ADD updated_at datetime2 DEFAULT SYSDATETIME();
 
+IF COL_LENGTH('import_log', 'file_hash') IS NULL
+    ALTER TABLE import_log ADD file_hash CHAR(64) NULL;
+
+IF NOT EXISTS (
+    SELECT 1
+FROM sys.indexes
+WHERE name = 'IX_import_log_file_hash'
+    AND object_id = OBJECT_ID('import_log')
+)
+    EXEC('CREATE INDEX IX_import_log_file_hash ON import_log(file_hash)');
+
 DECLARE @pk8 NVARCHAR(200);
 SELECT @pk8 = name
 FROM sys.key_constraints
@@ -289,6 +300,393 @@ IF COL_LENGTH('TempRouteImport', 'Route') IS NULL
     ALTER TABLE TempRouteImport ADD [Route] NVARCHAR(255) PRIMARY KEY;
 
 
+/* ===================== import_job ===================== */
+IF OBJECT_ID('import_job', 'U') IS NULL
+BEGIN
+    CREATE TABLE import_job
+    (
+        id NVARCHAR(32) NOT NULL PRIMARY KEY,
+        job_type NVARCHAR(50) NOT NULL,
+        status NVARCHAR(20) DEFAULT 'queued' NOT NULL,
+        file_count INT NULL,
+        file_names NVARCHAR(MAX) NULL,
+        work_dir NVARCHAR(500) NULL,
+        stages NVARCHAR(MAX) NULL,
+        result NVARCHAR(MAX) NULL,
+        error NVARCHAR(MAX) NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+        started_at DATETIME2 NULL,
+        finished_at DATETIME2 NULL
+    );
+
+    EXEC('CREATE INDEX IX_import_job_status ON import_job(status)');
+    EXEC('CREATE INDEX IX_import_job_created_at ON import_job(created_at)');
+END
+
+
+/* ===================== validation_watermark ===================== */
+IF OBJECT_ID('validation_watermark', 'U') IS NULL
+BEGIN
+    CREATE TABLE validation_watermark
+    (
+        name NVARCHAR(50) NOT NULL PRIMARY KEY,
+        watermark DATETIME2 NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+        updated_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+    );
+END
+
+
+/* ===================== normalized lookup keys ===================== */
+IF COL_LENGTH('actype_seat', 'actype_norm') IS NULL
+    ALTER TABLE actype_seat ADD actype_norm AS LOWER(TRIM(actype)) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_actype_seat_actype_norm' AND object_id = OBJECT_ID('actype_seat'))
+    EXEC('CREATE INDEX IX_actype_seat_actype_norm ON actype_seat(actype_norm)');
+
+IF COL_LENGTH('Airline_Route_Details', 'sector_key') IS NULL
+    ALTER TABLE Airline_Route_Details ADD sector_key AS UPPER(TRIM(Sector)) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Airline_Route_Details_sector_key' AND object_id = OBJECT_ID('Airline_Route_Details'))
+    EXEC('CREATE INDEX IX_Airline_Route_Details_sector_key ON Airline_Route_Details(sector_key)');
+
+IF COL_LENGTH('flight_clean_data_stg', 'actype_norm') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD actype_norm AS LOWER(TRIM(actype)) PERSISTED;
+
+IF COL_LENGTH('flight_clean_data_stg', 'sector_key') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD sector_key AS UPPER(
+    CASE
+        WHEN LEN(TRIM(route)) = 7 AND CHARINDEX('-', route) > 0 THEN
+            CASE
+                WHEN LEFT(route, 3) < RIGHT(route, 3) THEN CONCAT(LEFT(route, 3), RIGHT(route, 3))
+                ELSE CONCAT(RIGHT(route, 3), LEFT(route, 3))
+            END
+    END
+) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_clean_data_stg_actype_norm' AND object_id = OBJECT_ID('flight_clean_data_stg'))
+    EXEC('CREATE INDEX IX_flight_clean_data_stg_actype_norm ON flight_clean_data_stg(actype_norm)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_clean_data_stg_sector_key' AND object_id = OBJECT_ID('flight_clean_data_stg'))
+    EXEC('CREATE INDEX IX_flight_clean_data_stg_sector_key ON flight_clean_data_stg(sector_key)');
+
+IF COL_LENGTH('error_table', 'actype_norm') IS NULL
+    ALTER TABLE error_table ADD actype_norm AS LOWER(TRIM(actype)) PERSISTED;
+
+IF COL_LENGTH('error_table', 'sector_key') IS NULL
+    ALTER TABLE error_table ADD sector_key AS UPPER(
+    CASE
+        WHEN LEN(TRIM(route)) = 7 AND CHARINDEX('-', route) > 0 THEN
+            CASE
+                WHEN LEFT(route, 3) < RIGHT(route, 3) THEN CONCAT(LEFT(route, 3), RIGHT(route, 3))
+                ELSE CONCAT(RIGHT(route, 3), LEFT(route, 3))
+            END
+    END
+) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_error_table_actype_norm' AND object_id = OBJECT_ID('error_table'))
+    EXEC('CREATE INDEX IX_error_table_actype_norm ON error_table(actype_norm)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_error_table_sector_key' AND object_id = OBJECT_ID('error_table'))
+    EXEC('CREATE INDEX IX_error_table_sector_key ON error_table(sector_key)');
+
+/* ===================== typed flight_date ===================== */
+IF COL_LENGTH('flight_raw', 'flight_date') IS NULL
+    ALTER TABLE flight_raw ADD flight_date DATE NULL;
+
+IF COL_LENGTH('flight_raw', 'flight_date_status') IS NULL
+    ALTER TABLE flight_raw ADD flight_date_status TINYINT NULL;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_raw_flight_date' AND object_id = OBJECT_ID('flight_raw'))
+    EXEC('CREATE INDEX IX_flight_raw_flight_date ON flight_raw(flight_date)');
+
+IF COL_LENGTH('flight_clean_data_stg', 'flight_date') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD flight_date DATE NULL;
+
+IF COL_LENGTH('flight_clean_data_stg', 'flight_date_status') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD flight_date_status TINYINT NULL;
+
+IF COL_LENGTH('error_table', 'flight_date') IS NULL
+    ALTER TABLE error_table ADD flight_date DATE NULL;
+
+IF COL_LENGTH('error_table', 'flight_date_status') IS NULL
+    ALTER TABLE error_table ADD flight_date_status TINYINT NULL;
+
+GO
+
+-- Parse flightdate once for rows imported before flight_date existed, and re-parse rows
+-- marked invalid (status 2) by earlier versions: yyyyMMdd is read before the Excel serial
+-- branch, serials may be integral floats ('45296.0'); out-of-range serials are invalid
+-- instead of an error
+DECLARE @InvalidRawDates INT = (SELECT COUNT(*) FROM flight_raw WHERE flight_date_status = 2);
+
+UPDATE flight_raw
+SET flight_date = parsed.flight_date,
+    flight_date_status = CASE
+        WHEN flight_raw.flightdate IS NULL THEN 1
+        WHEN parsed.flight_date IS NULL THEN 2
+        ELSE 0
+    END
+FROM flight_raw
+    CROSS APPLY (
+        SELECT CASE
+            WHEN LEN(TRIM(flight_raw.flightdate)) = 8
+                AND TRIM(flight_raw.flightdate) NOT LIKE '%[^0-9]%'
+                AND TRY_CONVERT(DATE, TRIM(flight_raw.flightdate), 112) IS NOT NULL
+                THEN TRY_CONVERT(DATE, TRIM(flight_raw.flightdate), 112)
+            WHEN ISNUMERIC(flight_raw.flightdate) = 1 THEN
+                CASE
+                    WHEN TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)) = FLOOR(TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)))
+                        AND TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)) BETWEEN -53688 AND 2958465
+                        THEN DATEADD(DAY, CAST(TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)) AS INT), CAST('1899-12-30' AS DATE))
+                END
+            WHEN flight_raw.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, flight_raw.flightdate, 103)
+            WHEN flight_raw.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, flight_raw.flightdate, 103)
+            WHEN flight_raw.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(flight_raw.flightdate, 10), 120)
+            WHEN flight_raw.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, flight_raw.flightdate, 111)
+            ELSE CONVERT(DATE, TRY_CONVERT(DATETIME, flight_raw.flightdate))
+        END AS flight_date
+    ) parsed
+WHERE flight_raw.flight_date_status IS NULL
+    OR flight_raw.flight_date_status = 2;
+
+UPDATE flight_clean_data_stg
+SET flight_date = parsed.flight_date,
+    flight_date_status = CASE
+        WHEN flight_clean_data_stg.flightdate IS NULL THEN 1
+        WHEN parsed.flight_date IS NULL THEN 2
+        ELSE 0
+    END
+FROM flight_clean_data_stg
+    CROSS APPLY (
+        SELECT CASE
+            WHEN LEN(TRIM(flight_clean_data_stg.flightdate)) = 8
+                AND TRIM(flight_clean_data_stg.flightdate) NOT LIKE '%[^0-9]%'
+                AND TRY_CONVERT(DATE, TRIM(flight_clean_data_stg.flightdate), 112) IS NOT NULL
+                THEN TRY_CONVERT(DATE, TRIM(flight_clean_data_stg.flightdate), 112)
+            WHEN ISNUMERIC(flight_clean_data_stg.flightdate) = 1 THEN
+                CASE
+                    WHEN TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)) = FLOOR(TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)))
+                        AND TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)) BETWEEN -53688 AND 2958465
+                        THEN DATEADD(DAY, CAST(TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)) AS INT), CAST('1899-12-30' AS DATE))
+                END
+            WHEN flight_clean_data_stg.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, flight_clean_data_stg.flightdate, 103)
+            WHEN flight_clean_data_stg.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, flight_clean_data_stg.flightdate, 103)
+            WHEN flight_clean_data_stg.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(flight_clean_data_stg.flightdate, 10), 120)
+            WHEN flight_clean_data_stg.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, flight_clean_data_stg.flightdate, 111)
+            ELSE CONVERT(DATE, TRY_CONVERT(DATETIME, flight_clean_data_stg.flightdate))
+        END AS flight_date
+    ) parsed
+WHERE flight_clean_data_stg.flight_date_status IS NULL
+    OR flight_clean_data_stg.flight_date_status = 2;
+
+UPDATE error_table
+SET flight_date = parsed.flight_date,
+    flight_date_status = CASE
+        WHEN error_table.flightdate IS NULL THEN 1
+        WHEN parsed.flight_date IS NULL THEN 2
+        ELSE 0
+    END
+FROM error_table
+    CROSS APPLY (
+        SELECT CASE
+            WHEN LEN(TRIM(error_table.flightdate)) = 8
+                AND TRIM(error_table.flightdate) NOT LIKE '%[^0-9]%'
+                AND TRY_CONVERT(DATE, TRIM(error_table.flightdate), 112) IS NOT NULL
+                THEN TRY_CONVERT(DATE, TRIM(error_table.flightdate), 112)
+            WHEN ISNUMERIC(error_table.flightdate) = 1 THEN
+                CASE
+                    WHEN TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)) = FLOOR(TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)))
+                        AND TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)) BETWEEN -53688 AND 2958465
+                        THEN DATEADD(DAY, CAST(TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)) AS INT), CAST('1899-12-30' AS DATE))
+                END
+            WHEN error_table.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, error_table.flightdate, 103)
+            WHEN error_table.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, error_table.flightdate, 103)
+            WHEN error_table.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(error_table.flightdate, 10), 120)
+            WHEN error_table.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, error_table.flightdate, 111)
+            ELSE CONVERT(DATE, TRY_CONVERT(DATETIME, error_table.flightdate))
+        END AS flight_date
+    ) parsed
+WHERE error_table.flight_date_status IS NULL
+    OR error_table.flight_date_status = 2;
+
+-- Repaired flight_raw dates are stale in flight_export_fact: the next refresh rebuilds it
+IF OBJECT_ID('validation_watermark', 'U') IS NOT NULL
+    AND (SELECT COUNT(*) FROM flight_raw WHERE flight_date_status = 2) < @InvalidRawDates
+    DELETE FROM validation_watermark WHERE name = 'flight_export_fact';
+GO
+
+/* ===================== import batch id ===================== */
+IF COL_LENGTH('import_log', 'import_batch_id') IS NULL
+    ALTER TABLE import_log ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('flight_raw', 'import_batch_id') IS NULL
+    ALTER TABLE flight_raw ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('flight_clean_data_stg', 'import_batch_id') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('flight_data_chot', 'import_batch_id') IS NULL
+    ALTER TABLE flight_data_chot ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('error_table', 'import_batch_id') IS NULL
+    ALTER TABLE error_table ADD import_batch_id CHAR(32) NULL;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_import_log_import_batch_id' AND object_id = OBJECT_ID('import_log'))
+    EXEC('CREATE INDEX IX_import_log_import_batch_id ON import_log(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_raw_import_batch_id' AND object_id = OBJECT_ID('flight_raw'))
+    EXEC('CREATE INDEX IX_flight_raw_import_batch_id ON flight_raw(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_clean_data_stg_import_batch_id' AND object_id = OBJECT_ID('flight_clean_data_stg'))
+    EXEC('CREATE INDEX IX_flight_clean_data_stg_import_batch_id ON flight_clean_data_stg(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_data_chot_import_batch_id' AND object_id = OBJECT_ID('flight_data_chot'))
+    EXEC('CREATE INDEX IX_flight_data_chot_import_batch_id ON flight_data_chot(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_error_table_import_batch_id' AND object_id = OBJECT_ID('error_table'))
+    EXEC('CREATE INDEX IX_error_table_import_batch_id ON error_table(import_batch_id)');
+GO
+
+/* ===================== Missing_Dimensions_Log count ===================== */
+IF COL_LENGTH('Missing_Dimensions_Log', 'Count') IS NULL
+    ALTER TABLE Missing_Dimensions_Log ADD [Count] INT NOT NULL CONSTRAINT DF_Missing_Dimensions_Log_Count DEFAULT 0;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Missing_Dimensions_Log_Type_Value' AND object_id = OBJECT_ID('Missing_Dimensions_Log'))
+    EXEC('CREATE INDEX IX_Missing_Dimensions_Log_Type_Value ON Missing_Dimensions_Log([Type], [Value], SourceSheet)');
+
+IF TYPE_ID('MissingDimensionKeyList') IS NULL
+    EXEC('CREATE TYPE MissingDimensionKeyList AS TABLE ([Type] NVARCHAR(50) NOT NULL, [Value] NVARCHAR(255) NULL, SourceSheet NVARCHAR(255) NULL)');
+GO
+
+-- Exact counts for entries logged before Count existed
+UPDATE L
+SET [Count] = CASE L.[Type]
+    WHEN 'ROUTE' THEN (
+        SELECT COUNT(*)
+        FROM error_table et
+        WHERE et.Is_InvalidRoute = 1
+            AND EXISTS (SELECT et.route, et.sheet_name INTERSECT SELECT L.[Value], L.SourceSheet)
+    )
+    WHEN 'ACTYPE' THEN (
+        SELECT COUNT(*)
+        FROM error_table et
+        WHERE et.Is_InvalidActypeSeat = 1
+            AND (ISNULL(et.cgo, 0) > 0 OR ISNULL(et.totalpax, 0) > 0)
+            AND EXISTS (SELECT et.actype, et.sheet_name INTERSECT SELECT L.[Value], L.SourceSheet)
+    )
+    ELSE L.[Count]
+END
+FROM Missing_Dimensions_Log L
+WHERE L.[Count] = 0;
+GO
+
+
+/* ===================== pipeline_run ===================== */
+IF OBJECT_ID('pipeline_run', 'U') IS NULL
+BEGIN
+    CREATE TABLE pipeline_run
+    (
+        id NVARCHAR(32) NOT NULL PRIMARY KEY,
+        run_type NVARCHAR(50) NOT NULL,
+        status NVARCHAR(20) NOT NULL,
+        job_id NVARCHAR(32) NULL,
+        import_batch_id CHAR(32) NULL,
+        file_count INT NULL,
+        seconds FLOAT NULL,
+        db_round_trips INT NULL,
+        stages NVARCHAR(MAX) NULL,
+        error NVARCHAR(MAX) NULL,
+        started_at DATETIME2 NOT NULL,
+        finished_at DATETIME2 NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+    );
+
+    EXEC('CREATE INDEX IX_pipeline_run_run_type ON pipeline_run(run_type)');
+    EXEC('CREATE INDEX IX_pipeline_run_started_at ON pipeline_run(started_at)');
+END
+GO
+
+
+/* ===================== flight_export_fact ===================== */
+IF OBJECT_ID('flight_export_fact', 'U') IS NULL
+BEGIN
+    CREATE TABLE flight_export_fact
+    (
+        id BIGINT NOT NULL PRIMARY KEY NONCLUSTERED,
+        flight_date DATE NULL,
+        flightdate DATETIME NULL,
+        flightno NVARCHAR(50) NULL,
+        route NVARCHAR(100) NULL,
+        actype NVARCHAR(50) NULL,
+        totalpax FLOAT NULL,
+        cgo FLOAT NULL,
+        mail FLOAT NULL,
+        acregno NVARCHAR(50) NULL,
+        source NVARCHAR(500) NULL,
+        sheet_name NVARCHAR(255) NULL,
+        seat BIGINT NULL,
+        int_dom NVARCHAR(10) NULL,
+        airline_code NVARCHAR(10) NULL,
+        airlines_name NVARCHAR(255) NULL,
+        airline_nation NVARCHAR(255) NULL,
+        airline_nation_code NVARCHAR(10) NULL,
+        departure NVARCHAR(10) NULL,
+        city_departure NVARCHAR(255) NULL,
+        country_departure NVARCHAR(255) NULL,
+        arrives NVARCHAR(10) NULL,
+        city_arrives NVARCHAR(255) NULL,
+        country_arrives NVARCHAR(255) NULL,
+        country_code NVARCHAR(10) NULL,
+        area_code NVARCHAR(255) NULL,
+        type_filter INT NOT NULL,
+        dep_code NVARCHAR(10) NULL,
+        arr_code NVARCHAR(10) NULL,
+        carrier_code NVARCHAR(10) NULL,
+        actype_norm NVARCHAR(50) NULL,
+        import_batch_id CHAR(32) NULL,
+        refreshed_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+    );
+
+    EXEC('CREATE CLUSTERED INDEX IX_flight_export_fact_flight_date ON flight_export_fact(flight_date, id)');
+    EXEC('CREATE INDEX IX_flight_export_fact_departure ON flight_export_fact(departure)');
+    EXEC('CREATE INDEX IX_flight_export_fact_arrives ON flight_export_fact(arrives)');
+    EXEC('CREATE INDEX IX_flight_export_fact_dep_code ON flight_export_fact(dep_code)');
+    EXEC('CREATE INDEX IX_flight_export_fact_arr_code ON flight_export_fact(arr_code)');
+    EXEC('CREATE INDEX IX_flight_export_fact_carrier_code ON flight_export_fact(carrier_code)');
+    EXEC('CREATE INDEX IX_flight_export_fact_actype_norm ON flight_export_fact(actype_norm)');
+END
+
+IF OBJECT_ID('flight_export_ref_snapshot', 'U') IS NULL
+BEGIN
+    CREATE TABLE flight_export_ref_snapshot
+    (
+        ref_type VARCHAR(10) NOT NULL,
+        ref_key NVARCHAR(255) NOT NULL,
+        ref_hash VARBINARY(32) NOT NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+        PRIMARY KEY (ref_type, ref_key)
+    );
+END
+GO
+
+/* ===================== import_job owner / heartbeat ===================== */
+IF COL_LENGTH('import_job', 'owner') IS NULL
+    ALTER TABLE import_job ADD owner NVARCHAR(100) NULL;
+
+IF COL_LENGTH('import_job', 'heartbeat_at') IS NULL
+    ALTER TABLE import_job ADD heartbeat_at DATETIME2 NULL;
+GO
+
+/* ===================== import_job resume ===================== */
+IF COL_LENGTH('import_job', 'import_batch_id') IS NULL
+    ALTER TABLE import_job ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('import_job', 'raw_committed_at') IS NULL
+    ALTER TABLE import_job ADD raw_committed_at DATETIME2 NULL;
+GO
+
+
 
 -- ===================================================================
 -- TRIGGERS FOR AUDIT COLUMNS (created_at, updated_at)
@@ -549,3 +947,14 @@ AS UPDATE t SET t.created_at = SYSDATETIME()
    JOIN inserted i ON t.[Route] = i.[Route]
    WHERE t.created_at IS NULL;
 GO
+
+
+
+-- ===================================================================
+-- BUILD FLIGHT EXPORT FACT
+-- ===================================================================
+-- Rebuild flight_export_fact once the migration is applied, so exports do not come back
+-- empty until the next import (skipped while the procedures have not been created yet)
+IF OBJECT_ID('usp_RefreshFlightExportFact', 'P') IS NOT NULL
+    EXEC usp_RefreshFlightExportFact @FullRebuild = 1;
+GO
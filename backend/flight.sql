@@ -51,12 +51,15 @@ CREATE TABLE Airline_Route_Details
     -- Domestic (DOM) or International (INT)
     Area NVARCHAR(100) NULL,
     -- Geographic area/region
+    sector_key AS UPPER(TRIM(Sector)) PERSISTED,
+    -- Normalized lookup key for validation joins
     inserted_time DATETIME DEFAULT GETDATE() NOT NULL,
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
     updated_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
 
 CREATE INDEX IX_Airline_Route_Details_Sector ON Airline_Route_Details(Sector);
+CREATE INDEX IX_Airline_Route_Details_sector_key ON Airline_Route_Details(sector_key);
 CREATE INDEX IX_Airline_Route_Details_Route ON Airline_Route_Details(Route);
 CREATE INDEX IX_Airline_Route_Details_Country ON Airline_Route_Details(Country);
 GO
@@ -144,11 +147,14 @@ CREATE TABLE actype_seat
     -- Aircraft type code (e.g., A320, B777)
     seat BIGINT NOT NULL,
     -- Standard seat capacity
+    actype_norm AS LOWER(TRIM(actype)) PERSISTED,
+    -- Normalized lookup key for validation joins
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
     updated_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
 
 CREATE INDEX IX_actype_seat_actype ON actype_seat(actype);
+CREATE INDEX IX_actype_seat_actype_norm ON actype_seat(actype_norm);
 GO
 
 -- Aircraft Registration Details
@@ -183,6 +189,10 @@ CREATE TABLE flight_raw
     id BIGINT IDENTITY(1,1) PRIMARY KEY,
     flightdate NVARCHAR(255) NULL,
     -- Flight date (various formats from Excel)
+    flight_date DATE NULL,
+    -- Flight date parsed once at import (NULL if missing/invalid)
+    flight_date_status TINYINT NULL,
+    -- Parse status of flightdate (0 = ok, 1 = missing, 2 = invalid)
     flightno NVARCHAR(50) NULL,
     -- Flight number
     route NVARCHAR(100) NULL,
@@ -221,12 +231,16 @@ CREATE TABLE flight_raw
     -- Description of errors
     TotalErrors INT NULL,
     -- Total error count
+    import_batch_id CHAR(32) NULL,
+    -- Import batch of the file (import_log.import_batch_id)
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
 
 CREATE INDEX IX_flight_raw_flightdate ON flight_raw(flightdate);
+CREATE INDEX IX_flight_raw_flight_date ON flight_raw(flight_date);
 CREATE INDEX IX_flight_raw_route ON flight_raw(route);
 CREATE INDEX IX_flight_raw_source ON flight_raw(source);
+CREATE INDEX IX_flight_raw_import_batch_id ON flight_raw(import_batch_id);
 GO
 
 -- Flight Data Main - Processed and validated flight data
@@ -269,6 +283,8 @@ CREATE TABLE flight_data_chot
     inserted_time DATETIME DEFAULT GETDATE() NOT NULL,
     int_dom_ NVARCHAR(10) NULL,
     -- Domestic/International
+    import_batch_id CHAR(32) NULL,
+    -- Import batch of the source file
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
     updated_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
@@ -280,6 +296,7 @@ CREATE INDEX IX_flight_data_chot_flightno ON flight_data_chot(flightno);
 CREATE INDEX IX_flight_data_chot_actype ON flight_data_chot(actype);
 CREATE INDEX IX_flight_data_chot_source ON flight_data_chot(source);
 CREATE INDEX IX_flight_data_chot_sheet_name ON flight_data_chot(sheet_name);
+CREATE INDEX IX_flight_data_chot_import_batch_id ON flight_data_chot(import_batch_id);
 GO
 
 -- Flight Analysis Table - Enhanced flight data with additional calculations
@@ -381,6 +398,10 @@ CREATE TABLE error_table
     id BIGINT IDENTITY(1,1) PRIMARY KEY,
     flightdate NVARCHAR(255) NULL,
     -- Original flight date
+    flight_date DATE NULL,
+    -- Parsed flight date (from flight_raw)
+    flight_date_status TINYINT NULL,
+    -- Parse status of flightdate (0 = ok, 1 = missing, 2 = invalid)
     flightno NVARCHAR(50) NULL,
     -- Flight number
     route NVARCHAR(100) NULL,
@@ -419,6 +440,20 @@ CREATE TABLE error_table
     -- Description of errors
     TotalErrors INT NULL,
     -- Total error count
+    actype_norm AS LOWER(TRIM(actype)) PERSISTED,
+    -- Normalized actype, matches actype_seat.actype_norm
+    sector_key AS UPPER(
+        CASE
+            WHEN LEN(TRIM(route)) = 7 AND CHARINDEX('-', route) > 0 THEN
+                CASE
+                    WHEN LEFT(route, 3) < RIGHT(route, 3) THEN CONCAT(LEFT(route, 3), RIGHT(route, 3))
+                    ELSE CONCAT(RIGHT(route, 3), LEFT(route, 3))
+                END
+        END
+    ) PERSISTED,
+    -- Normalized sector (smaller code + larger code), matches Airline_Route_Details.sector_key
+    import_batch_id CHAR(32) NULL,
+    -- Import batch of the source file
     time_import DATETIME NOT NULL DEFAULT GETDATE(),
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
@@ -428,6 +463,9 @@ CREATE INDEX IX_error_table_source ON error_table(source);
 CREATE INDEX IX_error_table_flightno ON error_table(flightno);
 CREATE INDEX IX_error_table_route ON error_table(route);
 CREATE INDEX IX_error_table_actype ON error_table(actype);
+CREATE INDEX IX_error_table_actype_norm ON error_table(actype_norm);
+CREATE INDEX IX_error_table_sector_key ON error_table(sector_key);
+CREATE INDEX IX_error_table_import_batch_id ON error_table(import_batch_id);
 GO
 
 -- Flight Clean Data Staging - Temporary table for data processing
@@ -437,6 +475,10 @@ CREATE TABLE flight_clean_data_stg
     id BIGINT IDENTITY(1,1) PRIMARY KEY,
     flightdate NVARCHAR(255) NULL,
     -- Flight date
+    flight_date DATE NULL,
+    -- Parsed flight date (from flight_raw)
+    flight_date_status TINYINT NULL,
+    -- Parse status of flightdate (0 = ok, 1 = missing, 2 = invalid)
     flightno NVARCHAR(50) NULL,
     -- Flight number
     route NVARCHAR(100) NULL,
@@ -472,11 +514,28 @@ CREATE TABLE flight_clean_data_stg
     -- Error description
     TotalErrors INT NULL,
     -- Error count
+    actype_norm AS LOWER(TRIM(actype)) PERSISTED,
+    -- Normalized actype, matches actype_seat.actype_norm
+    sector_key AS UPPER(
+        CASE
+            WHEN LEN(TRIM(route)) = 7 AND CHARINDEX('-', route) > 0 THEN
+                CASE
+                    WHEN LEFT(route, 3) < RIGHT(route, 3) THEN CONCAT(LEFT(route, 3), RIGHT(route, 3))
+                    ELSE CONCAT(RIGHT(route, 3), LEFT(route, 3))
+                END
+        END
+    ) PERSISTED,
+    -- Normalized sector (smaller code + larger code), matches Airline_Route_Details.sector_key
+    import_batch_id CHAR(32) NULL,
+    -- Import batch being cleaned
     inserted_time DATETIME DEFAULT GETDATE() NOT NULL,
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
 
 CREATE INDEX IX_flight_clean_data_stg_source ON flight_clean_data_stg(source);
+CREATE INDEX IX_flight_clean_data_stg_actype_norm ON flight_clean_data_stg(actype_norm);
+CREATE INDEX IX_flight_clean_data_stg_sector_key ON flight_clean_data_stg(sector_key);
+CREATE INDEX IX_flight_clean_data_stg_import_batch_id ON flight_clean_data_stg(import_batch_id);
 GO
 
 -- ===================================================================
@@ -500,11 +559,17 @@ CREATE TABLE import_log
     -- Number of rows imported
     clean_data INT NULL,
     -- Flag for cleaned data
+    file_hash CHAR(64) NULL,
+    -- SHA-256 of file content (dedupe renamed / changed files)
+    import_batch_id CHAR(32) NULL,
+    -- Import batch (one per upload / batch import run)
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
 );
 
 CREATE INDEX IX_import_log_file_name ON import_log(file_name);
 CREATE INDEX IX_import_log_import_date ON import_log(import_date);
+CREATE INDEX IX_import_log_file_hash ON import_log(file_hash);
+CREATE INDEX IX_import_log_import_batch_id ON import_log(import_batch_id);
 GO
 
 -- Missing Dimensions Log - Tracks missing reference data
@@ -518,6 +583,8 @@ CREATE TABLE Missing_Dimensions_Log
     -- Missing value
     SourceSheet NVARCHAR(255) NULL,
     -- Source sheet where missing data found
+    [Count] INT NOT NULL DEFAULT 0,
+    -- Number of error_table rows with this missing value (kept exact incrementally)
     CreatedAt DATETIME NULL DEFAULT GETDATE(),
     -- When missing data was logged
     created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
@@ -525,6 +592,179 @@ CREATE TABLE Missing_Dimensions_Log
 
 CREATE INDEX IX_Missing_Dimensions_Log_Type ON Missing_Dimensions_Log([Type]);
 CREATE INDEX IX_Missing_Dimensions_Log_Value ON Missing_Dimensions_Log([Value]);
+CREATE INDEX IX_Missing_Dimensions_Log_Type_Value ON Missing_Dimensions_Log([Type], [Value], SourceSheet);
+GO
+
+-- Missing dimension keys whose count has to be recomputed (usp_RefreshMissingDimensions)
+CREATE TYPE MissingDimensionKeyList AS TABLE
+(
+    [Type] NVARCHAR(50) NOT NULL,
+    -- Type of missing data (ACTYPE/ROUTE)
+    [Value] NVARCHAR(255) NULL,
+    -- Missing value
+    SourceSheet NVARCHAR(255) NULL
+    -- Source sheet
+);
+GO
+
+-- Import Job - Background import + cleaning jobs
+-- Persists per-stage status so jobs can be queried after a restart
+CREATE TABLE import_job
+(
+    id NVARCHAR(32) NOT NULL PRIMARY KEY,
+    -- Job id (UUID hex)
+    job_type NVARCHAR(50) NOT NULL,
+    -- Type of job (upload, complete-workflow)
+    status NVARCHAR(20) DEFAULT 'queued' NOT NULL,
+    -- Job status (queued, running, completed, failed)
+    file_count INT NULL,
+    -- Number of submitted files
+    file_names NVARCHAR(MAX) NULL,
+    -- Submitted file names in upload order (JSON)
+    work_dir NVARCHAR(500) NULL,
+    -- Directory holding the submitted files
+    stages NVARCHAR(MAX) NULL,
+    -- Per-stage status, rows and timings (JSON)
+    result NVARCHAR(MAX) NULL,
+    -- Job result (JSON)
+    error NVARCHAR(MAX) NULL,
+    -- Error message
+    created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+    started_at DATETIME2 NULL,
+    finished_at DATETIME2 NULL,
+    owner NVARCHAR(100) NULL,
+    -- Process running the job (host:pid:id)
+    heartbeat_at DATETIME2 NULL,
+    -- Last heartbeat of the process running the job
+    import_batch_id CHAR(32) NULL,
+    -- Import batch of the job's files
+    raw_committed_at DATETIME2 NULL
+    -- Time the job's raw data was committed (a re-run resumes at cleaning)
+);
+
+CREATE INDEX IX_import_job_status ON import_job(status);
+CREATE INDEX IX_import_job_created_at ON import_job(created_at);
+GO
+
+-- Pipeline Run - History of import / cleaning pipeline runs
+-- Per-stage wall time, rows in/out and database round trips for comparing runs
+CREATE TABLE pipeline_run
+(
+    id NVARCHAR(32) NOT NULL PRIMARY KEY,
+    -- Run id (UUID hex)
+    run_type NVARCHAR(50) NOT NULL,
+    -- Type of run (route / job type)
+    status NVARCHAR(20) NOT NULL,
+    -- Run status (completed, failed)
+    job_id NVARCHAR(32) NULL,
+    -- Import job id
+    import_batch_id CHAR(32) NULL,
+    -- Import batch id
+    file_count INT NULL,
+    -- Number of processed files
+    seconds FLOAT NULL,
+    -- Wall time (seconds)
+    db_round_trips INT NULL,
+    -- Number of database round trips
+    stages NVARCHAR(MAX) NULL,
+    -- Per-stage timings, rows and round trips (JSON)
+    error NVARCHAR(MAX) NULL,
+    -- Error message
+    started_at DATETIME2 NOT NULL,
+    finished_at DATETIME2 NULL,
+    created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+);
+
+CREATE INDEX IX_pipeline_run_run_type ON pipeline_run(run_type);
+CREATE INDEX IX_pipeline_run_started_at ON pipeline_run(started_at);
+GO
+
+-- Validation Watermark - Last run of incremental validation procedures
+-- Dimension rows created/updated after the watermark trigger re-validation of error_table
+CREATE TABLE validation_watermark
+(
+    name NVARCHAR(50) NOT NULL PRIMARY KEY,
+    -- Watermark name (error_table, flight_export_fact)
+    watermark DATETIME2 NULL,
+    -- Start time of the last successful run
+    created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+    updated_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+);
+GO
+
+-- Flight Export Fact - Enriched flight rows read by /export-flight-data
+-- One row per flight_raw row with the dimension lookups of the export query already joined,
+-- clustered on the typed flight date so an export is a range scan (usp_RefreshFlightExportFact)
+CREATE TABLE flight_export_fact
+(
+    id BIGINT NOT NULL PRIMARY KEY NONCLUSTERED,
+    -- flight_raw id
+    flight_date DATE NULL,
+    -- Flight date parsed at import (flight_raw.flight_date)
+    flightdate DATETIME NULL,
+    -- Flight date as returned by the export
+    flightno NVARCHAR(50) NULL,
+    route NVARCHAR(100) NULL,
+    actype NVARCHAR(50) NULL,
+    totalpax FLOAT NULL,
+    -- totalpax, or adl + chd when totalpax is missing
+    cgo FLOAT NULL,
+    mail FLOAT NULL,
+    acregno NVARCHAR(50) NULL,
+    source NVARCHAR(500) NULL,
+    sheet_name NVARCHAR(255) NULL,
+    seat BIGINT NULL,
+    -- Seat of the row, or of its actype in actype_seat
+    int_dom NVARCHAR(10) NULL,
+    airline_code NVARCHAR(10) NULL,
+    airlines_name NVARCHAR(255) NULL,
+    airline_nation NVARCHAR(255) NULL,
+    airline_nation_code NVARCHAR(10) NULL,
+    departure NVARCHAR(10) NULL,
+    city_departure NVARCHAR(255) NULL,
+    country_departure NVARCHAR(255) NULL,
+    arrives NVARCHAR(10) NULL,
+    city_arrives NVARCHAR(255) NULL,
+    country_arrives NVARCHAR(255) NULL,
+    country_code NVARCHAR(10) NULL,
+    area_code NVARCHAR(255) NULL,
+    type_filter INT NOT NULL,
+    -- Flight type filter of the export, only rows > 0 are exported
+    dep_code NVARCHAR(10) NULL,
+    -- Departure airport lookup key (trimmed route)
+    arr_code NVARCHAR(10) NULL,
+    -- Arrival airport lookup key (trimmed route)
+    carrier_code NVARCHAR(10) NULL,
+    -- Airline lookup key
+    actype_norm NVARCHAR(50) NULL,
+    -- actype_seat lookup key
+    import_batch_id CHAR(32) NULL,
+    -- Import batch of the source file
+    refreshed_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+);
+
+CREATE CLUSTERED INDEX IX_flight_export_fact_flight_date ON flight_export_fact(flight_date, id);
+CREATE INDEX IX_flight_export_fact_departure ON flight_export_fact(departure);
+CREATE INDEX IX_flight_export_fact_arrives ON flight_export_fact(arrives);
+CREATE INDEX IX_flight_export_fact_dep_code ON flight_export_fact(dep_code);
+CREATE INDEX IX_flight_export_fact_arr_code ON flight_export_fact(arr_code);
+CREATE INDEX IX_flight_export_fact_carrier_code ON flight_export_fact(carrier_code);
+CREATE INDEX IX_flight_export_fact_actype_norm ON flight_export_fact(actype_norm);
+GO
+
+-- Flight Export Reference Snapshot - Reference rows flight_export_fact was built from
+-- Hash of each airport / airline / actype lookup; keys whose hash changed are re-enriched
+CREATE TABLE flight_export_ref_snapshot
+(
+    ref_type VARCHAR(10) NOT NULL,
+    -- Reference type (AIRPORT, AIRLINE, ACTYPE)
+    ref_key NVARCHAR(255) NOT NULL,
+    -- Lookup key (IATA code, carrier, normalized actype)
+    ref_hash VARBINARY(32) NOT NULL,
+    -- SHA-256 of the looked-up values
+    created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+    PRIMARY KEY (ref_type, ref_key)
+);
 GO
 
 -- ===================================================================
@@ -636,7 +876,10 @@ GO
 
 -- Main Data Cleaning and Processing Procedure
 -- Processes raw flight data through validation and loads into main tables
+-- @BatchId = import batch to clean (import_log.import_batch_id); every step only touches the
+-- rows of that batch. NULL stages all files not processed yet under a new batch id (legacy)
 CREATE OR ALTER PROCEDURE usp_CleanAndProcessFlightData
+    @BatchId CHAR(32) = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -655,28 +898,74 @@ BEGIN
         ------------------------------------------------------------------------------------
         PRINT '2. Loading data from flight_raw to flight_clean_data_stg...';
 
-        INSERT INTO flight_clean_data_stg
-        (
-        flightdate, flightno, route, actype, seat, adl, chd, cgo, mail,
-        source, acregno, sheet_name, totalpax, int_dom,
-        Is_InvalidFlightDate, Is_InvalidPassengerCargo, Is_InvalidRoute,
-        Is_InvalidActypeSeat, ErrorReason, TotalErrors
-        )
-    SELECT
-        flightdate, flightno, route, actype, seat, adl, chd, cgo, mail,
-        source, acregno, sheet_name, totalpax, int_dom,
-        0, 0, 0, 0, NULL, 0
-    -- Initialize error flags and counts
-    FROM flight_raw
-    WHERE source IN (SELECT file_name
-    FROM import_log
-    WHERE file_name NOT IN (
-                                                                                                                                                                    SELECT DISTINCT source
-        FROM flight_clean_data_stg
-    UNION
-        SELECT DISTINCT source
-        FROM flight_data_chot
-        ));
+        IF @BatchId IS NOT NULL
+        BEGIN
+            -- Serialize runs of the same batch (its own job and a later run picking up pending
+            -- batches); the waiting run then sees the batch as cleaned and skips it
+            IF @@TRANCOUNT > 0
+            BEGIN
+                DECLARE @LockResource NVARCHAR(255) = N'usp_CleanAndProcessFlightData:' + @BatchId;
+                EXEC sp_getapplock @Resource = @LockResource, @LockMode = 'Exclusive',
+                    @LockOwner = 'Transaction', @LockTimeout = -1;
+            END
+
+            -- Skip a batch that was already cleaned (repeated run)
+            IF NOT EXISTS (SELECT 1 FROM flight_clean_data_stg WHERE import_batch_id = @BatchId)
+                AND NOT EXISTS (SELECT 1 FROM flight_data_chot WHERE import_batch_id = @BatchId)
+                AND NOT EXISTS (SELECT 1 FROM error_table WHERE import_batch_id = @BatchId)
+                INSERT INTO flight_clean_data_stg
+                (
+                flightdate, flight_date, flight_date_status, flightno, route, actype, seat, adl, chd, cgo, mail,
+                source, acregno, sheet_name, totalpax, int_dom,
+                Is_InvalidFlightDate, Is_InvalidPassengerCargo, Is_InvalidRoute,
+                Is_InvalidActypeSeat, ErrorReason, TotalErrors, import_batch_id
+                )
+            SELECT
+                flightdate, flight_date, flight_date_status, flightno, route, actype, seat, adl, chd, cgo, mail,
+                source, acregno, sheet_name, totalpax, int_dom,
+                0, 0, 0, 0, NULL, 0, import_batch_id
+            FROM flight_raw
+            WHERE import_batch_id = @BatchId;
+        END
+        ELSE
+        BEGIN
+            -- Legacy: every file not processed yet, tagged with a new batch id for this run
+            SET @BatchId = REPLACE(CONVERT(CHAR(36), NEWID()), '-', '');
+
+            INSERT INTO flight_clean_data_stg
+            (
+            flightdate, flight_date, flight_date_status, flightno, route, actype, seat, adl, chd, cgo, mail,
+            source, acregno, sheet_name, totalpax, int_dom,
+            Is_InvalidFlightDate, Is_InvalidPassengerCargo, Is_InvalidRoute,
+            Is_InvalidActypeSeat, ErrorReason, TotalErrors, import_batch_id
+            )
+        SELECT
+            flightdate, flight_date, flight_date_status, flightno, route, actype, seat, adl, chd, cgo, mail,
+            source, acregno, sheet_name, totalpax, int_dom,
+            0, 0, 0, 0, NULL, 0, @BatchId
+        -- Initialize error flags and counts
+        FROM flight_raw
+        WHERE source IN (SELECT file_name
+        FROM import_log
+        WHERE file_name NOT IN (
+                                                                                                                                                                        SELECT DISTINCT source
+            FROM flight_clean_data_stg
+        UNION
+            SELECT DISTINCT source
+            FROM flight_data_chot
+            ));
+
+            -- Tag the files of this run with its batch so step 7 marks them as cleaned; a file
+            -- stranded under an earlier batch is moved to this one, like its staged rows
+            UPDATE import_log
+            SET import_batch_id = @BatchId
+            WHERE clean_data IS NULL
+                AND file_name IN (SELECT DISTINCT source
+                FROM flight_clean_data_stg
+                WHERE import_batch_id = @BatchId);
+        END
+
+        PRINT 'Import batch: ' + @BatchId;
 
         ------------------------------------------------------------------------------------
         -- 3. ENRICH DATA IN STAGING TABLE (flight_clean_data_stg)
@@ -689,7 +978,8 @@ BEGIN
         SET totalpax = CASE
                          WHEN ISNULL(adl, 0) + ISNULL(chd, 0) > 0 THEN ISNULL(adl, 0) + ISNULL(chd, 0)
                          ELSE ISNULL(totalpax, 0)
-                       END;
+                       END
+        WHERE import_batch_id = @BatchId;
 
         -- 3.2. Update int_dom (International/Domestic)
         -- Determines if a flight is DOM (Domestic) or INT (International) based on airport countries.
@@ -704,14 +994,16 @@ BEGIN
         FROM flight_clean_data_stg fcs
         LEFT JOIN Airport_Information dep ON LEFT(TRIM(fcs.route), 3) = dep.IATACode
         LEFT JOIN Airport_Information arr ON RIGHT(TRIM(fcs.route), 3) = arr.IATACode
-        WHERE fcs.int_dom IS NULL; -- Only update if not already set
+        WHERE fcs.import_batch_id = @BatchId
+            AND fcs.int_dom IS NULL; -- Only update if not already set
 
         -- 3.3. Update seat capacity
         -- Fills missing seat counts from the actype_seat table.
         UPDATE fcs
         SET fcs.seat = COALESCE(fcs.seat, s.seat) -- Use existing seat if not null, otherwise lookup
         FROM flight_clean_data_stg fcs
-        LEFT JOIN actype_seat s ON LOWER(TRIM(fcs.actype)) = LOWER(TRIM(s.actype));
+        LEFT JOIN actype_seat s ON s.actype_norm = fcs.actype_norm
+        WHERE fcs.import_batch_id = @BatchId;
 
         ------------------------------------------------------------------------------------
         -- 4. VALIDATE DATA IN STAGING TABLE (flight_clean_data_stg)
@@ -719,21 +1011,8 @@ BEGIN
         PRINT '4. Validating data in flight_clean_data_stg...';
         UPDATE fcs
         SET
-            -- 4.1. Validate Flight Date Format and Convertibility
-            Is_InvalidFlightDate = CAST(CASE
-                WHEN fcs.flightdate IS NULL THEN 1 -- Null date is invalid
-                WHEN -- Attempt to parse various common date formats
-                    CASE
-						WHEN ISNUMERIC(fcs.flightdate) = 1 THEN DATEADD(DAY, CAST(fcs.flightdate AS INT), '1899-12-30')
-						WHEN fcs.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, fcs.flightdate, 103)
-                        WHEN fcs.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, fcs.flightdate, 103) -- dd/MM/yyyy
-                        WHEN fcs.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(fcs.flightdate, 10), 120) -- yyyy-MM-dd HH:mm:ss
-                        WHEN fcs.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, fcs.flightdate, 111) -- yyyy/MM/dd
-                        WHEN LEN(TRIM(fcs.flightdate)) = 8 AND ISNUMERIC(TRIM(fcs.flightdate)) = 1 THEN TRY_CONVERT(DATE, TRIM(fcs.flightdate), 112) -- yyyyMMdd
-                        WHEN TRY_CONVERT(DATETIME, fcs.flightdate) IS NOT NULL THEN CONVERT(DATE, fcs.flightdate) -- General datetime string
-                        ELSE NULL
-                    END IS NULL
-                THEN 1 ELSE 0 END AS BIT),
+            -- 4.1. Validate Flight Date (parsed once at import into flight_date)
+            Is_InvalidFlightDate = CAST(CASE WHEN fcs.flight_date IS NULL THEN 1 ELSE 0 END AS BIT),
 
             -- 4.2. Validate Passenger + Cargo Load
             -- Checks if total payload (passengers + cargo + mail) is zero or less.
@@ -743,22 +1022,12 @@ BEGIN
 
             -- 4.3. Validate Route
             -- Checks if the route exists in AIRLINE_ROUTE_DETAILS.
-            -- Normalizes route to 'SMALLER_CODE-LARGER_CODE' for lookup.
+            -- sector_key normalizes route to 'SMALLER_CODE' + 'LARGER_CODE' for lookup.
             Is_InvalidRoute = CAST(CASE 
                 WHEN NOT EXISTS (
                     SELECT 1
     FROM Airline_Route_Details ARD
-    WHERE ARD.SECTOR = (
-                        CASE
-                            WHEN LEN(TRIM(fcs.route)) = 7 AND CHARINDEX('-', fcs.route) > 0 THEN
-                                CASE
-                                    WHEN LEFT(fcs.route, 3) < RIGHT(fcs.route, 3) 
-                                        THEN CONCAT(LEFT(fcs.route, 3), RIGHT(fcs.route, 3))
-                                    ELSE CONCAT(RIGHT(fcs.route, 3), LEFT(fcs.route, 3))
-                                END
-                            ELSE NULL
-                        END
-                    )
+    WHERE ARD.sector_key = fcs.sector_key
                 ) THEN 1 ELSE 0 END AS BIT),
 
             -- 4.4. Validate Actype (Aircraft Type) and Seat
@@ -768,9 +1037,10 @@ BEGIN
                 WHEN NOT EXISTS (
                     SELECT 1
     FROM actype_seat ATS
-    WHERE LOWER(TRIM(ATS.actype)) = LOWER(TRIM(fcs.actype))
+    WHERE ATS.actype_norm = fcs.actype_norm
                 ) THEN 1 ELSE 0 END AS BIT)
-        FROM flight_clean_data_stg fcs;
+        FROM flight_clean_data_stg fcs
+        WHERE fcs.import_batch_id = @BatchId;
 
         -- 4.5. Compile Error Reasons and Total Errors
         UPDATE flight_clean_data_stg
@@ -786,7 +1056,8 @@ BEGIN
                 ISNULL(Is_InvalidFlightDate, 0) +
                 ISNULL(Is_InvalidPassengerCargo, 0) +
                 ISNULL(Is_InvalidRoute, 0) +
-                ISNULL(Is_InvalidActypeSeat, 0);
+                ISNULL(Is_InvalidActypeSeat, 0)
+        WHERE import_batch_id = @BatchId;
 
         ------------------------------------------------------------------------------------
         -- 5. MOVE CLEAN DATA TO FINAL TABLE (flight_data_chot)
@@ -795,28 +1066,27 @@ BEGIN
         INSERT INTO flight_data_chot
         (
         convert_date, flightno, route, actype, totalpax, cgo, mail,
-        acregno, source, sheet_name, seat, region_type, int_dom_
+        acregno, source, sheet_name, seat, region_type, int_dom_, import_batch_id, type_filter
         )
     SELECT
-        FORMAT( -- Standardizes the date to 'yyyyMMdd' string
-                CASE
-                    WHEN fcs.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, fcs.flightdate, 103)
-                    WHEN fcs.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(fcs.flightdate, 10), 120)
-                    WHEN fcs.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, fcs.flightdate, 111)
-                    WHEN LEN(TRIM(fcs.flightdate)) = 8 AND ISNUMERIC(TRIM(fcs.flightdate)) = 1 THEN TRY_CONVERT(DATE, TRIM(fcs.flightdate), 112)
-                    WHEN TRY_CONVERT(DATETIME, fcs.flightdate) IS NOT NULL THEN CONVERT(DATE, fcs.flightdate)
-                    ELSE NULL
-                END,
-            'yyyyMMdd') AS convert_date,
+        CONVERT(INT, CONVERT(CHAR(8), fcs.flight_date, 112)) AS convert_date, -- 'yyyyMMdd'
         fcs.flightno, fcs.route, fcs.actype, fcs.totalpax, fcs.cgo, fcs.mail,
         fcs.acregno, fcs.source, fcs.sheet_name, fcs.seat,
         10 AS region_type, -- Static value
-        int_dom
+        int_dom, fcs.import_batch_id,
+        CASE
+            WHEN CHARINDEX('SGN', fcs.route) > 1 AND fcs.sheet_name != 'SGN' THEN 0
+            WHEN fcs.sheet_name = 'SGN' THEN 1
+            WHEN fcs.int_dom = 'INT' THEN 2
+            WHEN fcs.sheet_name = LEFT(fcs.route, 3) THEN 3
+            ELSE -1
+        END AS type_filter
     FROM flight_clean_data_stg fcs
-    WHERE fcs.TotalErrors = 0;
+    WHERE fcs.import_batch_id = @BatchId
+        AND fcs.TotalErrors = 0;
 
         -- Remove clean data from staging
-        DELETE FROM flight_clean_data_stg WHERE TotalErrors = 0;
+        DELETE FROM flight_clean_data_stg WHERE import_batch_id = @BatchId AND TotalErrors = 0;
 
         ------------------------------------------------------------------------------------
         -- 6. MOVE ERRORED DATA FROM STAGING TO ERROR TABLE (error_table)
@@ -824,32 +1094,30 @@ BEGIN
         PRINT '6. Moving errored data from staging to error_table...';
         INSERT INTO error_table
         (
-        flightdate, flightno, route, actype, seat, adl, chd, cgo, mail,
+        flightdate, flight_date, flight_date_status, flightno, route, actype, seat, adl, chd, cgo, mail,
         source, acregno, sheet_name, totalpax, int_dom, Is_InvalidFlightDate,
         Is_InvalidPassengerCargo, Is_InvalidRoute, Is_InvalidActypeSeat,
-        ErrorReason, TotalErrors
+        ErrorReason, TotalErrors, import_batch_id
         )
     SELECT
-        flightdate, flightno, route, actype, seat, adl, chd, cgo, mail,
+        flightdate, flight_date, flight_date_status, flightno, route, actype, seat, adl, chd, cgo, mail,
         source, acregno, sheet_name, totalpax, int_dom, Is_InvalidFlightDate,
         Is_InvalidPassengerCargo, Is_InvalidRoute, Is_InvalidActypeSeat,
-        ErrorReason, TotalErrors
-    FROM flight_clean_data_stg; -- All remaining records have TotalErrors > 0
-
-        -- Clear staging table completely
-        DELETE FROM flight_clean_data_stg;
-
-        -- Update type_filter for new records
-		UPDATE flight_data_chot
-		SET type_filter = CASE 
-			WHEN CHARINDEX('SGN', route) > 1 AND sheet_name != 'SGN' THEN 0 
-			WHEN sheet_name = 'SGN' THEN 1 
-			WHEN int_dom_ = 'INT' THEN 2 
-			WHEN sheet_name = LEFT(route,3) THEN 3 
-			ELSE -1 
-		END 
-		WHERE inserted_time >= DATEADD(MINUTE, -5, GETDATE())
-        AND type_filter IS NULL;
+        ErrorReason, TotalErrors, import_batch_id
+    FROM flight_clean_data_stg
+    WHERE import_batch_id = @BatchId; -- All remaining records have TotalErrors > 0
+
+        -- Clear this batch from staging (rows of concurrent runs are left alone)
+        DELETE FROM flight_clean_data_stg WHERE import_batch_id = @BatchId;
+
+        ------------------------------------------------------------------------------------
+        -- 7. MARK THE BATCH'S FILES AS CLEANED (import_log)
+        ------------------------------------------------------------------------------------
+        PRINT '7. Updating import_log...';
+        UPDATE import_log
+        SET clean_data = 1
+        WHERE import_batch_id = @BatchId
+            AND clean_data IS NULL;
 
     END TRY
 	BEGIN CATCH
@@ -861,41 +1129,98 @@ BEGIN
         PRINT 'Error Severity: ' + CAST(ERROR_SEVERITY() AS VARCHAR);
         PRINT 'Error State: ' + CAST(ERROR_STATE() AS VARCHAR);
 
-        -- Optional: Rethrow the error if needed
-        -- THROW; -- Uncomment if you want the calling process to receive the error
+        THROW; -- Throw error so Python can roll back the batch
     END CATCH
 END;
 GO
 
 -- Clean and Validate Flight Data Procedure
 -- Re-validates data in error_table and moves valid records back to main table
+-- By default only rows failing on a route sector / actype added or changed since the last run
+-- (validation_watermark) are re-checked; @FullSweep = 1 re-checks the whole error_table
 CREATE OR ALTER PROCEDURE usp_CleanAndValidateFlightData
+    @FullSweep BIT = 0
 AS
 BEGIN
     SET NOCOUNT ON;
     BEGIN TRY
         BEGIN TRANSACTION;
 
+        ------------------------------------------------------------------------------------
+        PRINT '6. Collecting dimension changes since the last run...';
+        ------------------------------------------------------------------------------------
+
+        DECLARE @RunStartedAt DATETIME2 = SYSDATETIME();
+        DECLARE @Watermark DATETIME2;
+
+        SELECT @Watermark = watermark
+        FROM validation_watermark WITH (UPDLOCK, HOLDLOCK)
+        WHERE name = 'error_table';
+
+        -- No previous run: every row has to be checked once
+        IF @Watermark IS NULL
+            SET @FullSweep = 1;
+
+        -- Overlap so dimension changes committed while the previous run was in progress are not missed
+        SET @Watermark = DATEADD(MINUTE, -1, @Watermark);
+
+        CREATE TABLE #ChangedSectors (Sector NVARCHAR(20) COLLATE DATABASE_DEFAULT NOT NULL);
+        CREATE TABLE #ChangedActypes (actype NVARCHAR(50) COLLATE DATABASE_DEFAULT NOT NULL);
+        CREATE TABLE #RevalidateRows (id BIGINT NOT NULL PRIMARY KEY);
+
+        IF @FullSweep = 0
+        BEGIN
+            INSERT INTO #ChangedSectors (Sector)
+            SELECT DISTINCT ARD.sector_key
+            FROM Airline_Route_Details ARD
+            WHERE ARD.created_at > @Watermark
+                OR ARD.updated_at > @Watermark
+                OR ARD.inserted_time > @Watermark;
+
+            INSERT INTO #ChangedActypes (actype)
+            SELECT DISTINCT ATS.actype_norm
+            FROM actype_seat ATS
+            WHERE ATS.created_at > @Watermark
+                OR ATS.updated_at > @Watermark;
+        END
+
+        -- Flight date and passenger/cargo flags do not depend on dimensions, so only rows
+        -- failing on a changed sector / actype can become valid
+        INSERT INTO #RevalidateRows (id)
+        SELECT et.id
+        FROM error_table et
+        WHERE @FullSweep = 1
+            OR (et.Is_InvalidRoute = 1 AND EXISTS (
+                SELECT 1
+                FROM #ChangedSectors CS
+                WHERE CS.Sector = et.sector_key
+            ))
+            OR (et.Is_InvalidActypeSeat = 1 AND EXISTS (
+                SELECT 1
+                FROM #ChangedActypes CA
+                WHERE CA.actype = et.actype_norm
+            ));
+
+        PRINT 'Rows to re-validate: ' + CAST(@@ROWCOUNT AS VARCHAR)
+            + CASE WHEN @FullSweep = 1 THEN ' (full sweep)' ELSE '' END;
+
+        -- Missing dimension entries the re-validated rows count towards
+        DECLARE @RevalidatedKeys MissingDimensionKeyList;
+
+        IF @FullSweep = 0
+            INSERT INTO @RevalidatedKeys ([Type], [Value], SourceSheet)
+            SELECT DISTINCT K.[Type], K.[Value], et.sheet_name
+            FROM error_table et
+                INNER JOIN #RevalidateRows RR ON RR.id = et.id
+                CROSS APPLY (VALUES ('ROUTE', et.route), ('ACTYPE', et.actype)) K([Type], [Value]);
+
         ------------------------------------------------------------------------------------
         PRINT '7. Re-validating data in error_table...';
         ------------------------------------------------------------------------------------
 
         UPDATE et
         SET
-            Is_InvalidFlightDate = CAST(CASE
-                WHEN et.flightdate IS NULL THEN 1
-                WHEN
-                    CASE
-						WHEN ISNUMERIC(et.flightdate) = 1 THEN DATEADD(DAY, CAST(et.flightdate AS INT), '1899-12-30')
-						WHEN et.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, et.flightdate, 103)
-                        WHEN et.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, et.flightdate, 103)
-                        WHEN et.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(et.flightdate, 10), 120)
-                        WHEN et.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, et.flightdate, 111)
-                        WHEN LEN(TRIM(et.flightdate)) = 8 AND ISNUMERIC(TRIM(et.flightdate)) = 1 THEN TRY_CONVERT(DATE, TRIM(et.flightdate), 112)
-                        WHEN TRY_CONVERT(DATETIME, et.flightdate) IS NOT NULL THEN CONVERT(DATE, et.flightdate)
-                        ELSE NULL
-                    END IS NULL
-                THEN 1 ELSE 0 END AS BIT),
+            Is_InvalidFlightDate = CAST(CASE WHEN et.flight_date IS NULL THEN 1 ELSE 0 END AS BIT),
 
             Is_InvalidPassengerCargo = CAST(CASE
                 WHEN ISNULL(et.totalpax, 0) + ISNULL(et.cgo, 0) + ISNULL(et.mail, 0) <= 0 THEN 1 ELSE 0 END AS BIT),
@@ -904,17 +1229,7 @@ BEGIN
                 WHEN NOT EXISTS (
                     SELECT 1
     FROM Airline_Route_Details ARD
-    WHERE ARD.SECTOR = (
-                        CASE
-                            WHEN LEN(TRIM(et.route)) = 7 AND CHARINDEX('-', et.route) > 0 THEN
-                                CASE
-                                    WHEN LEFT(et.route, 3) < RIGHT(et.route, 3) 
-                                        THEN CONCAT(LEFT(et.route, 3), RIGHT(et.route, 3))
-                                    ELSE CONCAT(RIGHT(et.route, 3), LEFT(et.route, 3))
-                                END
-                            ELSE NULL
-                        END
-                    )
+    WHERE ARD.sector_key = et.sector_key
                 ) THEN 1 ELSE 0 END AS BIT),
 
             Is_InvalidActypeSeat = CAST(CASE
@@ -922,9 +1237,10 @@ BEGIN
                 WHEN NOT EXISTS (
                     SELECT 1
     FROM actype_seat ATS
-    WHERE LOWER(TRIM(ATS.actype)) = LOWER(TRIM(et.actype))
+    WHERE ATS.actype_norm = et.actype_norm
                 ) THEN 1 ELSE 0 END AS BIT)
-        FROM error_table et;
+        FROM error_table et
+            INNER JOIN #RevalidateRows RR ON RR.id = et.id;
 
         ------------------------------------------------------------------------------------
         PRINT 'Updating error reason and total errors...';
@@ -943,7 +1259,8 @@ BEGIN
                 ISNULL(Is_InvalidFlightDate, 0) +
                 ISNULL(Is_InvalidPassengerCargo, 0) +
                 ISNULL(Is_InvalidRoute, 0) +
-                ISNULL(Is_InvalidActypeSeat, 0);
+                ISNULL(Is_InvalidActypeSeat, 0)
+        WHERE id IN (SELECT id FROM #RevalidateRows);
 
         ------------------------------------------------------------------------------------
         PRINT '8. Moving newly validated data from error_table to flight_data_chot...';
@@ -952,38 +1269,24 @@ BEGIN
         INSERT INTO flight_data_chot
         (
         convert_date, flightno, route, actype, totalpax, cgo, mail,
-        acregno, source, sheet_name, seat, region_type, int_dom_
+        acregno, source, sheet_name, seat, region_type, int_dom_, import_batch_id, type_filter
         )
     SELECT
-        FORMAT(
-                CASE
-                    WHEN et.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, et.flightdate, 103)
-                    WHEN et.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(et.flightdate, 10), 120)
-                    WHEN et.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, et.flightdate, 111)
-                    WHEN LEN(TRIM(et.flightdate)) = 8 AND ISNUMERIC(TRIM(et.flightdate)) = 1 THEN TRY_CONVERT(DATE, TRIM(et.flightdate), 112)
-                    WHEN TRY_CONVERT(DATETIME, et.flightdate) IS NOT NULL THEN CONVERT(DATE, et.flightdate)
-                    ELSE NULL
-                END,
-            'yyyyMMdd') AS convert_date,
+        CONVERT(INT, CONVERT(CHAR(8), et.flight_date, 112)) AS convert_date, -- 'yyyyMMdd'
         et.flightno, et.route, et.actype, et.totalpax, et.cgo, et.mail,
         et.acregno, et.source, et.sheet_name, et.seat,
         10 AS region_type,
-        int_dom
+        int_dom, et.import_batch_id,
+        CASE
+            WHEN CHARINDEX('SGN', et.route) > 1 AND et.sheet_name != 'SGN' THEN 0
+            WHEN et.sheet_name = 'SGN' THEN 1
+            WHEN et.int_dom = 'INT' THEN 2
+            WHEN et.sheet_name = LEFT(et.route, 3) THEN 3
+            ELSE -1
+        END AS type_filter
     FROM error_table et
     WHERE et.TotalErrors = 0;
 
-        -- Update type_filter for newly processed records
-		UPDATE flight_data_chot
-		SET type_filter = CASE 
-			WHEN CHARINDEX('SGN', route) > 1 AND sheet_name != 'SGN' THEN 0 
-			WHEN sheet_name = 'SGN' THEN 1 
-			WHEN int_dom_ = 'INT' THEN 2 
-			WHEN sheet_name = LEFT(route,3) THEN 3 
-			ELSE -1 
-		END 
-		WHERE inserted_time >= DATEADD(MINUTE, -5, GETDATE())
-        AND type_filter IS NULL;
-
         ------------------------------------------------------------------------------------
         PRINT 'Deleting validated rows from error_table...';
         ------------------------------------------------------------------------------------
@@ -991,25 +1294,26 @@ BEGIN
         DELETE FROM error_table WHERE TotalErrors = 0;
 
         ------------------------------------------------------------------------------------
-        PRINT '9. Logging missing dimensions from error_table...';
+        PRINT '9. Updating missing dimensions of re-validated rows...';
         ------------------------------------------------------------------------------------
 
-        EXEC usp_LogMissingDimensions;
+        IF @FullSweep = 1
+            EXEC usp_LogMissingDimensions;
+        ELSE
+            EXEC usp_RefreshMissingDimensions @Keys = @RevalidatedKeys;
 
         ------------------------------------------------------------------------------------
-        PRINT '10. Updating import_log...';
+        PRINT '10. Updating validation watermark...';
         ------------------------------------------------------------------------------------
 
-        UPDATE import_log
-        SET clean_data = 1
-        WHERE clean_data IS NULL
-        AND file_name IN (
-                                                                                                                                                                                                                                                  SELECT DISTINCT source
-            FROM flight_data_chot
-        UNION
-            SELECT DISTINCT source
-            FROM error_table
-          );
+        UPDATE validation_watermark
+        SET watermark = @RunStartedAt,
+            updated_at = SYSDATETIME()
+        WHERE name = 'error_table';
+
+        IF @@ROWCOUNT = 0
+            INSERT INTO validation_watermark (name, watermark)
+            VALUES ('error_table', @RunStartedAt);
 
         COMMIT TRANSACTION;
         PRINT 'Procedure completed successfully.';
@@ -1103,45 +1407,523 @@ BEGIN
 END;
 GO
 
+-- Refresh Missing Dimensions Procedure
+-- Recomputes the exact count of the given (Type, Value, SourceSheet) keys from error_table:
+-- new keys are added, counts updated and keys without error rows left (resolved) removed
+CREATE OR ALTER PROCEDURE usp_RefreshMissingDimensions
+    @Keys MissingDimensionKeyList READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    CREATE TABLE #Counts
+    (
+        [Type] NVARCHAR(50) COLLATE DATABASE_DEFAULT NOT NULL,
+        [Value] NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL,
+        SourceSheet NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL,
+        [Count] INT NOT NULL
+    );
+
+    -- Missing routes
+    INSERT INTO #Counts
+        ([Type], [Value], SourceSheet, [Count])
+    SELECT
+        K.[Type],
+        K.[Value],
+        K.SourceSheet,
+        COUNT(et.id)
+    FROM (SELECT DISTINCT [Type], [Value], SourceSheet FROM @Keys WHERE [Type] = 'ROUTE') K
+        LEFT JOIN error_table et
+        ON et.Is_InvalidRoute = 1
+            AND (et.route = K.[Value] OR (et.route IS NULL AND K.[Value] IS NULL))
+            AND (et.sheet_name = K.SourceSheet OR (et.sheet_name IS NULL AND K.SourceSheet IS NULL))
+    GROUP BY K.[Type], K.[Value], K.SourceSheet;
+
+    -- Missing actypes (only passenger or cargo flights need an actype)
+    INSERT INTO #Counts
+        ([Type], [Value], SourceSheet, [Count])
+    SELECT
+        K.[Type],
+        K.[Value],
+        K.SourceSheet,
+        COUNT(et.id)
+    FROM (SELECT DISTINCT [Type], [Value], SourceSheet FROM @Keys WHERE [Type] = 'ACTYPE') K
+        LEFT JOIN error_table et
+        ON et.Is_InvalidActypeSeat = 1
+            AND (ISNULL(et.cgo, 0) > 0 OR ISNULL(et.totalpax, 0) > 0)
+            AND (et.actype = K.[Value] OR (et.actype IS NULL AND K.[Value] IS NULL))
+            AND (et.sheet_name = K.SourceSheet OR (et.sheet_name IS NULL AND K.SourceSheet IS NULL))
+    GROUP BY K.[Type], K.[Value], K.SourceSheet;
+
+    -- Resolved dimensions
+    DELETE L
+    FROM Missing_Dimensions_Log L
+        INNER JOIN #Counts C
+        ON C.[Type] = L.[Type]
+            AND EXISTS (SELECT L.[Value], L.SourceSheet INTERSECT SELECT C.[Value], C.SourceSheet)
+    WHERE C.[Count] = 0;
+
+    UPDATE L
+    SET [Count] = C.[Count]
+    FROM Missing_Dimensions_Log L
+        INNER JOIN #Counts C
+        ON C.[Type] = L.[Type]
+            AND EXISTS (SELECT L.[Value], L.SourceSheet INTERSECT SELECT C.[Value], C.SourceSheet)
+    WHERE C.[Count] > 0
+        AND L.[Count] <> C.[Count];
+
+    INSERT INTO Missing_Dimensions_Log
+        ([Type], [Value], SourceSheet, [Count])
+    SELECT C.[Type], C.[Value], C.SourceSheet, C.[Count]
+    FROM #Counts C
+    WHERE C.[Count] > 0
+        AND NOT EXISTS (
+          SELECT 1
+        FROM Missing_Dimensions_Log L
+        WHERE L.[Type] = C.[Type]
+            AND EXISTS (SELECT L.[Value], L.SourceSheet INTERSECT SELECT C.[Value], C.SourceSheet)
+      );
+END;
+GO
+
 -- Log Missing Dimensions Procedure
--- Identifies and logs missing aircraft types and routes from error data
+-- Logs missing aircraft types and routes from error data with the number of error rows.
+-- @BatchId = only the keys of that import batch's error rows are recounted; NULL rebuilds the
+-- whole log from error_table (initial load / repair)
 CREATE OR ALTER PROCEDURE usp_LogMissingDimensions
+    @BatchId CHAR(32) = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
 
+    IF @BatchId IS NOT NULL
+    BEGIN
+        DECLARE @Keys MissingDimensionKeyList;
+
+        INSERT INTO @Keys
+            ([Type], [Value], SourceSheet)
+                SELECT 'ROUTE', et.route, et.sheet_name
+            FROM error_table et
+            WHERE et.import_batch_id = @BatchId
+                AND et.Is_InvalidRoute = 1
+        UNION
+            SELECT 'ACTYPE', et.actype, et.sheet_name
+            FROM error_table et
+            WHERE et.import_batch_id = @BatchId
+                AND et.Is_InvalidActypeSeat = 1;
+
+        EXEC usp_RefreshMissingDimensions @Keys = @Keys;
+        RETURN;
+    END
+
     DELETE FROM Missing_Dimensions_Log;
 
     -- Log missing routes
     INSERT INTO Missing_Dimensions_Log
-        (Type, Value, SourceSheet)
-    SELECT DISTINCT
+        (Type, Value, SourceSheet, [Count])
+    SELECT
         'ROUTE',
         et.route,
-        et.sheet_name
+        et.sheet_name,
+        COUNT(*)
     FROM error_table et
     WHERE et.Is_InvalidRoute = 1
-        AND NOT EXISTS (
-          SELECT 1
-        FROM Missing_Dimensions_Log L
-        WHERE L.Type = 'ROUTE' AND L.Value = et.route AND L.SourceSheet = et.sheet_name -- Avoid duplicate log entries for the same route from the same sheet
-      );
+    GROUP BY et.route, et.sheet_name;
 
     -- Log missing actypes
     INSERT INTO Missing_Dimensions_Log
-        (Type, Value, SourceSheet)
-    SELECT DISTINCT
+        (Type, Value, SourceSheet, [Count])
+    SELECT
         'ACTYPE',
         et.actype,
-        et.sheet_name
+        et.sheet_name,
+        COUNT(*)
     FROM error_table et
     WHERE et.Is_InvalidActypeSeat = 1
         AND (ISNULL(et.cgo, 0) > 0 OR ISNULL(et.totalpax, 0) > 0) -- Only log if it's a passenger or cargo flight needing an actype
-        AND NOT EXISTS (
-          SELECT 1
-        FROM Missing_Dimensions_Log L
-        WHERE L.Type = 'ACTYPE' AND L.Value = et.actype AND L.SourceSheet = et.sheet_name -- Avoid duplicate log entries
-      );
+    GROUP BY et.actype, et.sheet_name;
+END;
+GO
+
+-- Refresh Flight Export Fact Procedure
+-- Keeps flight_export_fact (the enriched rows read by /export-flight-data) up to date:
+-- @BatchId = (re)build the rows of that import batch; NULL = add flight_raw rows missing from
+-- the table and drop rows whose flight_raw row is gone. In both cases rows looking up an airport,
+-- airline or actype whose reference values changed since the last run
+-- (flight_export_ref_snapshot) are re-enriched. @FullRebuild = 1 rebuilds the whole table
+-- (also done on the first run)
+CREATE OR ALTER PROCEDURE usp_RefreshFlightExportFact
+    @BatchId CHAR(32) = NULL,
+    @FullRebuild BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        DECLARE @RunStartedAt DATETIME2 = SYSDATETIME();
+        DECLARE @Watermark DATETIME2;
+        DECLARE @ChangedRefCount INT = 0;
+        DECLARE @DeletedRows INT = 0;
+        DECLARE @RefreshedRows INT = 0;
+
+        -- Concurrent refreshes wait for each other
+        SELECT @Watermark = watermark
+        FROM validation_watermark WITH (UPDLOCK, HOLDLOCK)
+        WHERE name = 'flight_export_fact';
+
+        -- No previous run: the table has to be built once
+        IF @Watermark IS NULL
+            SET @FullRebuild = 1;
+
+        ------------------------------------------------------------------------------------
+        PRINT '1. Loading reference lookups...';
+        ------------------------------------------------------------------------------------
+
+        -- One row per lookup key (the export joins would repeat a flight for duplicate keys)
+        CREATE TABLE #Country
+        (
+            Country NVARCHAR(255) COLLATE DATABASE_DEFAULT NOT NULL PRIMARY KEY,
+            country_code NVARCHAR(10) COLLATE DATABASE_DEFAULT NULL,
+            region NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL
+        );
+        CREATE TABLE #Airport
+        (
+            IATACode NVARCHAR(50) COLLATE DATABASE_DEFAULT NOT NULL PRIMARY KEY,
+            City NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL,
+            Country NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL,
+            country_code NVARCHAR(10) COLLATE DATABASE_DEFAULT NULL,
+            region NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL
+        );
+        CREATE TABLE #Airline
+        (
+            CARRIER NVARCHAR(50) COLLATE DATABASE_DEFAULT NOT NULL PRIMARY KEY,
+            AIRLINES_NAME NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL,
+            AIRLINE_NATION NVARCHAR(255) COLLATE DATABASE_DEFAULT NULL,
+            nation_code NVARCHAR(10) COLLATE DATABASE_DEFAULT NULL
+        );
+        CREATE TABLE #Actype
+        (
+            actype_norm NVARCHAR(50) COLLATE DATABASE_DEFAULT NOT NULL PRIMARY KEY,
+            seat BIGINT NULL
+        );
+
+        INSERT INTO #Country (Country, country_code, region)
+        SELECT C.COUNTRY, C.[2_LETTER_CODE], C.[REGION_(VNM)]
+        FROM (
+            SELECT
+                COUNTRY,
+                [2_LETTER_CODE],
+                [REGION_(VNM)],
+                ROW_NUMBER() OVER (PARTITION BY COUNTRY ORDER BY [2_LETTER_CODE], [REGION_(VNM)]) AS rn
+            FROM COUNTRY_REF
+            WHERE COUNTRY IS NOT NULL
+        ) C
+        WHERE C.rn = 1;
+
+        INSERT INTO #Airport (IATACode, City, Country, country_code, region)
+        SELECT AP.IATACode, AP.City, AP.Country, C.country_code, C.region
+        FROM (
+            SELECT
+                IATACode,
+                City,
+                Country,
+                ROW_NUMBER() OVER (PARTITION BY IATACode ORDER BY City, Country) AS rn
+            FROM AIRPORT_REF
+            WHERE IATACode IS NOT NULL
+        ) AP
+            LEFT JOIN #Country C ON C.Country = AP.Country
+        WHERE AP.rn = 1;
+
+        INSERT INTO #Airline (CARRIER, AIRLINES_NAME, AIRLINE_NATION, nation_code)
+        SELECT A.CARRIER, A.AIRLINES_NAME, A.AIRLINE_NATION, C.country_code
+        FROM (
+            SELECT
+                CARRIER,
+                AIRLINES_NAME,
+                AIRLINE_NATION,
+                ROW_NUMBER() OVER (PARTITION BY CARRIER ORDER BY AIRLINES_NAME, AIRLINE_NATION) AS rn
+            FROM AIRLINE_REF
+            WHERE CARRIER IS NOT NULL
+        ) A
+            LEFT JOIN #Country C ON C.Country = A.AIRLINE_NATION
+        WHERE A.rn = 1;
+
+        INSERT INTO #Actype (actype_norm, seat)
+        SELECT S.actype_norm, S.seat
+        FROM (
+            SELECT
+                LOWER(TRIM(actype)) AS actype_norm,
+                seat,
+                ROW_NUMBER() OVER (PARTITION BY LOWER(TRIM(actype)) ORDER BY actype) AS rn
+            FROM actype_seat
+        ) S
+        WHERE S.rn = 1;
+
+        ------------------------------------------------------------------------------------
+        PRINT '2. Collecting reference changes since the last run...';
+        ------------------------------------------------------------------------------------
+
+        -- NULL and empty values hash differently ('0' / '1' + value)
+        CREATE TABLE #RefState
+        (
+            ref_type VARCHAR(10) NOT NULL,
+            ref_key NVARCHAR(255) COLLATE DATABASE_DEFAULT NOT NULL,
+            ref_hash VARBINARY(32) NOT NULL,
+            PRIMARY KEY (ref_type, ref_key)
+        );
+        CREATE TABLE #ChangedRefs
+        (
+            ref_type VARCHAR(10) NOT NULL,
+            ref_key NVARCHAR(255) COLLATE DATABASE_DEFAULT NOT NULL,
+            PRIMARY KEY (ref_type, ref_key)
+        );
+        CREATE TABLE #RefreshRows (id BIGINT NOT NULL PRIMARY KEY);
+
+        INSERT INTO #RefState (ref_type, ref_key, ref_hash)
+            SELECT 'AIRPORT', IATACode, HASHBYTES('SHA2_256', CONCAT(
+                ISNULL(N'1' + City, N'0'), N'|', ISNULL(N'1' + Country, N'0'), N'|',
+                ISNULL(N'1' + country_code, N'0'), N'|', ISNULL(N'1' + region, N'0')))
+            FROM #Airport
+        UNION ALL
+            SELECT 'AIRLINE', CARRIER, HASHBYTES('SHA2_256', CONCAT(
+                ISNULL(N'1' + AIRLINES_NAME, N'0'), N'|', ISNULL(N'1' + AIRLINE_NATION, N'0'), N'|',
+                ISNULL(N'1' + nation_code, N'0')))
+            FROM #Airline
+        UNION ALL
+            SELECT 'ACTYPE', actype_norm, HASHBYTES('SHA2_256', ISNULL(N'1' + CAST(seat AS NVARCHAR(20)), N'0'))
+            FROM #Actype;
+
+        IF @FullRebuild = 0
+        BEGIN
+            -- Added, changed and removed lookup keys
+            INSERT INTO #ChangedRefs (ref_type, ref_key)
+            SELECT COALESCE(R.ref_type, S.ref_type), COALESCE(R.ref_key, S.ref_key)
+            FROM #RefState R
+                FULL OUTER JOIN flight_export_ref_snapshot S
+                ON S.ref_type = R.ref_type
+                    AND S.ref_key = R.ref_key
+            WHERE R.ref_hash IS NULL
+                OR S.ref_hash IS NULL
+                OR R.ref_hash <> S.ref_hash;
+
+            SET @ChangedRefCount = @@ROWCOUNT;
+        END
+
+        PRINT 'Changed reference keys: ' + CAST(@ChangedRefCount AS VARCHAR)
+            + CASE WHEN @FullRebuild = 1 THEN ' (full rebuild)' ELSE '' END;
+
+        ------------------------------------------------------------------------------------
+        PRINT '3. Collecting rows to refresh...';
+        ------------------------------------------------------------------------------------
+
+        IF @FullRebuild = 1
+        BEGIN
+            SELECT @DeletedRows = COUNT(*) FROM flight_export_fact;
+            TRUNCATE TABLE flight_export_fact;
+
+            INSERT INTO #RefreshRows (id)
+            SELECT id FROM flight_raw;
+        END
+        ELSE
+        BEGIN
+            IF @BatchId IS NOT NULL
+                INSERT INTO #RefreshRows (id)
+                SELECT id
+                FROM flight_raw
+                WHERE import_batch_id = @BatchId;
+            ELSE
+            BEGIN
+                INSERT INTO #RefreshRows (id)
+                SELECT f.id
+                FROM flight_raw f
+                WHERE NOT EXISTS (SELECT 1 FROM flight_export_fact F2 WHERE F2.id = f.id);
+
+                DELETE F2
+                FROM flight_export_fact F2
+                WHERE NOT EXISTS (SELECT 1 FROM flight_raw f WHERE f.id = F2.id);
+
+                SET @DeletedRows = @@ROWCOUNT;
+            END
+
+            -- Rows looking up a changed reference key (one index seek per lookup column)
+            INSERT INTO #RefreshRows (id)
+            SELECT X.id
+            FROM (
+                        SELECT F2.id
+                    FROM flight_export_fact F2
+                        INNER JOIN #ChangedRefs CR ON CR.ref_type = 'AIRPORT' AND CR.ref_key = F2.dep_code
+                UNION
+                    SELECT F2.id
+                    FROM flight_export_fact F2
+                        INNER JOIN #ChangedRefs CR ON CR.ref_type = 'AIRPORT' AND CR.ref_key = F2.arr_code
+                UNION
+                    SELECT F2.id
+                    FROM flight_export_fact F2
+                        INNER JOIN #ChangedRefs CR ON CR.ref_type = 'AIRPORT' AND CR.ref_key = F2.departure
+                UNION
+                    SELECT F2.id
+                    FROM flight_export_fact F2
+                        INNER JOIN #ChangedRefs CR ON CR.ref_type = 'AIRPORT' AND CR.ref_key = F2.arrives
+                UNION
+                    SELECT F2.id
+                    FROM flight_export_fact F2
+                        INNER JOIN #ChangedRefs CR ON CR.ref_type = 'AIRLINE' AND CR.ref_key = F2.carrier_code
+                UNION
+                    SELECT F2.id
+                    FROM flight_export_fact F2
+                        INNER JOIN #ChangedRefs CR ON CR.ref_type = 'ACTYPE' AND CR.ref_key = F2.actype_norm
+            ) X
+            WHERE NOT EXISTS (SELECT 1 FROM #RefreshRows RR WHERE RR.id = X.id);
+
+            DELETE F2
+            FROM flight_export_fact F2
+                INNER JOIN #RefreshRows RR ON RR.id = F2.id;
+        END
+
+        ------------------------------------------------------------------------------------
+        PRINT '4. Enriching rows into flight_export_fact...';
+        ------------------------------------------------------------------------------------
+
+        -- Same columns and filters as the live export query (services/flight_export.py)
+        INSERT INTO flight_export_fact
+        (
+            id, flight_date, flightdate, flightno, route, actype, totalpax, cgo, mail,
+            acregno, source, sheet_name, seat, int_dom, airline_code, airlines_name,
+            airline_nation, airline_nation_code, departure, city_departure, country_departure,
+            arrives, city_arrives, country_arrives, country_code, area_code,
+            type_filter, dep_code, arr_code, carrier_code, actype_norm, import_batch_id
+        )
+    SELECT
+        f.id,
+        f.flight_date,
+        CAST(f.flight_date AS DATETIME),
+        f.flightno,
+        f.route,
+        f.actype,
+        CASE 
+            WHEN f.totalpax > 0 THEN f.totalpax
+            ELSE ISNULL(f.adl, 0) + ISNULL(f.chd, 0)
+        END,
+        f.cgo,
+        f.mail,
+        f.acregno,
+        f.source,
+        f.sheet_name,
+        COALESCE(f.seat, s.seat),
+        CASE 
+            WHEN UPPER(AI.Country) = 'VIETNAM' 
+                AND UPPER(AI1.Country) = 'VIETNAM' THEN 'DOM'
+            ELSE 'INT'
+        END,
+        LEFT(TRIM(f.flightno), 2),
+        A.AIRLINES_NAME,
+        A.AIRLINE_NATION,
+        A.nation_code,
+        LEFT(f.route, 3),
+        AI1.City,
+        AI1.Country,
+        RIGHT(f.route, 3),
+        AI.City,
+        AI.Country,
+        CASE 
+            WHEN UPPER(AI.Country) = 'VIETNAM' 
+                AND UPPER(AI1.Country) = 'VIETNAM' THEN 'VN'
+            WHEN UPPER(AI.Country) = 'VIETNAM' 
+                AND UPPER(AI1.Country) <> 'VIETNAM' THEN AI1.country_code
+            ELSE AI.country_code
+        END,
+        CASE 
+            WHEN UPPER(AI.Country) = 'VIETNAM' 
+                AND UPPER(AI1.Country) = 'VIETNAM' THEN 'VN'
+            WHEN UPPER(AI.Country) = 'VIETNAM' 
+                AND UPPER(AI1.Country) <> 'VIETNAM' THEN AI1.region
+            ELSE AI.region
+        END,
+        CASE 
+            WHEN CHARINDEX('SGN', f.route) > 1 
+                AND f.sheet_name != 'SGN' THEN 0
+            WHEN f.sheet_name = 'SGN' THEN 1
+            WHEN CASE
+                    WHEN dep.Country = 'Vietnam' 
+                        AND arr.Country = 'Vietnam' THEN 'DOM'
+                    WHEN dep.Country IS NOT NULL 
+                        AND arr.Country IS NOT NULL 
+                        AND (dep.Country != 'Vietnam' 
+                            OR arr.Country != 'Vietnam') THEN 'INT'
+                    ELSE NULL
+                END = 'INT' THEN 2
+            WHEN f.sheet_name = LEFT(f.route, 3) THEN 3
+            ELSE -1
+        END,
+        LEFT(TRIM(f.route), 3),
+        RIGHT(TRIM(f.route), 3),
+        LEFT(f.flightno, 2),
+        LOWER(TRIM(f.actype)),
+        f.import_batch_id
+    FROM flight_raw f
+        INNER JOIN #RefreshRows RR ON RR.id = f.id
+        LEFT JOIN #Airport dep ON dep.IATACode = LEFT(TRIM(f.route), 3)
+        LEFT JOIN #Airport arr ON arr.IATACode = RIGHT(TRIM(f.route), 3)
+        LEFT JOIN #Actype s ON s.actype_norm = LOWER(TRIM(f.actype))
+        LEFT JOIN #Airline A ON A.CARRIER = LEFT(f.flightno, 2)
+        LEFT JOIN #Airport AI ON AI.IATACode = RIGHT(f.route, 3)
+        LEFT JOIN #Airport AI1 ON AI1.IATACode = LEFT(f.route, 3);
+
+        SET @RefreshedRows = @@ROWCOUNT;
+
+        PRINT 'Refreshed rows: ' + CAST(@RefreshedRows AS VARCHAR);
+
+        ------------------------------------------------------------------------------------
+        PRINT '5. Updating reference snapshot and watermark...';
+        ------------------------------------------------------------------------------------
+
+        IF @FullRebuild = 1
+        BEGIN
+            DELETE FROM flight_export_ref_snapshot;
+
+            INSERT INTO flight_export_ref_snapshot (ref_type, ref_key, ref_hash)
+            SELECT ref_type, ref_key, ref_hash
+            FROM #RefState;
+        END
+        ELSE
+        BEGIN
+            DELETE S
+            FROM flight_export_ref_snapshot S
+                INNER JOIN #ChangedRefs CR
+                ON CR.ref_type = S.ref_type
+                    AND CR.ref_key = S.ref_key;
+
+            INSERT INTO flight_export_ref_snapshot (ref_type, ref_key, ref_hash)
+            SELECT R.ref_type, R.ref_key, R.ref_hash
+            FROM #RefState R
+                INNER JOIN #ChangedRefs CR
+                ON CR.ref_type = R.ref_type
+                    AND CR.ref_key = R.ref_key;
+        END
+
+        UPDATE validation_watermark
+        SET watermark = @RunStartedAt,
+            updated_at = SYSDATETIME()
+        WHERE name = 'flight_export_fact';
+
+        IF @@ROWCOUNT = 0
+            INSERT INTO validation_watermark (name, watermark)
+            VALUES ('flight_export_fact', @RunStartedAt);
+
+        COMMIT TRANSACTION;
+
+        SELECT
+            @FullRebuild AS full_rebuild,
+            @ChangedRefCount AS changed_refs,
+            @DeletedRows AS deleted_rows,
+            @RefreshedRows AS refreshed_rows;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW; -- Throw error so Python can catch it
+    END CATCH
 END;
 GO
 
@@ -1482,6 +2264,17 @@ IF COL_LENGTH('import_log', 'created_at') IS NULL
 IF COL_LENGTH('import_log', 'updated_at') IS NULL
     ALTER TABLE import_log ADD updated_at datetime2 DEFAULT SYSDATETIME();
 
+IF COL_LENGTH('import_log', 'file_hash') IS NULL
+    ALTER TABLE import_log ADD file_hash CHAR(64) NULL;
+
+IF NOT EXISTS (
+    SELECT 1
+FROM sys.indexes
+WHERE name = 'IX_import_log_file_hash'
+    AND object_id = OBJECT_ID('import_log')
+)
+    EXEC('CREATE INDEX IX_import_log_file_hash ON import_log(file_hash)');
+
 DECLARE @pk8 NVARCHAR(200);
 SELECT @pk8 = name
 FROM sys.key_constraints
@@ -1546,6 +2339,393 @@ IF COL_LENGTH('TempRouteImport', 'Route') IS NULL
     ALTER TABLE TempRouteImport ADD [Route] NVARCHAR(255) PRIMARY KEY;
 
 
+/* ===================== import_job ===================== */
+IF OBJECT_ID('import_job', 'U') IS NULL
+BEGIN
+    CREATE TABLE import_job
+    (
+        id NVARCHAR(32) NOT NULL PRIMARY KEY,
+        job_type NVARCHAR(50) NOT NULL,
+        status NVARCHAR(20) DEFAULT 'queued' NOT NULL,
+        file_count INT NULL,
+        file_names NVARCHAR(MAX) NULL,
+        work_dir NVARCHAR(500) NULL,
+        stages NVARCHAR(MAX) NULL,
+        result NVARCHAR(MAX) NULL,
+        error NVARCHAR(MAX) NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+        started_at DATETIME2 NULL,
+        finished_at DATETIME2 NULL
+    );
+
+    EXEC('CREATE INDEX IX_import_job_status ON import_job(status)');
+    EXEC('CREATE INDEX IX_import_job_created_at ON import_job(created_at)');
+END
+
+
+/* ===================== validation_watermark ===================== */
+IF OBJECT_ID('validation_watermark', 'U') IS NULL
+BEGIN
+    CREATE TABLE validation_watermark
+    (
+        name NVARCHAR(50) NOT NULL PRIMARY KEY,
+        watermark DATETIME2 NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+        updated_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+    );
+END
+
+
+/* ===================== normalized lookup keys ===================== */
+IF COL_LENGTH('actype_seat', 'actype_norm') IS NULL
+    ALTER TABLE actype_seat ADD actype_norm AS LOWER(TRIM(actype)) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_actype_seat_actype_norm' AND object_id = OBJECT_ID('actype_seat'))
+    EXEC('CREATE INDEX IX_actype_seat_actype_norm ON actype_seat(actype_norm)');
+
+IF COL_LENGTH('Airline_Route_Details', 'sector_key') IS NULL
+    ALTER TABLE Airline_Route_Details ADD sector_key AS UPPER(TRIM(Sector)) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Airline_Route_Details_sector_key' AND object_id = OBJECT_ID('Airline_Route_Details'))
+    EXEC('CREATE INDEX IX_Airline_Route_Details_sector_key ON Airline_Route_Details(sector_key)');
+
+IF COL_LENGTH('flight_clean_data_stg', 'actype_norm') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD actype_norm AS LOWER(TRIM(actype)) PERSISTED;
+
+IF COL_LENGTH('flight_clean_data_stg', 'sector_key') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD sector_key AS UPPER(
+    CASE
+        WHEN LEN(TRIM(route)) = 7 AND CHARINDEX('-', route) > 0 THEN
+            CASE
+                WHEN LEFT(route, 3) < RIGHT(route, 3) THEN CONCAT(LEFT(route, 3), RIGHT(route, 3))
+                ELSE CONCAT(RIGHT(route, 3), LEFT(route, 3))
+            END
+    END
+) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_clean_data_stg_actype_norm' AND object_id = OBJECT_ID('flight_clean_data_stg'))
+    EXEC('CREATE INDEX IX_flight_clean_data_stg_actype_norm ON flight_clean_data_stg(actype_norm)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_clean_data_stg_sector_key' AND object_id = OBJECT_ID('flight_clean_data_stg'))
+    EXEC('CREATE INDEX IX_flight_clean_data_stg_sector_key ON flight_clean_data_stg(sector_key)');
+
+IF COL_LENGTH('error_table', 'actype_norm') IS NULL
+    ALTER TABLE error_table ADD actype_norm AS LOWER(TRIM(actype)) PERSISTED;
+
+IF COL_LENGTH('error_table', 'sector_key') IS NULL
+    ALTER TABLE error_table ADD sector_key AS UPPER(
+    CASE
+        WHEN LEN(TRIM(route)) = 7 AND CHARINDEX('-', route) > 0 THEN
+            CASE
+                WHEN LEFT(route, 3) < RIGHT(route, 3) THEN CONCAT(LEFT(route, 3), RIGHT(route, 3))
+                ELSE CONCAT(RIGHT(route, 3), LEFT(route, 3))
+            END
+    END
+) PERSISTED;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_error_table_actype_norm' AND object_id = OBJECT_ID('error_table'))
+    EXEC('CREATE INDEX IX_error_table_actype_norm ON error_table(actype_norm)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_error_table_sector_key' AND object_id = OBJECT_ID('error_table'))
+    EXEC('CREATE INDEX IX_error_table_sector_key ON error_table(sector_key)');
+
+/* ===================== typed flight_date ===================== */
+IF COL_LENGTH('flight_raw', 'flight_date') IS NULL
+    ALTER TABLE flight_raw ADD flight_date DATE NULL;
+
+IF COL_LENGTH('flight_raw', 'flight_date_status') IS NULL
+    ALTER TABLE flight_raw ADD flight_date_status TINYINT NULL;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_raw_flight_date' AND object_id = OBJECT_ID('flight_raw'))
+    EXEC('CREATE INDEX IX_flight_raw_flight_date ON flight_raw(flight_date)');
+
+IF COL_LENGTH('flight_clean_data_stg', 'flight_date') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD flight_date DATE NULL;
+
+IF COL_LENGTH('flight_clean_data_stg', 'flight_date_status') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD flight_date_status TINYINT NULL;
+
+IF COL_LENGTH('error_table', 'flight_date') IS NULL
+    ALTER TABLE error_table ADD flight_date DATE NULL;
+
+IF COL_LENGTH('error_table', 'flight_date_status') IS NULL
+    ALTER TABLE error_table ADD flight_date_status TINYINT NULL;
+
+GO
+
+-- Parse flightdate once for rows imported before flight_date existed, and re-parse rows
+-- marked invalid (status 2) by earlier versions: yyyyMMdd is read before the Excel serial
+-- branch, serials may be integral floats ('45296.0'); out-of-range serials are invalid
+-- instead of an error
+DECLARE @InvalidRawDates INT = (SELECT COUNT(*) FROM flight_raw WHERE flight_date_status = 2);
+
+UPDATE flight_raw
+SET flight_date = parsed.flight_date,
+    flight_date_status = CASE
+        WHEN flight_raw.flightdate IS NULL THEN 1
+        WHEN parsed.flight_date IS NULL THEN 2
+        ELSE 0
+    END
+FROM flight_raw
+    CROSS APPLY (
+        SELECT CASE
+            WHEN LEN(TRIM(flight_raw.flightdate)) = 8
+                AND TRIM(flight_raw.flightdate) NOT LIKE '%[^0-9]%'
+                AND TRY_CONVERT(DATE, TRIM(flight_raw.flightdate), 112) IS NOT NULL
+                THEN TRY_CONVERT(DATE, TRIM(flight_raw.flightdate), 112)
+            WHEN ISNUMERIC(flight_raw.flightdate) = 1 THEN
+                CASE
+                    WHEN TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)) = FLOOR(TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)))
+                        AND TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)) BETWEEN -53688 AND 2958465
+                        THEN DATEADD(DAY, CAST(TRY_CAST(flight_raw.flightdate AS DECIMAL(18, 6)) AS INT), CAST('1899-12-30' AS DATE))
+                END
+            WHEN flight_raw.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, flight_raw.flightdate, 103)
+            WHEN flight_raw.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, flight_raw.flightdate, 103)
+            WHEN flight_raw.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(flight_raw.flightdate, 10), 120)
+            WHEN flight_raw.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, flight_raw.flightdate, 111)
+            ELSE CONVERT(DATE, TRY_CONVERT(DATETIME, flight_raw.flightdate))
+        END AS flight_date
+    ) parsed
+WHERE flight_raw.flight_date_status IS NULL
+    OR flight_raw.flight_date_status = 2;
+
+UPDATE flight_clean_data_stg
+SET flight_date = parsed.flight_date,
+    flight_date_status = CASE
+        WHEN flight_clean_data_stg.flightdate IS NULL THEN 1
+        WHEN parsed.flight_date IS NULL THEN 2
+        ELSE 0
+    END
+FROM flight_clean_data_stg
+    CROSS APPLY (
+        SELECT CASE
+            WHEN LEN(TRIM(flight_clean_data_stg.flightdate)) = 8
+                AND TRIM(flight_clean_data_stg.flightdate) NOT LIKE '%[^0-9]%'
+                AND TRY_CONVERT(DATE, TRIM(flight_clean_data_stg.flightdate), 112) IS NOT NULL
+                THEN TRY_CONVERT(DATE, TRIM(flight_clean_data_stg.flightdate), 112)
+            WHEN ISNUMERIC(flight_clean_data_stg.flightdate) = 1 THEN
+                CASE
+                    WHEN TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)) = FLOOR(TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)))
+                        AND TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)) BETWEEN -53688 AND 2958465
+                        THEN DATEADD(DAY, CAST(TRY_CAST(flight_clean_data_stg.flightdate AS DECIMAL(18, 6)) AS INT), CAST('1899-12-30' AS DATE))
+                END
+            WHEN flight_clean_data_stg.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, flight_clean_data_stg.flightdate, 103)
+            WHEN flight_clean_data_stg.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, flight_clean_data_stg.flightdate, 103)
+            WHEN flight_clean_data_stg.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(flight_clean_data_stg.flightdate, 10), 120)
+            WHEN flight_clean_data_stg.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, flight_clean_data_stg.flightdate, 111)
+            ELSE CONVERT(DATE, TRY_CONVERT(DATETIME, flight_clean_data_stg.flightdate))
+        END AS flight_date
+    ) parsed
+WHERE flight_clean_data_stg.flight_date_status IS NULL
+    OR flight_clean_data_stg.flight_date_status = 2;
+
+UPDATE error_table
+SET flight_date = parsed.flight_date,
+    flight_date_status = CASE
+        WHEN error_table.flightdate IS NULL THEN 1
+        WHEN parsed.flight_date IS NULL THEN 2
+        ELSE 0
+    END
+FROM error_table
+    CROSS APPLY (
+        SELECT CASE
+            WHEN LEN(TRIM(error_table.flightdate)) = 8
+                AND TRIM(error_table.flightdate) NOT LIKE '%[^0-9]%'
+                AND TRY_CONVERT(DATE, TRIM(error_table.flightdate), 112) IS NOT NULL
+                THEN TRY_CONVERT(DATE, TRIM(error_table.flightdate), 112)
+            WHEN ISNUMERIC(error_table.flightdate) = 1 THEN
+                CASE
+                    WHEN TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)) = FLOOR(TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)))
+                        AND TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)) BETWEEN -53688 AND 2958465
+                        THEN DATEADD(DAY, CAST(TRY_CAST(error_table.flightdate AS DECIMAL(18, 6)) AS INT), CAST('1899-12-30' AS DATE))
+                END
+            WHEN error_table.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, error_table.flightdate, 103)
+            WHEN error_table.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, error_table.flightdate, 103)
+            WHEN error_table.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(error_table.flightdate, 10), 120)
+            WHEN error_table.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, error_table.flightdate, 111)
+            ELSE CONVERT(DATE, TRY_CONVERT(DATETIME, error_table.flightdate))
+        END AS flight_date
+    ) parsed
+WHERE error_table.flight_date_status IS NULL
+    OR error_table.flight_date_status = 2;
+
+-- Repaired flight_raw dates are stale in flight_export_fact: the next refresh rebuilds it
+IF OBJECT_ID('validation_watermark', 'U') IS NOT NULL
+    AND (SELECT COUNT(*) FROM flight_raw WHERE flight_date_status = 2) < @InvalidRawDates
+    DELETE FROM validation_watermark WHERE name = 'flight_export_fact';
+GO
+
+/* ===================== import batch id ===================== */
+IF COL_LENGTH('import_log', 'import_batch_id') IS NULL
+    ALTER TABLE import_log ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('flight_raw', 'import_batch_id') IS NULL
+    ALTER TABLE flight_raw ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('flight_clean_data_stg', 'import_batch_id') IS NULL
+    ALTER TABLE flight_clean_data_stg ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('flight_data_chot', 'import_batch_id') IS NULL
+    ALTER TABLE flight_data_chot ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('error_table', 'import_batch_id') IS NULL
+    ALTER TABLE error_table ADD import_batch_id CHAR(32) NULL;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_import_log_import_batch_id' AND object_id = OBJECT_ID('import_log'))
+    EXEC('CREATE INDEX IX_import_log_import_batch_id ON import_log(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_raw_import_batch_id' AND object_id = OBJECT_ID('flight_raw'))
+    EXEC('CREATE INDEX IX_flight_raw_import_batch_id ON flight_raw(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_clean_data_stg_import_batch_id' AND object_id = OBJECT_ID('flight_clean_data_stg'))
+    EXEC('CREATE INDEX IX_flight_clean_data_stg_import_batch_id ON flight_clean_data_stg(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_flight_data_chot_import_batch_id' AND object_id = OBJECT_ID('flight_data_chot'))
+    EXEC('CREATE INDEX IX_flight_data_chot_import_batch_id ON flight_data_chot(import_batch_id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_error_table_import_batch_id' AND object_id = OBJECT_ID('error_table'))
+    EXEC('CREATE INDEX IX_error_table_import_batch_id ON error_table(import_batch_id)');
+GO
+
+/* ===================== Missing_Dimensions_Log count ===================== */
+IF COL_LENGTH('Missing_Dimensions_Log', 'Count') IS NULL
+    ALTER TABLE Missing_Dimensions_Log ADD [Count] INT NOT NULL CONSTRAINT DF_Missing_Dimensions_Log_Count DEFAULT 0;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Missing_Dimensions_Log_Type_Value' AND object_id = OBJECT_ID('Missing_Dimensions_Log'))
+    EXEC('CREATE INDEX IX_Missing_Dimensions_Log_Type_Value ON Missing_Dimensions_Log([Type], [Value], SourceSheet)');
+
+IF TYPE_ID('MissingDimensionKeyList') IS NULL
+    EXEC('CREATE TYPE MissingDimensionKeyList AS TABLE ([Type] NVARCHAR(50) NOT NULL, [Value] NVARCHAR(255) NULL, SourceSheet NVARCHAR(255) NULL)');
+GO
+
+-- Exact counts for entries logged before Count existed
+UPDATE L
+SET [Count] = CASE L.[Type]
+    WHEN 'ROUTE' THEN (
+        SELECT COUNT(*)
+        FROM error_table et
+        WHERE et.Is_InvalidRoute = 1
+            AND EXISTS (SELECT et.route, et.sheet_name INTERSECT SELECT L.[Value], L.SourceSheet)
+    )
+    WHEN 'ACTYPE' THEN (
+        SELECT COUNT(*)
+        FROM error_table et
+        WHERE et.Is_InvalidActypeSeat = 1
+            AND (ISNULL(et.cgo, 0) > 0 OR ISNULL(et.totalpax, 0) > 0)
+            AND EXISTS (SELECT et.actype, et.sheet_name INTERSECT SELECT L.[Value], L.SourceSheet)
+    )
+    ELSE L.[Count]
+END
+FROM Missing_Dimensions_Log L
+WHERE L.[Count] = 0;
+GO
+
+
+/* ===================== pipeline_run ===================== */
+IF OBJECT_ID('pipeline_run', 'U') IS NULL
+BEGIN
+    CREATE TABLE pipeline_run
+    (
+        id NVARCHAR(32) NOT NULL PRIMARY KEY,
+        run_type NVARCHAR(50) NOT NULL,
+        status NVARCHAR(20) NOT NULL,
+        job_id NVARCHAR(32) NULL,
+        import_batch_id CHAR(32) NULL,
+        file_count INT NULL,
+        seconds FLOAT NULL,
+        db_round_trips INT NULL,
+        stages NVARCHAR(MAX) NULL,
+        error NVARCHAR(MAX) NULL,
+        started_at DATETIME2 NOT NULL,
+        finished_at DATETIME2 NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+    );
+
+    EXEC('CREATE INDEX IX_pipeline_run_run_type ON pipeline_run(run_type)');
+    EXEC('CREATE INDEX IX_pipeline_run_started_at ON pipeline_run(started_at)');
+END
+GO
+
+
+/* ===================== flight_export_fact ===================== */
+IF OBJECT_ID('flight_export_fact', 'U') IS NULL
+BEGIN
+    CREATE TABLE flight_export_fact
+    (
+        id BIGINT NOT NULL PRIMARY KEY NONCLUSTERED,
+        flight_date DATE NULL,
+        flightdate DATETIME NULL,
+        flightno NVARCHAR(50) NULL,
+        route NVARCHAR(100) NULL,
+        actype NVARCHAR(50) NULL,
+        totalpax FLOAT NULL,
+        cgo FLOAT NULL,
+        mail FLOAT NULL,
+        acregno NVARCHAR(50) NULL,
+        source NVARCHAR(500) NULL,
+        sheet_name NVARCHAR(255) NULL,
+        seat BIGINT NULL,
+        int_dom NVARCHAR(10) NULL,
+        airline_code NVARCHAR(10) NULL,
+        airlines_name NVARCHAR(255) NULL,
+        airline_nation NVARCHAR(255) NULL,
+        airline_nation_code NVARCHAR(10) NULL,
+        departure NVARCHAR(10) NULL,
+        city_departure NVARCHAR(255) NULL,
+        country_departure NVARCHAR(255) NULL,
+        arrives NVARCHAR(10) NULL,
+        city_arrives NVARCHAR(255) NULL,
+        country_arrives NVARCHAR(255) NULL,
+        country_code NVARCHAR(10) NULL,
+        area_code NVARCHAR(255) NULL,
+        type_filter INT NOT NULL,
+        dep_code NVARCHAR(10) NULL,
+        arr_code NVARCHAR(10) NULL,
+        carrier_code NVARCHAR(10) NULL,
+        actype_norm NVARCHAR(50) NULL,
+        import_batch_id CHAR(32) NULL,
+        refreshed_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL
+    );
+
+    EXEC('CREATE CLUSTERED INDEX IX_flight_export_fact_flight_date ON flight_export_fact(flight_date, id)');
+    EXEC('CREATE INDEX IX_flight_export_fact_departure ON flight_export_fact(departure)');
+    EXEC('CREATE INDEX IX_flight_export_fact_arrives ON flight_export_fact(arrives)');
+    EXEC('CREATE INDEX IX_flight_export_fact_dep_code ON flight_export_fact(dep_code)');
+    EXEC('CREATE INDEX IX_flight_export_fact_arr_code ON flight_export_fact(arr_code)');
+    EXEC('CREATE INDEX IX_flight_export_fact_carrier_code ON flight_export_fact(carrier_code)');
+    EXEC('CREATE INDEX IX_flight_export_fact_actype_norm ON flight_export_fact(actype_norm)');
+END
+
+IF OBJECT_ID('flight_export_ref_snapshot', 'U') IS NULL
+BEGIN
+    CREATE TABLE flight_export_ref_snapshot
+    (
+        ref_type VARCHAR(10) NOT NULL,
+        ref_key NVARCHAR(255) NOT NULL,
+        ref_hash VARBINARY(32) NOT NULL,
+        created_at DATETIME2 DEFAULT SYSDATETIME() NOT NULL,
+        PRIMARY KEY (ref_type, ref_key)
+    );
+END
+GO
+
+/* ===================== import_job owner / heartbeat ===================== */
+IF COL_LENGTH('import_job', 'owner') IS NULL
+    ALTER TABLE import_job ADD owner NVARCHAR(100) NULL;
+
+IF COL_LENGTH('import_job', 'heartbeat_at') IS NULL
+    ALTER TABLE import_job ADD heartbeat_at DATETIME2 NULL;
+GO
+
+/* ===================== import_job resume ===================== */
+IF COL_LENGTH('import_job', 'import_batch_id') IS NULL
+    ALTER TABLE import_job ADD import_batch_id CHAR(32) NULL;
+
+IF COL_LENGTH('import_job', 'raw_committed_at') IS NULL
+    ALTER TABLE import_job ADD raw_committed_at DATETIME2 NULL;
+GO
+
+
 
 -- ===================================================================
 -- TRIGGERS FOR AUDIT COLUMNS (created_at, updated_at)
@@ -1806,3 +2986,14 @@ AS UPDATE t SET t.created_at = SYSDATETIME()
    JOIN inserted i ON t.[Route] = i.[Route]
    WHERE t.created_at IS NULL;
 GO
+
+
+
+-- ===================================================================
+-- BUILD FLIGHT EXPORT FACT
+-- ===================================================================
+-- Rebuild flight_export_fact once the migration is applied, so exports do not come back
+-- empty until the next import (skipped while the procedures have not been created yet)
+IF OBJECT_ID('usp_RefreshFlightExportFact', 'P') IS NOT NULL
+    EXEC usp_RefreshFlightExportFact @FullRebuild = 1;
+GO
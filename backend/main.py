@@ -1,10 +1,19 @@
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from backend.core.config import settings
 from backend.core.exception import validation_exception_handler
+from backend.core.logging_config import (
+    new_correlation_id,
+    reset_correlation_id,
+    set_correlation_id,
+    setup_logging,
+)
 from backend.db.database import create_tables
+from backend.services.import_jobs import job_queue
 from backend.routes.actype_seat import router as actype_seat_router
 from backend.routes.temp_actype_import import router as temp_actype_router
 from backend.routes.data_processing import router as data_processing_router
@@ -20,9 +29,26 @@ from backend.routes.dim_sector_route_dom_ref import (
 )
 
 
+setup_logging()
 create_tables()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Các handler là hàm def (Session, pandas đều blocking) nên FastAPI chạy chúng trong
+    # threadpool của anyio, event loop không bị chặn. Giới hạn số thread theo cấu hình.
+    to_thread.current_default_thread_limiter().total_tokens = (
+        settings.API_THREADPOOL_SIZE
+    )
+
+    # Worker pool cho các job import chạy nền, chạy lại job bị gián đoạn
+    job_queue.start()
+    yield
+    job_queue.shutdown()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     debug=settings.DEBUG,
     title="Airline API",
     description="API for managing airline reservations",
@@ -49,6 +75,20 @@ app.add_middleware(
 )
 
 
+# Mỗi request có một correlation id (lấy từ header X-Request-ID nếu client gửi lên),
+# được gắn vào mọi log của request và trả lại trong header của response
+@app.middleware("http")
+async def correlation_id_middleware(request: Request, call_next):
+    correlation_id = request.headers.get("X-Request-ID") or new_correlation_id()
+    token = set_correlation_id(correlation_id)
+    try:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = correlation_id
+        return response
+    finally:
+        reset_correlation_id(token)
+
+
 # Custom exception handler để loại bỏ "Value error, " từ Pydantic
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Float, Integer, DateTime, Text
+from sqlalchemy import Column, BigInteger, String, Float, Integer, DateTime, Text, Date, SmallInteger
 from sqlalchemy.sql import func
 
 from backend.db.database import Base
@@ -13,6 +13,8 @@ class ErrorTable(Base):
     Attributes:
         id: ID duy nhất của bản ghi
         flightdate: Ngày bay gốc
+        flight_date: Ngày bay đã parse (từ flight_raw)
+        flight_date_status: Trạng thái parse flightdate (0: hợp lệ, 1: trống, 2: không hợp lệ)
         flightno: Số hiệu chuyến bay
         route: Tuyến bay
         actype: Loại máy bay
@@ -32,6 +34,7 @@ class ErrorTable(Base):
         is_invalid_actype_seat: Cờ validation loại máy bay
         error_reason: Mô tả lỗi
         total_errors: Tổng số lỗi
+        import_batch_id: Import batch của file nguồn
         time_import: Thời gian import
         created_at: Thời gian tạo bản ghi
     """
@@ -40,6 +43,12 @@ class ErrorTable(Base):
 
     id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
     flightdate = Column(String(255), nullable=True, comment="Original flight date")
+    flight_date = Column(Date, nullable=True, comment="Parsed flight date")
+    flight_date_status = Column(
+        SmallInteger,
+        nullable=True,
+        comment="Parse status of flightdate (0 = ok, 1 = missing, 2 = invalid)",
+    )
     flightno = Column(String(50), nullable=True, index=True, comment="Flight number")
     route = Column(String(100), nullable=True, index=True, comment="Route")
     actype = Column(String(50), nullable=True, index=True, comment="Aircraft type")
@@ -77,6 +86,9 @@ class ErrorTable(Base):
     total_errors = Column(
         "TotalErrors", Integer, nullable=True, index=True, comment="Total error count"
     )
+    import_batch_id = Column(
+        String(32), nullable=True, index=True, comment="Import batch of the source file"
+    )
     time_import = Column(
         DateTime, nullable=False, default=func.getdate(), comment="Import timestamp"
     )
@@ -93,6 +105,8 @@ class ErrorTable(Base):
         return {
             "id": self.id,
             "flightdate": self.flightdate,
+            "flight_date": self.flight_date,
+            "flight_date_status": self.flight_date_status,
             "flightno": self.flightno,
             "route": self.route,
             "actype": self.actype,
@@ -112,6 +126,7 @@ class ErrorTable(Base):
             "is_invalid_actype_seat": self.is_invalid_actype_seat,
             "error_reason": self.error_reason,
             "total_errors": self.total_errors,
+            "import_batch_id": self.import_batch_id,
             "time_import": self.time_import,
             "created_at": self.created_at,
         }
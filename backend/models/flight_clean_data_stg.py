@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Float, Integer, DateTime, Text
+from sqlalchemy import Column, BigInteger, String, Float, Integer, DateTime, Text, Date, SmallInteger
 from sqlalchemy.sql import func
 
 from backend.db.database import Base
@@ -13,6 +13,8 @@ class FlightCleanDataStg(Base):
     Attributes:
         id: ID duy nhất của bản ghi
         flightdate: Ngày bay
+        flight_date: Ngày bay đã parse (từ flight_raw)
+        flight_date_status: Trạng thái parse flightdate (0: hợp lệ, 1: trống, 2: không hợp lệ)
         flightno: Số hiệu chuyến bay
         route: Tuyến bay
         actype: Loại máy bay
@@ -32,6 +34,7 @@ class FlightCleanDataStg(Base):
         is_invalid_actype_seat: Cờ validation loại máy bay
         error_reason: Mô tả lỗi
         total_errors: Số lượng lỗi
+        import_batch_id: Import batch đang được làm sạch
         inserted_time: Thời gian chèn
         created_at: Thời gian tạo bản ghi
     """
@@ -40,6 +43,12 @@ class FlightCleanDataStg(Base):
 
     id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
     flightdate = Column(String(255), nullable=True, comment="Flight date")
+    flight_date = Column(Date, nullable=True, comment="Parsed flight date")
+    flight_date_status = Column(
+        SmallInteger,
+        nullable=True,
+        comment="Parse status of flightdate (0 = ok, 1 = missing, 2 = invalid)",
+    )
     flightno = Column(String(50), nullable=True, comment="Flight number")
     route = Column(String(100), nullable=True, comment="Route")
     actype = Column(String(50), nullable=True, comment="Aircraft type")
@@ -75,6 +84,9 @@ class FlightCleanDataStg(Base):
         "ErrorReason", Text, nullable=True, comment="Error description"
     )
     total_errors = Column("TotalErrors", Integer, nullable=True, comment="Error count")
+    import_batch_id = Column(
+        String(32), nullable=True, index=True, comment="Import batch being cleaned"
+    )
     inserted_time = Column(
         DateTime, default=func.getdate(), nullable=False, comment="Thời gian chèn"
     )
@@ -91,6 +103,8 @@ class FlightCleanDataStg(Base):
         return {
             "id": self.id,
             "flightdate": self.flightdate,
+            "flight_date": self.flight_date,
+            "flight_date_status": self.flight_date_status,
             "flightno": self.flightno,
             "route": self.route,
             "actype": self.actype,
@@ -110,6 +124,7 @@ class FlightCleanDataStg(Base):
             "is_invalid_actype_seat": self.is_invalid_actype_seat,
             "error_reason": self.error_reason,
             "total_errors": self.total_errors,
+            "import_batch_id": self.import_batch_id,
             "inserted_time": self.inserted_time,
             "created_at": self.created_at,
         }
@@ -30,6 +30,7 @@ class FlightDataChot(Base):
         type_filter: Bộ lọc loại chuyến bay
         inserted_time: Thời gian chèn
         int_dom_: Domestic/International
+        import_batch_id: Import batch của file nguồn
         created_at: Thời gian tạo bản ghi
         updated_at: Thời gian cập nhật bản ghi
     """
@@ -63,6 +64,9 @@ class FlightDataChot(Base):
         DateTime, default=func.getdate(), nullable=False, comment="Thời gian chèn"
     )
     int_dom_ = Column(String(10), nullable=True, comment="Domestic/International")
+    import_batch_id = Column(
+        String(32), nullable=True, index=True, comment="Import batch of the source file"
+    )
     created_at = Column(
         DateTime, default=func.sysdatetime(), nullable=False, comment="Thời gian tạo"
     )
@@ -100,6 +104,7 @@ class FlightDataChot(Base):
             "type_filter": self.type_filter,
             "inserted_time": self.inserted_time,
             "int_dom_": self.int_dom_,
+            "import_batch_id": self.import_batch_id,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
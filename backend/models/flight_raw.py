@@ -1,4 +1,4 @@
-from sqlalchemy import INT, NVARCHAR, Column, BigInteger, String, Float, DateTime
+from sqlalchemy import INT, NVARCHAR, Column, BigInteger, String, Float, DateTime, Date, SmallInteger
 from sqlalchemy.sql import func
 
 from backend.db.database import Base
@@ -13,6 +13,8 @@ class FlightRaw(Base):
     Attributes:
         id: ID duy nhất của bản ghi
         flightdate: Ngày bay (các định dạng khác nhau từ Excel)
+        flight_date: Ngày bay đã parse khi import
+        flight_date_status: Trạng thái parse flightdate (0: hợp lệ, 1: trống, 2: không hợp lệ)
         flightno: Số hiệu chuyến bay
         route: Tuyến bay (VD: SGN-HAN)
         actype: Loại máy bay
@@ -32,6 +34,7 @@ class FlightRaw(Base):
         is_invalid_actype_seat: Cờ kiểm tra tính hợp lệ của loại máy bay và sức chứa ghế
         error_reason: Mô tả lỗi nếu có
         total_errors: Tổng số lỗi phát hiện
+        import_batch_id: Import batch của file nguồn
         created_at: Thời gian tạo bản ghi
     """
 
@@ -44,6 +47,14 @@ class FlightRaw(Base):
         index=True,
         comment="Flight date (various formats from Excel)",
     )
+    flight_date = Column(
+        Date, nullable=True, index=True, comment="Flight date parsed once at import"
+    )
+    flight_date_status = Column(
+        SmallInteger,
+        nullable=True,
+        comment="Parse status of flightdate (0 = ok, 1 = missing, 2 = invalid)",
+    )
     flightno = Column(String(50), nullable=True, comment="Flight number")
     route = Column(
         String(100), nullable=True, index=True, comment="Route (e.g., SGN-HAN)"
@@ -80,6 +91,9 @@ class FlightRaw(Base):
     total_errors = Column(
         "TotalErrors", INT, nullable=True, comment="Total error count"
     )
+    import_batch_id = Column(
+        String(32), nullable=True, index=True, comment="Import batch of the file"
+    )
     created_at = Column(
         DateTime, default=func.sysdatetime(), nullable=False, comment="Thời gian tạo"
     )
@@ -93,6 +107,8 @@ class FlightRaw(Base):
         return {
             "id": self.id,
             "flightdate": self.flightdate,
+            "flight_date": self.flight_date,
+            "flight_date_status": self.flight_date_status,
             "flightno": self.flightno,
             "route": self.route,
             "actype": self.actype,
@@ -112,5 +128,6 @@ class FlightRaw(Base):
             "is_invalid_actype_seat": self.is_invalid_actype_seat,
             "error_reason": self.error_reason,
             "total_errors": self.total_errors,
+            "import_batch_id": self.import_batch_id,
             "created_at": self.created_at,
         }
@@ -0,0 +1,97 @@
+import json
+
+from sqlalchemy import Column, Integer, String, DateTime, UnicodeText
+from sqlalchemy.sql import func
+
+from backend.db.database import Base
+
+
+class ImportJob(Base):
+    """
+    Model cho Import Job - Theo dõi các job import/làm sạch chạy nền
+
+    Lưu trạng thái từng stage để job vẫn tra cứu được sau khi server khởi động lại
+
+    Attributes:
+        id: ID của job (UUID dạng hex)
+        job_type: Loại job (upload, complete-workflow)
+        status: Trạng thái job (queued, running, completed, failed)
+        file_count: Số file được gửi lên
+        file_names: Tên các file theo thứ tự upload (JSON)
+        work_dir: Thư mục chứa các file chờ xử lý
+        stages: Trạng thái, số dòng và thời gian của từng stage (JSON)
+        result: Kết quả của job khi hoàn thành (JSON)
+        error: Mô tả lỗi nếu job thất bại
+        created_at: Thời gian tạo job
+        started_at: Thời gian worker bắt đầu chạy job
+        finished_at: Thời gian job kết thúc
+        owner: Process đang chạy job (host:pid:id)
+        heartbeat_at: Lần cuối process chạy job báo còn sống
+        import_batch_id: Import batch của các file job đã import
+        raw_committed_at: Thời gian commit flight_raw / import_log của job (chạy lại job
+            thì tiếp tục từ bước làm sạch)
+    """
+
+    __tablename__ = "import_job"
+
+    id = Column(String(32), primary_key=True, comment="Job id (UUID hex)")
+    job_type = Column(
+        String(50), nullable=False, comment="Type of job (upload, complete-workflow)"
+    )
+    status = Column(
+        String(20),
+        default="queued",
+        nullable=False,
+        index=True,
+        comment="Job status (queued, running, completed, failed)",
+    )
+    file_count = Column(Integer, nullable=True, comment="Number of submitted files")
+    file_names = Column(
+        UnicodeText, nullable=True, comment="Submitted file names in upload order (JSON)"
+    )
+    work_dir = Column(
+        String(500), nullable=True, comment="Directory holding the submitted files"
+    )
+    stages = Column(UnicodeText, nullable=True, comment="Per-stage status (JSON)")
+    result = Column(UnicodeText, nullable=True, comment="Job result (JSON)")
+    error = Column(UnicodeText, nullable=True, comment="Error message")
+    created_at = Column(
+        DateTime,
+        default=func.sysdatetime(),
+        nullable=False,
+        index=True,
+        comment="Thời gian tạo",
+    )
+    started_at = Column(DateTime, nullable=True, comment="Job start time")
+    finished_at = Column(DateTime, nullable=True, comment="Job finish time")
+    owner = Column(String(100), nullable=True, comment="Process running the job")
+    heartbeat_at = Column(
+        DateTime, nullable=True, comment="Last heartbeat of the process running the job"
+    )
+    import_batch_id = Column(
+        String(32), nullable=True, comment="Import batch of the job's files"
+    )
+    raw_committed_at = Column(
+        DateTime, nullable=True, comment="Time the job's raw data was committed"
+    )
+
+    def __repr__(self):
+        """Represent the ImportJob model as a string"""
+        return f"<ImportJob(id='{self.id}', job_type='{self.job_type}', status='{self.status}')>"
+
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            "id": self.id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "file_count": self.file_count,
+            "file_names": json.loads(self.file_names) if self.file_names else [],
+            "stages": json.loads(self.stages) if self.stages else [],
+            "result": json.loads(self.result) if self.result else None,
+            "import_batch_id": self.import_batch_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
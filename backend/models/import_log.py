@@ -18,6 +18,8 @@ class ImportLog(Base):
         status: Trạng thái import
         row_count: Số dòng được import
         clean_data: Cờ cho dữ liệu đã được làm sạch
+        file_hash: SHA-256 của nội dung file
+        import_batch_id: Import batch (mỗi lần upload / batch import)
         created_at: Thời gian tạo bản ghi
     """
 
@@ -42,6 +44,12 @@ class ImportLog(Base):
     )
     row_count = Column(Integer, nullable=True, comment="Number of rows imported")
     clean_data = Column(Integer, nullable=True, comment="Flag for cleaned data")
+    file_hash = Column(
+        String(64), nullable=True, index=True, comment="SHA-256 of file content"
+    )
+    import_batch_id = Column(
+        String(32), nullable=True, index=True, comment="Import batch (one per upload / batch import run)"
+    )
     created_at = Column(
         DateTime, default=func.sysdatetime(), nullable=False, comment="Thời gian tạo"
     )
@@ -60,5 +68,7 @@ class ImportLog(Base):
             "status": self.status,
             "row_count": self.row_count,
             "clean_data": self.clean_data,
+            "file_hash": self.file_hash,
+            "import_batch_id": self.import_batch_id,
             "created_at": self.created_at,
         }
@@ -15,6 +15,7 @@ class MissingDimensionsLog(Base):
         type: Loại dữ liệu bị thiếu (ACTYPE/ROUTE)
         value: Giá trị bị thiếu
         source_sheet: Source sheet nơi tìm thấy dữ liệu bị thiếu
+        count: Số dòng error_table đang thiếu giá trị này
         created_at_log: Khi dữ liệu bị thiếu được ghi lại
         created_at: Thời gian tạo bản ghi
     """
@@ -38,6 +39,13 @@ class MissingDimensionsLog(Base):
         nullable=True,
         comment="Source sheet where missing data found",
     )
+    count = Column(
+        "Count",
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Number of error_table rows with this missing value",
+    )
     created_at_log = Column(
         "CreatedAt",
         DateTime,
@@ -60,6 +68,7 @@ class MissingDimensionsLog(Base):
             "type": self.type,
             "value": self.value,
             "source_sheet": self.source_sheet,
+            "count": self.count,
             "created_at_log": self.created_at_log,
             "created_at": self.created_at,
         }
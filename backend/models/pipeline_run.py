@@ -0,0 +1,79 @@
+import json
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, UnicodeText
+from sqlalchemy.sql import func
+
+from backend.db.database import Base
+
+
+class PipelineRun(Base):
+    """
+    Model cho Pipeline Run - Lịch sử các lần chạy pipeline import / làm sạch dữ liệu
+
+    Lưu thời gian, số dòng vào/ra và số lần gọi database của từng stage để so sánh
+    giữa các lần chạy
+
+    Attributes:
+        id: ID của lần chạy (UUID dạng hex)
+        run_type: Loại lần chạy (upload-files, complete-workflow, run-data-cleaning, ...)
+        status: Trạng thái (completed, failed)
+        job_id: ID của import job (nếu chạy nền)
+        import_batch_id: Import batch của lần chạy (nếu có import)
+        file_count: Số file được xử lý
+        seconds: Tổng thời gian chạy (giây)
+        db_round_trips: Tổng số lần gọi database
+        stages: Thời gian, số dòng vào/ra, số lần gọi database từng stage (JSON)
+        error: Mô tả lỗi nếu thất bại
+        started_at: Thời gian bắt đầu
+        finished_at: Thời gian kết thúc
+        created_at: Thời gian tạo bản ghi
+    """
+
+    __tablename__ = "pipeline_run"
+
+    id = Column(String(32), primary_key=True, comment="Run id (UUID hex)")
+    run_type = Column(
+        String(50), nullable=False, index=True, comment="Type of run (route / job type)"
+    )
+    status = Column(
+        String(20), nullable=False, comment="Run status (completed, failed)"
+    )
+    job_id = Column(String(32), nullable=True, comment="Import job id")
+    import_batch_id = Column(String(32), nullable=True, comment="Import batch id")
+    file_count = Column(Integer, nullable=True, comment="Number of processed files")
+    seconds = Column(Float, nullable=True, comment="Wall time (seconds)")
+    db_round_trips = Column(
+        Integer, nullable=True, comment="Number of database round trips"
+    )
+    stages = Column(
+        UnicodeText, nullable=True, comment="Per-stage timings, rows and round trips (JSON)"
+    )
+    error = Column(UnicodeText, nullable=True, comment="Error message")
+    started_at = Column(
+        DateTime, nullable=False, index=True, comment="Run start time"
+    )
+    finished_at = Column(DateTime, nullable=True, comment="Run finish time")
+    created_at = Column(
+        DateTime, default=func.sysdatetime(), nullable=False, comment="Thời gian tạo"
+    )
+
+    def __repr__(self):
+        """Represent the PipelineRun model as a string"""
+        return f"<PipelineRun(id='{self.id}', run_type='{self.run_type}', status='{self.status}')>"
+
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            "id": self.id,
+            "run_type": self.run_type,
+            "status": self.status,
+            "job_id": self.job_id,
+            "import_batch_id": self.import_batch_id,
+            "file_count": self.file_count,
+            "seconds": self.seconds,
+            "db_round_trips": self.db_round_trips,
+            "stages": json.loads(self.stages) if self.stages else [],
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
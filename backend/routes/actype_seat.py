@@ -13,13 +13,19 @@ from backend.schema.actype_seat import (
     ActypeSeatBulkCreate,
     ActypeSeatBulkCreateResponse,
 )
+from backend.services.flight_export_fact import refresh_flight_export_after_change
 
 
-router = APIRouter(prefix="/actype-seats", tags=["actype-seats"])
+# Thay đổi dữ liệu reference làm mới bảng export flight_export_fact
+router = APIRouter(
+    prefix="/actype-seats",
+    tags=["actype-seats"],
+    dependencies=[Depends(refresh_flight_export_after_change)],
+)
 
 
 @router.get("/", response_model=List[ActypeSeatResponse])
-async def get_all_actype_seats(
+def get_all_actype_seats(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -41,7 +47,7 @@ async def get_all_actype_seats(
 
 
 @router.get("/{actype}", response_model=ActypeSeatResponse)
-async def get_actype_seat(actype: str, db: Session = Depends(get_db)):
+def get_actype_seat(actype: str, db: Session = Depends(get_db)):
     """
     Lấy thông tin cấu hình ghế theo loại máy bay
     """
@@ -69,7 +75,7 @@ async def get_actype_seat(actype: str, db: Session = Depends(get_db)):
 @router.post(
     "/", response_model=ActypeSeatResponse, status_code=status.HTTP_201_CREATED
 )
-async def create_actype_seat(
+def create_actype_seat(
     actype_seat: ActypeSeatCreate, db: Session = Depends(get_db)
 ):
     """
@@ -116,7 +122,7 @@ async def create_actype_seat(
     response_model=ActypeSeatBulkCreateResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_actype_seats_bulk(
+def create_actype_seats_bulk(
     actype_seat_bulk: ActypeSeatBulkCreate, db: Session = Depends(get_db)
 ):
     """
@@ -186,7 +192,7 @@ async def create_actype_seats_bulk(
 
 
 @router.put("/{actype}", response_model=ActypeSeatResponse)
-async def update_actype_seat(
+def update_actype_seat(
     actype: str, actype_seat_update: ActypeSeatUpdate, db: Session = Depends(get_db)
 ):
     """
@@ -224,7 +230,7 @@ async def update_actype_seat(
 
 
 @router.delete("/{actype}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_actype_seat(actype: str, db: Session = Depends(get_db)):
+def delete_actype_seat(actype: str, db: Session = Depends(get_db)):
     """
     Xóa cấu hình ghế cho loại máy bay
     """
@@ -256,7 +262,7 @@ async def delete_actype_seat(actype: str, db: Session = Depends(get_db)):
 
 
 @router.get("/search/", response_model=List[ActypeSeatResponse])
-async def search_actype_seats(
+def search_actype_seats(
     q: str = None,
     min_seat: int = None,
     max_seat: int = None,
@@ -290,7 +296,7 @@ async def search_actype_seats(
 
 
 @router.get("/stats/summary", response_model=dict)
-async def get_actype_seat_stats(db: Session = Depends(get_db)):
+def get_actype_seat_stats(db: Session = Depends(get_db)):
     """
     Thống kê tổng quan về cấu hình ghế
     """
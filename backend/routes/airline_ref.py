@@ -12,12 +12,18 @@ from backend.schema.airline_ref import (
     AirlineRefBulkCreate,
     AirlineRefBulkCreateResponse,
 )
+from backend.services.flight_export_fact import refresh_flight_export_after_change
 
-router = APIRouter(prefix="/airlines", tags=["airlines"])
+# Thay đổi dữ liệu reference làm mới bảng export flight_export_fact
+router = APIRouter(
+    prefix="/airlines",
+    tags=["airlines"],
+    dependencies=[Depends(refresh_flight_export_after_change)],
+)
 
 
 @router.get("/", response_model=List[AirlineRefResponse])
-async def get_all_airline_refs(
+def get_all_airline_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -40,7 +46,7 @@ async def get_all_airline_refs(
 
 
 @router.post("/", response_model=AirlineRefResponse)
-async def create_airline_ref(
+def create_airline_ref(
     airline_ref: AirlineRefCreate, db: Session = Depends(get_db)
 ):
     """
@@ -61,7 +67,7 @@ async def create_airline_ref(
 
 
 @router.post("/bulk-create", response_model=AirlineRefBulkCreateResponse)
-async def create_airline_refs_bulk(
+def create_airline_refs_bulk(
     airline_refs: AirlineRefBulkCreate, db: Session = Depends(get_db)
 ):
     """
@@ -125,7 +131,7 @@ async def create_airline_refs_bulk(
 
 
 @router.put("/{airline_id}", response_model=AirlineRefResponse)
-async def update_airline_ref(
+def update_airline_ref(
     airline_id: int, airline_ref_update: AirlineRefUpdate, db: Session = Depends(get_db)
 ):
     """
@@ -161,7 +167,7 @@ async def update_airline_ref(
 
 
 @router.delete("/{airline_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_airline_ref(airline_id: int, db: Session = Depends(get_db)):
+def delete_airline_ref(airline_id: int, db: Session = Depends(get_db)):
     """
     Xóa hãng hàng không
     """
@@ -192,7 +198,7 @@ async def delete_airline_ref(airline_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/", response_model=List[AirlineRefResponse])
-async def search_airline_refs(q: str = None, db: Session = Depends(get_db)):
+def search_airline_refs(q: str = None, db: Session = Depends(get_db)):
     """
     Tìm kiếm hãng hàng không
     """
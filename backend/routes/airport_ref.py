@@ -12,12 +12,18 @@ from backend.schema.airport_ref import (
     AirportRefBulkCreate,
     AirportRefBulkCreateResponse,
 )
+from backend.services.flight_export_fact import refresh_flight_export_after_change
 
-router = APIRouter(prefix="/airports", tags=["airports"])
+# Thay đổi dữ liệu reference làm mới bảng export flight_export_fact
+router = APIRouter(
+    prefix="/airports",
+    tags=["airports"],
+    dependencies=[Depends(refresh_flight_export_after_change)],
+)
 
 
 @router.get("/", response_model=List[AirportRefResponse])
-async def get_all_airport_refs(
+def get_all_airport_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -40,7 +46,7 @@ async def get_all_airport_refs(
 
 
 @router.post("/", response_model=AirportRefResponse)
-async def create_airport_ref(
+def create_airport_ref(
     airport_ref: AirportRefCreate, db: Session = Depends(get_db)
 ):
     """
@@ -61,7 +67,7 @@ async def create_airport_ref(
 
 
 @router.post("/bulk-create", response_model=AirportRefBulkCreateResponse)
-async def create_airport_refs_bulk(
+def create_airport_refs_bulk(
     airport_refs: AirportRefBulkCreate, db: Session = Depends(get_db)
 ):
     """
@@ -125,7 +131,7 @@ async def create_airport_refs_bulk(
 
 
 @router.put("/{airport_id}", response_model=AirportRefResponse)
-async def update_airport_ref(
+def update_airport_ref(
     airport_id: int, airport_ref_update: AirportRefUpdate, db: Session = Depends(get_db)
 ):
     """
@@ -161,7 +167,7 @@ async def update_airport_ref(
 
 
 @router.delete("/{airport_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_airport_ref(airport_id: int, db: Session = Depends(get_db)):
+def delete_airport_ref(airport_id: int, db: Session = Depends(get_db)):
     """
     Xóa sân bay
     """
@@ -190,7 +196,7 @@ async def delete_airport_ref(airport_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/", response_model=List[AirportRefResponse])
-async def search_airport_refs(q: str = None, db: Session = Depends(get_db)):
+def search_airport_refs(q: str = None, db: Session = Depends(get_db)):
     """
     Tìm kiếm sân bay
     """
@@ -12,13 +12,19 @@ from backend.schema.country_ref import (
     CountryRefBulkCreate,
     CountryRefBulkCreateResponse,
 )
+from backend.services.flight_export_fact import refresh_flight_export_after_change
 
 
-router = APIRouter(prefix="/countries", tags=["countries"])
+# Thay đổi dữ liệu reference làm mới bảng export flight_export_fact
+router = APIRouter(
+    prefix="/countries",
+    tags=["countries"],
+    dependencies=[Depends(refresh_flight_export_after_change)],
+)
 
 
 @router.get("/", response_model=List[CountryRefResponse])
-async def get_all_country_refs(
+def get_all_country_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -41,7 +47,7 @@ async def get_all_country_refs(
 
 
 @router.post("/", response_model=CountryRefResponse)
-async def create_country_ref(
+def create_country_ref(
     country_ref: CountryRefCreate, db: Session = Depends(get_db)
 ):
     """
@@ -66,7 +72,7 @@ async def create_country_ref(
     response_model=CountryRefBulkCreateResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_country_refs_bulk(
+def create_country_refs_bulk(
     country_refs: CountryRefBulkCreate, db: Session = Depends(get_db)
 ):
     """
@@ -130,7 +136,7 @@ async def create_country_refs_bulk(
 
 
 @router.put("/{country_id}", response_model=CountryRefResponse)
-async def update_country_ref(
+def update_country_ref(
     country_id: int, country_ref_update: CountryRefUpdate, db: Session = Depends(get_db)
 ):
     """
@@ -166,7 +172,7 @@ async def update_country_ref(
 
 
 @router.delete("/{country_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_country_ref(country_id: int, db: Session = Depends(get_db)):
+def delete_country_ref(country_id: int, db: Session = Depends(get_db)):
     """
     Xóa quốc gia
     """
@@ -195,7 +201,7 @@ async def delete_country_ref(country_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/search/", response_model=List[CountryRefResponse])
-async def search_country_refs(q: str = None, db: Session = Depends(get_db)):
+def search_country_refs(q: str = None, db: Session = Depends(get_db)):
     """
     Tìm kiếm quốc gia
     """
@@ -1,10 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime, timedelta
 import logging
+import shutil
 
-from backend.db.database import get_db
+from backend.core.config import settings
+from backend.db.database import SessionLocal, get_db
 from backend.services.excel_batch_processor import ExcelBatchProcessor
+from backend.services.flight_export import (
+    EXPORT_FORMATS,
+    FLIGHT_EXPORT_XLSX_HEADER,
+    FLIGHT_EXPORT_XLSX_SHEET,
+    execute_flight_export,
+    fetch_flight_export_page,
+    iter_flight_export_csv,
+    iter_flight_export_ndjson,
+    iter_flight_export_xlsx_rows,
+    parse_export_range,
+    row_to_export_dict,
+)
+from backend.services.flight_export_fact import refresh_flight_export_fact
+from backend.services.xlsx_export import (
+    new_xlsx_path,
+    remove_file,
+    write_xlsx,
+    xlsx_file_response,
+)
+from backend.services.pipeline_runs import get_pipeline_runs, record_pipeline_run
+from backend.services.summary_cache import processing_summary_cache
+from backend.services.import_jobs import (
+    JOB_TYPES,
+    build_workflow_summary,
+    job_queue,
+    new_upload_results,
+    save_uploaded_files,
+)
 from backend.schema.flight_data import (
     ExcelProcessRequest,
     ExcelProcessResponse,
@@ -12,15 +44,20 @@ from backend.schema.flight_data import (
     MissingDimensionResponse,
     DataProcessingStats,
 )
+from backend.schema.import_job import ImportJobResponse, ImportJobSubmitResponse
 from backend.models.flight_raw import FlightRaw
+from backend.models.import_job import ImportJob
 from backend.models.missing_dimensions_log import MissingDimensionsLog
 
 
+logger = logging.getLogger(__name__)
+
+
 router = APIRouter(prefix="/data-processing", tags=["data-processing"])
 
 
 @router.post("/process-excel", response_model=ExcelProcessResponse)
-async def process_excel_data(
+def process_excel_data(
     request: ExcelProcessRequest, db: Session = Depends(get_db)
 ):
     """
@@ -65,6 +102,7 @@ async def process_excel_data(
                 processor.run_data_cleaning_stored_procedure()
 
                 db.commit()
+                processing_summary_cache.invalidate()
 
                 return ExcelProcessResponse(
                     success=True,
@@ -80,7 +118,7 @@ async def process_excel_data(
 
     except Exception as e:
         db.rollback()
-        logging.error(f"Error processing Excel data: {e}")
+        logger.error("Error processing Excel data: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi xử lý dữ liệu: {str(e)}",
@@ -88,7 +126,7 @@ async def process_excel_data(
 
 
 @router.get("/flight-data", response_model=List[FlightRawResponse])
-async def get_flight_data(
+def get_flight_data(
     skip: int = 0,
     limit: int = 100,
     route: Optional[str] = None,
@@ -111,7 +149,7 @@ async def get_flight_data(
 
 
 @router.get("/missing-dimensions", response_model=List[MissingDimensionResponse])
-async def get_missing_dimensions(
+def get_missing_dimensions(
     dimension_type: Optional[str] = None, db: Session = Depends(get_db)
 ):
     """
@@ -127,7 +165,7 @@ async def get_missing_dimensions(
 
 
 @router.get("/stats", response_model=DataProcessingStats)
-async def get_processing_stats(db: Session = Depends(get_db)):
+def get_processing_stats(db: Session = Depends(get_db)):
     """
     Lấy thống kê xử lý dữ liệu
     """
@@ -147,7 +185,7 @@ async def get_processing_stats(db: Session = Depends(get_db)):
         return DataProcessingStats(**stats)
 
     except Exception as e:
-        logging.error(f"Error getting processing stats: {e}")
+        logger.error("Error getting processing stats: %s", e)
         # Return empty stats if error
         return DataProcessingStats(
             total_flights=0,
@@ -159,18 +197,21 @@ async def get_processing_stats(db: Session = Depends(get_db)):
 
 
 @router.post("/run-stored-procedure")
-async def run_stored_procedure(db: Session = Depends(get_db)):
+def run_stored_procedure(db: Session = Depends(get_db)):
     """
     Chạy stored procedure để xử lý dữ liệu
     """
     try:
         processor = ExcelBatchProcessor(db)
-        processor.run_data_cleaning_stored_procedure()
+
+        with record_pipeline_run("run-stored-procedure") as run:
+            with run.stage("clean"):
+                processor.run_data_cleaning_stored_procedure()
 
         return {"success": True, "message": "Đã chạy stored procedure thành công"}
 
     except Exception as e:
-        logging.error(f"Error running stored procedure: {e}")
+        logger.error("Error running stored procedure: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi chạy stored procedure: {str(e)}",
@@ -178,7 +219,7 @@ async def run_stored_procedure(db: Session = Depends(get_db)):
 
 
 @router.delete("/flight-data")
-async def clear_flight_data(db: Session = Depends(get_db)):
+def clear_flight_data(db: Session = Depends(get_db)):
     """
     Xóa tất cả dữ liệu flight raw (chỉ dùng cho development)
     """
@@ -191,16 +232,20 @@ async def clear_flight_data(db: Session = Depends(get_db)):
 
         db.execute(text("DELETE FROM import_log"))
 
+        # Delete enriched export rows
+        db.execute(text("DELETE FROM flight_export_fact"))
+
         # Delete missing dimensions log
         db.query(MissingDimensionsLog).delete()
 
         db.commit()
+        processing_summary_cache.invalidate()
 
         return {"success": True, "message": "Đã xóa tất cả dữ liệu"}
 
     except Exception as e:
         db.rollback()
-        logging.error(f"Error clearing data: {e}")
+        logger.error("Error clearing data: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi xóa dữ liệu: {str(e)}",
@@ -208,7 +253,7 @@ async def clear_flight_data(db: Session = Depends(get_db)):
 
 
 @router.post("/import-missing-dimensions")
-async def import_missing_dimensions_data(db: Session = Depends(get_db)):
+def import_missing_dimensions_data(db: Session = Depends(get_db)):
     """
     Chạy stored procedure để import missing dimensions data từ temp tables
     Theo logic từ notebook để xử lý aircraft types và routes thiếu
@@ -216,25 +261,35 @@ async def import_missing_dimensions_data(db: Session = Depends(get_db)):
     try:
         from sqlalchemy import text
 
-        print("🔧 Bắt đầu import missing dimensions data...")
+        logger.info("🔧 Bắt đầu import missing dimensions data...")
 
         processor = ExcelBatchProcessor(db)
 
-        # Get missing dimensions before import
-        before_summary = processor.get_processing_summary()
-        print(
-            f"📊 Trước import: {before_summary['missing_actypes']} actypes thiếu, {before_summary['missing_routes']} routes thiếu"
-        )
-
-        # Run the stored procedure to import and update missing dimensions
-        print("⚙️ Chạy stored procedure: usp_ImportAndUpdateMissingDimensions")
-        db.execute(text("EXEC usp_ImportAndUpdateMissingDimensions"))
-        db.commit()
+        with record_pipeline_run("import-missing-dimensions") as run:
+            # Get missing dimensions before import
+            with run.stage("summary_before"):
+                before_summary = processor.get_processing_summary(use_cache=False)
+            logger.info(
+                "📊 Trước import: %s actypes thiếu, %s routes thiếu",
+                before_summary["missing_actypes"],
+                before_summary["missing_routes"],
+            )
 
-        # Get summary after import
-        after_summary = processor.get_processing_summary()
-        print(
-            f"📊 Sau import: {after_summary['missing_actypes']} actypes thiếu, {after_summary['missing_routes']} routes thiếu"
+            # Run the stored procedure to import and update missing dimensions
+            logger.info("⚙️ Chạy stored procedure: usp_ImportAndUpdateMissingDimensions")
+            with run.stage("import_missing_dimensions"):
+                db.execute(text("EXEC usp_ImportAndUpdateMissingDimensions"))
+                refresh_flight_export_fact(db)
+                db.commit()
+                processing_summary_cache.invalidate()
+
+            # Get summary after import
+            with run.stage("summary_after"):
+                after_summary = processor.get_processing_summary(use_cache=False)
+        logger.info(
+            "📊 Sau import: %s actypes thiếu, %s routes thiếu",
+            after_summary["missing_actypes"],
+            after_summary["missing_routes"],
         )
 
         # Calculate what was imported
@@ -262,8 +317,7 @@ async def import_missing_dimensions_data(db: Session = Depends(get_db)):
     except Exception as e:
         db.rollback()
         error_msg = f"Lỗi import missing dimensions: {str(e)}"
-        print(f"❌ {error_msg}")
-        logging.error(error_msg)
+        logger.error("❌ %s", error_msg)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=error_msg,
@@ -271,7 +325,7 @@ async def import_missing_dimensions_data(db: Session = Depends(get_db)):
 
 
 @router.post("/batch-import-excel")
-async def batch_import_excel_files(
+def batch_import_excel_files(
     data_folder: str, destination_folder: str, db: Session = Depends(get_db)
 ):
     """
@@ -280,12 +334,19 @@ async def batch_import_excel_files(
     try:
         processor = ExcelBatchProcessor(db)
 
-        # Batch import files
-        results = processor.batch_import_files(data_folder, destination_folder)
+        with record_pipeline_run("batch-import-excel") as run:
+            # Batch import files
+            with run.stage("parse_load") as stage:
+                results = processor.batch_import_files(data_folder, destination_folder)
+                stage["rows"] = results["total_rows"]
+
+            if results["processed_files"] > 0:
+                # Run data cleaning stored procedure
+                with run.stage("clean"):
+                    processor.run_data_cleaning_stored_procedure()
 
-        if results["processed_files"] > 0:
-            # Run data cleaning stored procedure
-            processor.run_data_cleaning_stored_procedure()
+            run.import_batch_id = processor.import_batch_id
+            run.file_count = results["processed_files"]
 
         return {
             "success": True,
@@ -298,7 +359,7 @@ async def batch_import_excel_files(
         }
 
     except Exception as e:
-        logging.error(f"Error in batch import: {e}")
+        logger.error("Error in batch import: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi batch import: {str(e)}",
@@ -306,18 +367,21 @@ async def batch_import_excel_files(
 
 
 @router.post("/run-data-cleaning")
-async def run_data_cleaning(db: Session = Depends(get_db)):
+def run_data_cleaning(db: Session = Depends(get_db)):
     """
     Chạy stored procedure để làm sạch và xử lý dữ liệu flight
     """
     try:
         processor = ExcelBatchProcessor(db)
-        processor.run_data_cleaning_stored_procedure()
+
+        with record_pipeline_run("run-data-cleaning") as run:
+            with run.stage("clean"):
+                processor.run_data_cleaning_stored_procedure()
 
         return {"success": True, "message": "Đã chạy data cleaning thành công"}
 
     except Exception as e:
-        logging.error(f"Error running data cleaning: {e}")
+        logger.error("Error running data cleaning: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi chạy data cleaning: {str(e)}",
@@ -325,29 +389,65 @@ async def run_data_cleaning(db: Session = Depends(get_db)):
 
 
 @router.post("/revalidate-error-data")
-async def revalidate_error_data(db: Session = Depends(get_db)):
+def revalidate_error_data(full_sweep: bool = False, db: Session = Depends(get_db)):
     """
     Chạy stored procedure để revalidate error data
+
+    Mặc định chỉ kiểm tra lại các dòng lỗi có route / actype vừa được thêm hoặc sửa,
+    full_sweep=true để kiểm tra lại toàn bộ error_table
     """
     try:
-        from sqlalchemy import text
+        processor = ExcelBatchProcessor(db)
 
-        db.execute(text("EXEC usp_RevalidateErrorData"))
-        db.commit()
+        with record_pipeline_run("revalidate-error-data") as run:
+            with run.stage("validate"):
+                processor.run_validation_stored_procedure(full_sweep=full_sweep)
 
-        return {"success": True, "message": "Đã revalidate error data thành công"}
+        return {
+            "success": True,
+            "message": "Đã revalidate error data thành công",
+            "full_sweep": full_sweep,
+        }
 
     except Exception as e:
-        db.rollback()
-        logging.error(f"Error revalidating error data: {e}")
+        logger.error("Error revalidating error data: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi revalidate error data: {str(e)}",
         )
 
 
+@router.post("/refresh-flight-export")
+def refresh_flight_export(full_rebuild: bool = False, db: Session = Depends(get_db)):
+    """
+    Làm mới bảng flight_export_fact mà /export-flight-data đọc
+
+    Mặc định chỉ thêm các dòng flight_raw chưa có và tính lại các dòng tra cứu sân bay /
+    hãng bay / actype vừa đổi trong bảng reference, full_rebuild=true để dựng lại toàn bộ
+    """
+    try:
+        with record_pipeline_run("refresh-flight-export") as run:
+            with run.stage("refresh_export_fact"):
+                stats = refresh_flight_export_fact(db, full_rebuild=full_rebuild)
+                db.commit()
+
+        return {
+            "success": True,
+            "message": "Đã làm mới dữ liệu export thành công",
+            **stats,
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error("Error refreshing flight export data: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Lỗi làm mới dữ liệu export: {str(e)}",
+        )
+
+
 @router.get("/processing-summary")
-async def get_processing_summary(db: Session = Depends(get_db)):
+def get_processing_summary(db: Session = Depends(get_db)):
     """
     Lấy tóm tắt quá trình xử lý dữ liệu
     """
@@ -358,27 +458,41 @@ async def get_processing_summary(db: Session = Depends(get_db)):
         return {"success": True, "data": summary}
 
     except Exception as e:
-        logging.error(f"Error getting processing summary: {e}")
+        logger.error("Error getting processing summary: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi lấy processing summary: {str(e)}",
         )
 
 
+@router.get("/batches/{import_batch_id}/summary")
+def get_batch_summary(import_batch_id: str, db: Session = Depends(get_db)):
+    """
+    Lấy tóm tắt của một import batch (raw, clean, error, missing actype / route) kèm
+    chi tiết từng file
+    """
+    processor = ExcelBatchProcessor(db)
+    summary = processor.get_batch_summary(import_batch_id)
+
+    if not summary["imported_files"] and not summary["raw_records"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Không tìm thấy import batch {import_batch_id}",
+        )
+
+    return {"success": True, "data": summary}
+
+
 @router.post("/export-missing-dimensions")
-async def export_missing_dimensions_to_excel(db: Session = Depends(get_db)):
+def export_missing_dimensions_to_excel(db: Session = Depends(get_db)):
     """
     Xuất missing dimensions ra file Excel theo logic notebook
     Tạo file Add_information.xlsx với 3 sheets: Actype_seat, Route, Airline_Route_Details
     """
     try:
-        import pandas as pd
-        import tempfile
-        import os
-        from fastapi.responses import FileResponse
         from sqlalchemy import text
 
-        print("📤 Bắt đầu export missing dimensions...")
+        logger.info("📤 Bắt đầu export missing dimensions...")
 
         # Query 1: Actype_seat - missing actypes from error table
         query1 = """
@@ -449,45 +563,51 @@ async def export_missing_dimensions_to_excel(db: Session = Depends(get_db)):
         AND Value IS NOT NULL
         """
 
-        # Execute queries and create DataFrames
-        df1 = pd.read_sql(query1, db.bind)
-        df2 = pd.read_sql(query2, db.bind)
-        df3 = pd.read_sql(query3, db.bind)
+        # Stream each query into its own sheet (openpyxl write-only). Queries run one
+        # after another: the next one starts once the previous sheet is written
+        def missing_dimension_sheets():
+            for sheet_name, query in (
+                ("Actype_seat", query1),
+                ("Route", query2),
+                ("Airline_Route_Details", query3),
+            ):
+                result = db.execute(
+                    text(query),
+                    execution_options={"yield_per": settings.EXPORT_FETCH_SIZE},
+                )
+                try:
+                    yield sheet_name, list(result.keys()), result.partitions()
+                finally:
+                    result.close()
 
-        print(
-            f"📊 Export data: {len(df1)} actypes, {len(df2)} routes, {len(df3)} route details"
+        xlsx_path = new_xlsx_path()
+        try:
+            row_counts = write_xlsx(xlsx_path, missing_dimension_sheets())
+        except Exception:
+            remove_file(xlsx_path)
+            raise
+
+        logger.info(
+            "📊 Export data: %s actypes, %s routes, %s route details",
+            row_counts["Actype_seat"],
+            row_counts["Route"],
+            row_counts["Airline_Route_Details"],
         )
+        logger.info("✅ Đã tạo file Excel: Add_information.xlsx")
 
-        # Create temporary Excel file
-        with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as temp_file:
-            temp_path = temp_file.name
-
-            # Write to Excel with multiple sheets
-            with pd.ExcelWriter(temp_path, engine="openpyxl") as writer:
-                df1.to_excel(writer, sheet_name="Actype_seat", index=False)
-                df2.to_excel(writer, sheet_name="Route", index=False)
-                df3.to_excel(writer, sheet_name="Airline_Route_Details", index=False)
-
-        print(f"✅ Đã tạo file Excel: Add_information.xlsx")
-
-        # Return file response
-        return FileResponse(
-            path=temp_path,
-            filename="Add_information.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+        # Return file response, the temp file is removed once it has been sent
+        return xlsx_file_response(xlsx_path, "Add_information.xlsx")
 
     except Exception as e:
         error_msg = f"Lỗi export missing dimensions: {str(e)}"
-        print(f"❌ {error_msg}")
-        logging.error(error_msg)
+        logger.error("❌ %s", error_msg)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_msg
         )
 
 
 @router.post("/upload-files")
-async def upload_excel_files(
+def upload_excel_files(
     files: List[UploadFile] = File(...), db: Session = Depends(get_db)
 ):
     """
@@ -507,153 +627,54 @@ async def upload_excel_files(
 
     try:
         import tempfile
-        import os
 
         # All necessary functions
         processor = ExcelBatchProcessor(db)
 
-        results = {
-            "processed_files": 0,
-            "total_rows": 0,
-            "skipped_files": 0,
-            "errors": [],
-            "file_details": [],
-            "processing_summary": {},
-        }
-
-        print(f"📤 Bắt đầu upload và xử lý {len(files)} file Excel...")
-
-        # Create temp directory for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded files to temp directory
-            for file in files:
-                if not file.filename.lower().endswith((".xlsx", ".xls")):
-                    results["errors"].append(
-                        f"File {file.filename} không phải là Excel file"
-                    )
-                    continue
-
-                # Extract only filename from path (in case of folder upload)
-                filename_only = os.path.basename(file.filename)
-                file_path = os.path.join(temp_dir, filename_only)
-
-                # Save file
-                with open(file_path, "wb") as buffer:
-                    content = await file.read()
-                    buffer.write(content)
-
-                try:
-                    # Console log filename for debugging folder uploads
-                    print(f"📁 Processing file: {file.filename} -> {filename_only}")
-
-                    # Check if file already imported
-                    if processor.is_file_imported(filename_only):
-                        print(f"⏭️ File {filename_only} đã được import trước đó")
-                        results["skipped_files"] += 1
-                        continue
-
-                    print(f"🔄 Đang xử lý file: {filename_only}")
-
-                    # Determine file type first
-                    file_type = processor.find_matching_key(filename_only)
-                    if not file_type:
-                        results["errors"].append(
-                            f"Không thể xác định loại file: {filename_only}"
-                        )
-                        continue
-
-                    print(f"📁 Loại file: {file_type} - {filename_only}")
-
-                    # Process Excel file using notebook logic
-                    df = processor.process_excel_file(file_path, filename_only)
-
-                    if df.empty:
-                        results["errors"].append(
-                            f"Không có dữ liệu từ file {filename_only}"
-                        )
-                        continue
-
-                    row_count = len(df)
-                    print(f"📊 Extracted {row_count} rows từ {filename_only}")
-
-                    # Save to flight_raw table
-                    processor._save_to_database(df)
-
-                    # Mark file as imported with file type
-                    processor.mark_file_imported(filename_only, file_type, row_count)
-
-                    results["processed_files"] += 1
-                    results["total_rows"] += row_count
-                    results["file_details"].append(
-                        {
-                            "file_name": filename_only,
-                            "file_type": file_type,
-                            "rows": row_count,
-                        }
-                    )
-
-                    print(f"✅ Đã lưu {row_count} bản ghi từ file {filename_only}")
-
-                except Exception as e:
-                    error_msg = f"Lỗi xử lý file {filename_only}: {str(e)}"
-                    print(f"❌ {error_msg}")
-                    results["errors"].append(error_msg)
-
-            # Commit raw data first
-            db.commit()
-            print(f"💾 Đã commit {results['total_rows']} bản ghi raw data")
-
-            # Run data cleaning and processing if files were processed
-            if results["processed_files"] > 0:
-                print("🧹 Bắt đầu quá trình làm sạch và xử lý dữ liệu...")
-
-                try:
-                    # Step 1: Clean and process flight data
-                    print("1️⃣ Chạy stored procedure: usp_CleanAndProcessFlightData")
-                    processor.run_data_cleaning_stored_procedure()
+        results = new_upload_results()
 
-                    # Step 2: Validate and move error data
-                    print("2️⃣ Chạy stored procedure: usp_CleanAndValidateFlightData")
-                    from sqlalchemy import text
+        logger.info("📤 Bắt đầu upload và xử lý %s file Excel...", len(files))
 
-                    db.execute(text("EXEC usp_CleanAndValidateFlightData"))
-                    db.commit()
-
-                    # Get processing summary for CURRENT BATCH only
-                    # Extract file names from file_details
-                    processed_file_names = [
-                        detail["file_name"] for detail in results["file_details"]
-                    ]
-                    results["processing_summary"] = processor.get_current_session_summary(
-                        processed_file_names
+        with record_pipeline_run("upload-files") as run:
+            # Create temp directory for processing
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Stream files to disk, hashing them on the fly
+                with run.stage("save_uploads") as stage:
+                    stage["rows_in"] = len(files)
+                    uploaded_files, file_hashes = save_uploaded_files(
+                        files, temp_dir, results
                     )
+                    stage["rows"] = len(uploaded_files)
 
-                    print("✅ Hoàn thành quá trình làm sạch và xử lý dữ liệu")
+                # Parse, load, mark imported and run the cleaning stored procedures
+                processor.process_uploaded_files(
+                    uploaded_files, results, run.tracker, file_hashes=file_hashes
+                )
 
-                except Exception as sp_error:
-                    print(f"⚠️ Lỗi khi chạy stored procedures: {sp_error}")
-                    results["errors"].append(f"Lỗi stored procedure: {str(sp_error)}")
+            run.import_batch_id = processor.import_batch_id
+            run.file_count = results["processed_files"]
 
         success_message = f"Đã xử lý thành công {results['processed_files']} file với tổng {results['total_rows']} bản ghi"
         if results["skipped_files"] > 0:
             success_message += f" (bỏ qua {results['skipped_files']} file đã import)"
 
-        print(f"🎉 {success_message}")
+        logger.info("🎉 %s", success_message)
 
         return {"success": True, "message": success_message, **results}
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         error_msg = f"Lỗi upload files: {str(e)}"
-        print(f"💥 {error_msg}")
-        logging.error(error_msg)
+        logger.error("💥 %s", error_msg)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_msg
         )
 
 
 @router.post("/complete-workflow")
-async def complete_data_processing_workflow(
+def complete_data_processing_workflow(
     files: List[UploadFile] = File(...), db: Session = Depends(get_db)
 ):
     """
@@ -665,88 +686,167 @@ async def complete_data_processing_workflow(
     5. Trả về summary và file Excel cho missing data
     """
     try:
-        print("🚀 Bắt đầu complete workflow xử lý dữ liệu Excel...")
+        logger.info("🚀 Bắt đầu complete workflow xử lý dữ liệu Excel...")
 
-        # Step 1: Upload and process Excel files
-        upload_result = await upload_excel_files(files, db)
+        with record_pipeline_run("complete-workflow") as run:
+            # Step 1: Upload and process Excel files
+            upload_result = upload_excel_files(files, db)
 
-        if not upload_result["success"]:
-            return upload_result
+            if not upload_result["success"]:
+                return upload_result
 
-        print(f"✅ Step 1 hoàn thành: Upload {upload_result['processed_files']} files")
+            logger.info(
+                "✅ Step 1 hoàn thành: Upload %s files", upload_result["processed_files"]
+            )
 
-        # Step 2: Get processing summary from upload result (already contains current batch summary)
-        summary_after_processing = upload_result.get("processing_summary", {})
+            # Step 2-3: Summary of current batch, missing dimensions and next steps
+            with run.stage("workflow_summary"):
+                final_summary = build_workflow_summary(upload_result)
 
-        print(f"📊 Step 2: Summary sau xử lý - {summary_after_processing}")
+        logger.info("🎉 Complete workflow hoàn thành!")
 
-        # Step 3: If there are missing dimensions, prepare export data
-        missing_data_info = None
-        if (
-            summary_after_processing["missing_actypes"] > 0
-            or summary_after_processing["missing_routes"] > 0
-        ):
-            print(
-                f"⚠️ Phát hiện missing dimensions: {summary_after_processing['missing_actypes']} actypes, {summary_after_processing['missing_routes']} routes"
-            )
+        return {
+            "success": True,
+            "message": "Complete workflow đã hoàn thành thành công",
+            "data": final_summary,
+        }
 
-            # Create export data info (without actually creating file here)
-            missing_data_info = {
-                "missing_actypes": summary_after_processing["missing_actypes"],
-                "missing_routes": summary_after_processing["missing_routes"],
-                "export_available": True,
-                "message": "Có dữ liệu thiếu cần bổ sung. Sử dụng endpoint /export-missing-dimensions để tải file Excel.",
-            }
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = f"Lỗi complete workflow: {str(e)}"
+        logger.error("💥 %s", error_msg)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_msg
+        )
 
-        # Final summary
-        final_summary = {
-            "workflow_completed": True,
-            "files_processed": upload_result["processed_files"],
-            "total_rows": upload_result["total_rows"],
-            "processing_summary": summary_after_processing,
-            "missing_data_info": missing_data_info,
-            "next_steps": [],
-        }
 
-        # Add next steps recommendations
-        if missing_data_info:
-            final_summary["next_steps"].append(
-                "1. Tải file missing dimensions bằng endpoint /export-missing-dimensions"
-            )
-            final_summary["next_steps"].append("2. Điền thông tin thiếu vào file Excel")
-            final_summary["next_steps"].append("3. Upload file đã điền vào temp tables")
-            final_summary["next_steps"].append(
-                "4. Chạy endpoint /import-missing-dimensions để cập nhật"
-            )
-            final_summary["next_steps"].append(
-                "5. Chạy lại /revalidate-error-data để xử lý lại errors"
-            )
-        else:
-            final_summary["next_steps"].append(
-                "✅ Không có dữ liệu thiếu, workflow hoàn tất!"
-            )
+@router.post(
+    "/jobs",
+    response_model=ImportJobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def submit_import_job(
+    files: List[UploadFile] = File(...),
+    job_type: str = "upload",
+    db: Session = Depends(get_db),
+):
+    """
+    Gửi file Excel để import và làm sạch dữ liệu trong nền, trả về job id ngay
 
-        print("🎉 Complete workflow hoàn thành!")
+    Job chạy cùng pipeline với /upload-files (job_type=upload) hoặc /complete-workflow
+    (job_type=complete-workflow). Theo dõi tiến độ bằng GET /jobs/{job_id}.
+
+    Args:
+        files (List[UploadFile]): Danh sách file Excel
+        job_type (str): Loại job (upload, complete-workflow)
+        db (Session): Session của database
+
+    Returns:
+        Dict[str, Any]: ID và trạng thái của job
+    """
+
+    if job_type not in JOB_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"job_type phải là một trong: {', '.join(JOB_TYPES)}",
+        )
+
+    try:
+        results = new_upload_results()
+
+        job_id, work_dir = job_queue.create_work_dir()
+        try:
+            uploaded_files, _ = save_uploaded_files(files, work_dir, results)
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        job = job_queue.submit(
+            db, job_id, job_type, work_dir, uploaded_files, results
+        )
 
         return {
             "success": True,
-            "message": "Complete workflow đã hoàn thành thành công",
-            "data": final_summary,
+            "message": f"Đã nhận {len(uploaded_files)} file, job đang chờ xử lý",
+            "job_id": job.id,
+            "status": job.status,
+            "file_count": len(uploaded_files),
+            "errors": results["errors"],
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        error_msg = f"Lỗi complete workflow: {str(e)}"
-        print(f"💥 {error_msg}")
-        logging.error(error_msg)
+        db.rollback()
+        error_msg = f"Lỗi tạo import job: {str(e)}"
+        logger.error("💥 %s", error_msg)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_msg
+        )
+
+
+@router.get("/jobs", response_model=List[ImportJobResponse])
+def get_import_jobs(
+    skip: int = 0,
+    limit: int = 50,
+    job_status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Lấy danh sách import job, mới nhất trước
+    """
+    query = db.query(ImportJob).order_by(ImportJob.created_at.desc())
+
+    if job_status:
+        query = query.filter(ImportJob.status == job_status)
+
+    jobs = query.offset(skip).limit(limit).all()
+    return [job.to_dict() for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobResponse)
+def get_import_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Lấy trạng thái, số dòng và thời gian từng stage của một import job
+    """
+    job = db.get(ImportJob, job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Không tìm thấy job {job_id}",
+        )
+
+    return job.to_dict()
+
+
+@router.get("/runs")
+def get_pipeline_run_history(
+    run_type: Optional[str] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    """
+    Lấy lịch sử các lần chạy pipeline (mới nhất trước) kèm percentile thời gian,
+    số dòng và số lần gọi database của từng stage qua các lần chạy
+    """
+    try:
+        return get_pipeline_runs(db, run_type, limit)
+
+    except Exception as e:
+        error_msg = f"Lỗi lấy lịch sử chạy pipeline: {str(e)}"
+        logger.error("💥 %s", error_msg)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_msg
         )
 
 
 @router.get("/export-flight-data")
-async def export_flight_data(
+def export_flight_data(
     start_date: str,
     end_date: str,
+    output_format: str = "json",
     db: Session = Depends(get_db),
 ):
     """
@@ -759,241 +859,42 @@ async def export_flight_data(
     - DATA_: Main query with joins to get enriched flight information
     - Final SELECT with area logic
 
+    Mặc định (FLIGHT_EXPORT_SOURCE=fact) đọc kết quả đã tính sẵn trong bảng
+    flight_export_fact theo index ngày bay; FLIGHT_EXPORT_SOURCE=live chạy lại query trên.
+
+    output_format=ndjson / csv stream kết quả theo từng lô EXPORT_FETCH_SIZE dòng
+    (bộ nhớ và thời gian tới byte đầu tiên không phụ thuộc khoảng thời gian).
+    output_format=xlsx ghi file Excel (sheet "Flight Report") ở server bằng
+    openpyxl write-only theo từng lô rồi trả về dạng download.
+
     Args:
         start_date: Start datetime in format YYYY-MM-DD HH:MM:SS
         end_date: End datetime in format YYYY-MM-DD HH:MM:SS
+        output_format: json (mặc định), ndjson, csv hoặc xlsx
         db: Database session
 
     Returns:
-        JSON with flight data for the specified datetime range
+        JSON with flight data for the specified datetime range, a streamed
+        NDJSON / CSV response or an .xlsx download
     """
     try:
-        from datetime import datetime
-        from sqlalchemy import text
-
-        # Parse datetime strings
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S")
-            end = datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S")
-        except ValueError as e:
+        if output_format not in EXPORT_FORMATS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Ngày giờ không hợp lệ. Vui lòng nhập lại.",
+                detail=f"output_format phải là một trong: {', '.join(EXPORT_FORMATS)}",
             )
 
-        # Validate datetime range
-        if start > end:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ngày giờ bắt đầu phải trước ngày giờ kết thúc.",
-            )
+        start, end = parse_export_range(start_date, end_date)
 
-        print(f"📅 Date range: {start} to {end}")
-
-        # Complex SQL query based on the provided script
-        #! ===== UPDATE HERE
-        sql_query = text(
-            """
-            WITH SECTOR_DOM AS (
-                SELECT 
-                    CASE 
-                        WHEN LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1) 
-                            < RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR))
-                            THEN SECTOR
-                        ELSE RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR)) 
-                            + '-' 
-                            + LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1)
-                    END AS ROUTE,
-                    SECTOR,
-                    [Area_Lv1],
-                    [DOM/INT]
-                FROM SECTOR_ROUTE_DOM_REF
-            ),
-            ROUTE_ AS (
-                SELECT 
-                    ROUTE,
-                    [Area_Lv1] AS AREA
-                FROM SECTOR_DOM
-                WHERE UPPER(LTRIM(RTRIM([DOM/INT]))) = 'DOM'
-                GROUP BY ROUTE, [Area_Lv1]
-            ),
-            FLIGHT_DATA AS (
-                SELECT 
-                    f.id,
-                    CASE
-                        WHEN ISNUMERIC(f.flightdate) = 1 
-                            THEN DATEADD(DAY, CAST(f.flightdate AS INT), '1899-12-30')
-                        WHEN f.flightdate LIKE '__/_/____'  
-                            THEN TRY_CONVERT(DATE, f.flightdate, 103)
-                        WHEN f.flightdate LIKE '__/__/____' 
-                            THEN TRY_CONVERT(DATE, f.flightdate, 103)
-                        WHEN f.flightdate LIKE '____-__-__ %' 
-                            THEN TRY_CONVERT(DATE, LEFT(f.flightdate, 10), 120)
-                        WHEN f.flightdate LIKE '____/__/__' 
-                            THEN TRY_CONVERT(DATE, f.flightdate, 111)
-                        WHEN LEN(TRIM(f.flightdate)) = 8 
-                            AND ISNUMERIC(TRIM(f.flightdate)) = 1 
-                            THEN TRY_CONVERT(DATE, TRIM(f.flightdate), 112)
-                        WHEN TRY_CONVERT(DATETIME, f.flightdate) IS NOT NULL 
-                            THEN CONVERT(DATE, f.flightdate)
-                        ELSE NULL
-                    END AS flightdate,
-
-                    flightno,
-                    route,
-                    f.actype,
-                    COALESCE(f.seat, s.seat) AS seat,
-                    adl, chd, cgo, mail,
-                    source, acregno, sheet_name,
-
-                    CASE 
-                        WHEN totalpax > 0 THEN totalpax
-                        ELSE ISNULL(adl, 0) + ISNULL(chd, 0)
-                    END AS totalpax,
-
-                    CASE 
-                        WHEN totalpax = 0 
-                            AND (ISNULL(cgo, 0) + ISNULL(mail, 0) > 0) THEN 0
-                        WHEN totalpax > 0 THEN 1
-                    END AS FLIGHT_TYPE
-
-                FROM flight_raw f
-                LEFT JOIN AIRPORT_REF dep 
-                    ON LEFT(TRIM(f.route), 3) = dep.IATACode
-                LEFT JOIN AIRPORT_REF arr 
-                    ON RIGHT(TRIM(f.route), 3) = arr.IATACode
-                LEFT JOIN actype_seat s 
-                    ON LOWER(TRIM(f.actype)) = LOWER(TRIM(s.actype))
-
-                WHERE 
-                    CASE 
-                        WHEN CHARINDEX('SGN', route) > 1 
-                            AND sheet_name != 'SGN' THEN 0
-                        WHEN sheet_name = 'SGN' THEN 1
-                        WHEN CASE
-                                WHEN dep.Country = 'Vietnam' 
-                                    AND arr.Country = 'Vietnam' THEN 'DOM'
-                                WHEN dep.Country IS NOT NULL 
-                                    AND arr.Country IS NOT NULL 
-                                    AND (dep.Country != 'Vietnam' 
-                                        OR arr.Country != 'Vietnam') THEN 'INT'
-                                ELSE NULL
-                            END = 'INT' THEN 2
-                        WHEN sheet_name = LEFT(route, 3) THEN 3
-                        ELSE -1
-                    END > 0
-            ),
-            DATA_ AS (
-                SELECT
-                    CASE 
-                        WHEN LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1) 
-                            < RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE))
-                            THEN F.ROUTE
-                        ELSE RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE)) 
-                            + '-' 
-                            + LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1)
-                    END AS ROUTE_SORT,
-
-                    F.*,
-                    LEFT(TRIM(F.FLIGHTNO), 2) AS AIRLINE_CODE,
-                    A.AIRLINES_NAME,
-                    A.AIRLINE_NATION,
-
-                    LEFT(F.ROUTE, 3) AS DEPARTURE,
-                    RIGHT(F.ROUTE, 3) AS ARRIVES,
-
-                    CASE 
-                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'VIETNAM'
-                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(AI1.COUNTRY) <> 'VIETNAM' THEN AI1.COUNTRY
-                        ELSE AI.COUNTRY
-                    END AS COUNTRY,
-
-                    CASE 
-                        WHEN UPPER(AI.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'DOM'
-                        ELSE 'INT'
-                    END AS INT_DOM,
-
-                    CASE 
-                        WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
-                        WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[2_LETTER_CODE]
-                        ELSE C.[2_LETTER_CODE]
-                    END AS COUNTRY_CODE,
-
-                    CASE 
-                        WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
-                        WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
-                            AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[REGION_(VNM)]
-                        ELSE C.[REGION_(VNM)]
-                    END AS AREA,
-
-                    AI.CITY AS CITY_ARRIVES,
-                    AI.COUNTRY AS COUNTRY_ARRIVES,
-                    AI1.CITY AS CITY_DEPARTURE,
-                    AI1.COUNTRY AS COUNTRY_DEPARTURE,
-                    C2.[2_LETTER_CODE] AS AIRLINE_NATION_CODE
-                FROM FLIGHT_DATA F
-                LEFT JOIN AIRLINE_REF A 
-                    ON LEFT(F.FLIGHTNO, 2) = A.CARRIER
-                LEFT JOIN AIRPORT_REF AI 
-                    ON AI.IATACODE = RIGHT(F.ROUTE, 3)
-                LEFT JOIN AIRPORT_REF AI1 
-                    ON AI1.IATACODE = LEFT(F.ROUTE, 3)
-                LEFT JOIN COUNTRY_REF C 
-                    ON AI.COUNTRY = C.COUNTRY
-                LEFT JOIN COUNTRY_REF C1 
-                    ON AI1.COUNTRY = C1.COUNTRY
-                LEFT JOIN COUNTRY_REF C2 
-                    ON C2.COUNTRY = A.AIRLINE_NATION
-            )
-            SELECT  
-                D.flightdate,
-                D.FLIGHTNO,
-                D.ROUTE,
-                D.ACTYPE,
-                D.TOTALPAX,
-                D.CGO,
-                D.MAIL,
-                D.ACREGNO,
-                D.SOURCE,
-                D.SHEET_NAME,
-                D.SEAT,
-                D.INT_DOM,
-                D.AIRLINE_CODE,
-                D.AIRLINES_NAME,
-                D.AIRLINE_NATION,
-                D.AIRLINE_NATION_CODE,
-                DEPARTURE,
-                CITY_DEPARTURE,
-                COUNTRY_DEPARTURE,
-                ARRIVES,
-                CITY_ARRIVES,
-                COUNTRY_ARRIVES,
-                COUNTRY_CODE,
-                D.AREA AS AREA_CODE
-
-            FROM DATA_ AS D
-            LEFT JOIN ROUTE_ AS S 
-                ON D.ROUTE_SORT = S.ROUTE
-            WHERE D.flightdate >= :start_date
-                AND D.flightdate <= :end_date;
-        """
-        )
+        logger.debug("📅 Date range: %s to %s", start, end)
 
-        # Execute query with parameters (YYYYMMDD integer format + datetime for time filtering)
-        result = db.execute(
-            sql_query,
-            {
-                "start_date": start,
-                "end_date": end,
-            },
-        )
-        rows = result.fetchall()
+        if output_format == "xlsx":
+            return export_flight_data_xlsx(db, start, end)
+
+        if output_format != "json":
+            return stream_flight_export(start, end, output_format)
+
+        rows = execute_flight_export(db, start, end).fetchall()
 
         if not rows:
             return {
@@ -1003,36 +904,7 @@ async def export_flight_data(
             }
 
         # Convert to list of dictionaries
-        flight_data = []
-        for row in rows:
-            #! ===== UPDATE HERE =====
-            flight_dict = {
-                "flightdate": row.flightdate,
-                "flightno": row.FLIGHTNO,
-                "route": row.ROUTE,
-                "actype": row.ACTYPE,
-                "totalpax": row.TOTALPAX,
-                "cgo": row.CGO,
-                "mail": row.MAIL,
-                "acregno": row.ACREGNO,
-                "source": row.SOURCE,
-                "sheet_name": row.SHEET_NAME,
-                "seat": row.SEAT,
-                "int_dom": row.INT_DOM,
-                "airline_code": row.AIRLINE_CODE,
-                "airlines_name": row.AIRLINES_NAME,
-                "airline_nation": row.AIRLINE_NATION,
-                "airline_nation_code": row.AIRLINE_NATION_CODE,
-                "departure": row.DEPARTURE,
-                "city_departure": row.CITY_DEPARTURE,
-                "country_departure": row.COUNTRY_DEPARTURE,
-                "arrives": row.ARRIVES,
-                "city_arrives": row.CITY_ARRIVES,
-                "country_arrives": row.COUNTRY_ARRIVES,
-                "country_code": row.COUNTRY_CODE,
-                "area_code": row.AREA_CODE,
-            }
-            flight_data.append(flight_dict)
+        flight_data = [row_to_export_dict(row) for row in rows]
 
         return {
             "success": True,
@@ -1049,3 +921,165 @@ async def export_flight_data(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=error_msg + ": " + str(e) + ".",
         ) from e
+
+
+@router.get("/export-flight-data/page")
+def export_flight_data_page(
+    start_date: str,
+    end_date: str,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Export dữ liệu chuyến bay theo trang (keyset pagination trên bảng flight_export_fact)
+
+    Mỗi trang là một lần seek trên clustered index (flight_date, id), không dùng OFFSET.
+    Trang đầu không truyền cursor; các trang sau truyền next_cursor của trang trước
+    (cùng start_date / end_date) cho tới khi next_cursor = null. Có thể chia khoảng thời
+    gian để đọc song song, hoặc đọc tiếp từ cursor cuối cùng sau khi bị ngắt.
+
+    Luôn đọc bảng flight_export_fact, kể cả khi FLIGHT_EXPORT_SOURCE=live.
+
+    Args:
+        start_date: Ngày giờ bắt đầu (YYYY-MM-DD HH:MM:SS)
+        end_date: Ngày giờ kết thúc (YYYY-MM-DD HH:MM:SS)
+        page_size: Số dòng mỗi trang (mặc định EXPORT_PAGE_SIZE, tối đa EXPORT_MAX_PAGE_SIZE)
+        cursor: next_cursor của trang trước
+        db: Database session
+
+    Returns:
+        JSON với các dòng của trang và next_cursor
+    """
+    try:
+        if page_size is None:
+            page_size = settings.EXPORT_PAGE_SIZE
+        if not 1 <= page_size <= settings.EXPORT_MAX_PAGE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"page_size phải từ 1 đến {settings.EXPORT_MAX_PAGE_SIZE}",
+            )
+
+        start, end = parse_export_range(start_date, end_date)
+
+        page = fetch_flight_export_page(db, start, end, page_size, cursor)
+        flight_data = [row_to_export_dict(row) for row in page["rows"]]
+
+        return {
+            "success": True,
+            "message": "Export dữ liệu chuyến bay thành công.",
+            "data": flight_data,
+            "page_records": len(flight_data),
+            "page_size": page_size,
+            "next_cursor": page["next_cursor"],
+            "has_more": page["next_cursor"] is not None,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = "Lỗi khi export dữ liệu chuyến bay"
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error_msg + ": " + str(e) + ".",
+        ) from e
+
+
+def stream_flight_export(
+    start: datetime, end: datetime, output_format: str
+) -> StreamingResponse:
+    """
+    Tạo StreamingResponse NDJSON / CSV cho export dữ liệu chuyến bay
+
+    Response dùng session riêng (session của Depends(get_db) đóng trước khi body được
+    gửi), query chạy ngay để lỗi SQL vẫn trả về HTTP 500.
+
+    Args:
+        start (datetime): Ngày giờ bắt đầu
+        end (datetime): Ngày giờ kết thúc
+        output_format (str): ndjson hoặc csv
+
+    Returns:
+        StreamingResponse: Response stream
+    """
+
+    stream_db = SessionLocal()
+    try:
+        result = execute_flight_export(
+            stream_db, start, end, settings.EXPORT_FETCH_SIZE
+        )
+    except Exception:
+        stream_db.close()
+        raise
+
+    file_name = f"flight_data_{start:%Y%m%d}_{end:%Y%m%d}"
+
+    if output_format == "csv":
+        return StreamingResponse(
+            iter_flight_export_csv(result, stream_db),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f"attachment; filename={file_name}.csv"},
+        )
+
+    return StreamingResponse(
+        iter_flight_export_ndjson(result, stream_db),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={file_name}.ndjson"},
+    )
+
+
+def export_flight_data_xlsx(db: Session, start: datetime, end: datetime):
+    """
+    Ghi kết quả export ra file .xlsx (openpyxl write-only, đọc cursor theo từng lô
+    EXPORT_FETCH_SIZE dòng) và trả về dạng download
+
+    Args:
+        db (Session): Session của database
+        start (datetime): Ngày giờ bắt đầu
+        end (datetime): Ngày giờ kết thúc
+
+    Returns:
+        FileResponse or Dict[str, Any]: File .xlsx, hoặc JSON như output_format=json
+            nếu không có dữ liệu
+    """
+
+    result = execute_flight_export(db, start, end, settings.EXPORT_FETCH_SIZE)
+
+    xlsx_path = new_xlsx_path()
+    try:
+        row_counts = write_xlsx(
+            xlsx_path,
+            [
+                (
+                    FLIGHT_EXPORT_XLSX_SHEET,
+                    FLIGHT_EXPORT_XLSX_HEADER,
+                    iter_flight_export_xlsx_rows(result),
+                )
+            ],
+            column_width=30,
+        )
+    except Exception:
+        remove_file(xlsx_path)
+        raise
+    finally:
+        result.close()
+
+    if not row_counts[FLIGHT_EXPORT_XLSX_SHEET]:
+        remove_file(xlsx_path)
+        return {
+            "success": False,
+            "message": "Không có dữ liệu chuyến bay trong khoảng thời gian đã chọn.",
+            "data": [],
+        }
+
+    logger.info(
+        "📤 Đã ghi %s dòng dữ liệu chuyến bay ra file Excel",
+        row_counts[FLIGHT_EXPORT_XLSX_SHEET],
+    )
+
+    if end - start <= timedelta(days=1):
+        file_name = f"flight_report_{start:%Y-%m-%d}.xlsx"
+    else:
+        file_name = f"flight_report_{start:%Y-%m-%d}_to_{end:%Y-%m-%d}.xlsx"
+
+    return xlsx_file_response(xlsx_path, file_name)
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/dim-airlines", tags=["dim-airlines"])
 
 
 @router.get("/", response_model=List[DimAirlineRefResponse])
-async def get_all_dim_airline_refs(
+def get_all_dim_airline_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/dim-airports", tags=["dim-airports"])
 
 
 @router.get("/", response_model=List[DimAirportRefResponse])
-async def get_all_dim_airport_refs(
+def get_all_dim_airport_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/dim-countries", tags=["dim-countries"])
 
 
 @router.get("/", response_model=List[DimCountryRefResponse])
-async def get_all_dim_countries(
+def get_all_dim_countries(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
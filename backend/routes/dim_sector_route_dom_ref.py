@@ -11,7 +11,7 @@ router = APIRouter(prefix="/dim-sector-route-doms", tags=["dim-sector-route-doms
 
 
 @router.get("/", response_model=List[DimSectorRouteDomRefResponse])
-async def get_all_dim_sector_route_dom_refs(
+def get_all_dim_sector_route_dom_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
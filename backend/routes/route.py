@@ -18,7 +18,7 @@ router = APIRouter(prefix="/routes", tags=["routes"])
 
 
 @router.get("/", response_model=List[RouteResponse])
-async def get_all_routes(
+def get_all_routes(
     skip: int = 0,
     limit: int = None,
     country: Optional[str] = None,
@@ -52,7 +52,7 @@ async def get_all_routes(
 
 
 # @router.get("/{route_code}", response_model=RouteResponse)
-# async def get_route(route_code: str, db: Session = Depends(get_db)):
+# def get_route(route_code: str, db: Session = Depends(get_db)):
 #     """
 #     Lấy thông tin chi tiết đường bay theo mã
 #     """
@@ -76,7 +76,7 @@ async def get_all_routes(
 
 
 # @router.post("/", response_model=RouteResponse, status_code=status.HTTP_201_CREATED)
-# async def create_route(route: RouteCreate, db: Session = Depends(get_db)):
+# def create_route(route: RouteCreate, db: Session = Depends(get_db)):
 #     """
 #     Tạo đường bay mới
 #     """
@@ -117,7 +117,7 @@ async def get_all_routes(
     response_model=RouteBulkCreateResponse,
     status_code=status.HTTP_201_CREATED,
 )
-async def create_routes_bulk(
+def create_routes_bulk(
     route_bulk: RouteBulkCreate, db: Session = Depends(get_db)
 ):
     """
@@ -185,7 +185,7 @@ async def create_routes_bulk(
 
 
 # @router.put("/{route_code}", response_model=RouteResponse)
-# async def update_route(
+# def update_route(
 #     route_code: str, route_update: RouteUpdate, db: Session = Depends(get_db)
 # ):
 #     """
@@ -220,7 +220,7 @@ async def create_routes_bulk(
 
 
 # @router.delete("/{route_code}", status_code=status.HTTP_204_NO_CONTENT)
-# async def delete_route(route_code: str, db: Session = Depends(get_db)):
+# def delete_route(route_code: str, db: Session = Depends(get_db)):
 #     """
 #     Xóa đường bay
 #     """
@@ -248,7 +248,7 @@ async def create_routes_bulk(
 
 
 # @router.get("/search/", response_model=List[RouteResponse])
-# async def search_routes(
+# def search_routes(
 #     q: str = None,
 #     country: str = None,
 #     route_type: str = None,
@@ -301,7 +301,7 @@ async def create_routes_bulk(
 
 
 @router.get("/stats/summary", response_model=dict)
-async def get_route_stats(db: Session = Depends(get_db)):
+def get_route_stats(db: Session = Depends(get_db)):
     """
     Thống kê tổng quan về đường bay
     """
@@ -17,7 +17,7 @@ router = APIRouter(prefix="/sector-route-doms", tags=["sector-route-doms"])
 
 
 @router.get("/", response_model=List[SectorRouteDomRefResponse])
-async def get_all_sector_route_dom_refs(
+def get_all_sector_route_dom_refs(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -43,7 +43,7 @@ async def get_all_sector_route_dom_refs(
 
 
 @router.post("/", response_model=SectorRouteDomRefResponse)
-async def create_sector_route_dom_ref(
+def create_sector_route_dom_ref(
     sector_route_dom_ref: SectorRouteDomRefCreate, db: Session = Depends(get_db)
 ):
     """
@@ -64,7 +64,7 @@ async def create_sector_route_dom_ref(
 
 
 @router.post("/bulk-create", response_model=SectorRouteDomRefBulkCreateResponse)
-async def create_sector_route_dom_refs_bulk(
+def create_sector_route_dom_refs_bulk(
     sector_route_dom_refs: SectorRouteDomRefBulkCreate, db: Session = Depends(get_db)
 ):
     """
@@ -132,7 +132,7 @@ async def create_sector_route_dom_refs_bulk(
 
 
 @router.put("/{sector_route_dom_id}", response_model=SectorRouteDomRefResponse)
-async def update_sector_route_dom_ref(
+def update_sector_route_dom_ref(
     sector_route_dom_id: int,
     sector_route_dom_ref_update: SectorRouteDomRefUpdate,
     db: Session = Depends(get_db),
@@ -172,7 +172,7 @@ async def update_sector_route_dom_ref(
 
 
 @router.delete("/{sector_route_dom_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_sector_route_dom_ref(
+def delete_sector_route_dom_ref(
     sector_route_dom_id: int, db: Session = Depends(get_db)
 ):
     """
@@ -207,7 +207,7 @@ async def delete_sector_route_dom_ref(
 
 
 @router.get("/search/", response_model=List[SectorRouteDomRefResponse])
-async def search_sector_route_dom_refs(q: str = None, db: Session = Depends(get_db)):
+def search_sector_route_dom_refs(q: str = None, db: Session = Depends(get_db)):
     """
     Tìm kiếm phân loại tuyến bay
     """
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/temp-actype-import", tags=["temp-actype-import"])
 
 
 @router.get("/", response_model=List[TempActypeImportResponse])
-async def get_all_temp_actypes(
+def get_all_temp_actypes(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -43,7 +43,7 @@ async def get_all_temp_actypes(
 
 
 # @router.get("/{actype}", response_model=TempActypeImportResponse)
-# async def get_temp_actype(actype: str, db: Session = Depends(get_db)):
+# def get_temp_actype(actype: str, db: Session = Depends(get_db)):
 #     """
 #     Lấy thông tin một loại máy bay theo mã
 #     """
@@ -73,7 +73,7 @@ async def get_all_temp_actypes(
 # @router.post(
 #     "/", response_model=TempActypeImportResponse, status_code=status.HTTP_201_CREATED
 # )
-# async def create_temp_actype(
+# def create_temp_actype(
 #     temp_actype: TempActypeImportCreate, db: Session = Depends(get_db)
 # ):
 #     """
@@ -120,7 +120,7 @@ async def get_all_temp_actypes(
 #     response_model=TempActypeImportBulkCreateResponse,
 #     status_code=status.HTTP_201_CREATED,
 # )
-# async def create_temp_actypes_bulk(
+# def create_temp_actypes_bulk(
 #     temp_actype_bulk: TempActypeImportBulkCreate, db: Session = Depends(get_db)
 # ):
 #     """
@@ -182,7 +182,7 @@ async def get_all_temp_actypes(
 
 
 # @router.put("/{actype}", response_model=TempActypeImportResponse)
-# async def update_temp_actype(
+# def update_temp_actype(
 #     actype: str,
 #     temp_actype_update: TempActypeImportUpdate,
 #     db: Session = Depends(get_db),
@@ -223,7 +223,7 @@ async def get_all_temp_actypes(
 
 
 # @router.delete("/{actype}", status_code=status.HTTP_204_NO_CONTENT)
-# async def delete_temp_actype(actype: str, db: Session = Depends(get_db)):
+# def delete_temp_actype(actype: str, db: Session = Depends(get_db)):
 #     """
 #     Xóa loại máy bay khỏi bảng tạm
 #     """
@@ -255,7 +255,7 @@ async def get_all_temp_actypes(
 
 
 # @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
-# async def clear_all_temp_actypes(db: Session = Depends(get_db)):
+# def clear_all_temp_actypes(db: Session = Depends(get_db)):
 #     """
 #     Xóa tất cả loại máy bay khỏi bảng tạm
 #     """
@@ -274,7 +274,7 @@ async def get_all_temp_actypes(
 
 
 # @router.get("/search/", response_model=List[TempActypeImportResponse])
-# async def search_temp_actypes(
+# def search_temp_actypes(
 #     q: str = None,
 #     db: Session = Depends(get_db),
 # ):
@@ -297,7 +297,7 @@ async def get_all_temp_actypes(
 
 
 @router.post("/seed", response_model=dict)
-async def seed_temp_actypes(db: Session = Depends(get_db)):
+def seed_temp_actypes(db: Session = Depends(get_db)):
     """
     Thêm dữ liệu mẫu vào bảng temp_actypes
     """
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/temp-route-import", tags=["temp-route-import"])
 
 
 @router.get("/", response_model=List[TempRouteImportResponse])
-async def get_all_temp_routes(
+def get_all_temp_routes(
     skip: int = 0, limit: int = None, db: Session = Depends(get_db)
 ):
     """
@@ -41,7 +41,7 @@ async def get_all_temp_routes(
 
 
 # @router.get("/{route_code}", response_model=TempRouteImportResponse)
-# async def get_temp_route(route_code: str, db: Session = Depends(get_db)):
+# def get_temp_route(route_code: str, db: Session = Depends(get_db)):
 #     """
 #     Lấy thông tin một đường bay theo mã
 #     """
@@ -70,7 +70,7 @@ async def get_all_temp_routes(
 # @router.post(
 #     "/", response_model=TempRouteImportResponse, status_code=status.HTTP_201_CREATED
 # )
-# async def create_temp_route(
+# def create_temp_route(
 #     temp_route: TempRouteImportCreate, db: Session = Depends(get_db)
 # ):
 #     """
@@ -117,7 +117,7 @@ async def get_all_temp_routes(
 #     response_model=TempRouteImportBulkCreateResponse,
 #     status_code=status.HTTP_201_CREATED,
 # )
-# async def create_temp_routes_bulk(
+# def create_temp_routes_bulk(
 #     temp_route_bulk: TempRouteImportBulkCreate, db: Session = Depends(get_db)
 # ):
 #     """
@@ -179,7 +179,7 @@ async def get_all_temp_routes(
 
 
 # @router.put("/{route_code}", response_model=TempRouteImportResponse)
-# async def update_temp_route(
+# def update_temp_route(
 #     route_code: str,
 #     temp_route_update: TempRouteImportUpdate,
 #     db: Session = Depends(get_db),
@@ -219,7 +219,7 @@ async def get_all_temp_routes(
 
 
 # @router.delete("/{route_code}", status_code=status.HTTP_204_NO_CONTENT)
-# async def delete_temp_route(route_code: str, db: Session = Depends(get_db)):
+# def delete_temp_route(route_code: str, db: Session = Depends(get_db)):
 #     """
 #     Xóa đường bay khỏi bảng tạm
 #     """
@@ -250,7 +250,7 @@ async def get_all_temp_routes(
 
 
 # @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
-# async def clear_all_temp_routes(db: Session = Depends(get_db)):
+# def clear_all_temp_routes(db: Session = Depends(get_db)):
 #     """
 #     Xóa tất cả đường bay khỏi bảng tạm
 #     """
@@ -269,7 +269,7 @@ async def get_all_temp_routes(
 
 
 # @router.get("/search/", response_model=List[TempRouteImportResponse])
-# async def search_temp_routes(
+# def search_temp_routes(
 #     q: str = None,
 #     country: str = None,
 #     type: str = None,
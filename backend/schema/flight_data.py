@@ -13,6 +13,10 @@ class FlightRawBase(BaseModel):
     flightdate: Optional[str] = Field(
         None, max_length=255, description="Ngày bay (các định dạng khác nhau từ Excel)"
     )
+    flight_date: Optional[date] = Field(None, description="Ngày bay đã parse khi import")
+    flight_date_status: Optional[int] = Field(
+        None, description="Trạng thái parse flightdate (0: hợp lệ, 1: trống, 2: không hợp lệ)"
+    )
     flightno: Optional[str] = Field(
         None, max_length=50, description="Số hiệu chuyến bay"
     )
@@ -270,6 +274,7 @@ class MissingDimensionResponse(BaseModel):
     source_sheet: Optional[str] = Field(
         None, description="Source sheet nơi tìm thấy dữ liệu bị thiếu"
     )
+    count: int = Field(0, description="Số dòng error_table đang thiếu giá trị này")
     created_at_log: Optional[datetime] = Field(
         None, description="Khi dữ liệu bị thiếu được ghi lại"
     )
@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+
+class ImportJobStage(BaseModel):
+    """Schema cho trạng thái một stage của ImportJob"""
+
+    name: str = Field(..., description="Tên stage")
+    status: str = Field(..., description="Trạng thái stage (running, completed, failed)")
+    rows_in: Optional[int] = Field(None, description="Số dòng đầu vào")
+    rows: Optional[int] = Field(None, description="Số dòng được xử lý")
+    started_at: Optional[str] = Field(None, description="Thời gian bắt đầu")
+    seconds: Optional[float] = Field(None, description="Thời gian chạy (giây)")
+    db_round_trips: Optional[int] = Field(
+        None, description="Số lần gọi database trong stage"
+    )
+    steps: Optional[Dict[str, Dict[str, Any]]] = Field(
+        None, description="Thời gian, số lần gọi database từng bước trong stage"
+    )
+    error: Optional[str] = Field(None, description="Mô tả lỗi")
+
+
+class ImportJobResponse(BaseModel):
+    """Schema cho response của ImportJob API"""
+
+    id: str = Field(..., description="ID của job")
+    job_type: str = Field(..., description="Loại job (upload, complete-workflow)")
+    status: str = Field(
+        ..., description="Trạng thái job (queued, running, completed, failed)"
+    )
+    file_count: Optional[int] = Field(None, description="Số file được gửi lên")
+    file_names: List[str] = Field(
+        default_factory=list, description="Tên các file theo thứ tự upload"
+    )
+    stages: List[ImportJobStage] = Field(
+        default_factory=list, description="Trạng thái từng stage"
+    )
+    result: Optional[Dict[str, Any]] = Field(None, description="Kết quả của job")
+    error: Optional[str] = Field(None, description="Mô tả lỗi nếu job thất bại")
+    created_at: datetime = Field(..., description="Thời gian tạo job")
+    started_at: Optional[datetime] = Field(None, description="Thời gian bắt đầu")
+    finished_at: Optional[datetime] = Field(None, description="Thời gian kết thúc")
+
+
+class ImportJobSubmitResponse(BaseModel):
+    """Schema cho response khi gửi job"""
+
+    success: bool = Field(..., description="Trạng thái gửi job")
+    message: str = Field(..., description="Thông báo")
+    job_id: str = Field(..., description="ID của job")
+    status: str = Field(..., description="Trạng thái job")
+    file_count: int = Field(..., description="Số file được đưa vào job")
+    errors: List[str] = Field(
+        default_factory=list, description="Lỗi khi nhận file (file không phải Excel...)"
+    )
@@ -1,15 +1,42 @@
 import pandas as pd
+import numpy as np
 import logging
 import os
 import shutil
-from typing import Dict, List, Any, Tuple, Optional
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Any, Tuple, Optional, Iterator, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from sqlalchemy.types import UnicodeText
+from sqlalchemy import bindparam, text
+from sqlalchemy.types import Date, SmallInteger, UnicodeText
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
 import re
 import datetime
 from pathlib import Path
 
+from backend.core.config import settings
+from backend.core.logging_config import get_correlation_id, setup_worker_logging
+from backend.services.flight_export_fact import refresh_flight_export_fact
+from backend.services.flight_validator import (
+    ERROR_TABLE_TEXT_COLUMNS,
+    FLIGHT_DATA_CHOT_TEXT_COLUMNS,
+    FlightValidator,
+    parse_flight_dates,
+)
+from backend.services.job_stages import StageTracker, track_step
+from backend.services.parse_cache import compute_file_hash, get_parse_cache
+from backend.services.summary_cache import processing_summary_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Số file mỗi query/INSERT import_log (SQL Server giới hạn 2100 tham số mỗi câu lệnh)
+IMPORT_LOG_BATCH_SIZE = 500
+
 
 class ExcelBatchProcessor:
     """
@@ -17,14 +44,41 @@ class ExcelBatchProcessor:
 
     Args:
         db (Session): Session của database
+        streaming (bool, optional): Đọc Excel theo từng chunk (mặc định theo settings)
+        chunk_size (int, optional): Số dòng mỗi chunk khi đọc streaming
+        search_list (List[str], optional): Mã sân bay cho file MB (mặc định theo settings)
+        parse_workers (int, optional): Số process parse Excel song song (mặc định theo settings)
 
     Returns:
         Dict[str, Any]: Kết quả xử lý
     """
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        streaming: Optional[bool] = None,
+        chunk_size: Optional[int] = None,
+        search_list: Optional[List[str]] = None,
+        parse_workers: Optional[int] = None,
+    ):
         self.db = db
 
+        # Chế độ đọc streaming: giới hạn bộ nhớ theo chunk_size thay vì kích thước workbook
+        self.streaming = (
+            settings.EXCEL_STREAMING_READ if streaming is None else streaming
+        )
+        self.chunk_size = chunk_size or settings.EXCEL_CHUNK_SIZE
+
+        # Cache kết quả parse trên đĩa theo SHA-256 của file (None = tắt)
+        self.parse_cache = get_parse_cache(
+            settings.PARSE_CACHE_DIR, settings.PARSE_CACHE_MAX_MB
+        )
+
+        # Số process parse Excel song song (1 = tuần tự trong process hiện tại)
+        self.parse_workers = (
+            settings.EXCEL_PARSE_WORKERS if parse_workers is None else parse_workers
+        )
+
         # Cấu hình từ notebook
         self.json_data = {
             "MN": ["toan cang"],  # miền nam - chứa tên biến
@@ -32,8 +86,11 @@ class ExcelBatchProcessor:
             "MT": ["CV1"],  # miền trung - bắt đầu
         }
 
-        # Danh sách các airport codes
-        self.search_list = ["THD", "HPH", "HAN", "VDO", "VDH", "VII", "DIN"]
+        # Danh sách các airport codes (thứ tự ưu tiên khi route chứa nhiều mã)
+        self.search_list = list(
+            settings.MB_STATION_CODES if search_list is None else search_list
+        )
+        self.station_pattern = self._compile_station_pattern(self.search_list)
 
         # Các cột cần extract
         self.columns_to_extract = [
@@ -55,6 +112,46 @@ class ExcelBatchProcessor:
         # Các cột kiểu số thực
         self.numeric_columns = ["cgo", "mail", "adl", "chd", "seat", "totalpax"]
 
+        # Các cột ghi vào flight_raw và các cột text trong đó
+        self.flight_raw_columns = [
+            "flightdate",
+            "flightno",
+            "route",
+            "actype",
+            "seat",
+            "adl",
+            "chd",
+            "cgo",
+            "mail",
+            "totalpax",
+            "source",
+            "acregno",
+            "sheet_name",
+        ]
+        self.flight_raw_text_columns = [
+            col for col in self.flight_raw_columns if col not in self.numeric_columns
+        ]
+
+        # Số dòng mỗi lô insert flight_raw
+        self.insert_chunk_size = settings.FLIGHT_RAW_INSERT_CHUNK_SIZE
+
+        # Số dòng và thời gian ghi flight_raw: {file_name: {"rows": int, "seconds": float}}
+        self.load_stats: Dict[str, Dict[str, Any]] = {}
+
+        # Số cell bị ép về 0 khi chuyển số thực: {file_name: {column: count}}
+        self.coercion_report: Dict[str, Dict[str, int]] = {}
+
+        # Validate bằng stored procedure ("sql") hay ngay khi ghi flight_raw ("python")
+        self.validation_engine = settings.VALIDATION_ENGINE
+        self.validator: Optional[FlightValidator] = None
+
+        # Import batch của processor: gắn vào các dòng ghi flight_raw và import_log để
+        # usp_CleanAndProcessFlightData chỉ làm sạch đúng batch này
+        self.import_batch_id: Optional[str] = None
+
+        # Số dòng vào flight_data_chot / error_table: {file_name: {"valid": int, "error": int}}
+        self.validation_stats: Dict[str, Dict[str, int]] = {}
+
     def find_matching_key(self, text: str) -> Optional[str]:
         """
         Xác định loại file Excel (MN: miền nam, MB: miền bắc, MT: miền trung)
@@ -102,6 +199,119 @@ class ExcelBatchProcessor:
         except (ValueError, TypeError):
             return 0.0
 
+    def convert_column_to_float(self, series: pd.Series) -> Tuple[pd.Series, int]:
+        """
+        Chuyển cả cột thành số thực, cho kết quả giống hệt convert_to_float từng cell
+
+        Dấu ',' được đổi thành '.' bằng thao tác chuỗi trên cả cột, sau đó cả cột được
+        ép kiểu một lần (numpy dùng float() của Python nên kết quả khớp từng bit).
+        Chỉ các cell không chuyển được mới đi qua convert_to_float.
+
+        Args:
+            series (pd.Series): Cột cần chuyển đổi
+
+        Returns:
+            Tuple[pd.Series, int]: Cột số thực và số cell bị ép về 0 (trống hoặc không hợp lệ)
+        """
+
+        null_mask = series.isna().to_numpy()
+
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.astype("float64").to_numpy(copy=True)
+            values[null_mask] = 0.0
+            return pd.Series(values, index=series.index), int(null_mask.sum())
+
+        values = series.to_numpy(dtype=object, copy=True)
+        values[null_mask] = 0.0
+
+        # Convert ',' to '.' only for text cells
+        if pd.api.types.infer_dtype(series, skipna=True) == "string":
+            text_mask = ~null_mask
+        else:
+            text_mask = (series.map(type) == str).to_numpy()
+        if text_mask.any():
+            values[text_mask] = (
+                series[text_mask].str.replace(",", ".", regex=False).to_numpy()
+            )
+
+        try:
+            result = values.astype("float64")
+            failed_mask = np.zeros(len(values), dtype=bool)
+        except (ValueError, TypeError):
+            # Tìm các cell không chuyển được, phần còn lại vẫn ép kiểu theo lô
+            failed_mask = pd.to_numeric(
+                pd.Series(values), errors="coerce"
+            ).isna().to_numpy()
+            result = np.zeros(len(values), dtype="float64")
+            try:
+                result[~failed_mask] = values[~failed_mask].astype("float64")
+            except (ValueError, TypeError):
+                failed_mask = ~null_mask
+
+            failed_values = series[failed_mask]
+            converted = {
+                value: self.convert_to_float(value)
+                for value in pd.unique(failed_values)
+            }
+            result[failed_mask] = failed_values.map(converted).to_numpy(dtype="float64")
+
+        # Cell trống, không hợp lệ hoặc "nan" đều không còn mang giá trị số thật
+        coerced_mask = null_mask | failed_mask | np.isnan(result)
+        return pd.Series(result, index=series.index), int(coerced_mask.sum())
+
+    def _convert_numeric_columns(self, df_sheet: pd.DataFrame, file_name: str) -> None:
+        """
+        Chuyển các cột numeric_columns thành số thực và ghi nhận số cell bị ép về 0
+
+        Args:
+            df_sheet (pd.DataFrame): DataFrame chứa dữ liệu của sheet
+            file_name (str): Tên file Excel
+
+        Returns:
+            None
+        """
+
+        file_report = self.coercion_report.setdefault(file_name, {})
+
+        for col in self.numeric_columns:
+            df_sheet[col], coerced_count = self.convert_column_to_float(df_sheet[col])
+            file_report[col] = file_report.get(col, 0) + coerced_count
+
+    def _log_coercion_report(self, file_name: str) -> None:
+        """
+        Ghi log các cột số thực có cell bị ép về 0 của một file
+
+        Args:
+            file_name (str): Tên file Excel
+
+        Returns:
+            None
+        """
+
+        coerced = {
+            col: count
+            for col, count in self.get_coercion_report(file_name).items()
+            if count > 0
+        }
+        if coerced:
+            logger.warning(
+                "Số cell bị chuyển thành 0 trong file '%s': %s", file_name, coerced
+            )
+
+    def get_coercion_report(self, file_name: str) -> Dict[str, int]:
+        """
+        Lấy số cell bị ép về 0 theo từng cột số thực của một file
+
+        Args:
+            file_name (str): Tên file Excel
+
+        Returns:
+            Dict[str, int]: Số cell bị ép về 0 theo tên cột
+        """
+
+        file_report = self.coercion_report.get(file_name, {})
+        return {col: file_report.get(col, 0) for col in self.numeric_columns}
+
     def mb_sheet(self, text: str) -> Optional[str]:
         """
         Tìm giá trị đầu tiên trong search_list có chứa trong text
@@ -143,7 +353,7 @@ class ExcelBatchProcessor:
             # Determine file type
             file_type = self.find_matching_key(file_name)
             if not file_type:
-                logging.error(f"Không thể xác định loại file: {file_name}")
+                logger.error("Không thể xác định loại file: %s", file_name)
                 return pd.DataFrame()
 
             if file_type == "MN":
@@ -163,13 +373,13 @@ class ExcelBatchProcessor:
                 final_df = pd.concat(combined_data, ignore_index=True)
                 return final_df
             else:
-                logging.warning(
-                    f"Không có dữ liệu được trích xuất từ file: {file_name}"
+                logger.warning(
+                    "Không có dữ liệu được trích xuất từ file: %s", file_name
                 )
                 return pd.DataFrame()
 
         except Exception as e:
-            logging.error(f"Lỗi xử lý file {file_name}: {e}")
+            logger.error("Lỗi xử lý file %s: %s", file_name, e)
             return pd.DataFrame()
 
     def _process_mn_file(self, file_path: str, file_name: str) -> List[pd.DataFrame]:
@@ -201,7 +411,7 @@ class ExcelBatchProcessor:
                         combined_data.append(processed_df)
 
         except Exception as e:
-            logging.error(f"Lỗi xử lý file MN {file_name}: {e}")
+            logger.error("Lỗi xử lý file MN %s: %s", file_name, e)
 
         return combined_data
 
@@ -233,10 +443,73 @@ class ExcelBatchProcessor:
                         combined_data.append(processed_df)
 
         except Exception as e:
-            logging.error(f"Lỗi xử lý file MT {file_name}: {e}")
+            logger.error("Lỗi xử lý file MT %s: %s", file_name, e)
 
         return combined_data
 
+    def _compile_station_pattern(
+        self, search_list: List[str]
+    ) -> Optional[re.Pattern]:
+        """
+        Tạo một regex duy nhất tìm tất cả các mã sân bay trong search_list
+
+        Mỗi mã là một nhánh trong lookahead nên regex tìm được mọi vị trí khớp,
+        kể cả các mã chồng lên nhau. Ở cùng một vị trí, nhánh đứng trước trong
+        search_list được ưu tiên.
+
+        Args:
+            search_list (List[str]): Danh sách mã sân bay
+
+        Returns:
+            re.Pattern or None: Regex đã compile hoặc None nếu danh sách rỗng
+        """
+
+        codes = [re.escape(str(value).upper()) for value in search_list]
+        if not codes:
+            return None
+
+        return re.compile("(?=(" + "|".join(codes) + "))")
+
+    def mb_sheet_column(self, routes: pd.Series) -> pd.Series:
+        """
+        Tìm sheet_name cho cả cột route, kết quả giống mb_sheet từng dòng
+
+        Regex chỉ chạy trên các route khác nhau; với mỗi route lấy mã xuất hiện trong
+        route có vị trí nhỏ nhất trong search_list (không phải mã đứng đầu chuỗi).
+
+        Args:
+            routes (pd.Series): Cột route
+
+        Returns:
+            pd.Series: Mã sân bay tìm thấy hoặc None cho mỗi dòng
+        """
+
+        stations = np.full(len(routes), None, dtype=object)
+        if self.station_pattern is None or routes.empty:
+            return pd.Series(stations, index=routes.index, dtype=object)
+
+        # Route lặp lại rất nhiều, chỉ cần tìm trên các giá trị khác nhau
+        route_mask = routes.notna().to_numpy()
+        route_text = routes[route_mask].astype(str)
+        unique_routes = pd.Series(pd.unique(route_text), dtype=object)
+        found_codes = unique_routes.str.upper().str.findall(self.station_pattern)
+
+        # Vị trí của mã trong search_list, mã có vị trí nhỏ nhất được chọn
+        priority = {}
+        for position, value in enumerate(self.search_list):
+            priority.setdefault(str(value).upper(), position)
+
+        station_by_route = {
+            route: self.search_list[min(priority[code] for code in codes)]
+            for route, codes in zip(unique_routes, found_codes)
+            if codes
+        }
+
+        matched = route_text.map(station_by_route)
+        matched = matched.astype(object).where(matched.notna(), None)
+        stations[route_mask] = matched.to_numpy(dtype=object)
+        return pd.Series(stations, index=routes.index, dtype=object)
+
     def _process_mb_file(self, file_path: str, file_name: str) -> List[pd.DataFrame]:
         """
         Xử lý file MB (Miền Bắc)
@@ -252,48 +525,59 @@ class ExcelBatchProcessor:
         combined_data = []
 
         try:
-            print(f"MB: file {file_name}")
+            logger.debug("MB: file %s", file_name)
             # Read all sheets in the Excel file
             excel_sheets = pd.read_excel(file_path, sheet_name=None)
 
             for sheet_name, df_sheet in excel_sheets.items():
                 # Process only sheets with at least 1 character
                 if len(sheet_name) >= 1:
-                    # Lowercase column names
-                    df_sheet.columns = df_sheet.columns.str.lower()
-
-                    # Add missing columns with None/NaN
-                    for col in self.columns_to_extract:
-                        if col not in df_sheet.columns:
-                            df_sheet[col] = pd.NA
-
-                    # Add metadata columns
-                    df_sheet["source"] = file_name
-
-                    # Handle specific column data types and fill missing values
-                    df_sheet["flightdate"] = df_sheet["flightdate"].ffill()
-                    df_sheet["flightno"] = df_sheet["flightno"].fillna("").astype(str)
-                    df_sheet["actype"] = df_sheet["actype"].fillna("").astype(str)
-                    df_sheet["route"] = df_sheet["route"].fillna("").astype(str)
-
-                    # For MB, sheet_name is derived from route
-                    df_sheet["sheet_name"] = df_sheet["route"].apply(
-                        lambda x: self.mb_sheet(x)
-                    )
-
-                    # Convert numeric columns using custom conversion function
-                    for col in self.numeric_columns:
-                        df_sheet[col] = df_sheet[col].apply(self.convert_to_float)
-
-                    # Extract specified columns
-                    extracted_df = df_sheet[self.columns_to_extract].copy()
+                    extracted_df = self._process_mb_sheet(df_sheet, file_name)
                     combined_data.append(extracted_df)
 
         except Exception as e:
-            logging.error(f"Lỗi xử lý file MB {file_name}: {e}")
+            logger.error("Lỗi xử lý file MB %s: %s", file_name, e)
 
         return combined_data
 
+    def _process_mb_sheet(self, df_sheet: pd.DataFrame, file_name: str) -> pd.DataFrame:
+        """
+        Xử lý một sheet (hoặc một chunk của sheet) của file MB (Miền Bắc)
+
+        Args:
+            df_sheet (pd.DataFrame): DataFrame chứa dữ liệu của sheet
+            file_name (str): Tên file Excel
+
+        Returns:
+            pd.DataFrame: DataFrame chứa dữ liệu đã xử lý
+        """
+
+        # Lowercase column names
+        df_sheet.columns = df_sheet.columns.str.lower()
+
+        # Add missing columns with None/NaN
+        for col in self.columns_to_extract:
+            if col not in df_sheet.columns:
+                df_sheet[col] = pd.NA
+
+        # Add metadata columns
+        df_sheet["source"] = file_name
+
+        # Handle specific column data types and fill missing values
+        df_sheet["flightdate"] = df_sheet["flightdate"].ffill()
+        df_sheet["flightno"] = df_sheet["flightno"].fillna("").astype(str)
+        df_sheet["actype"] = df_sheet["actype"].fillna("").astype(str)
+        df_sheet["route"] = df_sheet["route"].fillna("").astype(str)
+
+        # For MB, sheet_name is derived from route
+        df_sheet["sheet_name"] = self.mb_sheet_column(df_sheet["route"])
+
+        # Convert numeric columns (vectorized, same result as convert_to_float)
+        self._convert_numeric_columns(df_sheet, file_name)
+
+        # Extract specified columns
+        return df_sheet[self.columns_to_extract].copy()
+
     def _process_sheet_common(
         self, df_sheet: pd.DataFrame, file_name: str, sheet_name: str
     ) -> pd.DataFrame:
@@ -328,253 +612,1335 @@ class ExcelBatchProcessor:
             df_sheet["actype"] = df_sheet["actype"].fillna("").astype(str)
             df_sheet["route"] = df_sheet["route"].fillna("").astype(str)
 
-            # Convert numeric columns using custom conversion function
+            # Convert numeric columns (vectorized, same result as convert_to_float)
+            try:
+                self._convert_numeric_columns(df_sheet, file_name)
+            except Exception as e:
+                logger.error(
+                    "Lỗi xử lý cột số thực trong sheet '%s' từ file '%s': %s",
+                    sheet_name,
+                    file_name,
+                    e,
+                )
             for col in self.numeric_columns:
-                try:
-                    df_sheet[col] = df_sheet[col].apply(self.convert_to_float)
-                    df_sheet[col] = df_sheet[col].fillna(0)
-                except Exception as e:
-                    logging.error(
-                        f"Lỗi xử lý cột số thực '{col}' trong sheet '{sheet_name}' từ file '{file_name}': {e}"
-                    )
-                    df_sheet[col] = df_sheet[col].fillna(0)
+                df_sheet[col] = df_sheet[col].fillna(0)
 
             # Extract specified columns
             extracted_df = df_sheet[self.columns_to_extract].copy()
             return extracted_df
 
         except Exception as e:
-            logging.error(f"Lỗi xử lý sheet '{sheet_name}' từ file '{file_name}': {e}")
+            logger.error(
+                "Lỗi xử lý sheet '%s' từ file '%s': %s", sheet_name, file_name, e
+            )
             return pd.DataFrame()
 
-    def is_file_imported(self, file_name: str) -> bool:
+    def iter_excel_chunks(self, file_path: str) -> Iterator[Tuple[str, pd.DataFrame]]:
         """
-        Kiểm tra file đã import chưa
+        Đọc file Excel theo từng sheet, mỗi sheet chia thành các chunk tối đa chunk_size dòng
+
+        File .xlsx được đọc bằng openpyxl read_only nên chỉ giữ một chunk trong bộ nhớ.
+        Giá trị cell được chuyển đổi giống pd.read_excel (TextParser, NA values, bỏ các dòng
+        trống ở cuối sheet). File .xls (xlrd) không hỗ trợ read_only nên đọc từng sheet một.
 
         Args:
-            file_name (str): Tên file Excel
+            file_path (str): Đường dẫn đến file Excel
 
         Returns:
-            bool: True nếu file đã import, False nếu không
+            Iterator[Tuple[str, pd.DataFrame]]: (tên sheet, DataFrame của chunk)
         """
 
+        if not file_path.lower().endswith(".xlsx"):
+            with pd.ExcelFile(file_path) as excel_file:
+                for sheet_name in excel_file.sheet_names:
+                    yield sheet_name, excel_file.parse(sheet_name)
+            return
+
+        workbook = load_workbook(
+            file_path, read_only=True, data_only=True, keep_links=False
+        )
+
         try:
-            query = text("SELECT 1 FROM import_log WHERE file_name = :file_name")
-            result = self.db.execute(query, {"file_name": file_name}).fetchone()
-            return result is not None
-        except Exception as e:
-            logging.error(f"Lỗi kiểm tra file đã import: {e}")
-            return False
+            for worksheet in workbook.worksheets:
+                header = None
+                width = 0
+                rows = []
+                pending_empty_rows = []
+
+                for row in worksheet.iter_rows(values_only=True):
+                    converted_row = [self._convert_excel_cell(value) for value in row]
+                    while converted_row and converted_row[-1] == "":
+                        converted_row.pop()
+
+                    if header is None:
+                        # Dòng đầu tiên là header (giống header=0 của pd.read_excel)
+                        width = max(len(converted_row), worksheet.max_column or 0)
+                        header = converted_row + [""] * (width - len(converted_row))
+                        continue
+
+                    converted_row = converted_row[:width]
+                    converted_row += [""] * (width - len(converted_row))
+
+                    # Dòng trống chỉ được giữ lại nếu phía sau còn dữ liệu
+                    if not any(value != "" for value in converted_row):
+                        pending_empty_rows.append(converted_row)
+                        continue
+
+                    rows.extend(pending_empty_rows)
+                    pending_empty_rows = []
+                    rows.append(converted_row)
+
+                    if len(rows) >= self.chunk_size:
+                        yield worksheet.title, self._rows_to_dataframe(header, rows)
+                        rows = []
 
-    def mark_file_imported(self, file_name: str, source_type: str, row_count: int):
+                # Các dòng trống còn lại ở cuối sheet bị bỏ qua
+                if rows:
+                    yield worksheet.title, self._rows_to_dataframe(header, rows)
+
+        finally:
+            workbook.close()
+
+    def _convert_excel_cell(self, value: Any) -> Any:
         """
-        Đánh dấu file đã import
+        Chuyển giá trị cell openpyxl giống cách pandas đọc Excel
 
         Args:
-            file_name (str): Tên file Excel
-            source_type (str): Loại source
-            row_count (int): Số lượng dòng
+            value (Any): Giá trị cell
 
         Returns:
-            None
+            Any: "" cho cell trống, int cho số thực nguyên, giá trị gốc cho các trường hợp khác
         """
 
-        try:
-            insert_query = text(
-                """
-                INSERT INTO import_log (file_name, source_type, row_count)
-                VALUES (:file_name, :source_type, :row_count)
-            """
-            )
-            self.db.execute(
-                insert_query,
-                {
-                    "file_name": file_name,
-                    "source_type": source_type,
-                    "row_count": row_count,
-                },
-            )
-            print(f"Đã đánh dấu file đã import: {file_name}")
-        except Exception as e:
-            logging.error(f"Lỗi đánh dấu file đã import: {e}")
-            raise e
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
 
-    def batch_import_files(
-        self, data_folder: str, destination_folder: str
-    ) -> Dict[str, Any]:
+    def _rows_to_dataframe(self, header: List[Any], rows: List[List[Any]]) -> pd.DataFrame:
         """
-        Import batch các file Excel từ folder
+        Tạo DataFrame từ header và các dòng dữ liệu của một chunk
+
+        Dùng dtype object để kiểu cột không phụ thuộc vào nội dung từng chunk
+        (ví dụ cột flightno chỉ có số trong một chunk sẽ không bị đổi thành float).
 
         Args:
-            data_folder (str): Đường dẫn đến folder chứa các file Excel
-            destination_folder (str): Đường dẫn đến folder chứa các file Excel đã import
+            header (List[Any]): Dòng header của sheet
+            rows (List[List[Any]]): Các dòng dữ liệu
 
         Returns:
-            Dict[str, Any]: Kết quả xử lý
+            pd.DataFrame: DataFrame của chunk
         """
 
-        results = {
-            "processed_files": 0,
-            "total_rows": 0,
-            "skipped_files": 0,
-            "errors": [],
-            "file_details": [],
-        }
+        parser = TextParser(
+            [header] + rows, header=0, skip_blank_lines=False, dtype=object
+        )
+        return parser.read()
 
-        try:
-            # Ensure destination folder exists
-            os.makedirs(destination_folder, exist_ok=True)
+    def iter_processed_chunks(
+        self, file_path: str, file_name: str
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Xử lý file Excel theo từng chunk (streaming) cho cả MN, MT và MB
 
-            # Process each file in the data folder
-            for file_name in os.listdir(data_folder):
-                if not self._is_excel_file(file_name):
-                    continue
+        Args:
+            file_path (str): Đường dẫn đến file Excel
+            file_name (str): Tên file Excel
 
-                try:
-                    # Check if file already imported
-                    if self.is_file_imported(file_name):
-                        print(f"{file_name} đã được import trước đó, bỏ qua.")
-                        results["skipped_files"] += 1
-                        continue
+        Returns:
+            Iterator[pd.DataFrame]: Các DataFrame đã xử lý, mỗi cái tối đa chunk_size dòng
+        """
 
-                    print(f"Đang xử lý: {file_name}")
+        file_type = self.find_matching_key(file_name)
+        if not file_type:
+            logger.error("Không thể xác định loại file: %s", file_name)
+            return
 
-                    # Process Excel file
-                    file_path = os.path.join(data_folder, file_name)
-                    df = self.process_excel_file(file_path, file_name)
+        current_sheet = None
+        last_flightdate = None
 
-                    if df.empty:
-                        results["errors"].append(
-                            f"Không có dữ liệu được trích xuất từ file {file_name}"
-                        )
-                        continue
+        for sheet_name, df_chunk in self.iter_excel_chunks(file_path):
+            # Process only sheets with at least 1 character
+            if len(sheet_name) < 1 or df_chunk.empty:
+                continue
 
-                    row_count = len(df)
-                    print(f"Đã trích xuất {row_count} dòng từ file {file_name}")
+            # flightdate được ffill trong sheet, nên phải mang giá trị cuối sang chunk kế tiếp
+            if sheet_name != current_sheet:
+                current_sheet = sheet_name
+                last_flightdate = None
 
-                    # Save to database
-                    self._save_to_database(df)
+            flightdate_cols = [
+                col for col in df_chunk.columns if str(col).lower() == "flightdate"
+            ]
+            if flightdate_cols:
+                col = flightdate_cols[0]
+                # Chunk được đọc với dtype object, giữ nguyên kiểu giá trị khi ffill
+                with pd.option_context("future.no_silent_downcasting", True):
+                    df_chunk[col] = df_chunk[col].ffill()
+                    if last_flightdate is not None:
+                        df_chunk[col] = df_chunk[col].fillna(last_flightdate)
+                last_valid = df_chunk[col].last_valid_index()
+                if last_valid is not None:
+                    last_flightdate = df_chunk[col].loc[last_valid]
+
+            if file_type == "MB":
+                processed_df = self._process_mb_sheet(df_chunk, file_name)
+            else:
+                processed_df = self._process_sheet_common(
+                    df_chunk, file_name, sheet_name
+                )
 
-                    # Mark file as imported
-                    self.mark_file_imported(file_name, "batch_excel", row_count)
+            if not processed_df.empty:
+                yield processed_df
 
-                    # Move processed file to destination folder
-                    shutil.move(file_path, os.path.join(destination_folder, file_name))
+    def import_excel_file(
+        self, file_path: str, file_name: str, file_hash: Optional[str] = None
+    ) -> int:
+        """
+        Đọc, xử lý và lưu một file Excel vào flight_raw
 
-                    print(f"Đã import file: {file_name}")
+        Ở chế độ streaming, mỗi chunk được ghi ngay vào flight_raw nên bộ nhớ chỉ phụ thuộc
+        chunk_size. Toàn bộ file nằm trong một savepoint: lỗi giữa chừng sẽ không để lại
+        dữ liệu dở dang. Khi có file_hash và parse cache đang bật, kết quả parse được
+        lấy từ cache (nếu có) hoặc lưu vào cache cho lần sau.
 
-                    results["processed_files"] += 1
-                    results["total_rows"] += row_count
-                    results["file_details"].append(
-                        {"file_name": file_name, "rows": row_count}
-                    )
+        Args:
+            file_path (str): Đường dẫn đến file Excel
+            file_name (str): Tên file Excel
+            file_hash (str, optional): SHA-256 của file, dùng làm key của parse cache
 
-                except Exception as e:
-                    error_msg = f"Lỗi xử lý file {file_name}: {e}"
-                    print(error_msg)
-                    results["errors"].append(error_msg)
+        Returns:
+            int: Số dòng đã trích xuất (0 nếu không có dữ liệu)
+        """
 
-            # Commit all changes
-            self.db.commit()
+        self.load_stats.pop(file_name, None)
 
-        except Exception as e:
-            self.db.rollback()
-            results["errors"].append(f"Lỗi batch import: {str(e)}")
+        cached = self._get_parse_cache_entry(file_hash, file_name)
+        if cached is not None:
+            return self._load_spilled_chunks(file_name, cached["chunk_paths"])
 
-        return results
+        self.coercion_report[file_name] = {}
 
-    def _is_excel_file(self, file_name: str) -> bool:
+        # Các chunk được ghi thêm ra file pickle để đưa vào parse cache sau khi xong
+        spill_dir = (
+            tempfile.mkdtemp(prefix="excel_spill_")
+            if file_hash and self.parse_cache
+            else None
+        )
+        chunk_paths = []
+
+        try:
+            if not self.streaming:
+                df = self.process_excel_file(file_path, file_name)
+                chunks = [df] if not df.empty else []
+            else:
+                chunks = self.iter_processed_chunks(file_path, file_name)
+
+            row_count = 0
+            with self.db.begin_nested():
+                for chunk_df in chunks:
+                    self._save_to_database(chunk_df, file_name)
+                    row_count += len(chunk_df)
+
+                    if spill_dir:
+                        chunk_path = os.path.join(spill_dir, f"{len(chunk_paths):06d}.pkl")
+                        chunk_df.to_pickle(chunk_path)
+                        chunk_paths.append(chunk_path)
+
+            if row_count == 0:
+                logger.warning("Không có dữ liệu được trích xuất từ file: %s", file_name)
+            elif spill_dir:
+                self._store_in_parse_cache(file_hash, file_name, chunk_paths)
+
+            return row_count
+
+        finally:
+            if spill_dir:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+
+    def import_excel_files(
+        self,
+        files: List[Tuple[str, str]],
+        file_hashes: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Tuple[str, int, Optional[Exception]]]:
         """
-        Kiểm tra có phải file Excel không
+        Import nhiều file Excel vào flight_raw, giữ đúng thứ tự danh sách
+
+        Khi parse_workers > 1, các file được parse song song trong process pool và ghi ra
+        file spill (pickle) trong thư mục tạm. Việc ghi flight_raw vẫn chạy tuần tự trong
+        process hiện tại theo thứ tự của files, nên kết quả không phụ thuộc file nào
+        parse xong trước. File đã có trong parse cache không cần parse lại.
 
         Args:
-            file_name (str): Tên file Excel
+            files (List[Tuple[str, str]]): Danh sách (đường dẫn file, tên file)
+            file_hashes (Dict[str, str], optional): SHA-256 theo tên file
 
         Returns:
-            bool: True nếu là file Excel, False nếu không
+            Iterator[Tuple[str, int, Optional[Exception]]]: (tên file, số dòng, lỗi nếu có)
         """
 
-        excel_extensions = [".xlsx", ".xls"]
-        return any(file_name.lower().endswith(ext) for ext in excel_extensions)
+        file_hashes = file_hashes or {}
+
+        if self.parse_workers <= 1 or len(files) <= 1:
+            for file_path, file_name in files:
+                try:
+                    row_count = self.import_excel_file(
+                        file_path, file_name, file_hashes.get(file_name)
+                    )
+                    self._log_coercion_report(file_name)
+                    yield file_name, row_count, None
+                except Exception as e:
+                    yield file_name, 0, e
+            return
+
+        cached_entries = {
+            file_name: self._get_parse_cache_entry(file_hashes.get(file_name), file_name)
+            for _, file_name in files
+        }
+        files_to_parse = [
+            (index, file_path, file_name)
+            for index, (file_path, file_name) in enumerate(files)
+            if cached_entries[file_name] is None
+        ]
 
-    def _save_to_database(self, df: pd.DataFrame):
+        workers = max(1, min(self.parse_workers, len(files_to_parse)))
+        logger.info(
+            "Parse song song %s file với %s process", len(files_to_parse), workers
+        )
+
+        with tempfile.TemporaryDirectory(prefix="excel_spill_") as spill_root:
+            # Process con ghi log thẳng ra stdout, giữ correlation id của request / job
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=setup_worker_logging,
+                initargs=(get_correlation_id(),),
+            ) as executor:
+                futures = {
+                    file_name: executor.submit(
+                        _parse_excel_file_to_spill,
+                        file_path,
+                        file_name,
+                        os.path.join(spill_root, str(index)),
+                        self.streaming,
+                        self.chunk_size,
+                        self.search_list,
+                    )
+                    for index, file_path, file_name in files_to_parse
+                }
+
+                try:
+                    for _, file_name in files:
+                        self.load_stats.pop(file_name, None)
+                        try:
+                            if cached_entries[file_name] is not None:
+                                row_count = self._load_spilled_chunks(
+                                    file_name, cached_entries[file_name]["chunk_paths"]
+                                )
+                            else:
+                                parsed = futures[file_name].result()
+                                self.coercion_report[file_name] = parsed[
+                                    "coercion_report"
+                                ]
+                                row_count = self._load_spilled_chunks(
+                                    file_name, parsed["chunk_paths"]
+                                )
+                                if row_count > 0:
+                                    self._store_in_parse_cache(
+                                        file_hashes.get(file_name),
+                                        file_name,
+                                        parsed["chunk_paths"],
+                                    )
+
+                            self._log_coercion_report(file_name)
+                            if row_count == 0:
+                                logger.warning(
+                                    "Không có dữ liệu được trích xuất từ file: %s",
+                                    file_name,
+                                )
+                            yield file_name, row_count, None
+                        except Exception as e:
+                            yield file_name, 0, e
+                finally:
+                    for future in futures.values():
+                        future.cancel()
+
+    def _get_parse_cache_entry(
+        self, file_hash: Optional[str], file_name: str
+    ) -> Optional[Dict[str, Any]]:
         """
-        Lưu DataFrame vào database sử dụng bulk insert
+        Lấy kết quả parse của file từ parse cache
 
         Args:
-            df (pd.DataFrame): DataFrame cần lưu
+            file_hash (str, optional): SHA-256 của file
+            file_name (str): Tên file Excel
 
         Returns:
-            None
+            Dict[str, Any] or None: Entry cache (chunk_paths, coercion_report) hoặc None
         """
 
-        try:
-            # Filter: chỉ lưu các row có flightno và actype không null
-            filtered_df = df[df["flightno"].notna() & df["actype"].notna()][
-                [
-                    "flightdate",
-                    "flightno",
-                    "route",
-                    "actype",
-                    "seat",
-                    "adl",
-                    "chd",
-                    "cgo",
-                    "mail",
-                    "totalpax",
-                    "source",
-                    "acregno",
-                    "sheet_name",
-                ]
-            ]
+        if not file_hash or not self.parse_cache:
+            return None
 
-            # Convert DataFrame to SQL
-            filtered_df.to_sql(
-                "flight_raw",
-                con=self.db.bind,
-                if_exists="append",
-                index=False,
-                dtype={
-                    "source": UnicodeText(),
-                    "sheet_name": UnicodeText(),
-                    "flightdate": UnicodeText(),
-                },
-            )
+        cached = self.parse_cache.get(file_hash, file_name, self.search_list)
+        if cached is not None:
+            logger.debug("Dùng kết quả parse từ cache cho file: %s", file_name)
+            self.coercion_report[file_name] = cached["coercion_report"]
 
-            # Log số lượng rows đã lọc
-            original_count = len(df)
-            filtered_count = len(filtered_df)
-            if original_count > filtered_count:
-                logging.info(
-                    f"📊 Đã lọc {original_count - filtered_count} rows thiếu flightno/actype"
-                )
+        return cached
 
+    def _store_in_parse_cache(
+        self, file_hash: Optional[str], file_name: str, chunk_paths: List[str]
+    ) -> None:
+        """
+        Đưa các chunk đã parse của file vào parse cache
+
+        Args:
+            file_hash (str, optional): SHA-256 của file
+            file_name (str): Tên file Excel
+            chunk_paths (List[str]): Đường dẫn các chunk theo thứ tự
+
+        Returns:
+            None
+        """
+
+        if not file_hash or not self.parse_cache:
+            return
+
+        self.parse_cache.put(
+            file_hash,
+            file_name,
+            self.search_list,
+            chunk_paths,
+            self.coercion_report.get(file_name, {}),
+        )
+
+    def _load_spilled_chunks(self, file_name: str, chunk_paths: List[str]) -> int:
+        """
+        Ghi các chunk đã parse (file spill hoặc parse cache) của một file vào flight_raw
+
+        Args:
+            file_name (str): Tên file Excel
+            chunk_paths (List[str]): Đường dẫn các chunk theo đúng thứ tự
+
+        Returns:
+            int: Số dòng đã ghi
+        """
+
+        row_count = 0
+        with self.db.begin_nested():
+            for chunk_path in chunk_paths:
+                chunk_df = pd.read_pickle(chunk_path)
+                self._save_to_database(chunk_df, file_name)
+                row_count += len(chunk_df)
+
+        return row_count
+
+    def get_import_batch_id(self) -> str:
+        """
+        Lấy import batch id của processor, tạo mới ở lần gọi đầu tiên
+
+        Returns:
+            str: Import batch id (uuid dạng hex, 32 ký tự)
+        """
+
+        if self.import_batch_id is None:
+            self.import_batch_id = uuid.uuid4().hex
+
+        return self.import_batch_id
+
+    def is_file_imported(self, file_name: str, file_hash: Optional[str] = None) -> bool:
+        """
+        Kiểm tra file đã import chưa
+
+        Khi có file_hash, file được coi là đã import nếu nội dung trùng với một file đã
+        import (kể cả khi đổi tên). Các dòng import_log cũ chưa có hash vẫn so theo tên.
+
+        Args:
+            file_name (str): Tên file Excel
+            file_hash (str, optional): SHA-256 của file
+
+        Returns:
+            bool: True nếu file đã import, False nếu không
+        """
+
+        try:
+            if file_hash:
+                query = text(
+                    """
+                    SELECT 1 FROM import_log
+                    WHERE file_hash = :file_hash
+                       OR (file_hash IS NULL AND file_name = :file_name)
+                    """
+                )
+                params = {"file_hash": file_hash, "file_name": file_name}
+            else:
+                query = text("SELECT 1 FROM import_log WHERE file_name = :file_name")
+                params = {"file_name": file_name}
+
+            result = self.db.execute(query, params).fetchone()
+            return result is not None
         except Exception as e:
-            logging.error(f"Lỗi lưu vào database: {e}")
+            logger.error("Lỗi kiểm tra file đã import: %s", e)
+            return False
+
+    def mark_file_imported(
+        self,
+        file_name: str,
+        source_type: str,
+        row_count: int,
+        file_hash: Optional[str] = None,
+    ):
+        """
+        Đánh dấu file đã import, ghi kèm import batch id của processor
+
+        Args:
+            file_name (str): Tên file Excel
+            source_type (str): Loại source
+            row_count (int): Số lượng dòng
+            file_hash (str, optional): SHA-256 của nội dung file
+
+        Returns:
+            None
+        """
+
+        try:
+            insert_query = text(
+                """
+                INSERT INTO import_log (file_name, source_type, row_count, file_hash, import_batch_id)
+                VALUES (:file_name, :source_type, :row_count, :file_hash, :import_batch_id)
+            """
+            )
+            self.db.execute(
+                insert_query,
+                {
+                    "file_name": file_name,
+                    "source_type": source_type,
+                    "row_count": row_count,
+                    "file_hash": file_hash,
+                    "import_batch_id": self.get_import_batch_id(),
+                },
+            )
+            logger.info("Đã đánh dấu file đã import: %s", file_name)
+        except Exception as e:
+            logger.error("Lỗi đánh dấu file đã import: %s", e)
+            raise e
+
+    def get_imported_files(
+        self, files: List[Tuple[str, Optional[str]]]
+    ) -> Set[str]:
+        """
+        Kiểm tra trạng thái đã import của cả danh sách file bằng một query
+
+        Cùng quy tắc với is_file_imported: trùng hash với file đã import (kể cả khi đổi
+        tên), hoặc trùng tên với các dòng import_log cũ chưa có hash. Danh sách rất lớn
+        được chia lô IMPORT_LOG_BATCH_SIZE file để không vượt giới hạn tham số.
+
+        Args:
+            files (List[Tuple[str, Optional[str]]]): Danh sách (tên file, SHA-256)
+
+        Returns:
+            Set[str]: Tên các file đã được import
+        """
+
+        imported = set()
+
+        for start in range(0, len(files), IMPORT_LOG_BATCH_SIZE):
+            batch = files[start : start + IMPORT_LOG_BATCH_SIZE]
+            file_names = [file_name for file_name, _ in batch]
+            file_hashes = [file_hash for _, file_hash in batch if file_hash] or [""]
+
+            query = text(
+                """
+                SELECT file_name, file_hash FROM import_log
+                WHERE file_hash IN :file_hashes
+                   OR (file_hash IS NULL AND file_name IN :file_names)
+                """
+            ).bindparams(
+                bindparam("file_hashes", expanding=True),
+                bindparam("file_names", expanding=True),
+            )
+
+            rows = self.db.execute(
+                query, {"file_hashes": file_hashes, "file_names": file_names}
+            ).fetchall()
+
+            imported_hashes = {row.file_hash for row in rows if row.file_hash}
+            imported_names = {row.file_name for row in rows if not row.file_hash}
+
+            for file_name, file_hash in batch:
+                if (file_hash and file_hash in imported_hashes) or (
+                    file_name in imported_names
+                ):
+                    imported.add(file_name)
+
+        return imported
+
+    def mark_files_imported(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Đánh dấu nhiều file đã import bằng một câu INSERT nhiều dòng, ghi kèm import
+        batch id của processor
+
+        Args:
+            entries (List[Dict[str, Any]]): Mỗi phần tử gồm file_name, source_type,
+                row_count, file_hash
+
+        Returns:
+            None
+        """
+
+        try:
+            import_batch_id = self.get_import_batch_id()
+
+            for start in range(0, len(entries), IMPORT_LOG_BATCH_SIZE):
+                batch = entries[start : start + IMPORT_LOG_BATCH_SIZE]
+
+                values = []
+                params = {"import_batch_id": import_batch_id}
+                for index, entry in enumerate(batch):
+                    values.append(
+                        f"(:file_name_{index}, :source_type_{index}, :row_count_{index}, :file_hash_{index}, :import_batch_id)"
+                    )
+                    params[f"file_name_{index}"] = entry["file_name"]
+                    params[f"source_type_{index}"] = entry["source_type"]
+                    params[f"row_count_{index}"] = entry["row_count"]
+                    params[f"file_hash_{index}"] = entry.get("file_hash")
+
+                insert_query = text(
+                    "INSERT INTO import_log (file_name, source_type, row_count, file_hash, import_batch_id) VALUES "
+                    + ", ".join(values)
+                )
+                self.db.execute(insert_query, params)
+
+            if entries:
+                logger.info("Đã đánh dấu %s file đã import", len(entries))
+        except Exception as e:
+            logger.error("Lỗi đánh dấu file đã import: %s", e)
             raise e
 
-    def run_data_cleaning_stored_procedure(self):
+    def batch_import_files(
+        self, data_folder: str, destination_folder: str
+    ) -> Dict[str, Any]:
+        """
+        Import batch các file Excel từ folder
+
+        Args:
+            data_folder (str): Đường dẫn đến folder chứa các file Excel
+            destination_folder (str): Đường dẫn đến folder chứa các file Excel đã import
+
+        Returns:
+            Dict[str, Any]: Kết quả xử lý
+        """
+
+        results = {
+            "processed_files": 0,
+            "total_rows": 0,
+            "skipped_files": 0,
+            "errors": [],
+            "file_details": [],
+        }
+
+        try:
+            # Ensure destination folder exists
+            os.makedirs(destination_folder, exist_ok=True)
+
+            # Hash all files, then check import_log for the whole folder in one query
+            candidates = []
+            file_hashes = {}
+            for file_name in sorted(os.listdir(data_folder)):
+                if not self._is_excel_file(file_name):
+                    continue
+
+                try:
+                    file_hashes[file_name] = compute_file_hash(
+                        os.path.join(data_folder, file_name)
+                    )
+                    candidates.append(file_name)
+                except Exception as e:
+                    error_msg = f"Lỗi xử lý file {file_name}: {e}"
+                    logger.error(error_msg)
+                    results["errors"].append(error_msg)
+
+            imported_files = self.get_imported_files(
+                [(file_name, file_hashes[file_name]) for file_name in candidates]
+            )
+
+            pending_files = []
+            pending_hashes = set()
+            for file_name in candidates:
+                # Skip files (or the same content under another name) already imported
+                if (
+                    file_name in imported_files
+                    or file_hashes[file_name] in pending_hashes
+                ):
+                    logger.info("%s đã được import trước đó, bỏ qua.", file_name)
+                    results["skipped_files"] += 1
+                    continue
+
+                logger.debug("Đang xử lý: %s", file_name)
+                pending_files.append((os.path.join(data_folder, file_name), file_name))
+                pending_hashes.add(file_hashes[file_name])
+
+            # Save to database in folder order (in parallel parsing if configured)
+            imported_entries = []
+            for file_name, row_count, error in self.import_excel_files(
+                pending_files, file_hashes
+            ):
+                try:
+                    if error is not None:
+                        raise error
+
+                    if row_count == 0:
+                        results["errors"].append(
+                            f"Không có dữ liệu được trích xuất từ file {file_name}"
+                        )
+                        continue
+
+                    logger.info(
+                        "Đã trích xuất %s dòng từ file %s",
+                        row_count,
+                        file_name,
+                        extra={"file_name": file_name, "rows": row_count},
+                    )
+
+                    imported_entries.append(
+                        {
+                            "file_name": file_name,
+                            "source_type": "batch_excel",
+                            "row_count": row_count,
+                            "file_hash": file_hashes[file_name],
+                        }
+                    )
+
+                    results["processed_files"] += 1
+                    results["total_rows"] += row_count
+                    results["file_details"].append(
+                        {
+                            "file_name": file_name,
+                            "rows": row_count,
+                            "coerced_to_zero": self.get_coercion_report(file_name),
+                            **self.get_load_stats(file_name),
+                        }
+                    )
+
+                except Exception as e:
+                    error_msg = f"Lỗi xử lý file {file_name}: {e}"
+                    logger.error(error_msg)
+                    results["errors"].append(error_msg)
+
+            # Mark all imported files in one insert
+            self.mark_files_imported(imported_entries)
+
+            # Move processed files to destination folder
+            for entry in imported_entries:
+                shutil.move(
+                    os.path.join(data_folder, entry["file_name"]),
+                    os.path.join(destination_folder, entry["file_name"]),
+                )
+                logger.info("Đã import file: %s", entry['file_name'])
+
+            # Commit all changes
+            self.db.commit()
+            processing_summary_cache.invalidate()
+
+        except Exception as e:
+            self.db.rollback()
+            results["errors"].append(f"Lỗi batch import: {str(e)}")
+
+        return results
+
+    def process_uploaded_files(
+        self,
+        uploaded_files: List[Tuple[str, str]],
+        results: Dict[str, Any],
+        tracker: Optional[StageTracker] = None,
+        file_hashes: Optional[Dict[str, str]] = None,
+        on_raw_commit: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Xử lý các file Excel đã upload: import vào flight_raw, ghi import_log và
+        chạy stored procedures làm sạch, validate dữ liệu (clean_imported_batch)
+
+        Args:
+            uploaded_files (List[Tuple[str, str]]): Danh sách (đường dẫn file, tên file)
+                theo thứ tự upload
+            results (Dict[str, Any]): Kết quả xử lý, được cập nhật trực tiếp
+            tracker (StageTracker, optional): Ghi trạng thái, số dòng, thời gian từng stage
+            file_hashes (Dict[str, str], optional): SHA-256 đã tính khi upload, file
+                chưa có hash sẽ được tính lại
+            on_raw_commit (Callable, optional): Gọi với results ngay trước khi commit raw
+                data, trong cùng transaction (ví dụ lưu import batch của job)
+
+        Returns:
+            Dict[str, Any]: Kết quả xử lý
+        """
+
+        tracker = tracker or StageTracker()
+        file_hashes = dict(file_hashes or {})
+
+        candidates = []
+        for file_path, file_name in uploaded_files:
+            try:
+                if file_name not in file_hashes:
+                    file_hashes[file_name] = compute_file_hash(file_path)
+                candidates.append((file_path, file_name))
+            except Exception as e:
+                error_msg = f"Lỗi xử lý file {file_name}: {str(e)}"
+                logger.error("❌ %s", error_msg)
+                results["errors"].append(error_msg)
+
+        with tracker.stage("parse_load") as stage:
+            # Check import_log for all uploaded files in one query
+            imported_files = self.get_imported_files(
+                [(file_name, file_hashes[file_name]) for _, file_name in candidates]
+            )
+
+            pending_files = []
+            pending_hashes = set()
+            file_types = {}
+
+            for file_path, file_name in candidates:
+                # Skip files (or the same content under another name) already imported
+                if (
+                    file_name in imported_files
+                    or file_hashes[file_name] in pending_hashes
+                ):
+                    logger.info("⏭️ File %s đã được import trước đó", file_name)
+                    results["skipped_files"] += 1
+                    continue
+
+                logger.debug("🔄 Đang xử lý file: %s", file_name)
+
+                # Determine file type first
+                file_type = self.find_matching_key(file_name)
+                if not file_type:
+                    results["errors"].append(
+                        f"Không thể xác định loại file: {file_name}"
+                    )
+                    continue
+
+                logger.debug("📁 Loại file: %s - %s", file_type, file_name)
+
+                pending_files.append((file_path, file_name))
+                pending_hashes.add(file_hashes[file_name])
+                file_types[file_name] = file_type
+
+            # Process Excel files using notebook logic (in parallel if configured)
+            # and save to flight_raw table in upload order
+            imported_entries = []
+            for file_name, row_count, error in self.import_excel_files(
+                pending_files, file_hashes
+            ):
+                try:
+                    if error is not None:
+                        raise error
+
+                    file_type = file_types[file_name]
+
+                    if row_count == 0:
+                        results["errors"].append(
+                            f"Không có dữ liệu từ file {file_name}"
+                        )
+                        continue
+
+                    logger.debug("📊 Extracted %s rows từ %s", row_count, file_name)
+
+                    imported_entries.append(
+                        {
+                            "file_name": file_name,
+                            "source_type": file_type,
+                            "row_count": row_count,
+                            "file_hash": file_hashes[file_name],
+                        }
+                    )
+
+                    results["processed_files"] += 1
+                    results["total_rows"] += row_count
+                    results["file_details"].append(
+                        {
+                            "file_name": file_name,
+                            "file_type": file_type,
+                            "rows": row_count,
+                            "coerced_to_zero": self.get_coercion_report(file_name),
+                            **self.get_load_stats(file_name),
+                        }
+                    )
+
+                    logger.info(
+                        "✅ Đã lưu %s bản ghi từ file %s",
+                        row_count,
+                        file_name,
+                        extra={"file_name": file_name, "rows": row_count},
+                    )
+
+                except Exception as e:
+                    error_msg = f"Lỗi xử lý file {file_name}: {str(e)}"
+                    logger.error("❌ %s", error_msg)
+                    results["errors"].append(error_msg)
+
+            stage["rows_in"] = results["total_rows"]
+            stage["rows"] = sum(
+                detail["loaded_rows"] for detail in results["file_details"]
+            )
+
+        with tracker.stage("import_log") as stage:
+            # Mark all imported files (with file type) in one insert
+            stage["rows_in"] = len(imported_entries)
+            self.mark_files_imported(imported_entries)
+            results["import_batch_id"] = self.import_batch_id
+
+            if on_raw_commit:
+                on_raw_commit(results)
+
+            # Commit raw data first
+            self.db.commit()
+            processing_summary_cache.invalidate()
+            stage["rows"] = len(imported_entries)
+            logger.info("💾 Đã commit %s bản ghi raw data", results['total_rows'])
+
+        # Run data cleaning and processing if files were processed
+        if results["processed_files"] > 0:
+            self.clean_imported_batch(results, tracker)
+
+        return results
+
+    def clean_imported_batch(
+        self, results: Dict[str, Any], tracker: Optional[StageTracker] = None
+    ) -> Dict[str, Any]:
+        """
+        Làm sạch, validate import batch của processor (raw data đã commit) và tính
+        summary của batch
+
+        Lỗi stored procedure được ghi vào results["errors"] và đánh dấu
+        results["cleaning_failed"] = True thay vì raise.
+
+        Args:
+            results (Dict[str, Any]): Kết quả xử lý, được cập nhật trực tiếp
+            tracker (StageTracker, optional): Ghi trạng thái, số dòng, thời gian từng stage
+
+        Returns:
+            Dict[str, Any]: Kết quả xử lý
+        """
+
+        tracker = tracker or StageTracker()
+
+        logger.info("🧹 Bắt đầu quá trình làm sạch và xử lý dữ liệu...")
+
+        try:
+            # Step 1: Clean and process flight data
+            with tracker.stage("clean") as stage:
+                logger.info("1️⃣ Chạy stored procedure: usp_CleanAndProcessFlightData")
+                stage["rows_in"] = sum(
+                    detail["loaded_rows"] for detail in results["file_details"]
+                )
+                self.run_data_cleaning_stored_procedure()
+                batch_counts = self.get_batch_row_counts()
+                stage["rows"] = batch_counts["valid_rows"] + batch_counts["error_rows"]
+
+            # Step 2: Validate and move error data
+            with tracker.stage("validate") as stage:
+                logger.info("2️⃣ Chạy stored procedure: usp_CleanAndValidateFlightData")
+                stage["rows_in"] = batch_counts["error_rows"]
+                self.run_validation_stored_procedure()
+
+            # Get processing summary for CURRENT BATCH only
+            with tracker.stage("summary") as stage:
+                results["processing_summary"] = self.get_batch_summary()
+                stage["rows_in"] = results["processing_summary"]["raw_records"]
+                stage["rows"] = results["processing_summary"]["processed_records"]
+
+            logger.info("✅ Hoàn thành quá trình làm sạch và xử lý dữ liệu")
+
+        except Exception as sp_error:
+            logger.warning("⚠️ Lỗi khi chạy stored procedures: %s", sp_error)
+            results["errors"].append(f"Lỗi stored procedure: {str(sp_error)}")
+            results["cleaning_failed"] = True
+
+        return results
+
+    def _is_excel_file(self, file_name: str) -> bool:
+        """
+        Kiểm tra có phải file Excel không
+
+        Args:
+            file_name (str): Tên file Excel
+
+        Returns:
+            bool: True nếu là file Excel, False nếu không
+        """
+
+        excel_extensions = [".xlsx", ".xls"]
+        return any(file_name.lower().endswith(ext) for ext in excel_extensions)
+
+    def _save_to_database(self, df: pd.DataFrame, file_name: Optional[str] = None) -> int:
+        """
+        Lưu DataFrame vào database sử dụng bulk insert
+
+        Trên SQL Server dùng executemany theo từng lô insert_chunk_size dòng (engine bật
+        fast_executemany của pyodbc). Các dialect khác dùng DataFrame.to_sql.
+
+        Với VALIDATION_ENGINE=python, các dòng được validate ngay và ghi vào
+        flight_data_chot / error_table trong cùng transaction.
+
+        Args:
+            df (pd.DataFrame): DataFrame cần lưu
+            file_name (str, optional): Tên file Excel, dùng để ghi nhận tốc độ ghi
+
+        Returns:
+            int: Số dòng đã ghi
+        """
+
+        try:
+            # Filter: chỉ lưu các row có flightno và actype không null
+            filtered_df = df[df["flightno"].notna() & df["actype"].notna()][
+                self.flight_raw_columns
+            ]
+
+            start_time = time.perf_counter()
+
+            filtered_df = self._normalize_flight_dates(filtered_df).assign(
+                import_batch_id=self.get_import_batch_id()
+            )
+
+            # Dùng connection của session để nằm trong cùng transaction
+            connection = self.db.connection()
+            with track_step("insert_flight_raw"):
+                if connection.dialect.name == "mssql":
+                    self._bulk_insert(
+                        connection, "flight_raw", filtered_df, self.flight_raw_text_columns
+                    )
+                else:
+                    filtered_df.to_sql(
+                        "flight_raw",
+                        con=connection,
+                        if_exists="append",
+                        index=False,
+                        chunksize=self.insert_chunk_size,
+                        dtype={
+                            "source": UnicodeText(),
+                            "sheet_name": UnicodeText(),
+                            "flightdate": UnicodeText(),
+                            "flight_date": Date(),
+                            "flight_date_status": SmallInteger(),
+                        },
+                    )
+
+            if file_name is not None:
+                stats = self.load_stats.setdefault(file_name, {"rows": 0, "seconds": 0.0})
+                stats["rows"] += len(filtered_df)
+                stats["seconds"] += time.perf_counter() - start_time
+
+            if self.validation_engine == "python":
+                with track_step("validate_python"):
+                    self._save_validated(connection, filtered_df, file_name)
+
+            # Log số lượng rows đã lọc
+            original_count = len(df)
+            filtered_count = len(filtered_df)
+            if original_count > filtered_count:
+                logger.info(
+                    "📊 Đã lọc %s rows thiếu flightno/actype",
+                    original_count - filtered_count,
+                )
+
+            return filtered_count
+
+        except Exception as e:
+            logger.error("Lỗi lưu vào database: %s", e)
+            raise e
+
+    def _normalize_flight_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parse flightdate một lần khi import, thêm cột flight_date (kiểu date) và
+        flight_date_status để các stored procedure và export không phải parse lại chuỗi
+
+        flightdate được parse ở dạng chuỗi như khi ghi vào flight_raw.
+
+        Args:
+            df (pd.DataFrame): DataFrame đã lọc, đúng thứ tự flight_raw_columns
+
+        Returns:
+            pd.DataFrame: DataFrame kèm flight_date, flight_date_status
+        """
+
+        flightdate_text = df["flightdate"].map(
+            lambda value: str(value) if pd.notna(value) else None
+        )
+        flight_dates, date_status = parse_flight_dates(flightdate_text)
+
+        return df.assign(flight_date=flight_dates, flight_date_status=date_status)
+
+    def _bulk_insert(
+        self, connection, table_name: str, df: pd.DataFrame, text_columns: List[str]
+    ) -> None:
+        """
+        Insert DataFrame bằng executemany theo lô (SQL Server, pyodbc fast_executemany)
+
+        fast_executemany bind theo kiểu của cả cột, nên các cột text được chuyển hết
+        sang chuỗi (ngày dạng datetime thành 'yyyy-mm-dd HH:MM:SS', khớp mẫu mà
+        usp_CleanAndProcessFlightData đang parse) và NaN thành NULL.
+
+        Args:
+            connection (Connection): Connection của session hiện tại
+            table_name (str): Tên bảng
+            df (pd.DataFrame): DataFrame với đúng các cột của bảng
+            text_columns (List[str]): Các cột text
+
+        Returns:
+            None
+        """
+
+        if df.empty:
+            return
+
+        records_df = df.astype(object)
+        for col in text_columns:
+            records_df[col] = records_df[col].map(
+                lambda value: str(value) if pd.notna(value) else None
+            )
+        records_df = records_df.where(records_df.notna(), None)
+
+        insert_query = text(
+            f"INSERT INTO {table_name} ("
+            + ", ".join(df.columns)
+            + ") VALUES ("
+            + ", ".join(f":{col}" for col in df.columns)
+            + ")"
+        )
+
+        for start in range(0, len(records_df), self.insert_chunk_size):
+            chunk = records_df.iloc[start : start + self.insert_chunk_size]
+            connection.execute(insert_query, chunk.to_dict(orient="records"))
+
+    def _save_validated(
+        self, connection, df: pd.DataFrame, file_name: Optional[str] = None
+    ) -> None:
+        """
+        Validate các dòng vừa ghi vào flight_raw và ghi thẳng vào flight_data_chot /
+        error_table, thay cho bước staging của usp_CleanAndProcessFlightData
+
+        Args:
+            connection (Connection): Connection của session hiện tại
+            df (pd.DataFrame): Các dòng đã ghi vào flight_raw
+            file_name (str, optional): Tên file Excel, dùng để ghi nhận số dòng
+
+        Returns:
+            None
+        """
+
+        # Dữ liệu tham chiếu chỉ nạp một lần cho mỗi processor
+        if self.validator is None:
+            self.validator = FlightValidator.from_db(self.db)
+
+        valid_df, error_df = self.validator.split(self.validator.validate(df))
+        valid_df = valid_df.assign(import_batch_id=self.get_import_batch_id())
+        error_df = error_df.assign(import_batch_id=self.get_import_batch_id())
+
+        for table_name, table_df, text_columns in [
+            ("flight_data_chot", valid_df, FLIGHT_DATA_CHOT_TEXT_COLUMNS),
+            ("error_table", error_df, ERROR_TABLE_TEXT_COLUMNS),
+        ]:
+            if connection.dialect.name == "mssql":
+                self._bulk_insert(connection, table_name, table_df, text_columns)
+            elif not table_df.empty:
+                table_df.to_sql(
+                    table_name,
+                    con=connection,
+                    if_exists="append",
+                    index=False,
+                    chunksize=self.insert_chunk_size,
+                )
+
+        if file_name is not None:
+            stats = self.validation_stats.setdefault(file_name, {"valid": 0, "error": 0})
+            stats["valid"] += len(valid_df)
+            stats["error"] += len(error_df)
+
+    def get_load_stats(self, file_name: str) -> Dict[str, Any]:
+        """
+        Lấy số dòng, thời gian và tốc độ ghi flight_raw của một file
+
+        Args:
+            file_name (str): Tên file Excel
+
+        Returns:
+            Dict[str, Any]: loaded_rows, load_seconds, rows_per_sec (kèm valid_rows,
+                error_rows khi VALIDATION_ENGINE=python)
+        """
+
+        stats = self.load_stats.get(file_name, {"rows": 0, "seconds": 0.0})
+        seconds = stats["seconds"]
+
+        load_stats = {
+            "loaded_rows": stats["rows"],
+            "load_seconds": round(seconds, 3),
+            "rows_per_sec": round(stats["rows"] / seconds, 1) if seconds > 0 else None,
+        }
+
+        if file_name in self.validation_stats:
+            load_stats["valid_rows"] = self.validation_stats[file_name]["valid"]
+            load_stats["error_rows"] = self.validation_stats[file_name]["error"]
+
+        return load_stats
+
+    def get_pending_batch_ids(self) -> List[str]:
+        """
+        Lấy các import batch đã import nhưng chưa được làm sạch (clean_data IS NULL)
+
+        Returns:
+            List[str]: Các import_batch_id, batch cũ nhất trước
+        """
+
+        rows = self.db.execute(
+            text(
+                "SELECT import_batch_id FROM import_log "
+                "WHERE clean_data IS NULL AND import_batch_id IS NOT NULL "
+                "GROUP BY import_batch_id ORDER BY MIN(created_at)"
+            )
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _clean_batch(self, batch_id: Optional[str]):
+        """
+        Làm sạch một import batch, chưa commit
+
+        Args:
+            batch_id (str, optional): Import batch cần làm sạch
+
+        Returns:
+            None
+        """
+
+        if self.validation_engine == "python":
+            # Dữ liệu đã được validate và ghi vào flight_data_chot / error_table khi import
+            logger.info("Bỏ qua usp_CleanAndProcessFlightData (VALIDATION_ENGINE=python)")
+            if batch_id:
+                self.db.execute(
+                    text(
+                        "UPDATE import_log SET clean_data = 1 "
+                        "WHERE import_batch_id = :batch_id AND clean_data IS NULL"
+                    ),
+                    {"batch_id": batch_id},
+                )
+        else:
+            logger.info("Chạy stored procedure làm sạch dữ liệu (batch %s)...", batch_id)
+            with track_step("usp_CleanAndProcessFlightData"):
+                self.db.execute(
+                    text("EXEC usp_CleanAndProcessFlightData @BatchId = :batch_id"),
+                    {"batch_id": batch_id},
+                )
+
+        # Chỉ đếm lại các missing dimension của batch (không có batch: dựng lại toàn bộ)
+        logger.info("Chạy stored procedure log missing dimensions...")
+        with track_step("usp_LogMissingDimensions"):
+            self.db.execute(
+                text("EXEC usp_LogMissingDimensions @BatchId = :batch_id"),
+                {"batch_id": batch_id},
+            )
+
+        # Đưa các dòng của batch vào bảng export đã enrich
+        refresh_flight_export_fact(self.db, batch_id)
+
+    def run_data_cleaning_stored_procedure(self, batch_id: Optional[str] = None):
         """
         Chạy stored procedure để làm sạch dữ liệu
 
+        Chỉ làm sạch các dòng của một import batch. Mặc định là batch processor vừa
+        import; nếu processor chưa import gì (chạy riêng từ API) thì stored procedure
+        làm sạch mọi file chưa xử lý như trước. Với VALIDATION_ENGINE=python dữ liệu đã
+        được validate khi import, chỉ đánh dấu import_log của batch là đã làm sạch.
+
+        Trước batch này, các batch cũ còn clean_data IS NULL (lần làm sạch trước bị lỗi)
+        được làm sạch lại, mỗi batch một transaction; batch lỗi chỉ được log và để lại
+        cho lần chạy sau.
+
+        Args:
+            batch_id (str, optional): Import batch cần làm sạch
+
         Returns:
             None
         """
 
+        batch_id = batch_id or self.import_batch_id
+
+        if batch_id:
+            for pending_id in self.get_pending_batch_ids():
+                if pending_id == batch_id:
+                    continue
+                try:
+                    logger.info("🔁 Làm sạch lại batch %s chưa được làm sạch", pending_id)
+                    self._clean_batch(pending_id)
+                    self.db.commit()
+                except Exception as e:
+                    self.db.rollback()
+                    logger.warning("⚠️ Chưa làm sạch được batch %s: %s", pending_id, e)
+
         try:
-            print("Chạy stored procedure làm sạch dữ liệu...")
-            self.db.execute(text("EXEC usp_CleanAndProcessFlightData"))
+            self._clean_batch(batch_id)
+            self.db.commit()
+            processing_summary_cache.invalidate()
+            logger.info("Làm sạch dữ liệu hoàn tất!")
+        except Exception as e:
+            self.db.rollback()
+            logger.error("Lỗi chạy stored procedure làm sạch dữ liệu: %s", e)
+            raise e
+
+    def run_validation_stored_procedure(self, full_sweep: bool = False):
+        """
+        Chạy stored procedure revalidate error_table và chuyển dòng hợp lệ sang flight_data_chot
+
+        Mặc định chỉ kiểm tra lại các dòng lỗi có route sector / actype vừa được thêm
+        hoặc sửa kể từ lần chạy trước (theo validation_watermark).
+
+        Args:
+            full_sweep (bool): True để kiểm tra lại toàn bộ error_table
 
-            print("Chạy stored procedure log missing dimensions...")
-            self.db.execute(text("EXEC usp_LogMissingDimensions"))
+        Returns:
+            None
+        """
 
+        try:
+            logger.info(
+                "Chạy stored procedure revalidate error_table (full_sweep=%s)...",
+                full_sweep,
+            )
+            with track_step("usp_CleanAndValidateFlightData"):
+                self.db.execute(
+                    text("EXEC usp_CleanAndValidateFlightData @FullSweep = :full_sweep"),
+                    {"full_sweep": 1 if full_sweep else 0},
+                )
             self.db.commit()
-            print("Làm sạch dữ liệu hoàn tất!")
+            processing_summary_cache.invalidate()
+            logger.info("Revalidate error_table hoàn tất!")
         except Exception as e:
             self.db.rollback()
-            logging.error(f"Lỗi chạy stored procedure làm sạch dữ liệu: {e}")
+            logger.error("Lỗi chạy stored procedure revalidate error_table: %s", e)
             raise e
 
+    def get_batch_row_counts(self, batch_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Đếm số dòng của một import batch trong flight_data_chot và error_table
+
+        Args:
+            batch_id (str, optional): Import batch (mặc định batch processor vừa import)
+
+        Returns:
+            Dict[str, int]: valid_rows, error_rows
+        """
+
+        row = self.db.execute(
+            text(
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM flight_data_chot WHERE import_batch_id = :batch_id) AS valid_rows,
+                    (SELECT COUNT(*) FROM error_table WHERE import_batch_id = :batch_id) AS error_rows
+                """
+            ),
+            {"batch_id": batch_id or self.import_batch_id},
+        ).fetchone()
+
+        return {"valid_rows": row.valid_rows, "error_rows": row.error_rows}
+
     def run_missing_dimensions_import(self):
         """
         Chạy stored procedure để import missing dimensions
@@ -584,71 +1950,41 @@ class ExcelBatchProcessor:
         """
 
         try:
-            print("Chạy stored procedure import missing dimensions...")
+            logger.info("Chạy stored procedure import missing dimensions...")
             self.db.execute(text("EXEC usp_ImportAndUpdateMissingDimensions"))
+            # actype_seat vừa được bổ sung: tính lại seat của các dòng export liên quan
+            refresh_flight_export_fact(self.db)
             self.db.commit()
-            print("Import missing dimensions hoàn tất!")
+            processing_summary_cache.invalidate()
+            logger.info("Import missing dimensions hoàn tất!")
         except Exception as e:
             self.db.rollback()
-            logging.error(f"Lỗi chạy stored procedure import missing dimensions: {e}")
+            logger.error("Lỗi chạy stored procedure import missing dimensions: %s", e)
             raise e
 
-    def get_processing_summary(self) -> Dict[str, Any]:
+    def get_processing_summary(self, use_cache: bool = True) -> Dict[str, Any]:
         """
         Lấy tóm tắt quá trình xử lý dữ liệu theo schema thực tế (TOÀN BỘ DATABASE)
 
+        Kết quả được cache PROCESSING_SUMMARY_CACHE_SECONDS giây, cache bị xoá khi
+        import / làm sạch / revalidate hoàn tất.
+
+        Args:
+            use_cache (bool): Dùng kết quả trong cache nếu còn hạn
+
         Returns:
             Dict[str, Any]: Tóm tắt quá trình xử lý dữ liệu
         """
 
         try:
-            # Get total records in each table
-            raw_count_result = self.db.execute(
-                text("SELECT COUNT(*) FROM flight_raw")
-            ).fetchone()
-
-            processed_count_result = self.db.execute(
-                text("SELECT COUNT(*) FROM flight_data_chot")
-            ).fetchone()
-
-            error_count_result = self.db.execute(
-                text("SELECT COUNT(*) FROM error_table")
-            ).fetchone()
-
-            missing_actype_result = self.db.execute(
-                text(
-                    "SELECT COUNT(*) FROM Missing_Dimensions_Log WHERE Type = 'ACTYPE'"
+            if use_cache:
+                return processing_summary_cache.get(
+                    "processing_summary", self._query_processing_summary
                 )
-            ).fetchone()
-
-            missing_route_result = self.db.execute(
-                text("SELECT COUNT(*) FROM Missing_Dimensions_Log WHERE Type = 'ROUTE'")
-            ).fetchone()
-
-            # Get imported files count
-            imported_files_result = self.db.execute(
-                text("SELECT COUNT(*) FROM import_log")
-            ).fetchone()
-
-            return {
-                "raw_records": raw_count_result[0] if raw_count_result else 0,
-                "processed_records": (
-                    processed_count_result[0] if processed_count_result else 0
-                ),
-                "error_records": error_count_result[0] if error_count_result else 0,
-                "missing_actypes": (
-                    missing_actype_result[0] if missing_actype_result else 0
-                ),
-                "missing_routes": (
-                    missing_route_result[0] if missing_route_result else 0
-                ),
-                "imported_files": (
-                    imported_files_result[0] if imported_files_result else 0
-                ),
-            }
+            return self._query_processing_summary()
 
         except Exception as e:
-            logging.error(f"Lỗi lấy tóm tắt quá trình xử lý dữ liệu: {e}")
+            logger.error("Lỗi lấy tóm tắt quá trình xử lý dữ liệu: %s", e)
             return {
                 "raw_records": 0,
                 "processed_records": 0,
@@ -658,119 +1994,208 @@ class ExcelBatchProcessor:
                 "imported_files": 0,
             }
 
-    def get_current_session_summary(self, source_files: List[str]) -> Dict[str, Any]:
+    def _query_processing_summary(self) -> Dict[str, Any]:
         """
-        Lấy tóm tắt quá trình xử lý CHỈ CHO BATCH HIỆN TẠI (filtered by source files)
+        Đếm số bản ghi các bảng của pipeline trong một câu query
 
-        Args:
-            source_files: Danh sách tên files đã xử lý trong session hiện tại
+        Với SQL Server, flight_raw / flight_data_chot / error_table (nhiều triệu dòng)
+        lấy số dòng từ metadata (sys.partitions) thay vì COUNT(*); Missing_Dimensions_Log
+        và import_log nhỏ nên đếm chính xác.
 
         Returns:
-            Dict[str, Any]: Tóm tắt quá trình xử lý của batch hiện tại
+            Dict[str, Any]: Tóm tắt quá trình xử lý dữ liệu
         """
-        try:
-            if not source_files:
-                return {
-                    "raw_records": 0,
-                    "processed_records": 0,
-                    "error_records": 0,
-                    "missing_actypes": 0,
-                    "missing_routes": 0,
-                    "imported_files": 0,
-                }
 
-            # Build IN clause for SQL query
-            files_placeholder = ", ".join(
-                [f":file_{i}" for i in range(len(source_files))]
+        if self.db.get_bind().dialect.name == "mssql":
+            table_count = (
+                "(SELECT ISNULL(SUM(p.rows), 0) FROM sys.partitions p "
+                "WHERE p.object_id = OBJECT_ID('{table}') AND p.index_id IN (0, 1))"
             )
-            files_params = {f"file_{i}": file for i, file in enumerate(source_files)}
+        else:
+            table_count = "(SELECT COUNT(*) FROM {table})"
 
-            # Get records count from flight_raw for current batch
-            raw_count_result = self.db.execute(
+        row = (
+            self.db.execute(
                 text(
-                    f"SELECT COUNT(*) FROM flight_raw WHERE source IN ({files_placeholder})"
-                ),
-                files_params,
-            ).fetchone()
+                    f"""
+                    SELECT
+                        {table_count.format(table="flight_raw")} AS raw_records,
+                        {table_count.format(table="flight_data_chot")} AS processed_records,
+                        {table_count.format(table="error_table")} AS error_records,
+                        (
+                            SELECT COUNT(*) FROM Missing_Dimensions_Log
+                            WHERE Type = 'ACTYPE'
+                        ) AS missing_actypes,
+                        (
+                            SELECT COUNT(*) FROM Missing_Dimensions_Log
+                            WHERE Type = 'ROUTE'
+                        ) AS missing_routes,
+                        (SELECT COUNT(*) FROM import_log) AS imported_files
+                    """
+                )
+            )
+            .mappings()
+            .one()
+        )
 
-            # Get records count from flight_data_chot for current batch
-            processed_count_result = self.db.execute(
-                text(
-                    f"SELECT COUNT(*) FROM flight_data_chot WHERE source IN ({files_placeholder})"
-                ),
-                files_params,
-            ).fetchone()
+        return {key: int(value or 0) for key, value in row.items()}
 
-            # Get records count from error_table for current batch
-            error_count_result = self.db.execute(
-                text(
-                    f"SELECT COUNT(*) FROM error_table WHERE source IN ({files_placeholder})"
-                ),
-                files_params,
-            ).fetchone()
+    def get_batch_summary(self, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lấy tóm tắt quá trình xử lý CHỈ CHO MỘT IMPORT BATCH, kèm chi tiết từng file
 
-            # Get missing actypes from Missing_Dimensions_Log for current batch
-            # Note: Missing_Dimensions_Log có thể không có source column,
-            # nên ta lấy từ error_table của batch hiện tại
-            missing_actype_result = self.db.execute(
-                text(
-                    f"""
-                    SELECT COUNT(DISTINCT actype) 
-                    FROM error_table 
-                    WHERE source IN ({files_placeholder})
-                    AND Is_InvalidActypeSeat = 1
-                    AND actype IS NOT NULL
-                """
-                ),
-                files_params,
-            ).fetchone()
+        Một query gộp các dòng của batch trong flight_raw, flight_data_chot, error_table
+        và import_log (seek theo index import_batch_id), group theo source; dòng cuối
+        (file_name NULL) là tổng của cả batch.
 
-            # Get missing routes from error_table for current batch
-            missing_route_result = self.db.execute(
-                text(
-                    f"""
-                    SELECT COUNT(DISTINCT route) 
-                    FROM error_table 
-                    WHERE source IN ({files_placeholder})
-                    AND Is_InvalidRoute = 1
-                    AND route IS NOT NULL
-                """
-                ),
-                files_params,
-            ).fetchone()
+        Args:
+            batch_id (str, optional): Import batch (mặc định batch processor vừa import)
+
+        Returns:
+            Dict[str, Any]: Tóm tắt của batch và danh sách "files" theo từng file
+        """
+
+        summary = {
+            "import_batch_id": batch_id or self.import_batch_id,
+            "raw_records": 0,
+            "processed_records": 0,
+            "error_records": 0,
+            "missing_actypes": 0,
+            "missing_routes": 0,
+            "imported_files": 0,
+            "files": [],
+        }
+
+        if not summary["import_batch_id"]:
+            return summary
 
-            # Get imported files count for current batch
-            imported_files_result = self.db.execute(
+        try:
+            rows = self.db.execute(
                 text(
-                    f"SELECT COUNT(*) FROM import_log WHERE file_name IN ({files_placeholder})"
+                    """
+                    WITH batch_rows AS (
+                        SELECT source, 1 AS raw_record, 0 AS processed_record,
+                            0 AS error_record,
+                            CAST(NULL AS NVARCHAR(255)) AS missing_actype,
+                            CAST(NULL AS NVARCHAR(255)) AS missing_route,
+                            0 AS imported_file
+                        FROM flight_raw
+                        WHERE import_batch_id = :batch_id
+                        UNION ALL
+                        SELECT source, 0, 1, 0, NULL, NULL, 0
+                        FROM flight_data_chot
+                        WHERE import_batch_id = :batch_id
+                        UNION ALL
+                        SELECT source, 0, 0, 1,
+                            CASE WHEN Is_InvalidActypeSeat = 1 THEN actype END,
+                            CASE WHEN Is_InvalidRoute = 1 THEN route END,
+                            0
+                        FROM error_table
+                        WHERE import_batch_id = :batch_id
+                        UNION ALL
+                        SELECT file_name, 0, 0, 0, NULL, NULL, 1
+                        FROM import_log
+                        WHERE import_batch_id = :batch_id
+                    )
+                    SELECT
+                        source AS file_name,
+                        SUM(raw_record) AS raw_records,
+                        SUM(processed_record) AS processed_records,
+                        SUM(error_record) AS error_records,
+                        COUNT(DISTINCT missing_actype) AS missing_actypes,
+                        COUNT(DISTINCT missing_route) AS missing_routes,
+                        SUM(imported_file) AS imported_files,
+                        0 AS is_total
+                    FROM batch_rows
+                    GROUP BY source
+                    UNION ALL
+                    SELECT
+                        CAST(NULL AS NVARCHAR(500)),
+                        SUM(raw_record),
+                        SUM(processed_record),
+                        SUM(error_record),
+                        COUNT(DISTINCT missing_actype),
+                        COUNT(DISTINCT missing_route),
+                        SUM(imported_file),
+                        1
+                    FROM batch_rows
+                    ORDER BY is_total, file_name
+                    """
                 ),
-                files_params,
-            ).fetchone()
+                {"batch_id": summary["import_batch_id"]},
+            ).mappings()
+
+            counts = (
+                "raw_records",
+                "processed_records",
+                "error_records",
+                "missing_actypes",
+                "missing_routes",
+            )
+            for row in rows:
+                if row["is_total"]:
+                    summary.update({key: int(row[key] or 0) for key in counts})
+                    summary["imported_files"] = int(row["imported_files"] or 0)
+                else:
+                    summary["files"].append(
+                        {
+                            "file_name": row["file_name"],
+                            **{key: int(row[key] or 0) for key in counts},
+                        }
+                    )
 
-            return {
-                "raw_records": raw_count_result[0] if raw_count_result else 0,
-                "processed_records": (
-                    processed_count_result[0] if processed_count_result else 0
-                ),
-                "error_records": error_count_result[0] if error_count_result else 0,
-                "missing_actypes": (
-                    missing_actype_result[0] if missing_actype_result else 0
-                ),
-                "missing_routes": (
-                    missing_route_result[0] if missing_route_result else 0
-                ),
-                "imported_files": (
-                    imported_files_result[0] if imported_files_result else 0
-                ),
-            }
+            return summary
 
         except Exception as e:
-            logging.error(f"Lỗi lấy tóm tắt batch hiện tại: {e}")
-            return {
-                "raw_records": 0,
-                "processed_records": 0,
-                "error_records": 0,
-                "missing_actypes": 0,
-                "missing_routes": 0,
-                "imported_files": 0,
-            }
+            logger.error("Lỗi lấy tóm tắt batch %s: %s", summary["import_batch_id"], e)
+            return summary
+
+
+def _parse_excel_file_to_spill(
+    file_path: str,
+    file_name: str,
+    spill_dir: str,
+    streaming: bool,
+    chunk_size: int,
+    search_list: List[str],
+) -> Dict[str, Any]:
+    """
+    Parse một file Excel trong process con và ghi các chunk ra file spill
+
+    Args:
+        file_path (str): Đường dẫn đến file Excel
+        file_name (str): Tên file Excel
+        spill_dir (str): Thư mục chứa các file spill của file này
+        streaming (bool): Đọc Excel theo từng chunk
+        chunk_size (int): Số dòng mỗi chunk
+        search_list (List[str]): Mã sân bay cho file MB
+
+    Returns:
+        Dict[str, Any]: Đường dẫn các chunk, số dòng và số cell bị ép về 0
+    """
+
+    processor = ExcelBatchProcessor(
+        None, streaming=streaming, chunk_size=chunk_size, search_list=search_list
+    )
+
+    if streaming:
+        chunks = processor.iter_processed_chunks(file_path, file_name)
+    else:
+        df = processor.process_excel_file(file_path, file_name)
+        chunks = [df] if not df.empty else []
+
+    os.makedirs(spill_dir, exist_ok=True)
+    chunk_paths = []
+    row_count = 0
+
+    for index, chunk_df in enumerate(chunks):
+        chunk_path = os.path.join(spill_dir, f"{index:06d}.pkl")
+        chunk_df.to_pickle(chunk_path)
+        chunk_paths.append(chunk_path)
+        row_count += len(chunk_df)
+
+    return {
+        "chunk_paths": chunk_paths,
+        "row_count": row_count,
+        "coercion_report": processor.coercion_report.get(file_name, {}),
+    }
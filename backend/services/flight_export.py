@@ -0,0 +1,658 @@
+import base64
+import csv
+import datetime
+import io
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.engine import Result, Row
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.services.flight_export_fact import is_flight_export_fact_built
+
+
+logger = logging.getLogger(__name__)
+
+
+# Các định dạng output của /export-flight-data: json (một document), ndjson / csv (stream),
+# xlsx (file Excel ghi bằng openpyxl write-only)
+EXPORT_FORMATS = ("json", "ndjson", "csv", "xlsx")
+
+# Query export dữ liệu chuyến bay đã enrich (SECTOR_DOM, ROUTE_, FLIGHT_DATA, DATA_),
+# tính lại mỗi lần (FLIGHT_EXPORT_SOURCE=live) trên các dòng flight_raw trong khoảng thời gian
+#! ===== UPDATE HERE
+FLIGHT_EXPORT_QUERY = text(
+    """
+    WITH SECTOR_DOM AS (
+        SELECT 
+            CASE 
+                WHEN LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1) 
+                    < RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR))
+                    THEN SECTOR
+                ELSE RIGHT(SECTOR, LEN(SECTOR) - CHARINDEX('-', SECTOR)) 
+                    + '-' 
+                    + LEFT(SECTOR, CHARINDEX('-', SECTOR) - 1)
+            END AS ROUTE,
+            SECTOR,
+            [Area_Lv1],
+            [DOM/INT]
+        FROM SECTOR_ROUTE_DOM_REF
+    ),
+    ROUTE_ AS (
+        SELECT 
+            ROUTE,
+            [Area_Lv1] AS AREA
+        FROM SECTOR_DOM
+        WHERE UPPER(LTRIM(RTRIM([DOM/INT]))) = 'DOM'
+        GROUP BY ROUTE, [Area_Lv1]
+    ),
+    FLIGHT_DATA AS (
+        SELECT 
+            f.id,
+            CAST(f.flight_date AS DATETIME) AS flightdate,
+
+            flightno,
+            route,
+            f.actype,
+            COALESCE(f.seat, s.seat) AS seat,
+            adl, chd, cgo, mail,
+            source, acregno, sheet_name,
+
+            CASE 
+                WHEN totalpax > 0 THEN totalpax
+                ELSE ISNULL(adl, 0) + ISNULL(chd, 0)
+            END AS totalpax,
+
+            CASE 
+                WHEN totalpax = 0 
+                    AND (ISNULL(cgo, 0) + ISNULL(mail, 0) > 0) THEN 0
+                WHEN totalpax > 0 THEN 1
+            END AS FLIGHT_TYPE
+
+        FROM flight_raw f
+        LEFT JOIN AIRPORT_REF dep 
+            ON LEFT(TRIM(f.route), 3) = dep.IATACode
+        LEFT JOIN AIRPORT_REF arr 
+            ON RIGHT(TRIM(f.route), 3) = arr.IATACode
+        LEFT JOIN actype_seat s 
+            ON LOWER(TRIM(f.actype)) = LOWER(TRIM(s.actype))
+
+        -- Lọc khoảng thời gian trước tiên: seek trên index flight_date, chỉ các dòng
+        -- trong khoảng đi qua các join / CTE phía sau
+        WHERE f.flight_date >= :start_day
+            AND f.flight_date <= :end_day
+            AND CAST(f.flight_date AS DATETIME) >= :start_date
+            AND CAST(f.flight_date AS DATETIME) <= :end_date
+            AND CASE 
+                WHEN CHARINDEX('SGN', route) > 1 
+                    AND sheet_name != 'SGN' THEN 0
+                WHEN sheet_name = 'SGN' THEN 1
+                WHEN CASE
+                        WHEN dep.Country = 'Vietnam' 
+                            AND arr.Country = 'Vietnam' THEN 'DOM'
+                        WHEN dep.Country IS NOT NULL 
+                            AND arr.Country IS NOT NULL 
+                            AND (dep.Country != 'Vietnam' 
+                                OR arr.Country != 'Vietnam') THEN 'INT'
+                        ELSE NULL
+                    END = 'INT' THEN 2
+                WHEN sheet_name = LEFT(route, 3) THEN 3
+                ELSE -1
+            END > 0
+    ),
+    DATA_ AS (
+        SELECT
+            CASE 
+                WHEN LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1) 
+                    < RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE))
+                    THEN F.ROUTE
+                ELSE RIGHT(F.ROUTE, LEN(F.ROUTE) - CHARINDEX('-', F.ROUTE)) 
+                    + '-' 
+                    + LEFT(F.ROUTE, CHARINDEX('-', F.ROUTE) - 1)
+            END AS ROUTE_SORT,
+
+            F.*,
+            LEFT(TRIM(F.FLIGHTNO), 2) AS AIRLINE_CODE,
+            A.AIRLINES_NAME,
+            A.AIRLINE_NATION,
+
+            LEFT(F.ROUTE, 3) AS DEPARTURE,
+            RIGHT(F.ROUTE, 3) AS ARRIVES,
+
+            CASE 
+                WHEN UPPER(AI.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'VIETNAM'
+                WHEN UPPER(AI.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(AI1.COUNTRY) <> 'VIETNAM' THEN AI1.COUNTRY
+                ELSE AI.COUNTRY
+            END AS COUNTRY,
+
+            CASE 
+                WHEN UPPER(AI.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(AI1.COUNTRY) = 'VIETNAM' THEN 'DOM'
+                ELSE 'INT'
+            END AS INT_DOM,
+
+            CASE 
+                WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
+                WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[2_LETTER_CODE]
+                ELSE C.[2_LETTER_CODE]
+            END AS COUNTRY_CODE,
+
+            CASE 
+                WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(C1.COUNTRY) = 'VIETNAM' THEN 'VN'
+                WHEN UPPER(C.COUNTRY) = 'VIETNAM' 
+                    AND UPPER(C1.COUNTRY) <> 'VIETNAM' THEN C1.[REGION_(VNM)]
+                ELSE C.[REGION_(VNM)]
+            END AS AREA,
+
+            AI.CITY AS CITY_ARRIVES,
+            AI.COUNTRY AS COUNTRY_ARRIVES,
+            AI1.CITY AS CITY_DEPARTURE,
+            AI1.COUNTRY AS COUNTRY_DEPARTURE,
+            C2.[2_LETTER_CODE] AS AIRLINE_NATION_CODE
+        FROM FLIGHT_DATA F
+        LEFT JOIN AIRLINE_REF A 
+            ON LEFT(F.FLIGHTNO, 2) = A.CARRIER
+        LEFT JOIN AIRPORT_REF AI 
+            ON AI.IATACODE = RIGHT(F.ROUTE, 3)
+        LEFT JOIN AIRPORT_REF AI1 
+            ON AI1.IATACODE = LEFT(F.ROUTE, 3)
+        LEFT JOIN COUNTRY_REF C 
+            ON AI.COUNTRY = C.COUNTRY
+        LEFT JOIN COUNTRY_REF C1 
+            ON AI1.COUNTRY = C1.COUNTRY
+        LEFT JOIN COUNTRY_REF C2 
+            ON C2.COUNTRY = A.AIRLINE_NATION
+    )
+    SELECT  
+        D.flightdate,
+        D.FLIGHTNO,
+        D.ROUTE,
+        D.ACTYPE,
+        D.TOTALPAX,
+        D.CGO,
+        D.MAIL,
+        D.ACREGNO,
+        D.SOURCE,
+        D.SHEET_NAME,
+        D.SEAT,
+        D.INT_DOM,
+        D.AIRLINE_CODE,
+        D.AIRLINES_NAME,
+        D.AIRLINE_NATION,
+        D.AIRLINE_NATION_CODE,
+        DEPARTURE,
+        CITY_DEPARTURE,
+        COUNTRY_DEPARTURE,
+        ARRIVES,
+        CITY_ARRIVES,
+        COUNTRY_ARRIVES,
+        COUNTRY_CODE,
+        D.AREA AS AREA_CODE
+
+    FROM DATA_ AS D
+    LEFT JOIN ROUTE_ AS S 
+        ON D.ROUTE_SORT = S.ROUTE;
+    """
+)
+
+# Các cột output của bảng flight_export_fact (tên như FLIGHT_EXPORT_QUERY)
+#! ===== UPDATE HERE
+FLIGHT_EXPORT_FACT_SELECT = """flightdate,
+        flightno AS FLIGHTNO,
+        route AS ROUTE,
+        actype AS ACTYPE,
+        totalpax AS TOTALPAX,
+        cgo AS CGO,
+        mail AS MAIL,
+        acregno AS ACREGNO,
+        source AS SOURCE,
+        sheet_name AS SHEET_NAME,
+        seat AS SEAT,
+        int_dom AS INT_DOM,
+        airline_code AS AIRLINE_CODE,
+        airlines_name AS AIRLINES_NAME,
+        airline_nation AS AIRLINE_NATION,
+        airline_nation_code AS AIRLINE_NATION_CODE,
+        departure AS DEPARTURE,
+        city_departure AS CITY_DEPARTURE,
+        country_departure AS COUNTRY_DEPARTURE,
+        arrives AS ARRIVES,
+        city_arrives AS CITY_ARRIVES,
+        country_arrives AS COUNTRY_ARRIVES,
+        country_code AS COUNTRY_CODE,
+        area_code AS AREA_CODE"""
+
+# Cùng kết quả với FLIGHT_EXPORT_QUERY, đọc từ bảng flight_export_fact đã enrich sẵn
+# (usp_RefreshFlightExportFact): range scan trên clustered index (flight_date, id).
+# Điều kiện theo flight_date (DATE) để seek, điều kiện theo flightdate giữ đúng giờ của khoảng
+FLIGHT_EXPORT_FACT_QUERY = text(
+    f"""
+    SELECT
+        {FLIGHT_EXPORT_FACT_SELECT}
+    FROM flight_export_fact
+    WHERE flight_date >= :start_day
+        AND flight_date <= :end_day
+        AND flightdate >= :start_date
+        AND flightdate <= :end_date
+        AND type_filter > 0
+    ORDER BY flight_date, id;
+    """
+)
+
+# Một trang export (/export-flight-data/page) trên bảng flight_export_fact, keyset theo
+# clustered index (flight_date, id), không OFFSET. Hai nhánh đều là seek trên index:
+# phần còn lại của ngày :after_day sau :after_id (seek theo (flight_date, id)) và các ngày
+# sau :after_day; mỗi nhánh đọc tối đa :limit dòng, nên chi phí một trang không phụ thuộc
+# vị trí của cursor trong khoảng hay trong một ngày nhiều chuyến bay
+FLIGHT_EXPORT_PAGE_QUERY = text(
+    f"""
+    SELECT TOP (:limit) *
+    FROM (
+        SELECT *
+        FROM (
+            SELECT TOP (:limit)
+                id,
+                flight_date,
+                {FLIGHT_EXPORT_FACT_SELECT}
+            FROM flight_export_fact
+            WHERE flight_date = :after_day
+                AND id > :after_id
+                AND flight_date <= :end_day
+                AND flightdate >= :start_date
+                AND flightdate <= :end_date
+                AND type_filter > 0
+            ORDER BY id
+        ) AS same_day
+        UNION ALL
+        SELECT *
+        FROM (
+            SELECT TOP (:limit)
+                id,
+                flight_date,
+                {FLIGHT_EXPORT_FACT_SELECT}
+            FROM flight_export_fact
+            WHERE flight_date > :after_day
+                AND flight_date <= :end_day
+                AND flightdate >= :start_date
+                AND flightdate <= :end_date
+                AND type_filter > 0
+            ORDER BY flight_date, id
+        ) AS later_days
+    ) AS page
+    ORDER BY flight_date, id;
+    """
+)
+
+# Tên key trong output và cột tương ứng của FLIGHT_EXPORT_QUERY, theo thứ tự
+#! ===== UPDATE HERE =====
+FLIGHT_EXPORT_COLUMNS: List[Tuple[str, str]] = [
+    ("flightdate", "flightdate"),
+    ("flightno", "FLIGHTNO"),
+    ("route", "ROUTE"),
+    ("actype", "ACTYPE"),
+    ("totalpax", "TOTALPAX"),
+    ("cgo", "CGO"),
+    ("mail", "MAIL"),
+    ("acregno", "ACREGNO"),
+    ("source", "SOURCE"),
+    ("sheet_name", "SHEET_NAME"),
+    ("seat", "SEAT"),
+    ("int_dom", "INT_DOM"),
+    ("airline_code", "AIRLINE_CODE"),
+    ("airlines_name", "AIRLINES_NAME"),
+    ("airline_nation", "AIRLINE_NATION"),
+    ("airline_nation_code", "AIRLINE_NATION_CODE"),
+    ("departure", "DEPARTURE"),
+    ("city_departure", "CITY_DEPARTURE"),
+    ("country_departure", "COUNTRY_DEPARTURE"),
+    ("arrives", "ARRIVES"),
+    ("city_arrives", "CITY_ARRIVES"),
+    ("country_arrives", "COUNTRY_ARRIVES"),
+    ("country_code", "COUNTRY_CODE"),
+    ("area_code", "AREA_CODE"),
+]
+
+# Header của sheet "Flight Report" trong file xlsx (cùng thứ tự FLIGHT_EXPORT_COLUMNS)
+FLIGHT_EXPORT_XLSX_SHEET = "Flight Report"
+FLIGHT_EXPORT_XLSX_HEADER = [
+    "STT",
+    "Flight Date",
+    "Flight No",
+    "Route",
+    "Aircraft Type",
+    "Total Pax",
+    "Cargo",
+    "Mail",
+    "Aircraft Registration",
+    "Source",
+    "Sheet Name",
+    "Seat",
+    "Int/Dom",
+    "Airline Code",
+    "Airlines Name",
+    "Airline Nation",
+    "Airline Nation Code",
+    "Departure",
+    "City Departure",
+    "Country Departure",
+    "Arrives",
+    "City Arrives",
+    "Country Arrives",
+    "Country Code",
+    "Area Code",
+]
+
+
+def parse_export_range(
+    start_date: str, end_date: str
+) -> Tuple[datetime.datetime, datetime.datetime]:
+    """
+    Đọc và kiểm tra khoảng thời gian export
+
+    Args:
+        start_date (str): Ngày giờ bắt đầu (YYYY-MM-DD HH:MM:SS)
+        end_date (str): Ngày giờ kết thúc (YYYY-MM-DD HH:MM:SS)
+
+    Returns:
+        Tuple[datetime, datetime]: (start, end)
+    """
+
+    try:
+        start = datetime.datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S")
+        end = datetime.datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ngày giờ không hợp lệ. Vui lòng nhập lại.",
+        )
+
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ngày giờ bắt đầu phải trước ngày giờ kết thúc.",
+        )
+
+    return start, end
+
+
+def execute_flight_export(
+    db: Session,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    fetch_size: int = 0,
+) -> Result:
+    """
+    Chạy query export trong khoảng thời gian (bảng flight_export_fact hoặc query enrich
+    đầy đủ theo FLIGHT_EXPORT_SOURCE). Khi flight_export_fact chưa được dựng lần nào
+    thì dùng query enrich đầy đủ thay vì trả về kết quả rỗng
+
+    Args:
+        db (Session): Session của database
+        start (datetime): Ngày giờ bắt đầu
+        end (datetime): Ngày giờ kết thúc
+        fetch_size (int): > 0 thì đọc cursor theo từng lô fetch_size dòng (yield_per)
+            thay vì buffer toàn bộ kết quả
+
+    Returns:
+        Result: Kết quả query
+    """
+
+    execution_options = {"yield_per": fetch_size} if fetch_size > 0 else {}
+    use_fact = settings.FLIGHT_EXPORT_SOURCE != "live"
+    if use_fact and not is_flight_export_fact_built(db):
+        logger.warning("⚠️ flight_export_fact chưa được dựng, export bằng query đầy đủ")
+        use_fact = False
+    query = FLIGHT_EXPORT_FACT_QUERY if use_fact else FLIGHT_EXPORT_QUERY
+
+    # start_day / end_day (DATE) để seek theo ngày bay, start_date / end_date giữ đúng giờ
+    return db.execute(
+        query,
+        {
+            "start_day": start.date(),
+            "end_day": end.date(),
+            "start_date": start,
+            "end_date": end,
+        },
+        execution_options=execution_options,
+    )
+
+
+def encode_export_cursor(flight_date: datetime.date, row_id: int) -> str:
+    """
+    Tạo cursor (opaque, an toàn trên URL) trỏ tới sau dòng (flight_date, id) của
+    flight_export_fact
+
+    Args:
+        flight_date (date): Ngày bay của dòng cuối trang
+        row_id (int): ID của dòng cuối trang
+
+    Returns:
+        str: Cursor
+    """
+
+    payload = json.dumps({"d": str(flight_date), "i": int(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_export_cursor(cursor: str) -> Tuple[datetime.date, int]:
+    """
+    Đọc cursor tạo bởi encode_export_cursor
+
+    Args:
+        cursor (str): Cursor
+
+    Returns:
+        Tuple[date, int]: (flight_date, id) của dòng cuối trang trước
+    """
+
+    try:
+        payload = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        )
+        return datetime.date.fromisoformat(payload["d"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor không hợp lệ.",
+        )
+
+
+def fetch_flight_export_page(
+    db: Session,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    page_size: int,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Đọc một trang export từ bảng flight_export_fact theo keyset (flight_date, id)
+
+    Trang đầu tiên bắt đầu từ đầu khoảng thời gian; các trang sau truyền next_cursor
+    của trang trước. Có thể chia khoảng thời gian thành nhiều khoảng nhỏ để đọc song
+    song, hoặc đọc tiếp từ cursor cuối cùng sau khi bị ngắt.
+
+    Args:
+        db (Session): Session của database
+        start (datetime): Ngày giờ bắt đầu
+        end (datetime): Ngày giờ kết thúc
+        page_size (int): Số dòng tối đa của trang
+        cursor (str, optional): next_cursor của trang trước
+
+    Returns:
+        Dict[str, Any]: {"rows": [...], "next_cursor": str hoặc None}
+    """
+
+    after_day, after_id = start.date(), 0
+    if cursor:
+        cursor_day, cursor_id = decode_export_cursor(cursor)
+        if cursor_day >= after_day:
+            after_day, after_id = cursor_day, cursor_id
+
+    # Đọc thêm một dòng để biết còn trang sau hay không
+    rows = db.execute(
+        FLIGHT_EXPORT_PAGE_QUERY,
+        {
+            "limit": page_size + 1,
+            "after_day": after_day,
+            "after_id": after_id,
+            "end_day": end.date(),
+            "start_date": start,
+            "end_date": end,
+        },
+    ).fetchall()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    last = rows[-1]._mapping if rows else None
+
+    return {
+        "rows": rows,
+        "next_cursor": (
+            encode_export_cursor(last["flight_date"], last["id"]) if has_more else None
+        ),
+    }
+
+
+def row_to_export_dict(row: Row) -> Dict[str, Any]:
+    """
+    Chuyển một dòng kết quả export thành dict theo FLIGHT_EXPORT_COLUMNS
+
+    Args:
+        row (Row): Dòng kết quả của FLIGHT_EXPORT_QUERY
+
+    Returns:
+        Dict[str, Any]: Dữ liệu chuyến bay
+    """
+
+    mapping = row._mapping
+    return {key: mapping[column] for key, column in FLIGHT_EXPORT_COLUMNS}
+
+
+def _export_value(value: Any) -> Any:
+    """Giá trị ghi ra NDJSON / CSV: ngày giờ theo ISO 8601 như response JSON"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def _stream_rows(
+    result: Result, db: Session, format_batch, prefix: str = ""
+) -> Iterator[str]:
+    """
+    Đọc kết quả theo từng lô (partitions) và format từng lô, đóng session khi xong
+
+    Args:
+        result (Result): Kết quả của execute_flight_export (có yield_per)
+        db (Session): Session riêng của response, được đóng khi stream kết thúc
+        format_batch: Hàm format một lô dòng thành chuỗi
+        prefix (str): Đoạn output đầu tiên (ví dụ header CSV)
+
+    Returns:
+        Iterator[str]: Các đoạn output
+    """
+
+    row_count = 0
+    try:
+        if prefix:
+            yield prefix
+        for rows in result.partitions():
+            row_count += len(rows)
+            yield format_batch(rows)
+        logger.info("📤 Đã stream %s dòng dữ liệu chuyến bay", row_count)
+    except Exception as e:
+        logger.error("Lỗi stream dữ liệu chuyến bay sau %s dòng: %s", row_count, e)
+        raise
+    finally:
+        result.close()
+        db.close()
+
+
+def iter_flight_export_ndjson(result: Result, db: Session) -> Iterator[str]:
+    """
+    Stream kết quả export dưới dạng NDJSON (mỗi chuyến bay một dòng JSON)
+
+    Args:
+        result (Result): Kết quả của execute_flight_export
+        db (Session): Session riêng của response
+
+    Returns:
+        Iterator[str]: Các đoạn NDJSON
+    """
+
+    def format_batch(rows: List[Row]) -> str:
+        return "".join(
+            json.dumps(
+                {
+                    key: _export_value(value)
+                    for key, value in row_to_export_dict(row).items()
+                },
+                ensure_ascii=False,
+                default=str,
+            )
+            + "\n"
+            for row in rows
+        )
+
+    return _stream_rows(result, db, format_batch)
+
+
+def iter_flight_export_csv(result: Result, db: Session) -> Iterator[str]:
+    """
+    Stream kết quả export dưới dạng CSV (UTF-8 có BOM để Excel đọc đúng tiếng Việt)
+
+    Args:
+        result (Result): Kết quả của execute_flight_export
+        db (Session): Session riêng của response
+
+    Returns:
+        Iterator[str]: Các đoạn CSV, đoạn đầu là BOM và dòng header
+    """
+
+    def format_batch(rows: List[Row]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            mapping = row._mapping
+            writer.writerow(
+                _export_value(mapping[column]) for _, column in FLIGHT_EXPORT_COLUMNS
+            )
+        return buffer.getvalue()
+
+    header = io.StringIO()
+    csv.writer(header).writerow(key for key, _ in FLIGHT_EXPORT_COLUMNS)
+
+    return _stream_rows(result, db, format_batch, "\ufeff" + header.getvalue())
+
+
+def iter_flight_export_xlsx_rows(result: Result) -> Iterator[List[List[Any]]]:
+    """
+    Đọc kết quả export theo từng lô thành các dòng của sheet FLIGHT_EXPORT_XLSX_SHEET
+    (STT + các cột theo FLIGHT_EXPORT_COLUMNS)
+
+    Args:
+        result (Result): Kết quả của execute_flight_export (có yield_per)
+
+    Returns:
+        Iterator[List[List[Any]]]: Các lô dòng
+    """
+
+    row_number = 0
+    for rows in result.partitions():
+        batch = []
+        for row in rows:
+            row_number += 1
+            mapping = row._mapping
+            batch.append(
+                [row_number]
+                + [mapping[column] for _, column in FLIGHT_EXPORT_COLUMNS]
+            )
+        yield batch
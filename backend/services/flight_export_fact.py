@@ -0,0 +1,120 @@
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import BackgroundTasks, Request
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.db.database import SessionLocal
+from backend.services.job_stages import track_step
+
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_flight_export_fact(
+    db: Session, batch_id: Optional[str] = None, full_rebuild: bool = False
+) -> Dict[str, Any]:
+    """
+    Làm mới bảng flight_export_fact (dữ liệu chuyến bay đã enrich cho /export-flight-data)
+    bằng usp_RefreshFlightExportFact, không commit (stored procedure tự commit phần của nó)
+
+    Chỉ các dòng của batch (hoặc các dòng flight_raw chưa có trong bảng nếu không truyền
+    batch) và các dòng tra cứu sân bay / hãng bay / actype vừa đổi trong bảng reference
+    được tính lại.
+
+    Args:
+        db (Session): Session của database
+        batch_id (str, optional): Import batch vừa làm sạch
+        full_rebuild (bool): True để dựng lại toàn bộ bảng
+
+    Returns:
+        Dict[str, Any]: full_rebuild, changed_refs, deleted_rows, refreshed_rows
+    """
+
+    with track_step("usp_RefreshFlightExportFact"):
+        row = (
+            db.execute(
+                text(
+                    "EXEC usp_RefreshFlightExportFact @BatchId = :batch_id, @FullRebuild = :full_rebuild"
+                ),
+                {"batch_id": batch_id, "full_rebuild": 1 if full_rebuild else 0},
+            )
+            .mappings()
+            .first()
+        )
+
+    stats = {
+        "full_rebuild": bool(row["full_rebuild"]),
+        "changed_refs": row["changed_refs"],
+        "deleted_rows": row["deleted_rows"],
+        "refreshed_rows": row["refreshed_rows"],
+    }
+    logger.info(
+        "🔄 Làm mới flight_export_fact: %s dòng tính lại, %s dòng xoá, %s reference thay đổi%s",
+        stats["refreshed_rows"],
+        stats["deleted_rows"],
+        stats["changed_refs"],
+        " (dựng lại toàn bộ)" if stats["full_rebuild"] else "",
+    )
+    return stats
+
+
+def is_flight_export_fact_built(db: Session) -> bool:
+    """
+    Kiểm tra flight_export_fact đã được dựng lần đầu chưa (usp_RefreshFlightExportFact
+    ghi watermark 'flight_export_fact' sau mỗi lần chạy)
+
+    Args:
+        db (Session): Session của database
+
+    Returns:
+        bool: True nếu bảng đã được dựng
+    """
+
+    return (
+        db.execute(
+            text("SELECT 1 FROM validation_watermark WHERE name = 'flight_export_fact'")
+        ).first()
+        is not None
+    )
+
+
+def refresh_flight_export_fact_in_background() -> None:
+    """
+    Làm mới flight_export_fact bằng session riêng (chạy sau khi response đã gửi),
+    lỗi chỉ được log lại
+
+    Returns:
+        None
+    """
+
+    db = SessionLocal()
+    try:
+        refresh_flight_export_fact(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Lỗi làm mới flight_export_fact: %s", e)
+    finally:
+        db.close()
+
+
+def refresh_flight_export_after_change(
+    request: Request, background_tasks: BackgroundTasks
+) -> None:
+    """
+    Dependency của router các bảng reference dùng trong export (sân bay, hãng bay,
+    quốc gia, actype): request thay đổi dữ liệu (POST / PUT / DELETE) làm mới
+    flight_export_fact sau khi response được gửi
+
+    Args:
+        request (Request): Request hiện tại
+        background_tasks (BackgroundTasks): Các task chạy sau response
+
+    Returns:
+        None
+    """
+
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        background_tasks.add_task(refresh_flight_export_fact_in_background)
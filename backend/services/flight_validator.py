@@ -0,0 +1,556 @@
+import datetime
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+
+# Mô tả lỗi, giống hệt ErrorReason của usp_CleanAndProcessFlightData
+ERROR_MESSAGES = {
+    "Is_InvalidFlightDate": "flightdate không hợp lệ",
+    "Is_InvalidPassengerCargo": "tổng số khách + hàng hóa <= 0",
+    "Is_InvalidRoute": "route không tồn tại trong AIRLINE_ROUTE_DETAILS",
+    "Is_InvalidActypeSeat": "actype không tồn tại trong actype_seat hoặc không phải chuyến bay chở hàng",
+}
+
+# Trạng thái parse flightdate (flight_date_status)
+FLIGHT_DATE_OK = 0
+FLIGHT_DATE_MISSING = 1
+FLIGHT_DATE_INVALID = 2
+
+# Các cột ghi vào error_table và flight_data_chot
+ERROR_TABLE_COLUMNS = [
+    "flightdate",
+    "flight_date",
+    "flight_date_status",
+    "flightno",
+    "route",
+    "actype",
+    "seat",
+    "adl",
+    "chd",
+    "cgo",
+    "mail",
+    "source",
+    "acregno",
+    "sheet_name",
+    "totalpax",
+    "int_dom",
+    "Is_InvalidFlightDate",
+    "Is_InvalidPassengerCargo",
+    "Is_InvalidRoute",
+    "Is_InvalidActypeSeat",
+    "ErrorReason",
+    "TotalErrors",
+]
+FLIGHT_DATA_CHOT_COLUMNS = [
+    "convert_date",
+    "flightno",
+    "route",
+    "actype",
+    "totalpax",
+    "cgo",
+    "mail",
+    "acregno",
+    "source",
+    "sheet_name",
+    "seat",
+    "region_type",
+    "int_dom_",
+    "type_filter",
+]
+
+TEXT_COLUMNS = ["flightdate", "flightno", "route", "actype", "source", "acregno", "sheet_name"]
+ERROR_TABLE_TEXT_COLUMNS = TEXT_COLUMNS + ["int_dom", "ErrorReason"]
+FLIGHT_DATA_CHOT_TEXT_COLUMNS = ["flightno", "route", "actype", "acregno", "source", "sheet_name", "int_dom_"]
+
+# Giới hạn của kiểu DATETIME trên SQL Server
+SQL_DATETIME_MIN = datetime.date(1753, 1, 1)
+SQL_DATETIME_MAX = datetime.date(9999, 12, 31)
+EXCEL_EPOCH = datetime.date(1899, 12, 30)
+
+MONTH_NAMES = {
+    name: index
+    for index, names in enumerate(
+        [
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+
+ISNUMERIC_PATTERN = re.compile(
+    r"^\s*[+-]?\s*[$€£¥]?\s*[+-]?(?:[\d,]*\.?\d*)(?:[eEdD][+-]?\d+)?\s*$"
+)
+# Serial date Excel: số nguyên, hoặc số thực có phần thập phân bằng 0 ("45296.0" do
+# pd.read_excel đọc cột có ô trống thành float)
+EXCEL_SERIAL_PATTERN = re.compile(r"^\s*([+-]?\d+)(?:\.0*)?\s*$")
+TIME_SUFFIX = r"(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2}(?:[.:]\d{1,3})?)?(?:\s*[AaPp][Mm])?)?"
+UNSEPARATED_PATTERN = re.compile(r"^(\d{4}|\d{6}|\d{8})" + TIME_SUFFIX + r"$")
+ISO_8601_PATTERN = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})T\d{2}:\d{2}(?::\d{2}(?:\.\d{1,3})?)?Z?$"
+)
+SEPARATED_PATTERN = re.compile(
+    r"^(\d{1,4})([/.-])(\d{1,2})\2(\d{1,4})" + TIME_SUFFIX + r"$"
+)
+ALPHA_MONTH_FIRST_PATTERN = re.compile(
+    r"^([A-Za-z]+)\s+(\d{1,2}),?\s+(\d{4})" + TIME_SUFFIX + r"$"
+)
+ALPHA_DAY_FIRST_PATTERN = re.compile(
+    r"^(\d{1,2})\s+([A-Za-z]+),?\s+(\d{4})" + TIME_SUFFIX + r"$"
+)
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[datetime.date]:
+    try:
+        value = datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return value if SQL_DATETIME_MIN <= value <= SQL_DATETIME_MAX else None
+
+
+def _two_digit_year(year: int) -> int:
+    # two digit year cutoff mặc định của SQL Server là 2049
+    return 2000 + year if year < 50 else 1900 + year
+
+
+def sql_isnumeric(value: str) -> bool:
+    """
+    Mô phỏng ISNUMERIC() của SQL Server (chấp nhận dấu, ',', '.', ký hiệu tiền tệ, số mũ)
+
+    Args:
+        value (str): Chuỗi cần kiểm tra
+
+    Returns:
+        bool: True nếu ISNUMERIC trả về 1
+    """
+
+    stripped = value.strip()
+    if not stripped:
+        return False
+    if stripped in ("+", "-", ".", ",", "$"):
+        return True
+    return bool(ISNUMERIC_PATTERN.match(value)) and any(c.isdigit() for c in value)
+
+
+def sql_convert_style(value: str, style: int) -> Optional[datetime.date]:
+    """
+    Mô phỏng TRY_CONVERT(DATE, value, style) cho các style mà stored procedure dùng
+
+    Args:
+        value (str): Chuỗi ngày
+        style (int): 103 (dd/mm/yyyy), 111 (yyyy/mm/dd), 112 (yyyymmdd), 120 (yyyy-mm-dd)
+
+    Returns:
+        datetime.date or None: Ngày hoặc None nếu không chuyển được
+    """
+
+    value = value.strip()
+
+    if style == 112:
+        if not re.fullmatch(r"\d{8}", value):
+            return None
+        return _make_date(int(value[:4]), int(value[4:6]), int(value[6:]))
+
+    separator = "-" if style == 120 else "/"
+    parts = value.split(separator)
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+
+    if style == 103:
+        day, month, year = (int(part) for part in parts)
+        if len(parts[2]) <= 2:
+            year = _two_digit_year(year)
+    else:
+        year, month, day = (int(part) for part in parts)
+
+    return _make_date(year, month, day)
+
+
+def sql_try_convert_datetime(value: str) -> Optional[datetime.date]:
+    """
+    Mô phỏng TRY_CONVERT(DATETIME, value) với language us_english (DATEFORMAT mdy)
+
+    Hỗ trợ các dạng phổ biến: yyyymmdd / yymmdd / yyyy, ISO 8601, m/d/y (dấu '/', '-',
+    '.'), y/m/d khi năm đứng đầu, tên tháng (Jan 5 2024, 5 Jan 2024), kèm giờ tuỳ chọn;
+    chuỗi rỗng là 1900-01-01. Chỉ trả về phần ngày.
+
+    Args:
+        value (str): Chuỗi ngày giờ
+
+    Returns:
+        datetime.date or None: Ngày hoặc None nếu không chuyển được
+    """
+
+    value = value.strip()
+    if not value:
+        # Chuỗi rỗng chuyển thành 1900-01-01
+        return datetime.date(1900, 1, 1)
+
+    match = UNSEPARATED_PATTERN.match(value)
+    if match:
+        digits = match.group(1)
+        if len(digits) == 4:
+            return _make_date(int(digits), 1, 1)
+        if len(digits) == 6:
+            return _make_date(
+                _two_digit_year(int(digits[:2])), int(digits[2:4]), int(digits[4:])
+            )
+        return _make_date(int(digits[:4]), int(digits[4:6]), int(digits[6:]))
+
+    match = ISO_8601_PATTERN.match(value)
+    if match:
+        return _make_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = SEPARATED_PATTERN.match(value)
+    if match:
+        first, _, second, third = match.groups()
+        if len(first) == 4:
+            if len(third) > 2:
+                return None
+            return _make_date(int(first), int(second), int(third))
+        if len(first) > 2 or len(third) == 3:
+            return None
+        year = int(third) if len(third) == 4 else _two_digit_year(int(third))
+        return _make_date(year, int(first), int(second))
+
+    match = ALPHA_MONTH_FIRST_PATTERN.match(value)
+    if match:
+        month = MONTH_NAMES.get(match.group(1).lower())
+        return _make_date(int(match.group(3)), month, int(match.group(2))) if month else None
+
+    match = ALPHA_DAY_FIRST_PATTERN.match(value)
+    if match:
+        month = MONTH_NAMES.get(match.group(2).lower())
+        return _make_date(int(match.group(3)), month, int(match.group(1))) if month else None
+
+    return None
+
+
+def _like(value: str, pattern: str) -> bool:
+    # LIKE với '_' (một ký tự bất kỳ) và '%' ở cuối mẫu, khoảng trắng cuối giá trị bị bỏ qua
+    value = value.rstrip(" ")
+    if pattern.endswith("%"):
+        pattern = pattern[:-1]
+        if len(value) < len(pattern):
+            return False
+    elif len(value) != len(pattern):
+        return False
+    return all(p == "_" or p == v for p, v in zip(pattern, value))
+
+
+def validation_flight_date(value: Optional[str]) -> Optional[datetime.date]:
+    """
+    Ngày bay theo biểu thức Is_InvalidFlightDate của stored procedure
+
+    Chuỗi 8 chữ số là ngày hợp lệ dạng yyyyMMdd được đọc theo style 112 trước; số
+    nguyên (hoặc số thực có phần thập phân bằng 0) được hiểu là serial date của Excel.
+    Giá trị ISNUMERIC khác (có phần thập phân, serial vượt giới hạn DATETIME) được coi là
+    không hợp lệ.
+
+    Args:
+        value (str or None): flightdate dạng chuỗi (như trong flight_raw)
+
+    Returns:
+        datetime.date or None: Ngày hoặc None nếu flightdate không hợp lệ
+    """
+
+    if value is None:
+        return None
+
+    stripped = value.strip(" ")
+    if re.fullmatch(r"[0-9]{8}", stripped):
+        result = sql_convert_style(stripped, 112)
+        if result is not None:
+            return result
+    if sql_isnumeric(value):
+        match = EXCEL_SERIAL_PATTERN.match(value)
+        if not match:
+            return None
+        try:
+            result = EXCEL_EPOCH + datetime.timedelta(days=int(match.group(1)))
+        except OverflowError:
+            return None
+        return result if SQL_DATETIME_MIN <= result <= SQL_DATETIME_MAX else None
+    if _like(value, "__/_/____") or _like(value, "__/__/____"):
+        return sql_convert_style(value, 103)
+    if _like(value, "____-__-__ %"):
+        return sql_convert_style(value[:10], 120)
+    if _like(value, "____/__/__"):
+        return sql_convert_style(value, 111)
+    return sql_try_convert_datetime(value)
+
+
+def parse_flight_dates(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Parse cột flightdate một lần thành ngày bay kiểu date và mã trạng thái
+
+    Mỗi giá trị khác nhau chỉ được parse một lần (flightdate lặp lại rất nhiều), theo
+    thứ tự nhánh: yyyyMMdd, serial date Excel, dd/MM/yyyy, yyyy-MM-dd hh:mm:ss,
+    yyyy/MM/dd rồi TRY_CONVERT(DATETIME).
+
+    Args:
+        series (pd.Series): flightdate dạng chuỗi (như trong flight_raw)
+
+    Returns:
+        Tuple[pd.Series, pd.Series]: (flight_date, flight_date_status)
+    """
+
+    flight_dates = pd.Series(
+        _map_unique(series, validation_flight_date), index=series.index, dtype=object
+    )
+    status = np.where(
+        series.isna(),
+        FLIGHT_DATE_MISSING,
+        np.where(flight_dates.isna(), FLIGHT_DATE_INVALID, FLIGHT_DATE_OK),
+    )
+
+    return flight_dates, pd.Series(status, index=series.index, dtype="int64")
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    # Giống khi ghi vào cột NVARCHAR của flight_raw: str(value), NaN thành NULL
+    return series.map(lambda value: str(value) if pd.notna(value) else None).astype(object)
+
+
+def _normalize_key(series: pd.Series) -> pd.Series:
+    # So sánh '=' của SQL Server: không phân biệt hoa thường, bỏ qua khoảng trắng cuối
+    return series.map(lambda value: value.rstrip(" ").upper() if isinstance(value, str) else None)
+
+
+def _map_unique(series: pd.Series, func) -> np.ndarray:
+    # Áp dụng hàm trên từng giá trị duy nhất (flightdate lặp lại rất nhiều)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    mapped = np.array([func(value) for value in uniques] + [func(None)], dtype=object)
+    return mapped[codes]
+
+
+class FlightValidator:
+    """
+    Validate dữ liệu chuyến bay trong bộ nhớ theo đúng các rule của
+    usp_CleanAndProcessFlightData (bước 3-5), thay cho vòng flight_raw ->
+    flight_clean_data_stg -> UPDATE toàn bảng
+
+    Dữ liệu tham chiếu (actype_seat, Airline_Route_Details, Airport_Information) được
+    nạp một lần khi tạo validator.
+
+    Args:
+        actype_seats (Dict[str, Any]): Seat theo actype đã chuẩn hoá (LOWER(TRIM))
+        sectors (set): Các SECTOR của Airline_Route_Details (chuẩn hoá)
+        airport_countries (Dict[str, Any]): Country theo IATACode (chuẩn hoá)
+    """
+
+    def __init__(
+        self,
+        actype_seats: Dict[str, Any],
+        sectors: set,
+        airport_countries: Dict[str, Any],
+    ):
+        self.actype_seats = actype_seats
+        self.sectors = sectors
+        self.airport_countries = airport_countries
+
+    @classmethod
+    def from_db(cls, db) -> "FlightValidator":
+        """
+        Tạo validator với dữ liệu tham chiếu nạp từ database
+
+        Args:
+            db (Session): Session của database
+
+        Returns:
+            FlightValidator: Validator
+        """
+
+        actype_seats = {}
+        for actype, seat in db.execute(text("SELECT actype, seat FROM actype_seat")):
+            if actype is not None:
+                actype_seats.setdefault(actype.strip(" ").lower(), seat)
+
+        sectors = {
+            sector.strip(" ").upper()
+            for (sector,) in db.execute(text("SELECT Sector FROM Airline_Route_Details"))
+            if sector is not None
+        }
+
+        airport_countries = {}
+        for iata_code, country in db.execute(
+            text("SELECT IATACode, Country FROM Airport_Information")
+        ):
+            if iata_code is not None:
+                airport_countries.setdefault(iata_code.rstrip(" ").upper(), country)
+
+        return cls(actype_seats, sectors, airport_countries)
+
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Enrich và validate DataFrame dạng flight_raw
+
+        Args:
+            df (pd.DataFrame): Dữ liệu với các cột của flight_raw
+
+        Returns:
+            pd.DataFrame: Dữ liệu như trong flight_clean_data_stg sau bước validate,
+                kèm cột convert_date
+        """
+
+        result = pd.DataFrame(index=df.index)
+        for col in TEXT_COLUMNS:
+            result[col] = _as_text(df[col]) if col in df else None
+
+        numeric = {
+            col: pd.to_numeric(df[col], errors="coerce").astype("float64")
+            for col in ["seat", "adl", "chd", "cgo", "mail", "totalpax"]
+        }
+        cgo = numeric["cgo"].fillna(0)
+        mail = numeric["mail"].fillna(0)
+
+        # 3.1. totalpax = adl + chd nếu > 0, ngược lại ISNULL(totalpax, 0)
+        pax = numeric["adl"].fillna(0) + numeric["chd"].fillna(0)
+        totalpax = pax.where(pax > 0, numeric["totalpax"].fillna(0))
+
+        # 3.2. int_dom theo Country của sân bay đi / đến
+        route = result["route"]
+        trimmed_route = route.map(lambda value: value.strip(" ") if isinstance(value, str) else None)
+        departure = _normalize_key(trimmed_route.str[:3]).map(self.airport_countries)
+        arrival = _normalize_key(trimmed_route.str[-3:]).map(self.airport_countries)
+        departure_vn = _normalize_key(departure) == "VIETNAM"
+        arrival_vn = _normalize_key(arrival) == "VIETNAM"
+        both_known = departure.notna() & arrival.notna()
+        int_dom = np.where(
+            departure_vn & arrival_vn, "DOM", np.where(both_known, "INT", None)
+        )
+
+        # 3.3. seat = COALESCE(seat, actype_seat.seat), cột BIGINT nên phần thập phân bị bỏ
+        actype_key = result["actype"].map(
+            lambda value: value.strip(" ").lower() if isinstance(value, str) else None
+        )
+        seat = numeric["seat"].where(
+            numeric["seat"].notna(),
+            pd.to_numeric(actype_key.map(self.actype_seats), errors="coerce"),
+        )
+        seat = np.trunc(seat).astype("Int64")
+
+        # 4.1. flightdate: dùng flight_date đã parse khi import nếu có
+        if "flight_date" in df and "flight_date_status" in df:
+            flight_dates = df["flight_date"].astype(object)
+            date_status = df["flight_date_status"]
+        else:
+            flight_dates, date_status = parse_flight_dates(result["flightdate"])
+        invalid_date = flight_dates.isna()
+
+        # 4.2. tổng khách + hàng hóa + bưu kiện <= 0
+        invalid_pax_cargo = totalpax + cgo + mail <= 0
+
+        # 4.3. route 'XXX-YYY' (7 ký tự sau TRIM), sector = mã nhỏ hơn + mã lớn hơn
+        has_route_shape = (trimmed_route.str.len() == 7) & route.str.contains(
+            "-", regex=False
+        ).fillna(False).astype(bool)
+        left = route.str[:3].str.upper().fillna("")
+        right = route.str[-3:].str.upper().fillna("")
+        sector = np.where(
+            left.to_numpy() < right.to_numpy(), left + right, right + left
+        )
+        sector = _normalize_key(pd.Series(sector, index=df.index))
+        invalid_route = ~(has_route_shape & sector.isin(self.sectors))
+
+        # 4.4. actype phải có trong actype_seat, trừ chuyến chỉ chở hàng/bưu kiện
+        cargo_only = (cgo + mail > 0) & (totalpax == 0)
+        invalid_actype = ~cargo_only & ~actype_key.isin(self.actype_seats.keys())
+
+        flags = {
+            "Is_InvalidFlightDate": invalid_date,
+            "Is_InvalidPassengerCargo": invalid_pax_cargo,
+            "Is_InvalidRoute": invalid_route,
+            "Is_InvalidActypeSeat": invalid_actype,
+        }
+
+        result["flight_date"] = flight_dates.where(flight_dates.notna(), None)
+        result["flight_date_status"] = date_status
+        result["seat"] = seat
+        for col in ["adl", "chd", "cgo", "mail"]:
+            result[col] = numeric[col]
+        result["totalpax"] = totalpax
+        result["int_dom"] = pd.Series(int_dom, index=df.index, dtype=object)
+
+        # 4.5. ErrorReason (NULL khi không có lỗi) và TotalErrors
+        error_reason = pd.Series("", index=df.index, dtype=object)
+        total_errors = pd.Series(0, index=df.index, dtype="int64")
+        for col, flag in flags.items():
+            result[col] = flag.astype("int64")
+            error_reason = error_reason + np.where(flag, f", {ERROR_MESSAGES[col]}", "")
+            total_errors += result[col]
+
+        result["ErrorReason"] = error_reason.str[2:].where(total_errors > 0, None)
+        result["TotalErrors"] = total_errors
+        result["convert_date"] = pd.array(
+            [int(value.strftime("%Y%m%d")) if pd.notna(value) else None for value in flight_dates],
+            dtype="Int64",
+        )
+
+        return result
+
+    def split(self, validated: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Tách kết quả validate thành dữ liệu cho flight_data_chot và error_table
+
+        Args:
+            validated (pd.DataFrame): Kết quả của validate()
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: (dòng hợp lệ, dòng lỗi)
+        """
+
+        is_valid = validated["TotalErrors"] == 0
+
+        errors = validated.loc[~is_valid, ERROR_TABLE_COLUMNS]
+
+        valid = validated.loc[is_valid].copy()
+        valid["region_type"] = 10
+        valid["int_dom_"] = valid["int_dom"]
+        valid["type_filter"] = self.type_filter(valid)
+
+        return valid[FLIGHT_DATA_CHOT_COLUMNS], errors
+
+    def type_filter(self, df: pd.DataFrame) -> pd.Series:
+        """
+        type_filter của flight_data_chot theo stored procedure
+
+        Args:
+            df (pd.DataFrame): Dòng hợp lệ (route, sheet_name, int_dom_)
+
+        Returns:
+            pd.Series: type_filter (0, 1, 2, 3 hoặc -1)
+        """
+
+        route = _normalize_key(df["route"])
+        sheet_name = _normalize_key(df["sheet_name"])
+
+        sgn_position = route.str.find("SGN")
+        is_sgn_sheet = (sheet_name == "SGN").fillna(False)
+        conditions = [
+            (sgn_position >= 1) & sheet_name.notna() & ~is_sgn_sheet,
+            is_sgn_sheet,
+            (_normalize_key(df["int_dom_"]) == "INT").fillna(False),
+            (sheet_name == _normalize_key(df["route"].str[:3])).fillna(False)
+            & sheet_name.notna(),
+        ]
+
+        return pd.Series(
+            np.select([c.to_numpy(dtype=bool) for c in conditions], [0, 1, 2, 3], -1),
+            index=df.index,
+        )
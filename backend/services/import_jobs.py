@@ -0,0 +1,713 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.logging_config import reset_correlation_id, set_correlation_id
+from backend.db.database import SessionLocal
+from backend.models.import_job import ImportJob
+from backend.services.excel_batch_processor import ExcelBatchProcessor
+from backend.services.job_stages import StageTracker
+from backend.services.pipeline_runs import record_pipeline_run
+
+
+logger = logging.getLogger(__name__)
+
+
+JOB_TYPES = ("upload", "complete-workflow")
+
+
+def new_upload_results() -> Dict[str, Any]:
+    """
+    Tạo dict kết quả rỗng cho quá trình upload và xử lý file Excel
+
+    Returns:
+        Dict[str, Any]: Kết quả xử lý ban đầu
+    """
+
+    return {
+        "processed_files": 0,
+        "total_rows": 0,
+        "skipped_files": 0,
+        "errors": [],
+        "file_details": [],
+        "processing_summary": {},
+    }
+
+
+def save_uploaded_files(
+    files: List[UploadFile], target_dir: str, results: Dict[str, Any]
+) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+    """
+    Ghi các file Excel được upload xuống thư mục theo từng chunk (không đọc cả file
+    vào bộ nhớ), tính SHA-256 và kích thước trong lúc ghi
+
+    Bỏ qua file không phải Excel, file trùng tên trong cùng request và file vượt
+    UPLOAD_MAX_FILE_MB. Tổng dung lượng vượt UPLOAD_MAX_REQUEST_MB thì từ chối cả
+    request (413) trước khi parse.
+
+    Args:
+        files (List[UploadFile]): Danh sách file Excel
+        target_dir (str): Thư mục lưu file
+        results (Dict[str, Any]): Kết quả xử lý, được cập nhật trực tiếp
+
+    Returns:
+        Tuple[List[Tuple[str, str]], Dict[str, str]]: Danh sách (đường dẫn file, tên file)
+            theo thứ tự upload và SHA-256 theo tên file
+    """
+
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    max_file_bytes = settings.UPLOAD_MAX_FILE_MB * 1024 * 1024
+    max_request_bytes = settings.UPLOAD_MAX_REQUEST_MB * 1024 * 1024
+
+    saved_files = []
+    file_hashes = {}
+    request_bytes = 0
+
+    for file in files:
+        if not file.filename.lower().endswith((".xlsx", ".xls")):
+            results["errors"].append(f"File {file.filename} không phải là Excel file")
+            continue
+
+        # Extract only filename from path (in case of folder upload)
+        filename_only = os.path.basename(file.filename)
+        file_path = os.path.join(target_dir, filename_only)
+
+        # Same file name uploaded twice in this request: keep the first one
+        if filename_only in file_hashes:
+            logger.info("⏭️ File %s đã được import trước đó", filename_only)
+            results["skipped_files"] += 1
+            continue
+
+        try:
+            # Console log filename for debugging folder uploads
+            logger.info("📁 Processing file: %s -> %s", file.filename, filename_only)
+
+            sha256 = hashlib.sha256()
+            file_bytes = 0
+            too_large = False
+
+            with open(file_path, "wb") as buffer:
+                for chunk in iter(lambda: file.file.read(chunk_size), b""):
+                    file_bytes += len(chunk)
+                    request_bytes += len(chunk)
+
+                    if max_request_bytes and request_bytes > max_request_bytes:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Tổng dung lượng upload vượt quá {settings.UPLOAD_MAX_REQUEST_MB} MB",
+                        )
+                    if max_file_bytes and file_bytes > max_file_bytes:
+                        too_large = True
+                        break
+
+                    sha256.update(chunk)
+                    buffer.write(chunk)
+
+            if too_large:
+                request_bytes -= file_bytes
+                os.remove(file_path)
+                results["errors"].append(
+                    f"File {filename_only} vượt quá {settings.UPLOAD_MAX_FILE_MB} MB"
+                )
+                continue
+
+            saved_files.append((file_path, filename_only))
+            file_hashes[filename_only] = sha256.hexdigest()
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            error_msg = f"Lỗi xử lý file {filename_only}: {str(e)}"
+            logger.error("❌ %s", error_msg)
+            results["errors"].append(error_msg)
+
+    return saved_files, file_hashes
+
+
+def build_workflow_summary(upload_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Tạo summary của complete workflow từ kết quả upload: missing dimensions và các
+    bước tiếp theo
+
+    Args:
+        upload_result (Dict[str, Any]): Kết quả upload và xử lý file Excel
+
+    Returns:
+        Dict[str, Any]: Summary của workflow
+    """
+
+    # Summary from upload result (already contains current batch summary)
+    summary_after_processing = upload_result.get("processing_summary", {})
+    missing_actypes = summary_after_processing.get("missing_actypes", 0)
+    missing_routes = summary_after_processing.get("missing_routes", 0)
+
+    logger.info("📊 Step 2: Summary sau xử lý - %s", summary_after_processing)
+
+    # If there are missing dimensions, prepare export data
+    missing_data_info = None
+    if missing_actypes > 0 or missing_routes > 0:
+        logger.warning(
+            "⚠️ Phát hiện missing dimensions: %s actypes, %s routes",
+            missing_actypes,
+            missing_routes,
+        )
+
+        # Create export data info (without actually creating file here)
+        missing_data_info = {
+            "missing_actypes": missing_actypes,
+            "missing_routes": missing_routes,
+            "export_available": True,
+            "message": "Có dữ liệu thiếu cần bổ sung. Sử dụng endpoint /export-missing-dimensions để tải file Excel.",
+        }
+
+    # Final summary
+    final_summary = {
+        "workflow_completed": True,
+        "files_processed": upload_result["processed_files"],
+        "total_rows": upload_result["total_rows"],
+        "processing_summary": summary_after_processing,
+        "missing_data_info": missing_data_info,
+        "next_steps": [],
+    }
+
+    # Add next steps recommendations
+    if missing_data_info:
+        final_summary["next_steps"].append(
+            "1. Tải file missing dimensions bằng endpoint /export-missing-dimensions"
+        )
+        final_summary["next_steps"].append("2. Điền thông tin thiếu vào file Excel")
+        final_summary["next_steps"].append("3. Upload file đã điền vào temp tables")
+        final_summary["next_steps"].append(
+            "4. Chạy endpoint /import-missing-dimensions để cập nhật"
+        )
+        final_summary["next_steps"].append(
+            "5. Chạy lại /revalidate-error-data để xử lý lại errors"
+        )
+    else:
+        final_summary["next_steps"].append(
+            "✅ Không có dữ liệu thiếu, workflow hoàn tất!"
+        )
+
+    return final_summary
+
+
+class JobStageTracker(StageTracker):
+    """
+    StageTracker lưu tiến độ từng stage vào bảng import_job
+
+    Dùng session riêng để tiến độ được commit ngay, độc lập với transaction import
+
+    Args:
+        job_id (str): ID của job
+        session_factory: Hàm tạo Session mới
+    """
+
+    def __init__(self, job_id: str, session_factory=SessionLocal):
+        super().__init__()
+        self.job_id = job_id
+        self.session_factory = session_factory
+
+    def on_change(self) -> None:
+        db = self.session_factory()
+        try:
+            db.query(ImportJob).filter(ImportJob.id == self.job_id).update(
+                {"stages": json.dumps(self.stages, ensure_ascii=False)}
+            )
+            db.commit()
+        except Exception as e:
+            # Không để lỗi ghi tiến độ làm hỏng job
+            db.rollback()
+            logger.error("Lỗi cập nhật tiến độ job %s: %s", self.job_id, e)
+        finally:
+            db.close()
+
+
+class ImportJobQueue:
+    """
+    Hàng đợi job import + làm sạch dữ liệu chạy nền trên một worker pool
+
+    Trạng thái job được lưu trong bảng import_job, dùng chung giữa các process
+    (uvicorn --workers N): worker nhận job bằng một UPDATE có điều kiện status = 'queued'
+    nên mỗi job chỉ chạy ở một process. Process chạy job cập nhật heartbeat_at định kỳ;
+    job running có heartbeat quá IMPORT_JOB_STALE_SECONDS (process đã dừng) được đưa lại
+    vào hàng đợi: dữ liệu raw và import_log chỉ được commit cùng lúc nên chạy lại job
+    không import trùng.
+
+    Args:
+        workers (int, optional): Số worker (mặc định theo settings)
+        jobs_dir (str, optional): Thư mục lưu file của job (mặc định theo settings)
+        session_factory: Hàm tạo Session mới
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        jobs_dir: Optional[str] = None,
+        session_factory=SessionLocal,
+    ):
+        self.workers = workers or settings.IMPORT_JOB_WORKERS
+        self.jobs_dir = (
+            jobs_dir
+            or settings.IMPORT_JOB_DIR
+            or os.path.join(tempfile.gettempdir(), "airline_import_jobs")
+        )
+        self.session_factory = session_factory
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Định danh process trong cột import_job.owner
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Job đã đưa vào executor của process này / đang chạy ở process này
+        self._submitted: Set[str] = set()
+        self._running: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Khởi động worker pool, chạy lại các job bị gián đoạn và thread heartbeat
+
+        Returns:
+            None
+        """
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="import-job"
+        )
+        self.recover()
+
+        self._stop.clear()
+        self._monitor = threading.Thread(
+            target=self._monitor_jobs, name="import-job-heartbeat", daemon=True
+        )
+        self._monitor.start()
+
+    def shutdown(self) -> None:
+        """
+        Dừng worker pool, các job chưa chạy vẫn ở trạng thái queued trong bảng import_job
+
+        Returns:
+            None
+        """
+
+        self._stop.set()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def create_work_dir(self) -> Tuple[str, str]:
+        """
+        Tạo ID và thư mục chứa file cho một job mới
+
+        Returns:
+            Tuple[str, str]: (ID của job, thư mục của job)
+        """
+
+        job_id = uuid.uuid4().hex
+        work_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(work_dir, exist_ok=True)
+        return job_id, work_dir
+
+    def submit(
+        self,
+        db: Session,
+        job_id: str,
+        job_type: str,
+        work_dir: str,
+        uploaded_files: List[Tuple[str, str]],
+        results: Dict[str, Any],
+    ) -> ImportJob:
+        """
+        Lưu job vào bảng import_job và đưa vào hàng đợi
+
+        Args:
+            db (Session): Session của database
+            job_id (str): ID của job
+            job_type (str): Loại job (upload, complete-workflow)
+            work_dir (str): Thư mục chứa các file của job
+            uploaded_files (List[Tuple[str, str]]): Danh sách (đường dẫn file, tên file)
+            results (Dict[str, Any]): Kết quả ban đầu (lỗi khi lưu file, file bỏ qua)
+
+        Returns:
+            ImportJob: Job vừa tạo
+        """
+
+        job = ImportJob(
+            id=job_id,
+            job_type=job_type,
+            status="queued",
+            file_count=len(uploaded_files),
+            work_dir=work_dir,
+            file_names=json.dumps(
+                [file_name for _, file_name in uploaded_files], ensure_ascii=False
+            ),
+            result=json.dumps(results, ensure_ascii=False),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._enqueue(job_id)
+        logger.info("📥 Đã đưa job %s (%s) vào hàng đợi", job_id, job_type)
+
+        return job
+
+    def _enqueue(self, job_id: str) -> bool:
+        """
+        Đưa job vào executor nếu process này chưa đưa vào
+
+        Args:
+            job_id (str): ID của job
+
+        Returns:
+            bool: True nếu job vừa được đưa vào executor
+        """
+
+        with self._lock:
+            if job_id in self._submitted or self.executor is None:
+                return False
+            self._submitted.add(job_id)
+
+        self.executor.submit(self.run_job, job_id)
+        return True
+
+    def recover(self) -> None:
+        """
+        Đưa lại vào hàng đợi các job running mà process chạy nó đã dừng (heartbeat quá
+        IMPORT_JOB_STALE_SECONDS) và các job queued chưa có ở process này; job mất file
+        thì đánh dấu failed
+
+        Job running ở process khác còn heartbeat không bị đụng tới. Nhiều process cùng
+        đưa một job queued vào hàng đợi thì chỉ một process nhận được job (run_job).
+
+        Returns:
+            None
+        """
+
+        db = self.session_factory()
+        try:
+            stale_before = datetime.datetime.now() - datetime.timedelta(
+                seconds=settings.IMPORT_JOB_STALE_SECONDS
+            )
+            stale = (
+                db.query(ImportJob)
+                .filter(
+                    ImportJob.status == "running",
+                    or_(
+                        ImportJob.heartbeat_at.is_(None),
+                        ImportJob.heartbeat_at < stale_before,
+                    ),
+                )
+                .update(
+                    {
+                        "status": "queued",
+                        "stages": None,
+                        "started_at": None,
+                        "owner": None,
+                        "heartbeat_at": None,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if stale:
+                logger.warning("🔁 %s job running không còn heartbeat, chạy lại", stale)
+
+            jobs = (
+                db.query(ImportJob.id, ImportJob.work_dir)
+                .filter(ImportJob.status == "queued")
+                .order_by(ImportJob.created_at)
+                .all()
+            )
+
+            for job_id, work_dir in jobs:
+                with self._lock:
+                    if job_id in self._submitted:
+                        continue
+
+                if work_dir and os.path.isdir(work_dir):
+                    if self._enqueue(job_id):
+                        logger.info("🔁 Đưa job %s vào hàng đợi", job_id)
+                else:
+                    db.query(ImportJob).filter(
+                        ImportJob.id == job_id, ImportJob.status == "queued"
+                    ).update(
+                        {
+                            "status": "failed",
+                            "error": "Job bị gián đoạn và không còn file để chạy lại",
+                            "finished_at": datetime.datetime.now(),
+                        },
+                        synchronize_session=False,
+                    )
+                    db.commit()
+
+        except Exception as e:
+            db.rollback()
+            logger.error("Lỗi khôi phục import job: %s", e)
+        finally:
+            db.close()
+
+    def _monitor_jobs(self) -> None:
+        """
+        Thread nền: cập nhật heartbeat_at của các job đang chạy ở process này, rồi
+        khôi phục job của các process đã dừng (recover)
+
+        Returns:
+            None
+        """
+
+        while not self._stop.wait(settings.IMPORT_JOB_HEARTBEAT_SECONDS):
+            with self._lock:
+                running = list(self._running)
+
+            if running:
+                db = self.session_factory()
+                try:
+                    db.query(ImportJob).filter(
+                        ImportJob.id.in_(running),
+                        ImportJob.owner == self.owner,
+                        ImportJob.status == "running",
+                    ).update(
+                        {"heartbeat_at": datetime.datetime.now()},
+                        synchronize_session=False,
+                    )
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error("Lỗi cập nhật heartbeat import job: %s", e)
+                finally:
+                    db.close()
+
+            self.recover()
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        """
+        Nhận job: chuyển queued -> running trong một UPDATE có điều kiện, chỉ một
+        process / worker nhận được
+
+        Args:
+            db (Session): Session của database
+            job_id (str): ID của job
+
+        Returns:
+            bool: True nếu process này nhận được job
+        """
+
+        now = datetime.datetime.now()
+        claimed = (
+            db.query(ImportJob)
+            .filter(ImportJob.id == job_id, ImportJob.status == "queued")
+            .update(
+                {
+                    "status": "running",
+                    "owner": self.owner,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return claimed == 1
+
+    def _save_raw_commit(
+        self, db: Session, job_id: str, results: Dict[str, Any]
+    ) -> None:
+        """
+        Lưu import batch và kết quả parse vào import_job trong cùng transaction với raw
+        data (gọi ngay trước commit), để job bị gián đoạn sau đó chạy tiếp từ bước làm
+        sạch thay vì import lại
+
+        Args:
+            db (Session): Session của job (cũng là session ghi raw data)
+            job_id (str): ID của job
+            results (Dict[str, Any]): Kết quả upload tới lúc commit raw data
+
+        Returns:
+            None
+        """
+
+        saved = (
+            db.query(ImportJob)
+            .filter(
+                ImportJob.id == job_id,
+                ImportJob.owner == self.owner,
+                ImportJob.status == "running",
+            )
+            .update(
+                {
+                    "import_batch_id": results.get("import_batch_id"),
+                    "raw_committed_at": datetime.datetime.now(),
+                    "result": json.dumps(results, ensure_ascii=False, default=str),
+                },
+                synchronize_session=False,
+            )
+        )
+        if saved != 1:
+            # Không commit raw data của một job đã được process khác nhận lại
+            raise RuntimeError(f"Job {job_id} đã được process khác nhận lại")
+
+    def _finish(self, db: Session, job_id: str, values: Dict[str, Any]) -> bool:
+        """
+        Ghi trạng thái kết thúc của job nếu process này vẫn là owner
+
+        Args:
+            db (Session): Session của database
+            job_id (str): ID của job
+            values (Dict[str, Any]): Các cột cần cập nhật (status, result, error, ...)
+
+        Returns:
+            bool: True nếu trạng thái được ghi
+        """
+
+        finished = (
+            db.query(ImportJob)
+            .filter(
+                ImportJob.id == job_id,
+                ImportJob.owner == self.owner,
+                ImportJob.status == "running",
+            )
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        return finished == 1
+
+    def run_job(self, job_id: str) -> None:
+        """
+        Chạy pipeline của một job trong worker: parse, ghi flight_raw, import_log,
+        stored procedures làm sạch/validate và summary
+
+        Job chỉ chạy nếu process này nhận được nó (_claim); file của job chỉ bị xoá
+        khi process này ghi được trạng thái kết thúc. Job đã commit raw data ở lần chạy
+        trước (raw_committed_at) chỉ chạy lại bước làm sạch của batch đã lưu.
+
+        Args:
+            job_id (str): ID của job
+
+        Returns:
+            None
+        """
+
+        # Log của job mang correlation id là job id
+        correlation_token = set_correlation_id(job_id)
+        db = self.session_factory()
+        work_dir = None
+        finished = False
+        try:
+            if not self._claim(db, job_id):
+                return
+
+            with self._lock:
+                self._running.add(job_id)
+
+            job = db.get(ImportJob, job_id)
+            work_dir = job.work_dir
+            logger.info("🚀 Bắt đầu job %s (%s)", job_id, job.job_type)
+
+            results = json.loads(job.result) if job.result else new_upload_results()
+            uploaded_files = [
+                (os.path.join(work_dir, file_name), file_name)
+                for file_name in json.loads(job.file_names or "[]")
+            ]
+
+            tracker = JobStageTracker(job_id, self.session_factory)
+            processor = ExcelBatchProcessor(db)
+
+            with record_pipeline_run(
+                job.job_type, tracker, job_id, self.session_factory
+            ) as run:
+                if job.raw_committed_at is None:
+                    processor.process_uploaded_files(
+                        uploaded_files,
+                        results,
+                        tracker,
+                        on_raw_commit=lambda raw_results: self._save_raw_commit(
+                            db, job_id, raw_results
+                        ),
+                    )
+                else:
+                    # Lần chạy trước đã commit flight_raw / import_log của batch (các file
+                    # giờ bị bỏ qua vì đã import): chạy tiếp từ bước làm sạch
+                    logger.info(
+                        "⏩ Job %s đã commit raw data (batch %s), chạy tiếp từ bước làm sạch",
+                        job_id,
+                        job.import_batch_id,
+                    )
+                    if job.import_batch_id:
+                        processor.import_batch_id = job.import_batch_id
+                        processor.clean_imported_batch(results, tracker)
+
+                if job.job_type == "complete-workflow":
+                    with run.stage("workflow_summary"):
+                        results["workflow_summary"] = build_workflow_summary(results)
+
+                run.import_batch_id = processor.import_batch_id
+                run.file_count = results["processed_files"]
+
+            # Raw data đã commit nhưng làm sạch / validate lỗi: job failed để client biết,
+            # batch vẫn được lần làm sạch sau xử lý
+            cleaning_failed = bool(results.get("cleaning_failed"))
+
+            # Tracker đã ghi stages bằng session khác, không ghi đè bằng giá trị cũ
+            finished = self._finish(
+                db,
+                job_id,
+                {
+                    "status": "failed" if cleaning_failed else "completed",
+                    "result": json.dumps(results, ensure_ascii=False, default=str),
+                    "error": results["errors"][-1] if cleaning_failed else None,
+                    "finished_at": datetime.datetime.now(),
+                },
+            )
+            if finished and cleaning_failed:
+                logger.error("💥 Job %s: lỗi làm sạch dữ liệu", job_id)
+            elif finished:
+                logger.info("🎉 Hoàn thành job %s", job_id)
+            else:
+                logger.warning("⚠️ Job %s đã được process khác nhận lại", job_id)
+
+        except Exception as e:
+            db.rollback()
+            error_msg = f"Lỗi job {job_id}: {str(e)}"
+            logger.error("💥 %s", error_msg)
+
+            try:
+                finished = self._finish(
+                    db,
+                    job_id,
+                    {
+                        "status": "failed",
+                        "error": str(e),
+                        "finished_at": datetime.datetime.now(),
+                    },
+                )
+            except Exception as update_error:
+                db.rollback()
+                logger.error("Lỗi cập nhật trạng thái job %s: %s", job_id, update_error)
+
+        finally:
+            db.close()
+            with self._lock:
+                self._running.discard(job_id)
+                self._submitted.discard(job_id)
+            # Job đã kết thúc (completed/failed) ở process này: xoá các file đã upload
+            if work_dir and finished:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            reset_correlation_id(correlation_token)
+
+
+job_queue = ImportJobQueue()
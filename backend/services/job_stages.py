@@ -0,0 +1,120 @@
+import datetime
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Stage đang chạy và các bản ghi (stage, step) đang đếm số lần gọi database trong
+# context hiện tại (mỗi thread / request có context riêng)
+_active_stage: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "active_stage", default=None
+)
+_round_trip_counters: ContextVar[Tuple[Dict[str, Any], ...]] = ContextVar(
+    "round_trip_counters", default=()
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_db_round_trip(conn, cursor, statement, parameters, context, executemany):
+    """Đếm mỗi lần gửi câu lệnh tới database cho stage / step đang chạy"""
+    for record in _round_trip_counters.get():
+        record["db_round_trips"] += 1
+
+
+class StageTracker:
+    """
+    Ghi lại trạng thái, số dòng vào/ra, thời gian và số lần gọi database của từng
+    stage trong pipeline import
+
+    Lớp con override on_change() để lưu tiến độ (ví dụ vào bảng import_job)
+    """
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Chạy một stage, stage được đánh dấu failed nếu có exception
+
+        Args:
+            name (str): Tên stage
+
+        Returns:
+            Iterator[Dict[str, Any]]: Bản ghi của stage, gán "rows_in" / "rows" để lưu
+                số dòng vào / ra
+        """
+
+        record = {
+            "name": name,
+            "status": "running",
+            "rows_in": None,
+            "rows": None,
+            "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "seconds": None,
+            "db_round_trips": 0,
+            "steps": {},
+            "error": None,
+        }
+        self.stages.append(record)
+        self.on_change()
+
+        stage_token = _active_stage.set(record)
+        counter_token = _round_trip_counters.set(_round_trip_counters.get() + (record,))
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+            raise
+        else:
+            record["status"] = "completed"
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            for step in record["steps"].values():
+                step["seconds"] = round(step["seconds"], 3)
+            _round_trip_counters.reset(counter_token)
+            _active_stage.reset(stage_token)
+            self.on_change()
+
+    def on_change(self) -> None:
+        """Gọi mỗi khi một stage bắt đầu hoặc kết thúc"""
+        pass
+
+
+@contextmanager
+def track_step(name: str) -> Iterator[None]:
+    """
+    Đo thời gian và số lần gọi database của một bước bên trong stage đang chạy
+    (ví dụ ghi flight_raw, từng EXEC stored procedure). Cộng dồn nếu bước chạy nhiều
+    lần; không làm gì nếu không có stage nào đang chạy
+
+    Args:
+        name (str): Tên bước
+
+    Returns:
+        Iterator[None]
+    """
+
+    stage_record = _active_stage.get()
+    if stage_record is None:
+        yield
+        return
+
+    step = stage_record["steps"].setdefault(
+        name, {"calls": 0, "seconds": 0.0, "db_round_trips": 0}
+    )
+    step["calls"] += 1
+
+    counter_token = _round_trip_counters.set(_round_trip_counters.get() + (step,))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        step["seconds"] += time.perf_counter() - start
+        _round_trip_counters.reset(counter_token)
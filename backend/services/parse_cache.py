@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# Tăng khi định dạng cache hoặc logic parse thay đổi để bỏ qua các entry cũ
+CACHE_VERSION = 1
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: str) -> str:
+    """
+    Tính SHA-256 của nội dung file, đọc theo từng block
+
+    Args:
+        file_path (str): Đường dẫn file
+
+    Returns:
+        str: SHA-256 dạng hex (64 ký tự)
+    """
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+class ParseCache:
+    """
+    Cache trên đĩa các DataFrame đã parse và chuẩn hoá từ file Excel
+
+    Mỗi entry là một thư mục đặt tên theo SHA-256 của file, chứa các chunk (pickle)
+    theo thứ tự và file meta.json. Khi tổng dung lượng vượt max_bytes, các entry
+    dùng lâu nhất bị xoá trước.
+
+    Args:
+        cache_dir (str): Thư mục cache
+        max_bytes (int): Dung lượng tối đa của cache (byte)
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, file_hash: str) -> str:
+        return os.path.join(self.cache_dir, file_hash)
+
+    def _parse_key(self, file_name: str, search_list: List[str]) -> Dict[str, Any]:
+        # Kết quả parse phụ thuộc tên file (loại MN/MB/MT, cột source) và search_list
+        return {
+            "version": CACHE_VERSION,
+            "file_name": file_name,
+            "search_list": list(search_list),
+        }
+
+    def get(
+        self, file_hash: str, file_name: str, search_list: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lấy entry cache của file nếu có và khớp cấu hình parse
+
+        Args:
+            file_hash (str): SHA-256 của file
+            file_name (str): Tên file Excel
+            search_list (List[str]): Mã sân bay dùng khi parse file MB
+
+        Returns:
+            Dict[str, Any] or None: chunk_paths và coercion_report hoặc None
+        """
+
+        entry_dir = self._entry_dir(file_hash)
+        meta_path = os.path.join(entry_dir, "meta.json")
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("key") != self._parse_key(file_name, search_list):
+            return None
+
+        chunk_paths = [os.path.join(entry_dir, name) for name in meta["chunks"]]
+        if not all(os.path.exists(path) for path in chunk_paths):
+            return None
+
+        # Đánh dấu vừa dùng (LRU theo mtime của meta.json)
+        os.utime(meta_path)
+
+        return {
+            "chunk_paths": chunk_paths,
+            "coercion_report": meta["coercion_report"],
+        }
+
+    def put(
+        self,
+        file_hash: str,
+        file_name: str,
+        search_list: List[str],
+        chunk_paths: List[str],
+        coercion_report: Dict[str, int],
+    ) -> None:
+        """
+        Đưa các chunk đã parse (file pickle) của một file vào cache
+
+        Các file chunk được chuyển (move) vào thư mục tạm trong cache rồi đổi tên thành
+        entry, nên reader không bao giờ thấy entry ghi dở.
+
+        Args:
+            file_hash (str): SHA-256 của file
+            file_name (str): Tên file Excel
+            search_list (List[str]): Mã sân bay dùng khi parse file MB
+            chunk_paths (List[str]): Đường dẫn các chunk theo thứ tự
+            coercion_report (Dict[str, int]): Số cell bị ép về 0 theo cột
+
+        Returns:
+            None
+        """
+
+        staging_dir = None
+
+        try:
+            staging_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir)
+            chunk_names = []
+
+            for index, chunk_path in enumerate(chunk_paths):
+                chunk_name = f"{index:06d}.pkl"
+                shutil.move(chunk_path, os.path.join(staging_dir, chunk_name))
+                chunk_names.append(chunk_name)
+
+            meta = {
+                "key": self._parse_key(file_name, search_list),
+                "chunks": chunk_names,
+                "coercion_report": coercion_report,
+            }
+            with open(
+                os.path.join(staging_dir, "meta.json"), "w", encoding="utf-8"
+            ) as meta_file:
+                json.dump(meta, meta_file)
+
+            entry_dir = self._entry_dir(file_hash)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+
+            self.evict()
+
+        except Exception as e:
+            logger.error("Lỗi ghi parse cache cho file '%s': %s", file_name, e)
+            if staging_dir:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def evict(self) -> None:
+        """
+        Xoá các entry dùng lâu nhất cho tới khi cache không vượt max_bytes
+
+        Returns:
+            None
+        """
+
+        entries = []
+        total_bytes = 0
+
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry_dir, "meta.json")
+            if name.startswith(".") or not os.path.exists(meta_path):
+                continue
+
+            size = sum(
+                os.path.getsize(os.path.join(entry_dir, file))
+                for file in os.listdir(entry_dir)
+            )
+            entries.append((os.path.getmtime(meta_path), size, entry_dir))
+            total_bytes += size
+
+        for _, size, entry_dir in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+
+
+def get_parse_cache(cache_dir: str, max_mb: int) -> Optional[ParseCache]:
+    """
+    Tạo ParseCache theo cấu hình, None nếu cache bị tắt
+
+    Args:
+        cache_dir (str): Thư mục cache (rỗng = thư mục tạm của hệ thống)
+        max_mb (int): Dung lượng tối đa (MB), 0 = tắt cache
+
+    Returns:
+        ParseCache or None: Cache hoặc None nếu bị tắt
+    """
+
+    if max_mb <= 0:
+        return None
+
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "airline_parse_cache")
+
+    try:
+        return ParseCache(cache_dir, max_mb * 1024 * 1024)
+    except OSError as e:
+        logger.error("Không thể tạo parse cache tại '%s': %s", cache_dir, e)
+        return None
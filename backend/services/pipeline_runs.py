@@ -0,0 +1,267 @@
+import datetime
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from backend.db.database import SessionLocal
+from backend.models.pipeline_run import PipelineRun
+from backend.services.job_stages import StageTracker
+
+
+logger = logging.getLogger(__name__)
+
+
+# Các percentile trả về trong summary của GET /runs
+RUN_PERCENTILES = (50, 90, 95, 99)
+
+# Lần chạy đang được ghi trong context hiện tại (route gọi lồng route khác thì dùng chung)
+_active_run: ContextVar[Optional["PipelineRunRecorder"]] = ContextVar(
+    "active_pipeline_run", default=None
+)
+
+
+class PipelineRunRecorder:
+    """
+    Ghi lại một lần chạy pipeline (route hoặc import job) vào bảng pipeline_run
+
+    Các stage được đo bằng StageTracker; gán import_batch_id, file_count trong lúc
+    chạy nếu có.
+
+    Args:
+        run_type (str): Loại lần chạy (tên route / loại job)
+        tracker (StageTracker, optional): Tracker đo các stage (mặc định tạo mới)
+        job_id (str, optional): ID của import job
+    """
+
+    def __init__(
+        self,
+        run_type: str,
+        tracker: Optional[StageTracker] = None,
+        job_id: Optional[str] = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.run_type = run_type
+        self.tracker = tracker or StageTracker()
+        self.job_id = job_id
+        self.import_batch_id: Optional[str] = None
+        self.file_count: Optional[int] = None
+        self.started_at = datetime.datetime.now()
+
+    def stage(self, name: str):
+        """
+        Chạy một stage của lần chạy
+
+        Args:
+            name (str): Tên stage
+
+        Returns:
+            ContextManager[Dict[str, Any]]: Bản ghi của stage
+        """
+
+        return self.tracker.stage(name)
+
+    def save(
+        self,
+        status: str,
+        seconds: float,
+        error: Optional[str] = None,
+        session_factory=SessionLocal,
+    ) -> None:
+        """
+        Lưu lần chạy vào bảng pipeline_run bằng session riêng (độc lập với transaction
+        của pipeline), lỗi khi lưu chỉ được log lại
+
+        Args:
+            status (str): Trạng thái (completed, failed)
+            seconds (float): Tổng thời gian chạy
+            error (str, optional): Mô tả lỗi
+            session_factory: Hàm tạo Session mới
+
+        Returns:
+            None
+        """
+
+        db = session_factory()
+        try:
+            db.add(
+                PipelineRun(
+                    id=self.id,
+                    run_type=self.run_type,
+                    status=status,
+                    job_id=self.job_id,
+                    import_batch_id=self.import_batch_id,
+                    file_count=self.file_count,
+                    seconds=round(seconds, 3),
+                    db_round_trips=sum(
+                        stage["db_round_trips"] for stage in self.tracker.stages
+                    ),
+                    stages=json.dumps(self.tracker.stages, ensure_ascii=False),
+                    error=error,
+                    started_at=self.started_at,
+                    finished_at=datetime.datetime.now(),
+                )
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Lỗi lưu lịch sử chạy pipeline %s: %s", self.run_type, e)
+        finally:
+            db.close()
+
+
+@contextmanager
+def record_pipeline_run(
+    run_type: str,
+    tracker: Optional[StageTracker] = None,
+    job_id: Optional[str] = None,
+    session_factory=SessionLocal,
+) -> Iterator[PipelineRunRecorder]:
+    """
+    Đo và lưu một lần chạy pipeline vào pipeline_run, kể cả khi lần chạy thất bại
+
+    Nếu đang ở trong một lần chạy khác (ví dụ /complete-workflow gọi /upload-files),
+    các stage được ghi vào lần chạy bên ngoài.
+
+    Args:
+        run_type (str): Loại lần chạy (tên route / loại job)
+        tracker (StageTracker, optional): Tracker đo các stage (mặc định tạo mới)
+        job_id (str, optional): ID của import job
+        session_factory: Hàm tạo Session mới để lưu lịch sử
+
+    Returns:
+        Iterator[PipelineRunRecorder]: Lần chạy, dùng run.stage(...) để đo từng stage
+    """
+
+    outer_run = _active_run.get()
+    if outer_run is not None:
+        yield outer_run
+        return
+
+    run = PipelineRunRecorder(run_type, tracker, job_id)
+    token = _active_run.set(run)
+    start = time.perf_counter()
+    try:
+        yield run
+    except Exception as e:
+        run.save("failed", time.perf_counter() - start, str(e), session_factory)
+        raise
+    else:
+        run.save("completed", time.perf_counter() - start, None, session_factory)
+    finally:
+        _active_run.reset(token)
+
+
+def _percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    """
+    Tính các percentile (RUN_PERCENTILES) và max của một dãy số
+
+    Args:
+        values (List[float]): Dãy giá trị (bỏ qua None)
+
+    Returns:
+        Dict[str, float] or None: {"p50": ..., "max": ...}, None nếu không có giá trị
+    """
+
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+
+    result = {
+        f"p{percentile}": round(float(value), 3)
+        for percentile, value in zip(
+            RUN_PERCENTILES, np.percentile(values, RUN_PERCENTILES)
+        )
+    }
+    result["max"] = round(float(max(values)), 3)
+    return result
+
+
+def summarize_runs(runs: List[PipelineRun]) -> Dict[str, Any]:
+    """
+    Tổng hợp percentile thời gian, số dòng và số lần gọi database qua các lần chạy,
+    cho cả lần chạy và từng stage / step
+
+    Args:
+        runs (List[PipelineRun]): Các lần chạy cần tổng hợp
+
+    Returns:
+        Dict[str, Any]: Summary theo lần chạy và theo tên stage
+    """
+
+    stage_values: Dict[str, Dict[str, Any]] = {}
+
+    for run in runs:
+        for stage in json.loads(run.stages) if run.stages else []:
+            values = stage_values.setdefault(
+                stage["name"],
+                {"seconds": [], "rows_in": [], "rows": [], "db_round_trips": [], "steps": {}},
+            )
+            values["seconds"].append(stage.get("seconds"))
+            values["rows_in"].append(stage.get("rows_in"))
+            values["rows"].append(stage.get("rows"))
+            values["db_round_trips"].append(stage.get("db_round_trips"))
+
+            for step_name, step in (stage.get("steps") or {}).items():
+                step_values = values["steps"].setdefault(
+                    step_name, {"seconds": [], "db_round_trips": []}
+                )
+                step_values["seconds"].append(step.get("seconds"))
+                step_values["db_round_trips"].append(step.get("db_round_trips"))
+
+    return {
+        "run_count": len(runs),
+        "failed_count": sum(1 for run in runs if run.status == "failed"),
+        "seconds": _percentiles([run.seconds for run in runs]),
+        "db_round_trips": _percentiles([run.db_round_trips for run in runs]),
+        "stages": {
+            name: {
+                "count": len(values["seconds"]),
+                "seconds": _percentiles(values["seconds"]),
+                "rows_in": _percentiles(values["rows_in"]),
+                "rows": _percentiles(values["rows"]),
+                "db_round_trips": _percentiles(values["db_round_trips"]),
+                "steps": {
+                    step_name: {
+                        "seconds": _percentiles(step_values["seconds"]),
+                        "db_round_trips": _percentiles(step_values["db_round_trips"]),
+                    }
+                    for step_name, step_values in values["steps"].items()
+                },
+            }
+            for name, values in stage_values.items()
+        },
+    }
+
+
+def get_pipeline_runs(
+    db: Session, run_type: Optional[str] = None, limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Lấy các lần chạy gần nhất và summary percentile của chúng
+
+    Args:
+        db (Session): Session của database
+        run_type (str, optional): Chỉ lấy một loại lần chạy
+        limit (int): Số lần chạy gần nhất được lấy và tổng hợp
+
+    Returns:
+        Dict[str, Any]: {"summary": ..., "runs": [...]}
+    """
+
+    query = db.query(PipelineRun).order_by(PipelineRun.started_at.desc())
+    if run_type:
+        query = query.filter(PipelineRun.run_type == run_type)
+
+    runs = query.limit(limit).all()
+
+    return {
+        "summary": summarize_runs(runs),
+        "runs": [run.to_dict() for run in runs],
+    }
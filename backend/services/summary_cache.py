@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from backend.core.config import settings
+
+
+class SummaryCache:
+    """
+    Cache trong bộ nhớ (theo process) cho các summary đọc nhiều lần như
+    /stats, /processing-summary
+
+    Mỗi key hết hạn sau ttl_seconds; invalidate() xoá toàn bộ cache khi dữ liệu thay đổi
+    (import, làm sạch, revalidate, import missing dimensions). Với nhiều process, mỗi
+    process có cache riêng nên dữ liệu cũ tối đa ttl_seconds.
+
+    Args:
+        ttl_seconds (float): Thời gian sống của một entry (0 = tắt cache)
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Lấy giá trị của key từ cache, gọi loader() nếu chưa có hoặc đã hết hạn
+
+        Exception của loader không được cache.
+
+        Args:
+            key (str): Khoá cache
+            loader (Callable[[], Any]): Hàm tính giá trị
+
+        Returns:
+            Any: Giá trị của key
+        """
+
+        if self.ttl_seconds <= 0:
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            # Không lưu kết quả đã tính trước một lần invalidate()
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+        return value
+
+    def invalidate(self) -> None:
+        """Xoá toàn bộ cache"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+processing_summary_cache = SummaryCache(settings.PROCESSING_SUMMARY_CACHE_SECONDS)
@@ -0,0 +1,118 @@
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi.responses import FileResponse
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from starlette.background import BackgroundTask
+
+
+logger = logging.getLogger(__name__)
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Số dòng tối đa của một sheet Excel (kể cả header)
+XLSX_MAX_ROWS = 1048576
+
+# Một sheet cần ghi: (tên sheet, header, các lô dòng)
+XlsxSheet = Tuple[str, Sequence[str], Iterable[Sequence[Sequence[Any]]]]
+
+
+def write_xlsx(
+    path: str, sheets: Iterable[XlsxSheet], column_width: Optional[float] = None
+) -> Dict[str, int]:
+    """
+    Ghi workbook bằng openpyxl write-only: từng lô dòng được ghi thẳng xuống file tạm
+    của worksheet, bộ nhớ không phụ thuộc số dòng. Sheet vượt XLSX_MAX_ROWS được ghi
+    tiếp sang sheet "<tên> (2)", "<tên> (3)", ...
+
+    Args:
+        path (str): Đường dẫn file .xlsx
+        sheets (Iterable[XlsxSheet]): Các sheet (tên, header, các lô dòng)
+        column_width (float, optional): Độ rộng các cột
+
+    Returns:
+        Dict[str, int]: Số dòng dữ liệu đã ghi theo tên sheet (gốc)
+    """
+
+    workbook = Workbook(write_only=True)
+    row_counts: Dict[str, int] = {}
+
+    for title, header, batches in sheets:
+
+        def new_worksheet(part: int):
+            worksheet = workbook.create_sheet(
+                title if part == 1 else f"{title} ({part})"
+            )
+            if column_width:
+                for index in range(1, len(header) + 1):
+                    worksheet.column_dimensions[get_column_letter(index)].width = (
+                        column_width
+                    )
+            worksheet.append(list(header))
+            return worksheet
+
+        part = 1
+        worksheet = new_worksheet(part)
+        sheet_rows = 1
+        row_count = 0
+
+        for rows in batches:
+            for row in rows:
+                if sheet_rows >= XLSX_MAX_ROWS:
+                    part += 1
+                    worksheet = new_worksheet(part)
+                    sheet_rows = 1
+                worksheet.append(list(row))
+                sheet_rows += 1
+                row_count += 1
+
+        row_counts[title] = row_count
+
+    workbook.save(path)
+    return row_counts
+
+
+def new_xlsx_path() -> str:
+    """
+    Tạo file tạm .xlsx (rỗng) để ghi workbook
+
+    Returns:
+        str: Đường dẫn file tạm
+    """
+
+    file_descriptor, path = tempfile.mkstemp(suffix=".xlsx", prefix="export_")
+    os.close(file_descriptor)
+    return path
+
+
+def remove_file(path: str) -> None:
+    """Xoá file tạm, bỏ qua nếu file không còn"""
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning("Không thể xoá file tạm %s: %s", path, e)
+
+
+def xlsx_file_response(path: str, filename: str) -> FileResponse:
+    """
+    Trả file .xlsx dạng download (gửi theo từng chunk), xoá file tạm sau khi gửi xong
+
+    Args:
+        path (str): Đường dẫn file .xlsx
+        filename (str): Tên file khi tải về
+
+    Returns:
+        FileResponse: Response download
+    """
+
+    return FileResponse(
+        path=path,
+        filename=filename,
+        media_type=XLSX_MEDIA_TYPE,
+        background=BackgroundTask(remove_file, path),
+    )
+
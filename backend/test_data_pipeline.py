@@ -8,6 +8,8 @@ import sys
 import os
 import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # API base URL
@@ -165,6 +167,85 @@ def test_aircraft_drafts_api():
         print(f"❌ Connection error: {e}")
         return False
 
+def test_concurrent_requests_during_import():
+    """Test GET nhẹ vẫn nhanh trong khi một request import nặng đang chạy
+
+    Upload các file Excel trong thư mục TEST_EXCEL_DIR (bỏ qua nếu không đặt),
+    đồng thời gửi nhiều GET nhẹ và đo latency của chúng.
+    """
+    print("\n⏱️ Testing API latency during a heavy import...")
+
+    excel_dir = os.environ.get("TEST_EXCEL_DIR")
+    if not excel_dir:
+        print("⏭️ TEST_EXCEL_DIR chưa được đặt, bỏ qua load test")
+        return True
+
+    excel_files = sorted(
+        p for p in Path(excel_dir).iterdir() if p.suffix.lower() in (".xlsx", ".xls")
+    )
+    if not excel_files:
+        print(f"⏭️ Không có file Excel trong {excel_dir}, bỏ qua load test")
+        return True
+
+    light_clients = int(os.environ.get("TEST_LIGHT_CLIENTS", "8"))
+    requests_per_client = int(os.environ.get("TEST_REQUESTS_PER_CLIENT", "20"))
+    max_p95_seconds = float(os.environ.get("TEST_MAX_P95_SECONDS", "1.0"))
+
+    def heavy_upload():
+        files = [
+            ("files", (p.name, open(p, "rb"), "application/octet-stream"))
+            for p in excel_files
+        ]
+        try:
+            started = time.perf_counter()
+            response = requests.post(f"{BASE_URL}/data-processing/upload-files", files=files)
+            return response.status_code, time.perf_counter() - started
+        finally:
+            for _, (_, handle, _) in files:
+                handle.close()
+
+    def light_client():
+        latencies = []
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            response = requests.get(f"{BASE_URL}/")
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP Error: {response.status_code}")
+        return latencies
+
+    try:
+        with ThreadPoolExecutor(max_workers=light_clients + 1) as executor:
+            heavy_future = executor.submit(heavy_upload)
+            time.sleep(0.5)  # Đợi request import bắt đầu xử lý
+
+            light_futures = [executor.submit(light_client) for _ in range(light_clients)]
+            latencies = sorted(
+                latency for future in light_futures for latency in future.result()
+            )
+            heavy_still_running = not heavy_future.done()
+
+            heavy_status, heavy_seconds = heavy_future.result()
+
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+        print(f"   Heavy upload: HTTP {heavy_status} trong {heavy_seconds:.2f}s ({len(excel_files)} files)")
+        print(f"   Light GETs: {len(latencies)} requests, p50={p50 * 1000:.0f}ms, p95={p95 * 1000:.0f}ms, max={latencies[-1] * 1000:.0f}ms")
+
+        if not heavy_still_running:
+            print("⚠️ Upload xong trước các GET nhẹ, hãy dùng nhiều file hơn để kết quả có ý nghĩa")
+
+        if p95 > max_p95_seconds:
+            print(f"❌ p95 latency {p95:.2f}s vượt ngưỡng {max_p95_seconds:.2f}s")
+            return False
+
+        print("✅ API vẫn phản hồi nhanh trong khi import đang chạy")
+        return True
+    except Exception as e:
+        print(f"❌ Connection error: {e}")
+        return False
+
 def main():
     """Main test function"""
     print("🚀 Starting Data Pipeline Test")
@@ -178,6 +259,7 @@ def main():
         ("Aircraft Drafts API", test_aircraft_drafts_api),
         ("Data Cleaning", test_data_cleaning),
         ("Error Revalidation", test_revalidate_errors),
+        ("Concurrent Requests During Import", test_concurrent_requests_during_import),
     ]
     
     passed = 0
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Test parity giữa FlightValidator và các rule của usp_CleanAndProcessFlightData
+
+Các case chạy offline. Đặt TEST_PARITY_DATABASE_URL (SQL Server) để so sánh thêm với
+biểu thức CASE parse flightdate của SQL (chỉ SELECT, không ghi dữ liệu).
+"""
+
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+from backend.services.flight_validator import (
+    ERROR_MESSAGES,
+    FLIGHT_DATE_INVALID,
+    FLIGHT_DATE_MISSING,
+    FLIGHT_DATE_OK,
+    FlightValidator,
+    parse_flight_dates,
+    validation_flight_date,
+)
+
+
+def make_validator():
+    return FlightValidator(
+        actype_seats={"a321": 220, "a320": 180},
+        sectors={"HANSGN", "DADHAN", "BKKSGN"},
+        airport_countries={"SGN": "Vietnam", "HAN": "Vietnam", "DAD": "Vietnam", "BKK": "Thailand"},
+    )
+
+
+def make_rows(**overrides):
+    row = {
+        "flightdate": "2024-01-05 00:00:00",
+        "flightno": "VN123",
+        "route": "SGN-HAN",
+        "actype": "A321",
+        "seat": None,
+        "adl": 100.0,
+        "chd": 5.0,
+        "cgo": 0.0,
+        "mail": 0.0,
+        "totalpax": None,
+        "source": "file.xlsx",
+        "acregno": "VN-A1",
+        "sheet_name": "SGN",
+    }
+    row.update(overrides)
+    return pd.DataFrame([row])
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("45296", datetime.date(2024, 1, 5)),
+        ("5/1/2024", datetime.date(2024, 5, 1)),  # không khớp '__/_/____', đọc theo mdy
+        ("05/1/2024", datetime.date(2024, 1, 5)),
+        ("05/01/2024", datetime.date(2024, 1, 5)),
+        ("31/12/2024", datetime.date(2024, 12, 31)),
+        ("2024-01-05 00:00:00", datetime.date(2024, 1, 5)),
+        ("2024/01/05", datetime.date(2024, 1, 5)),
+        ("20240105", datetime.date(2024, 1, 5)),  # yyyyMMdd trước nhánh serial date
+        ("20241305", None),  # không phải yyyyMMdd, serial date vượt giới hạn DATETIME
+        ("45296.0", datetime.date(2024, 1, 5)),  # serial date đọc thành float
+        ("01/05/24", datetime.date(2024, 1, 5)),  # TRY_CONVERT(DATETIME) theo mdy
+        ("Jan 5 2024", datetime.date(2024, 1, 5)),
+        ("2024-01-05", datetime.date(2024, 1, 5)),
+        ("32/01/2024", None),
+        ("45296.5", None),
+        ("abc", None),
+        (None, None),
+    ],
+)
+def test_validation_flight_date(value, expected):
+    assert validation_flight_date(value) == expected
+
+
+def test_parse_flight_dates():
+    series = pd.Series(["45296", "45296", "05/01/2024", "abc", None])
+    flight_dates, status = parse_flight_dates(series)
+
+    assert list(flight_dates) == [
+        datetime.date(2024, 1, 5),
+        datetime.date(2024, 1, 5),
+        datetime.date(2024, 1, 5),
+        None,
+        None,
+    ]
+    assert list(status) == [
+        FLIGHT_DATE_OK,
+        FLIGHT_DATE_OK,
+        FLIGHT_DATE_OK,
+        FLIGHT_DATE_INVALID,
+        FLIGHT_DATE_MISSING,
+    ]
+
+
+def test_valid_row_enrichment():
+    validator = make_validator()
+    result = validator.validate(make_rows())
+
+    row = result.iloc[0]
+    assert row["TotalErrors"] == 0
+    assert row["ErrorReason"] is None
+    assert row["totalpax"] == 105
+    assert row["int_dom"] == "DOM"
+    assert row["seat"] == 220
+    assert row["convert_date"] == 20240105
+    assert row["flight_date"] == datetime.date(2024, 1, 5)
+
+
+def test_convert_date_uses_parsed_flight_date():
+    result = make_validator().validate(make_rows(flightdate="45296"))
+    assert result.iloc[0]["convert_date"] == 20240105
+
+
+def test_totalpax_falls_back_to_column():
+    result = make_validator().validate(make_rows(adl=0.0, chd=None, totalpax=42.0))
+    assert result.iloc[0]["totalpax"] == 42
+
+
+def test_int_dom():
+    validator = make_validator()
+    assert validator.validate(make_rows(route="SGN-BKK")).iloc[0]["int_dom"] == "INT"
+    assert validator.validate(make_rows(route="SGN-XXX")).iloc[0]["int_dom"] is None
+
+
+def test_route_is_normalized_to_sector():
+    validator = make_validator()
+    assert validator.validate(make_rows(route="HAN-DAD")).iloc[0]["Is_InvalidRoute"] == 0
+    assert validator.validate(make_rows(route="han-sgn")).iloc[0]["Is_InvalidRoute"] == 0
+    # RIGHT(route, 3) trong stored procedure không TRIM route
+    assert validator.validate(make_rows(route="HAN-SGN ")).iloc[0]["Is_InvalidRoute"] == 1
+    assert validator.validate(make_rows(route="SGNHAN")).iloc[0]["Is_InvalidRoute"] == 1
+    assert validator.validate(make_rows(route="SGN-PQC")).iloc[0]["Is_InvalidRoute"] == 1
+
+
+def test_actype_and_cargo_only_flights():
+    validator = make_validator()
+    assert validator.validate(make_rows(actype=" a320")).iloc[0]["Is_InvalidActypeSeat"] == 0
+    assert validator.validate(make_rows(actype="B777")).iloc[0]["Is_InvalidActypeSeat"] == 1
+
+    cargo = make_rows(actype="B777", adl=0.0, chd=0.0, totalpax=0.0, cgo=10.0)
+    assert validator.validate(cargo).iloc[0]["Is_InvalidActypeSeat"] == 0
+
+
+def test_error_reason_and_total_errors():
+    rows = make_rows(flightdate="abc", adl=0.0, chd=0.0, totalpax=0.0, route="SGN-PQC", actype="B777")
+    row = make_validator().validate(rows).iloc[0]
+
+    assert row["TotalErrors"] == 4
+    assert row["ErrorReason"] == ", ".join(ERROR_MESSAGES.values())
+
+
+def test_split_and_type_filter():
+    validator = make_validator()
+    rows = pd.concat(
+        [
+            make_rows(route="HAN-SGN", sheet_name="HAN"),
+            make_rows(route="SGN-HAN", sheet_name="SGN"),
+            make_rows(route="BKK-SGN", sheet_name=None),
+            make_rows(route="DAD-HAN", sheet_name="DAD"),
+            make_rows(route="HAN-DAD", sheet_name="SGN", flightdate="abc"),
+        ],
+        ignore_index=True,
+    )
+
+    valid, errors = validator.split(validator.validate(rows))
+
+    assert list(valid["type_filter"]) == [0, 1, 2, 3]
+    assert (valid["region_type"] == 10).all()
+    assert list(valid["int_dom_"]) == ["DOM", "DOM", "INT", "DOM"]
+    assert len(errors) == 1
+    assert errors.iloc[0]["Is_InvalidFlightDate"] == 1
+
+
+PARITY_FLIGHT_DATES = [
+    "45296",
+    "05/1/2024",
+    "05/01/2024",
+    "2024-01-05 00:00:00",
+    "2024/01/05",
+    "01/05/24",
+    "Jan 5 2024",
+    "32/01/2024",
+    "abc",
+]
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_PARITY_DATABASE_URL"),
+    reason="Cần TEST_PARITY_DATABASE_URL (SQL Server) để so sánh với stored procedure",
+)
+def test_flight_date_parity_with_sql_server():
+    from sqlalchemy import bindparam, create_engine, text
+
+    # Biểu thức CASE parse flightdate trước đây của usp_CleanAndProcessFlightData (bước 4.1),
+    # vẫn dùng khi backfill flight_date cho dữ liệu cũ
+    query = text(
+        """
+        SELECT v.flightdate,
+            CASE
+                WHEN ISNUMERIC(v.flightdate) = 1 THEN DATEADD(DAY, CAST(v.flightdate AS INT), '1899-12-30')
+                WHEN v.flightdate LIKE '__/_/____' THEN TRY_CONVERT(DATE, v.flightdate, 103)
+                WHEN v.flightdate LIKE '__/__/____' THEN TRY_CONVERT(DATE, v.flightdate, 103)
+                WHEN v.flightdate LIKE '____-__-__ %' THEN TRY_CONVERT(DATE, LEFT(v.flightdate, 10), 120)
+                WHEN v.flightdate LIKE '____/__/__' THEN TRY_CONVERT(DATE, v.flightdate, 111)
+                WHEN LEN(TRIM(v.flightdate)) = 8 AND ISNUMERIC(TRIM(v.flightdate)) = 1
+                    THEN TRY_CONVERT(DATE, TRIM(v.flightdate), 112)
+                ELSE TRY_CONVERT(DATETIME, v.flightdate)
+            END AS validation_date
+        FROM (SELECT value AS flightdate FROM STRING_SPLIT(:values, '|')) v
+        """
+    ).bindparams(bindparam("values"))
+
+    engine = create_engine(os.environ["TEST_PARITY_DATABASE_URL"])
+    with engine.connect() as connection:
+        rows = connection.execute(query, {"values": "|".join(PARITY_FLIGHT_DATES)}).all()
+
+    for flightdate, validation_date in rows:
+        expected = validation_date.date() if isinstance(validation_date, datetime.datetime) else validation_date
+        assert validation_flight_date(flightdate) == expected, flightdate
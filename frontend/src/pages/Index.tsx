@@ -545,13 +545,11 @@ const Index = () => {
             const encodedStartDate = encodeURIComponent(startDateStr)
             const encodedEndDate = encodeURIComponent(endDateStr)
 
+            // Server builds the .xlsx file (sheet "Flight Report") and returns it as a download
             const response = await fetch(
-                `${import.meta.env.VITE_API_URL}/data-processing/export-flight-data?start_date=${encodedStartDate}&end_date=${encodedEndDate}`,
+                `${import.meta.env.VITE_API_URL}/data-processing/export-flight-data?start_date=${encodedStartDate}&end_date=${encodedEndDate}&output_format=xlsx`,
                 {
                     method: 'GET',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
                 }
             )
 
@@ -563,28 +561,18 @@ const Index = () => {
                 return
             }
 
-            // Parse JSON response
-            let result: ExportFlightDataResponse
-            try {
-                result = await response.json() as ExportFlightDataResponse
-            } catch (parseError) {
-                toast.error("Lỗi khi xử lý dữ liệu", {
-                    description: "Phản hồi từ server không hợp lệ.",
-                })
-                return
-            }
-
-            // Handle unsuccessful response
-            if (!result.success) {
-                const message = result.message || "Có lỗi xảy ra khi xuất dữ liệu."
-                toast.warning("Không thể xuất dữ liệu", {
-                    description: message,
-                })
-                return
-            }
+            // No data in the selected range: server answers with JSON instead of a file
+            if (response.headers.get("content-type")?.includes("application/json")) {
+                let result: ExportFlightDataResponse
+                try {
+                    result = await response.json() as ExportFlightDataResponse
+                } catch (parseError) {
+                    toast.error("Lỗi khi xử lý dữ liệu", {
+                        description: "Phản hồi từ server không hợp lệ.",
+                    })
+                    return
+                }
 
-            // Handle empty data
-            if (!result.data || !Array.isArray(result.data) || result.data.length === 0) {
                 const message = result.message || "Không có dữ liệu chuyến bay trong khoảng thời gian đã chọn."
                 toast.warning("Không có dữ liệu", {
                     description: message,
@@ -592,46 +580,6 @@ const Index = () => {
                 return
             }
 
-            // Export to Excel
-            const XLSX = await import("xlsx")
-            //! ===== UPDATE HERE =====
-            const excelData = result.data.map((flight: FlightExportData, index: number) => ({
-                STT: index + 1,
-                "Flight Date": flight.flightdate || "",
-                "Flight No": flight.flightno || "",
-                "Route": flight.route || "",
-                "Aircraft Type": flight.actype || "",
-                "Total Pax": flight.totalpax || 0,
-                "Cargo": flight.cgo || 0,
-                "Mail": flight.mail || 0,
-                "Aircraft Registration": flight.acregno || "",
-                "Source": flight.source || "",
-                "Sheet Name": flight.sheet_name || "",
-                "Seat": flight.seat || "",
-                "Int/Dom": flight.int_dom || "",
-                "Airline Code": flight.airline_code || "",
-                "Airlines Name": flight.airlines_name || "",
-                "Airline Nation": flight.airline_nation || "",
-                "Airline Nation Code": flight.airline_nation_code || "",
-                "Departure": flight.departure || "",
-                "City Departure": flight.city_departure || "",
-                "Country Departure": flight.country_departure || "",
-                "Arrives": flight.arrives || "",
-                "City Arrives": flight.city_arrives || "",
-                "Country Arrives": flight.country_arrives || "",
-                "Country Code": flight.country_code || "",
-                "Area Code": flight.area_code || "",
-            }))
-
-            const ws = XLSX.utils.json_to_sheet(excelData)
-            const wb = XLSX.utils.book_new()
-            XLSX.utils.book_append_sheet(wb, ws, "Flight Report")
-
-            // Auto-fit column widths
-            const maxWidth = 30
-            const wscols = Object.keys(excelData[0] || {}).map(() => ({ wch: maxWidth }))
-            ws['!cols'] = wscols
-
             // Generate filename based on date range
             let fileName: string
             if ((endDate.getTime() - startDate.getTime()) <= 24 * 60 * 60 * 1000) {
@@ -640,7 +588,16 @@ const Index = () => {
                 fileName = `flight_report_${format(startDate, "yyyy-MM-dd")}_to_${format(endDate, "yyyy-MM-dd")}.xlsx`
             }
 
-            XLSX.writeFile(wb, fileName)
+            // Download the workbook
+            const blob = await response.blob()
+            const url = URL.createObjectURL(blob)
+            const link = document.createElement("a")
+            link.href = url
+            link.download = fileName
+            document.body.appendChild(link)
+            link.click()
+            link.remove()
+            URL.revokeObjectURL(url)
         } catch (error) {
             toast.error("Lỗi khi xuất dữ liệu", {
                 description: error instanceof Error ? error.message : "Có lỗi không xác định xảy ra",